@@ -5,15 +5,137 @@ For deployment on Hugging Face Spaces
 """
 
 import gradio as gr
+import uvicorn
 import os
-from cloudflare_manager import CloudflareManager, CloudflareAccount
+import queue
+import shutil
+import asyncio
+import zipfile
+import tempfile
+import threading
+import functools
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, wait as futures_wait
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from cloudflare_manager import ManagerPool
+from metrics import REGISTRY
 
 
+# Queue tuning: read-only buttons and long-running writes get separate
+# concurrency groups so a slow create_zone never blocks a listing
+READ_CONCURRENCY = int(os.getenv("READ_CONCURRENCY", "16"))
+WRITE_CONCURRENCY = int(os.getenv("WRITE_CONCURRENCY", "4"))
+PER_USER_CONCURRENCY = int(os.getenv("PER_USER_CONCURRENCY", "2"))
+QUEUE_MAX_SIZE = int(os.getenv("QUEUE_MAX_SIZE", "200"))
+
+READ_EVENT = {"concurrency_limit": READ_CONCURRENCY, "concurrency_id": "cloudflare-reads"}
+WRITE_EVENT = {"concurrency_limit": WRITE_CONCURRENCY, "concurrency_id": "cloudflare-writes"}
+
+# Blocking Cloudflare API calls run here, never on the event loop
+api_executor = ThreadPoolExecutor(max_workers=READ_CONCURRENCY + WRITE_CONCURRENCY,
+                                  thread_name_prefix="cloudflare-api")
+
+# Warm managers shared by all requests, keyed by a hash of (email, token)
+manager_pool = ManagerPool(
+    max_size=int(os.getenv("MANAGER_POOL_SIZE", "64")),
+    idle_ttl=float(os.getenv("MANAGER_POOL_IDLE_TTL", "1800"))
+)
+
+# Listings re-render the output after this many new rows
+LIST_RENDER_EVERY = 10
+# Spool buffer for extracting uploaded archives to disk
+SPOOL_CHUNK_SIZE = 1 << 20
+ZONE_STATUSES = ["all", "active", "pending", "initializing", "moved", "deactivated"]
+
+# Requests each user has running, keyed like the manager pool
+_user_active = {}
+
+
+def get_manager(email, token):
+    """Get a pooled manager for the given credentials"""
+    return manager_pool.get(email, token, use_api_key=True)
+
+
+@contextlib.contextmanager
+def user_slot(email, token):
+    """Claim one of the user's PER_USER_CONCURRENCY slots; yields False when all are taken
+
+    Requests over the cap are turned away at once rather than waiting, since a
+    waiting request would hold one of the shared queue slots while it waits.
+    Runs on the event loop only, so the counter needs no lock.
+    """
+    key = ManagerPool.key(email or "", token or "")
+    active = _user_active.get(key, 0)
+    if active >= PER_USER_CONCURRENCY:
+        yield False
+        return
+    _user_active[key] = active + 1
+    try:
+        yield True
+    finally:
+        _user_active[key] -= 1
+        if not _user_active[key]:
+            del _user_active[key]
+
+
+def busy_message():
+    return (f"⏳ You already have {PER_USER_CONCURRENCY} requests running. "
+            f"Try again when one of them finishes.")
+
+
+def _close_after(future, iterator):
+    """Wait for a next() in flight, then close the generator (runs on the API pool)"""
+    futures_wait([future])
+    iterator.close()
+
+
+def streaming_handler(fn):
+    """Like blocking_handler for generator handlers: each next() runs on the API pool"""
+    @functools.wraps(fn)
+    async def handler(email, token, *args):
+        with user_slot(email, token) as claimed:
+            if not claimed:
+                yield busy_message()
+                return
+            iterator = fn(email, token, *args)
+            done = object()
+            future = None
+            try:
+                while True:
+                    future = api_executor.submit(next, iterator, done)
+                    value = await asyncio.wrap_future(future)
+                    if value is done:
+                        return
+                    yield value
+            finally:
+                # A client disconnect abandons the generator mid-stream: close it once
+                # any next() in flight returns, releasing its open response now. The
+                # user's slot is held until the generator's own cleanup has finished
+                if future is None:
+                    iterator.close()
+                else:
+                    await asyncio.wrap_future(api_executor.submit(_close_after, future, iterator))
+    return handler
+
+
+def blocking_handler(fn):
+    """Run a blocking (email, token, ...) handler on the API pool within the user's slot"""
+    @functools.wraps(fn)
+    async def handler(email, token, *args):
+        with user_slot(email, token) as claimed:
+            if not claimed:
+                return busy_message()
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(api_executor, functools.partial(fn, email, token, *args))
+    return handler
+
+
+@blocking_handler
 def test_connection(email, token):
     """Test Cloudflare API connection"""
     try:
-        account = CloudflareAccount(email=email, token=token, use_api_key=True)
-        cf = CloudflareManager(account)
+        cf = get_manager(email, token)
         
         if cf.account.account_id:
             return f"✓ Connected!\n\nAccount: {cf.account.name}\nID: {cf.account.account_id}"
@@ -23,33 +145,80 @@ def test_connection(email, token):
         return f"✗ Error: {str(e)}"
 
 
-def list_projects(email, token):
-    """List all Pages projects"""
+def format_project(project):
+    """Render one Pages project for the listing output"""
+    result = f"📦 {project['name']}\n"
+    result += f"   URL: https://{project.get('subdomain', 'N/A')}\n"
+    result += f"   Created: {project.get('created_on', 'N/A')}\n\n"
+    return result
+
+
+def iter_projects_from(cf, skip):
+    """Stream projects from offset `skip` on, fetching only the API pages that cover it"""
+    api_page, offset = divmod(skip, cf.PROJECTS_PAGE_SIZE)
+    api_page += 1
+    while True:
+        envelope = {}
+        for index, project in enumerate(cf.iter_pages_projects_page(api_page, envelope)):
+            if index >= offset:
+                yield project
+        if not envelope:
+            raise RuntimeError("Failed to list projects")
+        if api_page >= (envelope.get("result_info") or {}).get("total_pages", 0):
+            return
+        api_page += 1
+        offset = 0
+
+
+@streaming_handler
+def list_projects(email, token, search="", page=1, page_size=20):
+    """List one page of Pages projects, streaming rows as they arrive
+
+    Without a search term only the API pages covering the requested page are
+    fetched; a search filters names client-side and so walks from the start.
+    """
     try:
-        account = CloudflareAccount(email=email, token=token, use_api_key=True)
-        cf = CloudflareManager(account)
-        
-        projects = cf.list_pages_projects()
+        cf = get_manager(email, token)
+        page = max(1, int(page or 1))
+        page_size = int(page_size or 20)
+        term = (search or "").strip().lower()
+        skip = (page - 1) * page_size
         
-        if not projects:
-            return "No projects found."
+        yield f"⏳ Loading page {page}..."
         
-        result = f"Found {len(projects)} project(s):\n\n"
+        if term:
+            projects = cf.iter_pages_projects(stream=True)
+        else:
+            projects = iter_projects_from(cf, skip)
+        result = ""
+        matched = shown = 0
         for project in projects:
-            result += f"📦 {project['name']}\n"
-            result += f"   URL: https://{project.get('subdomain', 'N/A')}\n"
-            result += f"   Created: {project.get('created_on', 'N/A')}\n\n"
+            if term:
+                if term not in project["name"].lower():
+                    continue
+                matched += 1
+                if matched <= skip:
+                    continue
+            result += format_project(project)
+            shown += 1
+            if shown >= page_size:
+                break
+            if shown % LIST_RENDER_EVERY == 0:
+                yield f"⏳ Loading page {page}... ({shown} so far)\n\n" + result
         
-        return result
+        if not shown:
+            yield "No projects found."
+            return
+        yield f"Projects {skip + 1}-{skip + shown} (page {page}):\n\n" + result
     except Exception as e:
-        return f"✗ Error: {str(e)}"
+        yield f"✗ Error: {str(e)}"
 
 
+@blocking_handler
 def create_project(email, token, project_name, branch):
     """Create a new Pages project"""
     try:
-        account = CloudflareAccount(email=email, token=token, use_api_key=True)
-        cf = CloudflareManager(account)
+        cf = get_manager(email, token)
         
         project = cf.create_pages_project(project_name, branch)
         
@@ -61,40 +230,63 @@ def create_project(email, token, project_name, branch):
         return f"✗ Error: {str(e)}"
 
 
-def list_zones(email, token):
-    """List all zones"""
+def format_zone(zone):
+    """Render one zone for the listing output"""
+    result = f"🌐 {zone['name']}\n"
+    result += f"   Zone ID: {zone['id']}\n"
+    result += f"   Status: {zone.get('status', 'unknown')}\n"
+    
+    nameservers = zone.get('name_servers', [])
+    if nameservers:
+        result += f"   Nameservers:\n"
+        for ns in nameservers:
+            result += f"     - {ns}\n"
+    return result + "\n"
+
+
+@streaming_handler
+def list_zones(email, token, search="", status="all", page=1, page_size=50):
+    """List one page of zones, filtered and paged by the API, streaming rows as they arrive"""
     try:
-        account = CloudflareAccount(email=email, token=token, use_api_key=True)
-        cf = CloudflareManager(account)
-        
-        zones = cf.list_zones()
+        cf = get_manager(email, token)
+        page = max(1, int(page or 1))
+        page_size = int(page_size or 50)
+        params = {}
+        if (search or "").strip():
+            params["name"] = f"contains:{search.strip()}"
+        if status and status != "all":
+            params["status"] = status
         
-        if not zones:
-            return "No zones found."
+        yield f"⏳ Loading page {page}..."
         
-        result = f"Found {len(zones)} zone(s):\n\n"
-        for zone in zones:
-            result += f"🌐 {zone['name']}\n"
-            result += f"   Zone ID: {zone['id']}\n"
-            result += f"   Status: {zone.get('status', 'unknown')}\n"
-            
-            nameservers = zone.get('name_servers', [])
-            if nameservers:
-                result += f"   Nameservers:\n"
-                for ns in nameservers:
-                    result += f"     - {ns}\n"
-            result += "\n"
+        envelope = {}
+        result = ""
+        count = 0
+        for zone in cf.iter_zones_page(page, page_size, params, envelope):
+            result += format_zone(zone)
+            count += 1
+            if count % LIST_RENDER_EVERY == 0:
+                yield f"⏳ Loading page {page}... ({count} so far)\n\n" + result
         
-        return result
+        if not envelope:
+            yield "✗ Failed to list zones"
+            return
+        if not count:
+            yield "No zones found."
+            return
+        info = envelope.get("result_info") or {}
+        start = (page - 1) * page_size + 1
+        yield (f"Zones {start}-{start + count - 1} of {info.get('total_count', '?')} "
+               f"(page {page}/{info.get('total_pages', '?')}):\n\n") + result
     except Exception as e:
-        return f"✗ Error: {str(e)}"
+        yield f"✗ Error: {str(e)}"
 
 
+@blocking_handler
 def create_zone_and_get_ns(email, token, domain_name):
     """Create zone and get nameservers"""
     try:
-        account = CloudflareAccount(email=email, token=token, use_api_key=True)
-        cf = CloudflareManager(account)
+        cf = get_manager(email, token)
         
         zone = cf.create_zone(domain_name)
         
@@ -112,11 +304,11 @@ def create_zone_and_get_ns(email, token, domain_name):
         return f"✗ Error: {str(e)}"
 
 
+@blocking_handler
 def bind_domain(email, token, project_name, domain_name):
     """Bind domain to Pages project"""
     try:
-        account = CloudflareAccount(email=email, token=token, use_api_key=True)
-        cf = CloudflareManager(account)
+        cf = get_manager(email, token)
         
         result_data = cf.add_pages_domain(project_name, domain_name)
         
@@ -139,11 +331,11 @@ def bind_domain(email, token, project_name, domain_name):
         return f"✗ Error: {str(e)}"
 
 
+@blocking_handler
 def create_worker_route(email, token, zone_id, pattern, script_name):
     """Create worker route"""
     try:
-        account = CloudflareAccount(email=email, token=token, use_api_key=True)
-        cf = CloudflareManager(account)
+        cf = get_manager(email, token)
         
         route = cf.create_worker_route(zone_id, pattern, script_name)
         
@@ -155,6 +347,128 @@ def create_worker_route(email, token, zone_id, pattern, script_name):
         return f"✗ Error: {str(e)}"
 
 
+def _upload_path(upload):
+    """Gradio passes uploads as paths or as objects with a .name path"""
+    return upload if isinstance(upload, str) else getattr(upload, "name", str(upload))
+
+
+def stage_upload(archive, staging_dir):
+    """Spool an uploaded zip into staging_dir and return the site root
+    
+    Archive members are copied to disk in chunks, never read whole into memory.
+    Folders are deployed as a zip: Gradio stores each uploaded file of a folder
+    as <hash>/<basename>, so the site's directory layout would be lost.
+    """
+    if not archive:
+        raise ValueError("Upload a .zip archive of the site to deploy")
+    with zipfile.ZipFile(_upload_path(archive)) as zf:
+        root = os.path.realpath(staging_dir)
+        for member in zf.infolist():
+            target = os.path.realpath(os.path.join(root, member.filename))
+            if not target.startswith(root + os.sep):
+                raise ValueError(f"Unsafe path in archive: {member.filename}")
+            if member.is_dir():
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with zf.open(member) as src, open(target, "wb") as dst:
+                shutil.copyfileobj(src, dst, SPOOL_CHUNK_SIZE)
+    # A zip of a single top-level folder deploys that folder
+    entries = os.listdir(staging_dir)
+    if len(entries) == 1 and os.path.isdir(os.path.join(staging_dir, entries[0])):
+        return os.path.join(staging_dir, entries[0])
+    return staging_dir
+
+
+def format_deploy_progress(phase, info):
+    """Render one deploy progress event"""
+    mb = 1024 * 1024
+    done = info.get("bytes", 0) / mb
+    total = info.get("total_bytes", 0) / mb
+    if phase == "scan":
+        return f"📄 Found {info['total_files']} files ({total:.1f} MB)"
+    if phase == "hash":
+        return f"🔑 Hashed {info['files']}/{info['total_files']} files ({done:.1f}/{total:.1f} MB)"
+    if phase == "upload":
+        percent = 100 * info["bytes"] / info["total_bytes"] if info.get("total_bytes") else 100
+        eta = f", ETA {info['eta']:.0f}s" if info.get("eta") is not None else ""
+        return (f"⬆️ Uploaded {done:.1f}/{total:.1f} MB ({percent:.0f}%) "
+                f"at {info.get('rate', 0) / mb:.2f} MB/s{eta}")
+    if phase == "processing":
+        return f"⏳ Upload complete after {info['elapsed']:.1f}s, waiting for Cloudflare..."
+    return f"{phase}: {info}"
+
+
+@streaming_handler
+def deploy_project(email, token, project_name, branch, commit_message, archive, wait):
+    """Deploy an uploaded zip to a Pages project, streaming progress"""
+    staging_dir = tempfile.mkdtemp(prefix="pages-deploy-")
+    worker = None
+    try:
+        if not project_name:
+            yield "✗ Project name is required"
+            return
+        cf = get_manager(email, token)
+        
+        yield "📥 Spooling upload to disk..."
+        site_dir = stage_upload(archive, staging_dir)
+        
+        # Run the deploy in the background and relay its progress events
+        events = queue.Queue()
+        outcome = {}
+        
+        def run():
+            try:
+                outcome["deployment"] = cf.deploy_pages_project(
+                    project_name, site_dir, branch or "main", commit_message or "Deploy via web UI",
+                    wait=bool(wait), progress=lambda phase, info: events.put((phase, info))
+                )
+            except Exception as e:
+                outcome["error"] = e
+            finally:
+                events.put(None)
+        
+        worker = threading.Thread(target=run, name="pages-deploy", daemon=True)
+        worker.start()
+        
+        lines = []
+        while True:
+            event = events.get()
+            if event is None:
+                break
+            phase, info = event
+            line = format_deploy_progress(phase, info)
+            # Keep one line per phase, updated in place
+            if lines and lines[-1][0] == phase:
+                lines[-1] = (phase, line)
+            else:
+                lines.append((phase, line))
+            yield "\n".join(text for _, text in lines)
+        
+        log = "\n".join(text for _, text in lines)
+        if "error" in outcome:
+            yield f"{log}\n\n✗ Error: {outcome['error']}"
+            return
+        deployment = outcome.get("deployment")
+        if not deployment:
+            yield f"{log}\n\n✗ Deployment failed"
+            return
+        
+        result = f"{log}\n\n✓ Deployment created: {deployment.get('id')}\nURL: {deployment.get('url')}\n"
+        waited = deployment.get("wait")
+        if waited:
+            result += f"Status: {waited.get('status')}\n"
+            for stage, seconds in (waited.get("stages") or {}).items():
+                result += f"  {stage}: {seconds:.1f}s\n"
+        yield result
+    except Exception as e:
+        yield f"✗ Error: {str(e)}"
+    finally:
+        # After a client disconnect the deploy is still reading files from staging
+        if worker is not None:
+            worker.join()
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+
 # Create Gradio interface
 with gr.Blocks(title="Cloudflare Manager") as demo:
     gr.Markdown("""
@@ -164,6 +478,7 @@ with gr.Blocks(title="Cloudflare Manager") as demo:
     
     ## Features
     - ✅ Pages project management
+    - ✅ Pages deploys from a zip upload
     - ✅ Domain binding
     - ✅ Nameserver lookup
     - ✅ Worker route configuration
@@ -191,7 +506,8 @@ with gr.Blocks(title="Cloudflare Manager") as demo:
             test_btn.click(
                 test_connection,
                 inputs=[email_input, token_input],
-                outputs=test_output
+                outputs=test_output,
+                **READ_EVENT
             )
         
         # Tab 2: Pages Projects
@@ -199,13 +515,28 @@ with gr.Blocks(title="Cloudflare Manager") as demo:
             with gr.Row():
                 with gr.Column():
                     gr.Markdown("### List Projects")
+                    with gr.Row():
+                        projects_search = gr.Textbox(label="Search", placeholder="name contains...")
+                        projects_page_size = gr.Dropdown(label="Per page", choices=[10, 20, 50], value=20)
+                    with gr.Row():
+                        projects_prev_btn = gr.Button("◀ Prev")
+                        projects_page = gr.Number(label="Page", value=1, precision=0, minimum=1)
+                        projects_next_btn = gr.Button("Next ▶")
                     list_projects_btn = gr.Button("List Projects")
                     list_projects_output = gr.Textbox(label="Projects", lines=10)
+                    projects_inputs = [email_input, token_input, projects_search, projects_page, projects_page_size]
                     list_projects_btn.click(
                         list_projects,
-                        inputs=[email_input, token_input],
-                        outputs=list_projects_output
+                        inputs=projects_inputs,
+                        outputs=list_projects_output,
+                        **READ_EVENT
                     )
+                    projects_prev_btn.click(
+                        lambda page: max(1, int(page or 1) - 1), projects_page, projects_page, queue=False
+                    ).then(list_projects, inputs=projects_inputs, outputs=list_projects_output, **READ_EVENT)
+                    projects_next_btn.click(
+                        lambda page: int(page or 1) + 1, projects_page, projects_page, queue=False
+                    ).then(list_projects, inputs=projects_inputs, outputs=list_projects_output, **READ_EVENT)
                 
                 with gr.Column():
                     gr.Markdown("### Create Project")
@@ -216,21 +547,59 @@ with gr.Blocks(title="Cloudflare Manager") as demo:
                     create_project_btn.click(
                         create_project,
                         inputs=[email_input, token_input, project_name, project_branch],
-                        outputs=create_project_output
+                        outputs=create_project_output,
+                        **WRITE_EVENT
                     )
         
-        # Tab 3: Domains & Zones
+        # Tab 3: Deploy
+        with gr.Tab("🚀 Deploy"):
+            gr.Markdown("### Deploy a Site to Pages\nUpload a .zip of the built site.")
+            with gr.Row():
+                with gr.Column():
+                    deploy_project_name = gr.Textbox(label="Project Name", placeholder="my-website")
+                    deploy_branch = gr.Textbox(label="Branch", value="main")
+                    deploy_message = gr.Textbox(label="Commit Message", value="Deploy via web UI")
+                    deploy_wait = gr.Checkbox(label="Wait for the deployment to finish", value=True)
+                with gr.Column():
+                    deploy_archive = gr.File(label="Site archive (.zip)", file_types=[".zip"])
+            deploy_btn = gr.Button("Deploy", variant="primary")
+            deploy_output = gr.Textbox(label="Progress", lines=10)
+            deploy_btn.click(
+                deploy_project,
+                inputs=[email_input, token_input, deploy_project_name, deploy_branch, deploy_message,
+                        deploy_archive, deploy_wait],
+                outputs=deploy_output,
+                **WRITE_EVENT
+            )
+        
+        # Tab 4: Domains & Zones
         with gr.Tab("🌐 Domains & Zones"):
             with gr.Row():
                 with gr.Column():
                     gr.Markdown("### List Zones")
+                    with gr.Row():
+                        zones_search = gr.Textbox(label="Search", placeholder="name contains...")
+                        zones_status = gr.Dropdown(label="Status", choices=ZONE_STATUSES, value="all")
+                        zones_page_size = gr.Dropdown(label="Per page", choices=[20, 50], value=50)
+                    with gr.Row():
+                        zones_prev_btn = gr.Button("◀ Prev")
+                        zones_page = gr.Number(label="Page", value=1, precision=0, minimum=1)
+                        zones_next_btn = gr.Button("Next ▶")
                     list_zones_btn = gr.Button("List Zones")
                     list_zones_output = gr.Textbox(label="Zones", lines=10)
+                    zones_inputs = [email_input, token_input, zones_search, zones_status, zones_page, zones_page_size]
                     list_zones_btn.click(
                         list_zones,
-                        inputs=[email_input, token_input],
-                        outputs=list_zones_output
+                        inputs=zones_inputs,
+                        outputs=list_zones_output,
+                        **READ_EVENT
                     )
+                    zones_prev_btn.click(
+                        lambda page: max(1, int(page or 1) - 1), zones_page, zones_page, queue=False
+                    ).then(list_zones, inputs=zones_inputs, outputs=list_zones_output, **READ_EVENT)
+                    zones_next_btn.click(
+                        lambda page: int(page or 1) + 1, zones_page, zones_page, queue=False
+                    ).then(list_zones, inputs=zones_inputs, outputs=list_zones_output, **READ_EVENT)
                 
                 with gr.Column():
                     gr.Markdown("### Create Zone & Get Nameservers")
@@ -240,10 +609,11 @@ with gr.Blocks(title="Cloudflare Manager") as demo:
                     create_zone_btn.click(
                         create_zone_and_get_ns,
                         inputs=[email_input, token_input, zone_domain],
-                        outputs=create_zone_output
+                        outputs=create_zone_output,
+                        **WRITE_EVENT
                     )
         
-        # Tab 4: Domain Binding
+        # Tab 5: Domain Binding
         with gr.Tab("🔗 Bind Domain"):
             gr.Markdown("### Bind Domain to Pages Project")
             with gr.Row():
@@ -254,10 +624,11 @@ with gr.Blocks(title="Cloudflare Manager") as demo:
             bind_btn.click(
                 bind_domain,
                 inputs=[email_input, token_input, bind_project, bind_domain_name],
-                outputs=bind_output
+                outputs=bind_output,
+                **WRITE_EVENT
             )
         
-        # Tab 5: Worker Routes
+        # Tab 6: Worker Routes
         with gr.Tab("⚡ Worker Routes"):
             gr.Markdown("### Create Worker Route")
             worker_zone_id = gr.Textbox(label="Zone ID", placeholder="abc123...")
@@ -268,7 +639,8 @@ with gr.Blocks(title="Cloudflare Manager") as demo:
             worker_btn.click(
                 create_worker_route,
                 inputs=[email_input, token_input, worker_zone_id, worker_pattern, worker_script],
-                outputs=worker_output
+                outputs=worker_output,
+                **WRITE_EVENT
             )
     
     gr.Markdown("""
@@ -293,11 +665,24 @@ with gr.Blocks(title="Cloudflare Manager") as demo:
     3. DNS propagation takes 5-30 minutes
     """)
 
+demo.queue(default_concurrency_limit=WRITE_CONCURRENCY, max_size=QUEUE_MAX_SIZE)
+
+pool_size = REGISTRY.gauge("cloudflare_manager_pool_size", "Warm managers held by the web UI")
+
+# The Gradio UI is mounted on a FastAPI app so Prometheus can scrape /metrics
+app = FastAPI()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus scrape endpoint for Cloudflare API metrics"""
+    pool_size.set(len(manager_pool))
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+app = gr.mount_gradio_app(app, demo, path="/")
+
 
 if __name__ == "__main__":
-    # Run with sharing enabled for Hugging Face Spaces
-    demo.launch(
-        server_name="0.0.0.0",
-        server_port=7860,
-        share=False
-    )
+    # Serve on all interfaces for Hugging Face Spaces
+    uvicorn.run(app, host="0.0.0.0", port=7860)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for CloudflareManager against the local mock API
+
+Scenarios:
+    deploy  - Pages deploy of a generated site (10,000 files by default)
+    zones   - streamed paginated listing of 50,000 zones
+    fanout  - broadcast_worker to 50 accounts, one route each
+    routes  - bulk creation of 1,000 worker routes across 10 zones
+
+Results are written as JSON; --baseline compares against an earlier run
+and exits 1 when a scenario got slower than --threshold allows.
+
+Usage:
+    python benchmark.py --output benchmark_results.json
+    python benchmark.py --scale 0.1 --baseline benchmark_results.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from cloudflare_manager import CloudflareManager, CloudflareAccount, MultiAccountManager, StateStore
+from metrics import MetricsRegistry, ApiMetrics
+from mock_cloudflare import MockCloudflareServer
+
+
+SCENARIOS = ("deploy", "zones", "fanout", "routes")
+
+# Full-size workloads; --scale multiplies the counts
+SIZES = {"deploy_files": 10000, "deploy_file_size": 1024, "zones": 50000, "accounts": 50,
+         "routes": 1000, "route_zones": 10}
+
+WORKER_SOURCE = "export default { async fetch(request) { return new Response('bench') } }\n"
+
+
+class Bench:
+    """Shared fixtures for one benchmark run"""
+
+    def __init__(self, server: MockCloudflareServer, workdir: str, scale: float, concurrency: int):
+        self.server = server
+        self.workdir = workdir
+        self.scale = scale
+        self.concurrency = concurrency
+        self.state = StateStore(os.path.join(workdir, "state.json"))
+
+    def size(self, name: str) -> int:
+        return max(1, int(SIZES[name] * self.scale))
+
+    def manager(self, token: str = "bench-token", metrics: Optional[ApiMetrics] = None) -> CloudflareManager:
+        account = CloudflareAccount(email="bench@example.com", token=token)
+        return CloudflareManager(account, state=self.state, metrics=metrics, base_url=self.server.url)
+
+
+def measure(bench: Bench, run: Callable[[Bench, ApiMetrics], Dict]) -> Dict:
+    """Run one scenario with its own metrics and return timings plus request stats"""
+    metrics = ApiMetrics(MetricsRegistry())
+    requests_before = bench.server.api.request_count
+    bytes_before = bench.server.api.bytes_received
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        started = time.perf_counter()
+        result = run(bench, metrics)
+        seconds = time.perf_counter() - started
+    count, total = metrics.latency.totals()
+    result.update(
+        seconds=round(seconds, 4),
+        requests=bench.server.api.request_count - requests_before,
+        bytes_uploaded=bench.server.api.bytes_received - bytes_before,
+        mean_latency_ms=round(1000 * total / count, 3) if count else None,
+    )
+    return result
+
+
+def scenario_deploy(bench: Bench, metrics: ApiMetrics) -> Dict:
+    files, file_size = bench.size("deploy_files"), SIZES["deploy_file_size"]
+    site = os.path.join(bench.workdir, "site")
+    if not os.path.isdir(site):
+        payload = os.urandom(file_size)
+        for n in range(files):
+            directory = os.path.join(site, f"dir{n // 100:03d}")
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, f"file{n}.html"), "wb") as f:
+                f.write(payload[:file_size - 8] + n.to_bytes(8, "big"))
+    cf = bench.manager(metrics=metrics)
+    if not cf.get_pages_project("bench-site"):
+        cf.create_pages_project("bench-site")
+    started = time.perf_counter()
+    deployment = cf.deploy_pages_project("bench-site", site)
+    seconds = time.perf_counter() - started
+    assert deployment and deployment["files"] == files, "deploy did not upload every file"
+    return {"files": files, "files_per_sec": round(files / seconds, 1),
+            "mb_per_sec": round(deployment["bytes"] / seconds / 1e6, 2)}
+
+
+def scenario_zones(bench: Bench, metrics: ApiMetrics) -> Dict:
+    expected = bench.size("zones")
+    missing = expected - len(bench.server.api.zones)
+    if missing > 0:
+        bench.server.api.add_zones(missing, prefix="list")
+    cf = bench.manager(metrics=metrics)
+    started = time.perf_counter()
+    count = sum(1 for _ in cf.iter_zones(strict=True, stream=True))
+    seconds = time.perf_counter() - started
+    assert count >= expected, f"listed {count} of {expected} zones"
+    return {"zones": count, "zones_per_sec": round(count / seconds, 1)}
+
+
+def scenario_fanout(bench: Bench, metrics: ApiMetrics) -> Dict:
+    accounts = bench.size("accounts")
+    zone_ids = bench.server.api.add_zones(accounts, prefix="fanout")
+    worker = os.path.join(bench.workdir, "worker.js")
+    with open(worker, "w", encoding="utf-8") as f:
+        f.write(WORKER_SOURCE)
+    multi = MultiAccountManager(base_url=bench.server.url)
+    routes = {}
+    for n, zone_id in enumerate(zone_ids):
+        name = f"account{n}"
+        manager = multi.add_account(name, f"{name}@example.com", f"bench-token-{n}")
+        manager.state, manager.metrics = bench.state, metrics
+        routes[name] = [(zone_id, f"fanout{n}.example.com/*")]
+    results = multi.broadcast_worker("bench-worker", worker, routes=routes, max_workers=bench.concurrency,
+                                     force=True)
+    ok = sum(1 for entry in results.values() if entry["upload"] == "uploaded" and all(
+        route["ok"] for route in entry["routes"]))
+    assert ok == accounts, f"{accounts - ok} account(s) failed"
+    slowest = max(entry["timings"]["total"] for entry in results.values())
+    return {"accounts": accounts, "slowest_account_seconds": round(slowest, 4)}
+
+
+def scenario_routes(bench: Bench, metrics: ApiMetrics) -> Dict:
+    total, zones = bench.size("routes"), min(bench.size("route_zones"), bench.size("routes"))
+    zone_ids = bench.server.api.add_zones(zones, prefix="routes")
+    cf = bench.manager(metrics=metrics)
+    jobs = [(zone_ids[n % zones], f"r{n}.routes{n % zones}.example.com/*") for n in range(total)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=bench.concurrency) as pool:
+        created = list(pool.map(lambda job: cf.create_worker_route(job[0], job[1], "bench-worker"), jobs))
+    seconds = time.perf_counter() - started
+    assert all(created), f"{created.count(None)} route(s) failed"
+    return {"routes": total, "routes_per_sec": round(total / seconds, 1)}
+
+
+RUNNERS = {"deploy": scenario_deploy, "zones": scenario_zones, "fanout": scenario_fanout,
+           "routes": scenario_routes}
+
+
+def run_benchmarks(scenarios: List[str], scale: float = 1.0, concurrency: int = 16) -> Dict:
+    """Run the selected scenarios against a fresh mock server"""
+    workdir = tempfile.mkdtemp(prefix="cf-bench-")
+    try:
+        with MockCloudflareServer() as server:
+            bench = Bench(server, workdir, scale, concurrency)
+            results = {}
+            for name in scenarios:
+                print(f"⏱️  {name}...", flush=True)
+                results[name] = measure(bench, RUNNERS[name])
+                print(f"   {results[name]['seconds']:.2f}s, {results[name]['requests']} requests", flush=True)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": scale,
+        "concurrency": concurrency,
+        "scenarios": results,
+    }
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Scenarios whose run time grew by more than `threshold` (0.2 = 20%) over the baseline"""
+    regressions = []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous or baseline.get("scale") != results["scale"]:
+            continue
+        if current["seconds"] > previous["seconds"] * (1 + threshold):
+            regressions.append(f"{name}: {previous['seconds']:.2f}s -> {current['seconds']:.2f}s")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark CloudflareManager against the mock API")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated scenarios to run")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply workload sizes (e.g. 0.1 for a quick run)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Worker threads for concurrent scenarios")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before failing")
+    args = parser.parse_args(argv)
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in RUNNERS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    results = run_benchmarks(scenarios, args.scale, args.concurrency)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"✓ Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"✗ Regression: {line}")
+        if regressions:
+            return 1
+        print("✓ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,668 @@
+#!/usr/bin/env python3
+"""
+Non-interactive command line interface for scripts and CI pipelines
+
+Results are written to stdout as JSON (or NDJSON with --format ndjson, one
+item per line as it arrives); progress and error messages go to stderr.
+Only argparse/json are imported up front, so --help and argument errors
+return without loading requests or the manager.
+
+Credentials come from, in order: --email/--token/--account-id, the
+CLOUDFLARE_EMAIL / CLOUDFLARE_TOKEN (or CLOUDFLARE_API_TOKEN for a Bearer
+token) / CLOUDFLARE_ACCOUNT_ID environment variables, then the --profile
+entry of the config file (CLOUDFLARE_CONFIG, default
+~/.cloudflare_manager/config.json):
+
+    {"default": {"email": "...", "token": "...", "account_id": "..."}}
+
+R2 object commands also need an R2 access key pair: R2_ACCESS_KEY_ID /
+R2_SECRET_ACCESS_KEY, or r2_access_key_id / r2_secret_access_key in the
+profile.
+
+Usage:
+    python cli.py zones list --status active --format ndjson
+    python cli.py ns example.com
+    python cli.py deploy my-site ./dist --wait
+    python cli.py routes apply routes.json --prune
+    python cli.py routes match https://shop.example.com/api/x --zone example.com
+    python cli.py apply zones.json          # after a crash: python cli.py resume zones.json.journal
+    python cli.py dns import example.com example.com.zone --dry-run
+    python cli.py purge example.com --url-file changed.txt
+    python cli.py kv write <namespace-id> --ndjson pairs.ndjson
+    python cli.py r2 upload media ./videos --prefix videos/ --concurrency 8
+"""
+
+import os
+import sys
+import json
+import argparse
+import contextlib
+from typing import Any, Dict, Iterable, List, Optional
+
+
+DEFAULT_CONFIG = os.path.join(os.path.expanduser("~"), ".cloudflare_manager", "config.json")
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+
+class CLIError(Exception):
+    """A failure reported as a message on stderr and a non-zero exit code"""
+
+
+def load_config(path: str, profile: str) -> Dict:
+    """Read one profile from the JSON config file; {} when it does not exist"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            profiles = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        raise CLIError(f"Cannot read config {path}: {e}")
+    if profile not in profiles:
+        raise CLIError(f"Profile {profile!r} not found in {path}")
+    return profiles[profile]
+
+
+def resolve_credentials(args: argparse.Namespace) -> Dict:
+    """Merge flags, environment and config file into email/token/account_id/use_api_key"""
+    config = load_config(args.config, args.profile)
+    api_token = os.getenv("CLOUDFLARE_API_TOKEN")
+    email = args.email or os.getenv("CLOUDFLARE_EMAIL") or config.get("email", "")
+    token = args.token or os.getenv("CLOUDFLARE_TOKEN") or api_token or config.get("token", "")
+    if not token:
+        raise CLIError("No credentials: pass --token or set CLOUDFLARE_TOKEN / CLOUDFLARE_API_TOKEN")
+    use_api_key = config.get("use_api_key", bool(email))
+    if args.api_token or (token == api_token and not args.token):
+        use_api_key = False
+    return {
+        "email": email,
+        "token": token,
+        "account_id": args.account_id or os.getenv("CLOUDFLARE_ACCOUNT_ID") or config.get("account_id"),
+        "use_api_key": use_api_key,
+        "r2_access_key_id": os.getenv("R2_ACCESS_KEY_ID") or config.get("r2_access_key_id"),
+        "r2_secret_access_key": os.getenv("R2_SECRET_ACCESS_KEY") or config.get("r2_secret_access_key"),
+    }
+
+
+def get_manager(args: argparse.Namespace):
+    """Build a manager, reusing the account ID remembered from earlier runs"""
+    from cloudflare_manager import CloudflareManager, CloudflareAccount, ManagerPool, StateStore
+
+    creds = resolve_credentials(args)
+    state = StateStore()
+    state_key = "account:" + ManagerPool.key(creds["email"], creds["token"], creds["use_api_key"])
+    cached = state.get(state_key) or {}
+    account = CloudflareAccount(email=creds["email"], token=creds["token"],
+                                account_id=creds["account_id"] or cached.get("id"),
+                                name=cached.get("name"), use_api_key=creds["use_api_key"],
+                                r2_access_key_id=creds["r2_access_key_id"],
+                                r2_secret_access_key=creds["r2_secret_access_key"])
+    manager = CloudflareManager(account, state=state)
+    if not account.account_id:
+        raise CLIError("Could not determine the account ID; check the credentials")
+    if not creds["account_id"] and not cached:
+        state.set(state_key, {"id": account.account_id, "name": account.name})
+    return manager
+
+
+def pick(item: Any, fields: Optional[List[str]]) -> Any:
+    """Keep only the requested top-level fields of a dict"""
+    if not fields or not isinstance(item, dict):
+        return item
+    return {field: item.get(field) for field in fields}
+
+
+class Output:
+    """Writes results to the real stdout while manager messages go to stderr"""
+
+    def __init__(self, stream, fmt: str = "json", fields: Optional[List[str]] = None):
+        self.stream = stream
+        self.fmt = fmt
+        self.fields = fields
+
+    def write(self, value: Any):
+        json.dump(pick(value, self.fields), self.stream, default=str)
+        self.stream.write("\n")
+        self.stream.flush()
+
+    def items(self, items: Iterable[Any]) -> int:
+        """Emit a listing: streamed line by line for ndjson, one array for json"""
+        if self.fmt == "ndjson":
+            count = 0
+            for item in items:
+                self.write(item)
+                count += 1
+            return count
+        items = [pick(item, self.fields) for item in items]
+        json.dump(items, self.stream, default=str)
+        self.stream.write("\n")
+        return len(items)
+
+
+def require(value: Any, message: str) -> Any:
+    if not value:
+        raise CLIError(message)
+    return value
+
+
+# ==================== Commands ====================
+
+def cmd_accounts_list(cf, args, out):
+    out.items(cf.iter_accounts(strict=True, stream=True))
+
+
+def cmd_zones_list(cf, args, out):
+    params = {}
+    if args.status:
+        params["status"] = args.status
+    if args.name:
+        params["name"] = args.name
+    out.items(cf.iter_zones(params=params, strict=True, stream=True))
+
+
+def cmd_zones_create(cf, args, out):
+    out.write(require(cf.create_zone(args.domain, args.type), f"Failed to create zone {args.domain}"))
+
+
+def cmd_ns(cf, args, out):
+    zones = list(cf.iter_zones(params={"name": args.domain}, strict=True))
+    zone = require(zones and zones[0], f"Zone not found for domain: {args.domain}")
+    out.write({"name": zone["name"], "status": zone.get("status"), "name_servers": zone.get("name_servers", [])})
+
+
+def cmd_projects_list(cf, args, out):
+    out.items(cf.iter_pages_projects(strict=True, stream=True))
+
+
+def cmd_projects_create(cf, args, out):
+    out.write(require(cf.create_pages_project(args.name, args.branch), f"Failed to create project {args.name}"))
+
+
+def cmd_deploy(cf, args, out):
+    def progress(phase, info):
+        if args.progress:
+            print(json.dumps({"phase": phase, **info}), file=sys.stderr, flush=True)
+
+    if args.purge_zone and not args.purge_host:
+        raise CLIError("--purge-zone needs at least one --purge-host to build the URLs to purge")
+    purge_zone = resolve_zone(cf, args.purge_zone, {}) if args.purge_zone else None
+    deployment = cf.deploy_pages_project(args.project, args.directory, args.branch, args.message,
+                                         wait=args.wait, timeout=args.timeout, progress=progress,
+                                         purge_zone=purge_zone, purge_hosts=args.purge_host or ())
+    deployment = require(deployment, f"Failed to deploy {args.project}")
+    out.write(deployment)
+    if (args.wait or purge_zone) and (deployment.get("wait") or {}).get("status") != "success":
+        raise CLIError(f"Deployment {deployment.get('id')} did not succeed")
+    if (deployment.get("purge") or {}).get("failed"):
+        raise CLIError("Cache purge after the deploy failed")
+
+
+def cmd_purge(cf, args, out):
+    if not (args.everything or args.url or args.prefix or args.host or args.tag):
+        raise CLIError("Nothing to purge: pass --url, --prefix, --host, --tag or --everything")
+    urls = list(args.url or [])
+    if args.url_file:
+        with open(args.url_file, "r", encoding="utf-8") as f:
+            urls.extend(line.strip() for line in f if line.strip())
+    summary = cf.purge_cache(resolve_zone(cf, args.zone, {}), files=urls, prefixes=args.prefix or (),
+                             hosts=args.host or (), tags=args.tag or (), everything=args.everything,
+                             max_workers=args.concurrency)
+    out.write(summary)
+    if summary["failed"]:
+        raise CLIError(f"{summary['failed']} purge target(s) failed")
+
+
+def cmd_domains_list(cf, args, out):
+    out.items(cf.list_pages_domains(args.project))
+
+
+def cmd_domains_add(cf, args, out):
+    results = cf.attach_pages_domains([(args.project, domain) for domain in args.domains], wait=args.wait,
+                                      timeout=args.timeout)
+    failed = [domain for (_, domain), result in results.items() if result.get("status") == "failed"]
+    out.items(dict(result, name=domain) for (_, domain), result in results.items())
+    if failed:
+        raise CLIError(f"Failed to add: {', '.join(failed)}")
+
+
+def cmd_workers_list(cf, args, out):
+    out.items(cf.list_workers(strict=True))
+
+
+def cmd_workers_upload(cf, args, out):
+    bindings = None
+    if args.bindings:
+        with open(args.bindings, "r", encoding="utf-8") as f:
+            bindings = json.load(f)
+    result = cf.upload_worker(args.name, args.path, bindings=bindings, force=args.force,
+                              main_module=args.main_module, compatibility_date=args.compatibility_date,
+                              compatibility_flags=args.compatibility_flag)
+    out.write(require(result, f"Failed to upload worker {args.name}"))
+
+
+def cmd_routes_list(cf, args, out):
+    out.items(cf.list_worker_routes(resolve_zone(cf, args.zone, {}), strict=True))
+
+
+def resolve_zone(cf, zone: str, cache: Dict[str, str]) -> str:
+    """Accept a zone ID or a zone name"""
+    if zone not in cache:
+        if len(zone) == 32 and "." not in zone:
+            cache[zone] = zone
+        else:
+            zones = list(cf.iter_zones(params={"name": zone}, strict=True))
+            cache[zone] = require(zones and zones[0]["id"], f"Zone not found: {zone}")
+    return cache[zone]
+
+
+def cmd_routes_match(cf, args, out):
+    zones: Dict[str, str] = {}
+    index = cf.worker_route_index((resolve_zone(cf, zone, zones) for zone in args.zone), strict=True)
+    out.items({"url": url, "route": index.match(url)} for url in args.urls)
+
+
+def cmd_routes_conflicts(cf, args, out):
+    zones: Dict[str, str] = {}
+    index = cf.worker_route_index((resolve_zone(cf, zone, zones) for zone in args.zones), strict=True)
+    conflicts = index.conflicts()
+    out.items(conflicts)
+    if conflicts:
+        raise CLIError(f"{len(conflicts)} conflicting route pair(s) in {len(index)} route(s)")
+
+
+def plan_routes(desired: List[Dict], current: Dict[str, List[Dict]], prune: bool) -> List[Dict]:
+    """Compare wanted routes with the zones' current routes
+
+    Args:
+        desired: [{"zone_id", "pattern", "script"}]
+        current: zone_id -> routes listed from the API
+        prune: Also delete routes in those zones that are not wanted
+    Returns:
+        Actions {"action": create|update|delete|unchanged, "zone_id", "pattern", "script", "id"}
+    """
+    actions = []
+    wanted = set()
+    for route in desired:
+        zone_id, pattern, script = route["zone_id"], route["pattern"], route["script"]
+        wanted.add((zone_id, pattern))
+        existing = next((r for r in current.get(zone_id, []) if r.get("pattern") == pattern), None)
+        if existing is None:
+            action = "create"
+        elif existing.get("script") != script:
+            action = "update"
+        else:
+            action = "unchanged"
+        actions.append({"action": action, "zone_id": zone_id, "pattern": pattern, "script": script,
+                        "id": existing and existing.get("id")})
+    if prune:
+        for zone_id, routes in current.items():
+            for route in routes:
+                if (zone_id, route.get("pattern")) not in wanted:
+                    actions.append({"action": "delete", "zone_id": zone_id, "pattern": route.get("pattern"),
+                                    "script": route.get("script"), "id": route.get("id")})
+    return actions
+
+
+def cmd_routes_apply(cf, args, out):
+    journal = new_journal(args.journal) if args.journal else None
+    with open(args.file, "r", encoding="utf-8") as f:
+        routes = json.load(f)
+    zones: Dict[str, str] = {}
+    desired = [{"zone_id": resolve_zone(cf, route.get("zone_id") or route["zone"], zones),
+                "pattern": route["pattern"], "script": route["script"]} for route in routes]
+    current = {zone_id: cf.list_worker_routes(zone_id, strict=True)
+               for zone_id in dict.fromkeys(route["zone_id"] for route in desired)}
+    actions = plan_routes(desired, current, args.prune)
+
+    if journal and not args.dry_run:
+        steps = [{"action": f"{action['action']}_worker_route",
+                  **{field: action[field] for field in ("zone_id", "id", "pattern", "script") if action[field]}}
+                 for action in actions if action["action"] != "unchanged"]
+        return run_plan(cf, journal.begin("routes apply", steps), out)
+
+    failed = 0
+    for action in actions:
+        ok = True
+        if not args.dry_run:
+            if action["action"] == "create":
+                ok = bool(cf.create_worker_route(action["zone_id"], action["pattern"], action["script"]))
+            elif action["action"] == "update":
+                ok = bool(cf.update_worker_route(action["zone_id"], action["id"], action["pattern"],
+                                                 action["script"]))
+            elif action["action"] == "delete":
+                ok = cf.delete_worker_route(action["zone_id"], action["id"])
+        failed += not ok
+        out.write(dict(action, ok=ok, dry_run=args.dry_run))
+    if failed:
+        raise CLIError(f"{failed} route change(s) failed")
+
+
+def new_journal(path: str):
+    from journal import Journal
+
+    journal = Journal(path)
+    if journal.started:
+        raise CLIError(f"Journal {path} already exists; continue it with: resume {path}")
+    return journal
+
+
+def run_plan(cf, journal, out):
+    from journal import run_journal
+
+    summary = run_journal(cf, journal, on_step=out.write)
+    if summary["failed"]:
+        raise CLIError(f"{summary['failed']} step(s) failed; run: resume {journal.path}")
+
+
+def cmd_apply(cf, args, out):
+    with open(args.file, "r", encoding="utf-8") as f:
+        steps = json.load(f)
+    journal = new_journal(args.journal or args.file + ".journal")
+    zones: Dict[str, str] = {}
+    for step in steps:
+        if "zone" in step:
+            step["zone_id"] = resolve_zone(cf, step.pop("zone"), zones)
+    try:
+        journal.begin("apply", steps)
+    except ValueError as e:
+        raise CLIError(str(e))
+    run_plan(cf, journal, out)
+
+
+def cmd_resume(cf, args, out):
+    from journal import Journal
+
+    if not os.path.exists(args.journal):
+        raise CLIError(f"No journal at {args.journal}")
+    journal = Journal(args.journal)
+    require(journal.started, f"Journal {args.journal} has no plan")
+    run_plan(cf, journal, out)
+
+
+def cmd_dns_list(cf, args, out):
+    params = {key: value for key, value in (("type", args.type), ("name", args.name)) if value}
+    out.items(cf.iter_dns_records(resolve_zone(cf, args.zone, {}), params=params, strict=True, stream=True))
+
+
+def cmd_dns_export(cf, args, out):
+    text = require(cf.export_zone_file(resolve_zone(cf, args.zone, {})), f"Zone not found: {args.zone}")
+    if not args.output:
+        out.stream.write(text)
+        return
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(text)
+    out.write({"zone": args.zone, "path": args.output,
+               "records": sum(1 for line in text.splitlines() if not line.startswith("$"))})
+
+
+def cmd_dns_import(cf, args, out):
+    from zonefile import ZoneFileError
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        text = f.read()
+    try:
+        summary = cf.import_zone_file(resolve_zone(cf, args.zone, {}), text, origin=args.origin,
+                                      prune=args.prune, batch_size=args.batch_size,
+                                      max_workers=args.concurrency, dry_run=args.dry_run)
+    except ZoneFileError as e:
+        raise CLIError(f"{args.file}: {e}")
+    out.write(dict(summary, dry_run=args.dry_run))
+    if summary["failed"]:
+        raise CLIError(f"{summary['failed']} DNS record change(s) failed")
+
+
+def cmd_kv_namespaces(cf, args, out):
+    out.items(cf.list_kv_namespaces(strict=True))
+
+
+def cmd_kv_create(cf, args, out):
+    out.write(require(cf.create_kv_namespace(args.title), f"Failed to create namespace {args.title}"))
+
+
+def cmd_kv_write(cf, args, out):
+    source = args.ndjson or args.dir
+    if not source:
+        raise CLIError("Nothing to write: pass --ndjson or --dir")
+    if args.ndjson == "-" and not args.resume_key:
+        raise CLIError("Reading stdin needs --resume-key to be resumable")
+    try:
+        summary = cf.bulk_write_kv(args.namespace, source, max_workers=args.concurrency, resume_key=args.resume_key)
+    except ValueError as e:
+        raise CLIError(str(e))
+    out.write(summary)
+    if not summary["complete"]:
+        raise CLIError(f"Bulk write stopped at chunk {summary['failed_chunk']}; run it again to resume")
+
+
+def cmd_kv_delete(cf, args, out):
+    stream = sys.stdin if args.keys_file == "-" else open(args.keys_file, "r", encoding="utf-8")
+    try:
+        keys = (line.rstrip("\n") for line in stream if line.strip())
+        summary = cf.bulk_delete_kv(args.namespace, keys, max_workers=args.concurrency,
+                                    resume_key=args.resume_key or (None if args.keys_file == "-"
+                                                                   else os.path.abspath(args.keys_file)))
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    out.write(summary)
+    if not summary["complete"]:
+        raise CLIError(f"Bulk delete stopped at chunk {summary['failed_chunk']}; run it again to resume")
+
+
+def cmd_r2_buckets(cf, args, out):
+    out.items(cf.list_r2_buckets(strict=True))
+
+
+def cmd_r2_create(cf, args, out):
+    out.write(require(cf.create_r2_bucket(args.name, location_hint=args.location), f"Failed to create {args.name}"))
+
+
+def cmd_r2_upload(cf, args, out):
+    part_size = args.part_size * 1024 * 1024 if args.part_size else None
+    try:
+        if os.path.isdir(args.path):
+            summary = cf.upload_r2_directory(args.bucket, args.path, prefix=args.prefix, part_size=part_size,
+                                             max_workers=args.concurrency, force=args.force)
+            out.write(summary)
+            if summary["failed"]:
+                raise CLIError(f"{summary['failed']} file(s) failed to upload")
+            return
+        key = args.key or args.prefix + os.path.basename(args.path)
+        result = cf.upload_r2_object(args.bucket, key, args.path, part_size=part_size,
+                                     max_workers=args.concurrency, force=args.force)
+    except ValueError as e:
+        raise CLIError(str(e))
+    out.write(require(result, f"Failed to upload {args.path}"))
+
+
+# ==================== Parser ====================
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cloudflare-manager", description="Cloudflare Manager CLI")
+    parser.add_argument("--email", help="Account email (API key auth)")
+    parser.add_argument("--token", help="API key, or API token with --api-token")
+    parser.add_argument("--api-token", action="store_true", help="Treat --token as a Bearer API token")
+    parser.add_argument("--account-id", help="Account ID (skips auto-detection)")
+    parser.add_argument("--config", default=os.getenv("CLOUDFLARE_CONFIG", DEFAULT_CONFIG), help="Config file")
+    parser.add_argument("--profile", default=os.getenv("CLOUDFLARE_PROFILE", "default"), help="Config profile")
+    parser.add_argument("--format", choices=["json", "ndjson"], default="json", help="Output format")
+    parser.add_argument("--fields", help="Comma-separated fields to keep in each result")
+    sub = parser.add_subparsers(dest="command", metavar="command", required=True)
+
+    accounts = sub.add_parser("accounts", help="Accounts").add_subparsers(dest="action", required=True)
+    accounts.add_parser("list", help="List accounts").set_defaults(func=cmd_accounts_list)
+
+    zones = sub.add_parser("zones", help="Zones").add_subparsers(dest="action", required=True)
+    p = zones.add_parser("list", help="List zones")
+    p.add_argument("--status", help="Only zones with this status")
+    p.add_argument("--name", help="Only the zone with this name")
+    p.set_defaults(func=cmd_zones_list)
+    p = zones.add_parser("create", help="Create a zone")
+    p.add_argument("domain")
+    p.add_argument("--type", default="full", choices=["full", "partial"])
+    p.set_defaults(func=cmd_zones_create)
+
+    p = sub.add_parser("ns", help="Show a zone's nameservers")
+    p.add_argument("domain")
+    p.set_defaults(func=cmd_ns)
+
+    projects = sub.add_parser("projects", help="Pages projects").add_subparsers(dest="action", required=True)
+    projects.add_parser("list", help="List projects").set_defaults(func=cmd_projects_list)
+    p = projects.add_parser("create", help="Create a project")
+    p.add_argument("name")
+    p.add_argument("--branch", default="main", help="Production branch")
+    p.set_defaults(func=cmd_projects_create)
+
+    p = sub.add_parser("deploy", help="Deploy a directory to a Pages project")
+    p.add_argument("project")
+    p.add_argument("directory")
+    p.add_argument("--branch", default="main")
+    p.add_argument("--message", default="Deploy via CLI", help="Commit message")
+    p.add_argument("--wait", action="store_true", help="Wait for the deployment; fail unless it succeeds")
+    p.add_argument("--timeout", type=float, default=900.0, help="Seconds to wait")
+    p.add_argument("--progress", action="store_true", help="Write progress events to stderr as NDJSON")
+    p.add_argument("--purge-zone", help="Zone (ID or name) to purge changed files from once the deploy is live "
+                                        "(implies --wait)")
+    p.add_argument("--purge-host", action="append", help="Hostname serving the project (required with --purge-zone); may be repeated")
+    p.set_defaults(func=cmd_deploy)
+
+    p = sub.add_parser("purge", help="Purge cached content from a zone")
+    p.add_argument("zone", help="Zone ID or name")
+    p.add_argument("--url", action="append", help="Full URL; may be repeated")
+    p.add_argument("--url-file", help="File with one URL per line")
+    p.add_argument("--prefix", action="append", help="host/path prefix; may be repeated")
+    p.add_argument("--host", action="append", help="Hostname; may be repeated")
+    p.add_argument("--tag", action="append", help="Cache tag; may be repeated")
+    p.add_argument("--everything", action="store_true", help="Purge the whole zone")
+    p.add_argument("--concurrency", type=int, default=4, help="Purge requests in flight")
+    p.set_defaults(func=cmd_purge)
+
+    domains = sub.add_parser("domains", help="Pages custom domains").add_subparsers(dest="action", required=True)
+    p = domains.add_parser("list", help="List a project's domains")
+    p.add_argument("project")
+    p.set_defaults(func=cmd_domains_list)
+    p = domains.add_parser("add", help="Add domains to a project")
+    p.add_argument("project")
+    p.add_argument("domains", nargs="+")
+    p.add_argument("--wait", action="store_true", help="Wait for validation to finish")
+    p.add_argument("--timeout", type=float, default=1800.0, help="Seconds to wait")
+    p.set_defaults(func=cmd_domains_add)
+
+    workers = sub.add_parser("workers", help="Worker scripts").add_subparsers(dest="action", required=True)
+    workers.add_parser("list", help="List worker scripts").set_defaults(func=cmd_workers_list)
+    p = workers.add_parser("upload", help="Upload a script file or bundle directory")
+    p.add_argument("name")
+    p.add_argument("path")
+    p.add_argument("--main-module")
+    p.add_argument("--bindings", help="JSON file with the bindings list")
+    p.add_argument("--compatibility-date", default="2023-01-01")
+    p.add_argument("--compatibility-flag", action="append", help="May be repeated")
+    p.add_argument("--force", action="store_true", help="Upload even if unchanged")
+    p.set_defaults(func=cmd_workers_upload)
+
+    routes = sub.add_parser("routes", help="Worker routes").add_subparsers(dest="action", required=True)
+    p = routes.add_parser("list", help="List a zone's routes")
+    p.add_argument("zone", help="Zone ID or name")
+    p.set_defaults(func=cmd_routes_list)
+    p = routes.add_parser("match", help="Show which route handles each URL")
+    p.add_argument("urls", nargs="+")
+    p.add_argument("--zone", action="append", required=True, help="Zone ID or name (may be repeated)")
+    p.set_defaults(func=cmd_routes_match)
+    p = routes.add_parser("conflicts", help="Report duplicate and overlapping routes (exit 1 if any)")
+    p.add_argument("zones", nargs="+", help="Zone IDs or names")
+    p.set_defaults(func=cmd_routes_conflicts)
+    p = routes.add_parser("apply", help="Create or update routes from a JSON file")
+    p.add_argument("file", help='JSON list of {"zone" or "zone_id", "pattern", "script"}')
+    p.add_argument("--prune", action="store_true", help="Delete other routes in the listed zones")
+    p.add_argument("--dry-run", action="store_true", help="Only print the planned changes")
+    p.add_argument("--journal", help="Record each change here so an interrupted run can be resumed")
+    p.set_defaults(func=cmd_routes_apply)
+
+    p = sub.add_parser("apply", help="Run a plan of zone, project, domain and route changes with a journal")
+    p.add_argument("file", help='JSON list of steps, e.g. {"action": "create_zone", "domain": "example.com"}')
+    p.add_argument("--journal", help="Journal path (default: <file>.journal)")
+    p.set_defaults(func=cmd_apply)
+    p = sub.add_parser("resume", help="Continue an interrupted apply or routes apply from its journal")
+    p.add_argument("journal")
+    p.set_defaults(func=cmd_resume)
+
+    dns = sub.add_parser("dns", help="DNS records").add_subparsers(dest="action", required=True)
+    p = dns.add_parser("list", help="List a zone's DNS records")
+    p.add_argument("zone", help="Zone ID or name")
+    p.add_argument("--type", help="Only records of this type")
+    p.add_argument("--name", help="Only records with this name")
+    p.set_defaults(func=cmd_dns_list)
+    p = dns.add_parser("export", help="Write a zone's records as a BIND zone file")
+    p.add_argument("zone", help="Zone ID or name")
+    p.add_argument("--output", help="File to write (default: stdout)")
+    p.set_defaults(func=cmd_dns_export)
+    p = dns.add_parser("import", help="Create or update records from a BIND zone file")
+    p.add_argument("zone", help="Zone ID or name")
+    p.add_argument("file")
+    p.add_argument("--origin", help="Origin for relative names (default: the zone name)")
+    p.add_argument("--prune", action="store_true", help="Delete records not in the file")
+    p.add_argument("--dry-run", action="store_true", help="Only count the changes")
+    p.add_argument("--batch-size", type=int, help="Changes per batch request (default: the plan's limit)")
+    p.add_argument("--concurrency", type=int, default=4, help="Batch requests in flight")
+    p.set_defaults(func=cmd_dns_import)
+
+    kv = sub.add_parser("kv", help="Workers KV").add_subparsers(dest="action", required=True)
+    kv.add_parser("namespaces", help="List KV namespaces").set_defaults(func=cmd_kv_namespaces)
+    p = kv.add_parser("create", help="Create a KV namespace")
+    p.add_argument("title")
+    p.set_defaults(func=cmd_kv_create)
+    p = kv.add_parser("write", help="Bulk write keys; re-running after a failure resumes")
+    p.add_argument("namespace", help="Namespace ID")
+    p.add_argument("--ndjson", help='NDJSON file of {"key", "value", ...} ("-" for stdin)')
+    p.add_argument("--dir", help="Directory; one key per file, named by its relative path")
+    p.add_argument("--resume-key", help="Job name for resuming (default: the input path)")
+    p.add_argument("--concurrency", type=int, default=4, help="Bulk requests in flight")
+    p.set_defaults(func=cmd_kv_write)
+    p = kv.add_parser("delete", help="Bulk delete keys")
+    p.add_argument("namespace", help="Namespace ID")
+    p.add_argument("keys_file", help='File with one key per line ("-" for stdin)')
+    p.add_argument("--resume-key", help="Job name for resuming (default: the file path)")
+    p.add_argument("--concurrency", type=int, default=4, help="Bulk requests in flight")
+    p.set_defaults(func=cmd_kv_delete)
+
+    r2 = sub.add_parser("r2", help="R2 buckets and objects").add_subparsers(dest="action", required=True)
+    r2.add_parser("buckets", help="List R2 buckets").set_defaults(func=cmd_r2_buckets)
+    p = r2.add_parser("create", help="Create an R2 bucket")
+    p.add_argument("name")
+    p.add_argument("--location", help="Location hint, e.g. weur")
+    p.set_defaults(func=cmd_r2_create)
+    p = r2.add_parser("upload", help="Upload a file or directory; unchanged objects are skipped")
+    p.add_argument("bucket")
+    p.add_argument("path", help="File, or directory to upload recursively")
+    p.add_argument("--key", help="Object key for a single file (default: prefix + file name)")
+    p.add_argument("--prefix", default="", help="Key prefix")
+    p.add_argument("--part-size", type=int, help="Multipart part size in MiB (default 16, minimum 5)")
+    p.add_argument("--concurrency", type=int, default=4, help="Parts uploaded at once")
+    p.add_argument("--force", action="store_true", help="Upload even if the object is unchanged")
+    p.set_defaults(func=cmd_r2_upload)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    args = build_parser().parse_args(argv)
+    fields = [field.strip() for field in args.fields.split(",")] if args.fields else None
+    out = Output(sys.stdout, args.format, fields)
+    # The manager reports progress with print(); keep stdout for results only
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            args.func(get_manager(args), args, out)
+        except CLIError as e:
+            print(f"✗ {e}")
+            return EXIT_FAILED
+        except Exception as e:
+            print(f"✗ Error: {type(e).__name__}: {e}")
+            return EXIT_FAILED
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
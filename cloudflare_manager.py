@@ -11,13 +11,45 @@ Supports:
 
 import os
 import sys
+import copy
 import json
+import mmap
+import time
+import heapq
+import threading
 import requests
 import hashlib
+import tempfile
 import mimetypes
+import contextlib
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+from urllib.parse import quote
+from typing import Dict, List, Optional, Any, Callable, Iterable, Iterator, Tuple, Union
+from dataclasses import dataclass, asdict, replace
+
+from json_stream import iter_result_items
+from records import parse_time
+from metrics import ApiMetrics, API_METRICS, endpoint_label
+from tracing import Tracer, NOOP_SPAN, current_span, get_tracer, traced
+from worker_bundle import WorkerBundle, WorkerModule, MultipartPart, MultipartStream, file_chunks
+from zonefile import parse_zone_file, render_zone_file
+from purge import PURGE_LIMITS, PurgeCoalescer, changed_paths, chunk_purges, coalesce, pages_purge_urls
+from kv import (BULK_DELETE_MAX_KEYS, BULK_GET_MAX_KEYS, BULK_WRITE_MAX_BYTES, BULK_WRITE_MAX_ITEMS, BulkCheckpoint,
+                bulk_item, iter_directory, iter_ndjson, pack_bulk)
+from r2 import (DEFAULT_PART_SIZE, PartReader, R2Auth, complete_multipart_body, normalize_etag, object_etag,
+                parse_list_objects, plan_parts, xml_find)
+from route_index import RouteIndex, RoutePatternError
+
+
+class CloudflareAPIError(Exception):
+    """Raised by strict operations when the API reports failure"""
+    
+    def __init__(self, message: str, errors: Optional[List] = None):
+        super().__init__(message)
+        self.errors = errors or []
 
 
 @dataclass
@@ -28,6 +60,221 @@ class CloudflareAccount:
     account_id: Optional[str] = None
     name: Optional[str] = None
     use_api_key: bool = True  # True = API Key (X-Auth-Key), False = API Token (Bearer)
+    r2_access_key_id: Optional[str] = None  # R2 API token key pair, for object operations
+    r2_secret_access_key: Optional[str] = None
+
+
+class RateLimiter:
+    """Thread-safe token bucket shared by every request that draws from it"""
+    
+    def __init__(self, rate: float, burst: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+    
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until `tokens` are available and return the time spent waiting"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+
+class AdaptivePoller:
+    """Poll many pending items from one thread with per-item adaptive intervals
+    
+    Each item is first checked after `initial_interval` seconds; the interval then
+    grows by `backoff` per check up to `max_interval`. A check returns
+    (done, result, urgent): urgent items back off half as fast and are checked
+    first when more than `max_workers` items are due at once.
+    """
+    
+    def __init__(self, initial_interval: float = 2.0, max_interval: float = 60.0,
+                 backoff: float = 1.6, timeout: float = 900.0, max_workers: int = 4,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.timeout = timeout
+        self.max_workers = max(1, max_workers)
+        self._clock = clock
+        self._sleep = sleep
+        self._checks: Dict[Any, Callable[[], Tuple[bool, Any, bool]]] = {}
+    
+    def add(self, key: Any, check: Callable[[], Tuple[bool, Any, bool]]):
+        """Register an item; `check` is called on every poll of that item"""
+        self._checks[key] = check
+    
+    def _interval(self, checks: int, urgent: bool) -> float:
+        steps = checks // 2 if urgent else checks
+        return min(self.max_interval, self.initial_interval * (self.backoff ** steps))
+    
+    def run(self) -> Dict[Any, Dict]:
+        """Poll until every item is done or timed out
+        
+        Returns a dict keyed like `add()` with done, result, checks and elapsed.
+        """
+        started = self._clock()
+        outcomes: Dict[Any, Dict] = {}
+        state = {key: {"checks": 0, "urgent": False} for key in self._checks}
+        heap = [(started + self.initial_interval, 1, seq, key)
+                for seq, key in enumerate(self._checks)]
+        heapq.heapify(heap)
+        seq = len(heap)
+        
+        def check(key):
+            try:
+                return self._checks[key]()
+            except Exception as e:
+                print(f"✗ Poll failed for {key}: {e}")
+                return False, None, False
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while heap:
+                now = self._clock()
+                if heap[0][0] > now:
+                    self._sleep(heap[0][0] - now)
+                    continue
+                
+                due = []
+                while heap and heap[0][0] <= now:
+                    due.append(heapq.heappop(heap))
+                due.sort(key=lambda item: (item[1], item[0]))
+                batch, deferred = due[:self.max_workers], due[self.max_workers:]
+                for item in deferred:
+                    heapq.heappush(heap, item)
+                
+                keys = [item[3] for item in batch]
+                for key, (done, result, urgent) in zip(keys, pool.map(check, keys)):
+                    info = state[key]
+                    info["checks"] += 1
+                    now = self._clock()
+                    elapsed = now - started
+                    if done or elapsed >= self.timeout:
+                        outcomes[key] = {"done": done, "result": result,
+                                         "checks": info["checks"], "elapsed": elapsed}
+                        continue
+                    heapq.heappush(heap, (now + self._interval(info["checks"], urgent),
+                                          0 if urgent else 1, seq, key))
+                    seq += 1
+        
+        return outcomes
+
+
+class ProgressReporter:
+    """Rate-limited relay of progress(phase, info) events to a user callback
+    
+    Upload progress is measured as bytes leave the multipart body, so the
+    "upload" phase also carries throughput (rate, bytes/s) and an ETA.
+    """
+    
+    def __init__(self, callback: Optional[Callable[[str, Dict], None]], interval: float = 0.2):
+        self.callback = callback
+        self.interval = interval
+        self.started = time.monotonic()
+        self._last = 0.0
+        self._upload_started: Optional[float] = None
+    
+    def __call__(self, phase: str, info: Dict, force: bool = False):
+        if not self.callback:
+            return
+        now = time.monotonic()
+        if not force and now - self._last < self.interval:
+            return
+        self._last = now
+        self.callback(phase, dict(info, elapsed=now - self.started))
+    
+    def transfer(self, sent: int, total: int):
+        """MultipartStream progress hook"""
+        now = time.monotonic()
+        if self._upload_started is None:
+            self._upload_started = now
+        elapsed = max(now - self._upload_started, 1e-6)
+        rate = sent / elapsed
+        eta = (total - sent) / rate if rate else None
+        done = sent >= total
+        self("upload", {"bytes": sent, "total_bytes": total, "rate": rate, "eta": eta}, force=done)
+        if done:
+            self("processing", {"bytes": sent, "total_bytes": total}, force=True)
+
+
+# One lock per state file, shared by every StateStore opened on it in this process
+_STATE_LOCKS: Dict[str, threading.Lock] = {}
+_STATE_LOCKS_GUARD = threading.Lock()
+
+
+def _state_lock(path: Path) -> threading.Lock:
+    key = os.path.realpath(path)
+    with _STATE_LOCKS_GUARD:
+        return _STATE_LOCKS.setdefault(key, threading.Lock())
+
+
+class StateStore:
+    """Small JSON file of per-resource state (e.g. last uploaded worker digests)
+    
+    Writes go through a uniquely named temporary file and os.replace so a
+    crash never leaves a truncated state file behind. Every store on the same
+    file shares one lock, and a write re-reads the file first, so managers
+    with their own stores never drop each other's keys.
+    """
+    
+    DEFAULT_DIR = Path(os.getenv("CLOUDFLARE_STATE_DIR", Path.home() / ".cloudflare_manager"))
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else self.DEFAULT_DIR / "state.json"
+        self._lock = _state_lock(self.path)
+        self._data: Optional[Dict[str, Dict]] = None
+        self._stamp: Optional[Tuple[int, int, int]] = None
+    
+    def _file_stamp(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        # os.replace gives every write a new inode
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+    
+    def _load(self, fresh: bool = False) -> Dict[str, Dict]:
+        """The file's contents, re-read when it changed since the last read (always with fresh=True)"""
+        stamp = self._file_stamp()
+        if fresh or self._data is None or stamp != self._stamp:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._data = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._data = {}
+            self._stamp = stamp
+        return self._data
+    
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            return self._load().get(key)
+    
+    def set(self, key: str, value: Dict):
+        with self._lock:
+            data = self._load(fresh=True)
+            data[key] = value
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.path.parent,
+                                             prefix=f"{self.path.name}.", suffix=".tmp", delete=False) as f:
+                json.dump(data, f, indent=1, sort_keys=True)
+            os.replace(f.name, self.path)
+            self._stamp = self._file_stamp()
 
 
 class CloudflareManager:
@@ -35,9 +282,56 @@ class CloudflareManager:
     
     BASE_URL = "https://api.cloudflare.com/client/v4"
     
-    def __init__(self, account: CloudflareAccount):
+    # Pages custom domain statuses that end validation polling (value = success)
+    PAGES_DOMAIN_FINAL_STATUSES = {"active": True, "deactivated": False, "blocked": False, "error": False}
+    
+    # How long a fetched worker script listing is trusted when verifying skipped uploads
+    SCRIPTS_CACHE_TTL = 60.0
+    
+    # DNS records per list page, and per batch request by zone plan (the API's limits)
+    DNS_PAGE_SIZE = 5000
+    DNS_BATCH_SIZE = {"free": 200}
+    DNS_BATCH_SIZE_DEFAULT = 3500
+    # Pages projects per list page (the API's limit)
+    PROJECTS_PAGE_SIZE = 10
+    
+    # Purge targets per request by kind, and how long queue_purge() collects before sending
+    PURGE_LIMITS = PURGE_LIMITS
+    PURGE_WINDOW = 1.0
+    
+    # R2 objects go through the S3-compatible endpoint; larger files than one part upload in parts
+    R2_ENDPOINT = "https://{account_id}.r2.cloudflarestorage.com"
+    R2_PART_SIZE = DEFAULT_PART_SIZE
+    
+    # How long the list of accounts a credential can access is reused
+    ACCOUNTS_CACHE_TTL = 3600.0
+    
+    def __init__(self, account: CloudflareAccount, rate_limiter: Optional[RateLimiter] = None,
+                 max_retries: int = 3, state: Optional[StateStore] = None,
+                 metrics: Optional[ApiMetrics] = None, tracer: Optional[Tracer] = None,
+                 base_url: Optional[str] = None, transport: Optional[requests.adapters.BaseAdapter] = None,
+                 sleep: Callable[[float], None] = time.sleep):
         self.account = account
+        if base_url:
+            self.BASE_URL = base_url.rstrip("/")
+        self.metrics = metrics or API_METRICS
+        self.tracer = tracer or get_tracer()
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.state = state or StateStore()
         self.session = requests.Session()
+        # R2's S3 endpoint is signed per request; the Cloudflare auth headers must not be sent there
+        self.r2_session = requests.Session()
+        if transport is not None:
+            # e.g. sim_transport.SimulatedTransport for offline latency and fault experiments
+            for session in (self.session, self.r2_session):
+                session.mount("https://", transport)
+                session.mount("http://", transport)
+        self._sleep = sleep
+        self.purges = PurgeCoalescer(self.purge_cache, window=self.PURGE_WINDOW)
+        self._scripts_cache: Tuple[float, Dict[str, Dict]] = (0.0, {})
+        # Shared (not copied) with the managers for_account() creates
+        self._accounts_cache: Dict[str, Any] = {}
         
         # Support both API Key and API Token authentication
         if account.use_api_key:
@@ -59,16 +353,103 @@ class CloudflareManager:
             self._fetch_account_id()
     
     def _fetch_account_id(self):
-        """Fetch the account ID for the authenticated user"""
-        response = self.session.get(f"{self.BASE_URL}/accounts")
-        data = self._handle_response(response)
+        """Use the first account the credential can access; for_account() reaches the others"""
+        accounts = self.accessible_accounts()
+        if accounts:
+            self.account.account_id = accounts[0]["id"]
+            self.account.name = accounts[0].get("name", "Unknown")
+            print(f"✓ Auto-detected account: {self.account.name} ({self.account.account_id})")
+            if len(accounts) > 1:
+                print(f"  This credential can access {len(accounts)} accounts; "
+                      f"use for_account() or MultiAccountManager.add_credential() for the others")
+    
+    def accessible_accounts(self, refresh: bool = False) -> List[Dict]:
+        """Every account this credential can access, across all pages
         
-        if data and data.get("result"):
-            accounts = data["result"]
-            if accounts:
-                self.account.account_id = accounts[0]["id"]
-                self.account.name = accounts[0].get("name", "Unknown")
-                print(f"✓ Auto-detected account: {self.account.name} ({self.account.account_id})")
+        The listing is cached for ACCOUNTS_CACHE_TTL seconds and shared with
+        the managers for_account() creates, so it is fetched once per
+        credential. A failed listing is not cached.
+        """
+        cache = self._accounts_cache
+        if refresh or not cache or time.monotonic() - cache["fetched_at"] > self.ACCOUNTS_CACHE_TTL:
+            try:
+                accounts = list(self._paginate(f"{self.BASE_URL}/accounts", strict=True))
+            except CloudflareAPIError:
+                return []
+            cache.update(fetched_at=time.monotonic(), accounts=accounts)
+        return list(cache["accounts"])
+    
+    def for_account(self, account_id: str, name: Optional[str] = None) -> "CloudflareManager":
+        """A manager for another account the same credential can access
+        
+        It shares this manager's HTTP sessions, rate limiter, state, metrics
+        and account listing, so many accounts use one set of connections and
+        one request budget. R2 keys are per account and are not carried over.
+        """
+        if name is None:
+            name = next((info.get("name") for info in self._accounts_cache.get("accounts", [])
+                         if info["id"] == account_id), None)
+        manager = copy.copy(self)
+        manager.account = replace(self.account, account_id=account_id, name=name,
+                                  r2_access_key_id=None, r2_secret_access_key=None)
+        manager.purges = PurgeCoalescer(manager.purge_cache, window=self.PURGE_WINDOW)
+        manager._scripts_cache = (0.0, {})
+        return manager
+    
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request through the session, honoring the rate limiter and 429 Retry-After"""
+        if not self.tracer.enabled:
+            return self._send(method, url, NOOP_SPAN, kwargs)
+        attributes = {"http.method": method, "cloudflare.endpoint": endpoint_label(url),
+                      "cloudflare.account_id": self.account.account_id}
+        with self.tracer.span("cloudflare.request", attributes, kind="client") as span:
+            response = self._send(method, url, span, kwargs)
+            span.set_attribute("http.status_code", response.status_code)
+            return response
+    
+    def _send(self, method: str, url: str, span, kwargs: Dict) -> requests.Response:
+        attempt = 0
+        while True:
+            if self.rate_limiter:
+                waited = self.rate_limiter.acquire()
+                if waited:
+                    self.metrics.rate_limit_wait.inc(waited)
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.RequestException:
+                self.metrics.observe(method, url, "error", time.perf_counter() - started)
+                raise
+            sent, received = self._observe(method, url, response, time.perf_counter() - started,
+                                           kwargs.get("stream", False))
+            span.set_attributes({"http.request_bytes": sent, "http.response_bytes": received})
+            if response.status_code != 429 or attempt >= self.max_retries:
+                return response
+            try:
+                delay = float(response.headers.get("Retry-After", ""))
+            except ValueError:
+                delay = 2.0 ** attempt
+            response.close()
+            body = kwargs.get("data")
+            if hasattr(body, "seek"):
+                body.seek(0)
+            attempt += 1
+            self.metrics.retry(url, "429")
+            span.add_event("retry", {"reason": "429", "attempt": attempt, "delay": delay})
+            print(f"⏳ Rate limited, retrying in {delay:.1f}s ({attempt}/{self.max_retries})")
+            self._sleep(delay)
+    
+    def _observe(self, method: str, url: str, response: requests.Response, seconds: float,
+                 stream: bool) -> Tuple[int, int]:
+        """Record one request/response pair in the metrics; returns (bytes sent, bytes received)"""
+        sent = int(response.request.headers.get("Content-Length") or 0)
+        received = response.headers.get("Content-Length")
+        if received is not None:
+            received = int(received)
+        else:
+            received = 0 if stream else len(response.content or b"")
+        self.metrics.observe(method, url, str(response.status_code), seconds, sent, received)
+        return sent, received
     
     def _handle_response(self, response: requests.Response) -> Dict:
         """Handle API response and check for errors"""
@@ -76,21 +457,110 @@ class CloudflareManager:
             data = response.json()
         except json.JSONDecodeError:
             print(f"✗ Failed to parse response: {response.text}")
+            self.metrics.errors(self._response_url(response), [{"code": "invalid_json"}])
             return {}
         
         if not data.get("success", False):
             errors = data.get("errors", [])
             print(f"✗ API Error: {errors}")
+            self.metrics.errors(self._response_url(response), errors)
             return {}
         
         return data
     
+    @staticmethod
+    def _response_url(response: requests.Response) -> Optional[str]:
+        request = getattr(response, "request", None)
+        return getattr(request, "url", None)
+    
+    def _list(self, url: str, strict: bool = False) -> List[Dict]:
+        """Fetch a non-paginated list endpoint; strict=True raises on API errors"""
+        response = self._request("GET", url)
+        data = self._handle_response(response)
+        if not data and strict:
+            raise CloudflareAPIError(f"Failed to list {url}")
+        return data.get("result") or []
+    
+    def _get(self, url: str, strict: bool = False) -> Optional[Dict]:
+        """Fetch one object; strict=True returns None on 404 and raises on any other API error"""
+        response = self._request("GET", url)
+        if strict and response.status_code == 404:
+            return None
+        data = self._handle_response(response)
+        if not data and strict:
+            raise CloudflareAPIError(f"Failed to get {url}")
+        return data.get("result")
+    
+    def _stream_result(self, url: str, params: Optional[Dict], envelope: Dict) -> Iterator[Dict]:
+        """Yield the items of a GET's result array as they are decoded from the body
+        
+        `envelope` receives the other top-level fields once the body is consumed,
+        and is left empty if the response failed or could not be parsed.
+        """
+        response = self._request("GET", url, params=params, stream=True)
+        try:
+            yield from iter_result_items(response.iter_content(chunk_size=65536), envelope)
+        except ValueError:
+            print(f"✗ Failed to parse streamed response from {url}")
+            envelope.clear()
+            return
+        finally:
+            response.close()
+        
+        if not envelope.get("success", False):
+            print(f"✗ API Error: {envelope.get('errors', [])}")
+            envelope.clear()
+    
+    def _paginate(self, url: str, params: Optional[Dict] = None, per_page: int = 50,
+                  strict: bool = False, stream: bool = False) -> Iterator[Dict]:
+        """Yield every item of a paginated list endpoint, fetching one page at a time
+        
+        With strict=True an API error raises CloudflareAPIError instead of ending
+        the iteration early, so callers can tell "no more items" from "failed".
+        With stream=True each page is decoded incrementally and items are yielded
+        while the body is still arriving, keeping memory flat for large pages.
+        """
+        params = dict(params or {})
+        page = 1
+        while True:
+            params.update(page=page, per_page=per_page)
+            count = 0
+            if stream:
+                data: Dict = {}
+                for item in self._stream_result(url, params, data):
+                    count += 1
+                    yield item
+            else:
+                response = self._request("GET", url, params=params)
+                data = self._handle_response(response)
+                items = data.get("result") or []
+                count = len(items)
+                yield from items
+            
+            if not data:
+                if strict:
+                    raise CloudflareAPIError(f"Failed to list {url} (page {page})")
+                return
+            
+            info = data.get("result_info") or {}
+            total_pages = info.get("total_pages")
+            if total_pages is not None:
+                if page >= total_pages:
+                    return
+            elif count < per_page:
+                return
+            page += 1
+    
     def list_accounts(self) -> List[Dict]:
         """List all accounts"""
-        response = self.session.get(f"{self.BASE_URL}/accounts")
+        response = self._request("GET", f"{self.BASE_URL}/accounts")
         data = self._handle_response(response)
         return data.get("result", [])
     
+    def iter_accounts(self, strict: bool = False, stream: bool = False) -> Iterator[Dict]:
+        """Iterate over every account across all result pages"""
+        return self._paginate(f"{self.BASE_URL}/accounts", strict=strict, stream=stream)
+    
     # ==================== Pages Operations ====================
     
     def create_pages_project(self, project_name: str, production_branch: str = "main") -> Optional[Dict]:
@@ -101,7 +571,7 @@ class CloudflareManager:
             "production_branch": production_branch
         }
         
-        response = self.session.post(url, json=payload)
+        response = self._request("POST", url, json=payload)
         data = self._handle_response(response)
         
         if data and data.get("result"):
@@ -111,26 +581,57 @@ class CloudflareManager:
     
     def list_pages_projects(self) -> List[Dict]:
         """List all Pages projects"""
-        url = f"{self.BASE_URL}/accounts/{self.account.account_id}/pages/projects"
-        response = self.session.get(url)
-        data = self._handle_response(response)
-        return data.get("result", [])
+        return list(self.iter_pages_projects())
     
-    def get_pages_project(self, project_name: str) -> Optional[Dict]:
-        """Get a specific Pages project"""
+    def get_pages_project(self, project_name: str, strict: bool = False) -> Optional[Dict]:
+        """Get a specific Pages project; strict=True returns None only if it does not exist"""
         url = f"{self.BASE_URL}/accounts/{self.account.account_id}/pages/projects/{project_name}"
-        response = self.session.get(url)
-        data = self._handle_response(response)
-        return data.get("result")
+        return self._get(url, strict=strict)
     
+    @traced("pages.deploy")
     def deploy_pages_project(self, project_name: str, directory: str, 
-                            branch: str = "main", commit_message: str = "Deploy via API") -> Optional[Dict]:
-        """Deploy a Pages project from a directory"""
-        url = f"{self.BASE_URL}/accounts/{self.account.account_id}/pages/projects/{project_name}/deployments"
+                            branch: str = "main", commit_message: str = "Deploy via API",
+                            wait: bool = False, timeout: float = 900.0,
+                            progress: Optional[Callable[[str, Dict], None]] = None,
+                            purge_zone: Optional[str] = None, purge_hosts: Iterable[str] = ()) -> Optional[Dict]:
+        """Deploy a Pages project from a directory
         
-        # Build manifest and upload files
-        manifest = {}
-        files_to_upload = []
+        Files are hashed and uploaded in chunks straight from disk, so large
+        sites are never held in memory.
+        
+        Args:
+            project_name: Name of the Pages project
+            directory: Directory with the built site
+            branch: Branch name recorded on the deployment
+            commit_message: Commit message recorded on the deployment
+            wait: Block until the deployment finishes; the returned deployment
+                then carries a "wait" entry from wait_for_deployment()
+            timeout: Seconds to wait when wait=True
+            progress: Optional callback progress(phase, info) for the phases
+                "scan", "hash", "upload" and "processing"; info holds files /
+                total_files, bytes / total_bytes and elapsed, plus rate (bytes/s)
+                and eta (seconds) while uploading
+            purge_zone: Zone to purge after the deploy; only the URLs of files
+                whose hash changed since the last deploy that purged are sent
+                (the whole of purge_hosts the first time). Implies wait=True:
+                the purge runs only once the deployment is live, and is
+                skipped if it fails; the result is stored under
+                deployment["purge"]
+            purge_hosts: Hostnames serving the project, e.g. ["www.example.com"];
+                required with purge_zone (ValueError otherwise)
+        """
+        url = f"{self.BASE_URL}/accounts/{self.account.account_id}/pages/projects/{project_name}/deployments"
+        report = ProgressReporter(progress)
+        current_span().set_attributes({"cloudflare.account_id": self.account.account_id,
+                                       "pages.project": project_name, "pages.branch": branch})
+        purge_hosts = list(purge_hosts)
+        if purge_zone and not purge_hosts:
+            # Without hosts there are no URLs to purge, and the manifest would still be recorded
+            raise ValueError("purge_zone needs purge_hosts, the hostnames serving the project")
+        if purge_zone and not wait:
+            # Purging before the deployment is live lets edge caches refill with the old files
+            print("⏳ Waiting for the deployment to go live before purging")
+            wait = True
         
         dir_path = Path(directory)
         if not dir_path.exists():
@@ -139,51 +640,191 @@ class CloudflareManager:
         
         print(f"📦 Building deployment from: {directory}")
         
-        for file_path in dir_path.rglob("*"):
-            if file_path.is_file():
-                relative_path = file_path.relative_to(dir_path).as_posix()
-                
-                # Read file and calculate hash
-                with open(file_path, "rb") as f:
-                    content = f.read()
-                    file_hash = hashlib.sha256(content).hexdigest()
-                
-                manifest[relative_path] = file_hash
-                files_to_upload.append((relative_path, content))
+        with self.tracer.span("pages.deploy.scan") as span:
+            files_to_upload = [(file_path, file_path.relative_to(dir_path).as_posix(), file_path.stat().st_size)
+                               for file_path in sorted(dir_path.rglob("*")) if file_path.is_file()]
+            total_bytes = sum(size for _, _, size in files_to_upload)
+            total_files = len(files_to_upload)
+            span.set_attributes({"files": total_files, "bytes": total_bytes})
+        report("scan", {"files": total_files, "total_files": total_files, "bytes": 0,
+                        "total_bytes": total_bytes}, force=True)
         
-        print(f"📄 Found {len(files_to_upload)} files to deploy")
+        print(f"📄 Found {total_files} files to deploy")
         
-        # Prepare multipart form data
-        files = []
-        files.append(("branch", (None, branch)))
-        files.append(("commit_message", (None, commit_message)))
-        files.append(("manifest", (None, json.dumps(manifest))))
+        # Hash files in chunks to build the manifest
+        manifest = {}
+        hashed_bytes = 0
+        with self.tracer.span("pages.deploy.hash", {"files": total_files, "bytes": total_bytes}):
+            for index, (file_path, relative_path, size) in enumerate(files_to_upload, 1):
+                file_hash = hashlib.sha256()
+                for chunk in file_chunks(file_path):
+                    file_hash.update(chunk)
+                manifest[relative_path] = file_hash.hexdigest()
+                hashed_bytes += size
+                report("hash", {"files": index, "total_files": total_files, "bytes": hashed_bytes,
+                                "total_bytes": total_bytes}, force=index == total_files)
         
-        # Add each file
-        for file_name, content in files_to_upload:
-            mime_type = mimetypes.guess_type(file_name)[0] or "application/octet-stream"
-            files.append((file_name, (file_name, content, mime_type)))
+        # Prepare multipart form data; file parts are read from disk while sending
+        with self.tracer.span("pages.deploy.multipart") as span:
+            parts = [
+                MultipartPart("branch", branch.encode("utf-8")),
+                MultipartPart("commit_message", commit_message.encode("utf-8")),
+                MultipartPart("manifest", json.dumps(manifest).encode("utf-8")),
+            ]
+            for file_path, relative_path, _ in files_to_upload:
+                mime_type = mimetypes.guess_type(relative_path)[0] or "application/octet-stream"
+                parts.append(MultipartPart(relative_path, file_path, mime_type, filename=relative_path))
+            body = MultipartStream(parts, progress=report.transfer)
+            span.set_attributes({"parts": len(parts), "bytes": len(body)})
         
         # Send deployment
-        headers = {"Authorization": f"Bearer {self.account.token}"}
-        response = requests.post(url, headers=headers, files=files)
-        data = self._handle_response(response)
+        with self.tracer.span("pages.deploy.upload", {"files": total_files, "bytes": len(body)}):
+            response = self._request("POST", url, headers={"Content-Type": body.content_type}, data=body)
+            data = self._handle_response(response)
         
         if data and data.get("result"):
             deployment = data["result"]
             print(f"✓ Deployment created: {deployment.get('id')}")
             print(f"  URL: {deployment.get('url')}")
             print(f"  Stage: {deployment.get('stages', [{}])[0].get('name', 'unknown')}")
+            current_span().set_attribute("pages.deployment_id", deployment.get("id"))
+            if wait and deployment.get("id"):
+                with self.tracer.span("pages.deploy.processing") as span:
+                    deployment["wait"] = self.wait_for_deployment(project_name, deployment["id"], timeout=timeout)
+                    span.set_attribute("status", (deployment["wait"] or {}).get("status"))
+            if purge_zone and (deployment.get("wait") or {}).get("status") == "success":
+                deployment["purge"] = self._purge_deploy(project_name, branch, manifest, purge_zone,
+                                                         purge_hosts)
             return deployment
         return None
     
+    def _purge_deploy(self, project_name: str, branch: str, manifest: Dict[str, str], zone_id: str,
+                      hosts: List[str]) -> Dict:
+        """Purge what changed since the previous purged deploy, then remember this manifest"""
+        state_key = f"pages:{self.account.account_id}/{project_name}/{branch}"
+        previous = (self.state.get(state_key) or {}).get("manifest")
+        paths = None
+        with self.tracer.span("pages.deploy.purge") as span:
+            if previous is None:
+                summary = self.purge_cache(zone_id, hosts=hosts)
+            else:
+                paths = changed_paths(previous, manifest)
+                summary = self.purge_cache(zone_id, files=pages_purge_urls(paths, hosts))
+                summary["paths"] = len(paths)
+            span.set_attributes({"requests": summary["requests"], "purged": summary["purged"]})
+        # Only a purge that was actually sent (or had nothing to send) moves the baseline on
+        if not summary["failed"] and (summary["requests"] or paths == []):
+            self.state.set(state_key, {"manifest": manifest, "purged_at": time.time()})
+        return summary
+    
     def list_pages_deployments(self, project_name: str) -> List[Dict]:
         """List all deployments for a Pages project"""
         url = f"{self.BASE_URL}/accounts/{self.account.account_id}/pages/projects/{project_name}/deployments"
-        response = self.session.get(url)
+        response = self._request("GET", url)
         data = self._handle_response(response)
         return data.get("result", [])
     
+    def get_pages_deployment(self, project_name: str, deployment_id: str) -> Optional[Dict]:
+        """Get a single deployment of a Pages project"""
+        url = (f"{self.BASE_URL}/accounts/{self.account.account_id}/pages/projects/"
+               f"{project_name}/deployments/{deployment_id}")
+        response = self._request("GET", url)
+        data = self._handle_response(response)
+        return data.get("result")
+    
+    @staticmethod
+    def deployment_timings(deployment: Dict) -> Dict[str, Optional[float]]:
+        """Seconds spent in each deployment stage (None while a stage has not finished)"""
+        timings = {}
+        for stage in deployment.get("stages") or []:
+            started = parse_time(stage.get("started_on"))
+            ended = parse_time(stage.get("ended_on"))
+            timings[stage.get("name")] = (ended - started).total_seconds() if started and ended else None
+        return timings
+    
+    def wait_for_deployments(self, deployments: Iterable[Tuple[str, str]], timeout: float = 900.0,
+                             initial_interval: float = 2.0, max_interval: float = 30.0,
+                             max_workers: int = 4) -> Dict[Tuple[str, str], Dict]:
+        """Wait for many Pages deployments with one shared adaptive poller
+        
+        Args:
+            deployments: (project_name, deployment_id) tuples
+            timeout: Seconds to wait before reporting status "timeout"
+            initial_interval: First poll delay; grows per deployment up to max_interval
+            max_workers: Concurrent status checks per polling round
+        
+        Returns:
+            Dict keyed by (project, deployment_id) with status (success, failure,
+            canceled or timeout), url, per-stage durations in `stages`, `total`
+            seconds from the first stage start to the last stage end, and the
+            last deployment payload
+        """
+        poller = AdaptivePoller(initial_interval=initial_interval, max_interval=max_interval,
+                                timeout=timeout, max_workers=max_workers)
+        for key in dict.fromkeys(deployments):
+            def check(key=key):
+                deployment = self.get_pages_deployment(*key)
+                if not deployment:
+                    return False, None, False
+                stage = deployment.get("latest_stage") or {}
+                failed = stage.get("status") in ("failure", "canceled")
+                done = failed or (stage.get("name") == "deploy" and stage.get("status") == "success")
+                # Once the deploy stage has started the deployment is about to finish
+                return done, deployment, stage.get("name") == "deploy"
+            poller.add(key, check)
+        
+        results = {}
+        for key, outcome in poller.run().items():
+            deployment = outcome["result"] or {}
+            stage = deployment.get("latest_stage") or {}
+            stages = deployment.get("stages") or []
+            started = [parse_time(s["started_on"]) for s in stages if s.get("started_on")]
+            ended = [parse_time(s["ended_on"]) for s in stages if s.get("ended_on")]
+            total = (max(ended) - min(started)).total_seconds() if started and ended else None
+            status = stage.get("status") if outcome["done"] else "timeout"
+            results[key] = {"project": key[0], "id": key[1], "status": status,
+                            "url": deployment.get("url"), "stages": self.deployment_timings(deployment),
+                            "total": total, "deployment": deployment,
+                            "checks": outcome["checks"], "elapsed": outcome["elapsed"]}
+            icon = "✓" if status == "success" else "✗"
+            print(f"{icon} Deployment {key[1]} ({key[0]}): {status}")
+        return results
+    
+    def wait_for_deployment(self, project_name: str, deployment_id: str, timeout: float = 900.0,
+                            initial_interval: float = 2.0, max_interval: float = 30.0) -> Dict:
+        """Poll one Pages deployment until it succeeds or fails
+        
+        Returns:
+            Same dict as one entry of wait_for_deployments(), e.g.
+            {"status": "success", "stages": {"queued": 3.1, "initialize": 1.2, "deploy": 4.8}, ...}
+        """
+        key = (project_name, deployment_id)
+        return self.wait_for_deployments([key], timeout=timeout, initial_interval=initial_interval,
+                                         max_interval=max_interval)[key]
+    
+    def iter_pages_projects(self, strict: bool = False, stream: bool = False) -> Iterator[Dict]:
+        """Iterate over every Pages project across all result pages"""
+        url = f"{self.BASE_URL}/accounts/{self.account.account_id}/pages/projects"
+        return self._paginate(url, per_page=self.PROJECTS_PAGE_SIZE, strict=strict, stream=stream)
+    
+    def iter_pages_projects_page(self, page: int = 1, envelope: Optional[Dict] = None) -> Iterator[Dict]:
+        """Stream the Pages projects of a single result page, PROJECTS_PAGE_SIZE per page
+        
+        Args:
+            page: 1-based page number
+            envelope: Optional dict that receives result_info (total_count,
+                total_pages) once the page has been consumed; left empty on error
+        """
+        url = f"{self.BASE_URL}/accounts/{self.account.account_id}/pages/projects"
+        query = {"page": page, "per_page": self.PROJECTS_PAGE_SIZE}
+        return self._stream_result(url, query, envelope if envelope is not None else {})
+    
+    def iter_pages_deployments(self, project_name: str, strict: bool = False,
+                               stream: bool = False) -> Iterator[Dict]:
+        """Iterate over a project's deployments, newest first, across all result pages"""
+        url = f"{self.BASE_URL}/accounts/{self.account.account_id}/pages/projects/{project_name}/deployments"
+        return self._paginate(url, per_page=25, strict=strict, stream=stream)
+    
     # ==================== Domain Operations ====================
     
     def add_pages_domain(self, project_name: str, domain_name: str) -> Optional[Dict]:
@@ -191,7 +832,7 @@ class CloudflareManager:
         url = f"{self.BASE_URL}/accounts/{self.account.account_id}/pages/projects/{project_name}/domains"
         payload = {"name": domain_name}
         
-        response = self.session.post(url, json=payload)
+        response = self._request("POST", url, json=payload)
         data = self._handle_response(response)
         
         if data and data.get("result"):
@@ -202,16 +843,82 @@ class CloudflareManager:
     def list_pages_domains(self, project_name: str) -> List[Dict]:
         """List all domains for a Pages project"""
         url = f"{self.BASE_URL}/accounts/{self.account.account_id}/pages/projects/{project_name}/domains"
-        response = self.session.get(url)
+        response = self._request("GET", url)
         data = self._handle_response(response)
         return data.get("result", [])
     
-    def get_pages_domain(self, project_name: str, domain_name: str) -> Optional[Dict]:
-        """Get details about a Pages domain"""
+    def get_pages_domain(self, project_name: str, domain_name: str, strict: bool = False) -> Optional[Dict]:
+        """Get details about a Pages domain; strict=True returns None only if it does not exist"""
         url = f"{self.BASE_URL}/accounts/{self.account.account_id}/pages/projects/{project_name}/domains/{domain_name}"
-        response = self.session.get(url)
-        data = self._handle_response(response)
-        return data.get("result")
+        return self._get(url, strict=strict)
+    
+    def attach_pages_domains(self, pairs: Iterable[Tuple[str, str]], wait: bool = True,
+                             max_workers: int = 8, requests_per_second: float = 4.0,
+                             timeout: float = 1800.0, initial_interval: float = 5.0,
+                             max_interval: float = 120.0) -> Dict[Tuple[str, str], Dict]:
+        """Attach many custom domains to Pages projects and track their validation
+        
+        Args:
+            pairs: (project_name, domain_name) tuples
+            wait: Poll until every domain is active or failed
+            max_workers: Concurrent attach requests / status checks
+            requests_per_second: Request budget shared by all attaches and polls
+                (ignored when the manager already has a rate_limiter)
+            timeout: Seconds to keep polling before giving up
+            initial_interval: First poll delay; grows per domain up to max_interval
+        
+        Returns:
+            Dict keyed by (project, domain) with status, domain details, checks and elapsed
+        """
+        pairs = list(dict.fromkeys(pairs))
+        budget = RateLimiter(requests_per_second) if self.rate_limiter is None else None
+        
+        def call(method, *args):
+            if budget:
+                budget.acquire()
+            return method(*args)
+        
+        def attach(pair):
+            project_name, domain_name = pair
+            domain = call(self.add_pages_domain, project_name, domain_name)
+            if domain is None:
+                # Already attached (or attach rejected) - pick up the existing record if any
+                domain = call(self.get_pages_domain, project_name, domain_name)
+            return domain
+        
+        print(f"🔗 Attaching {len(pairs)} domain(s) to Pages projects...")
+        results: Dict[Tuple[str, str], Dict] = {}
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            for pair, domain in zip(pairs, pool.map(attach, pairs)):
+                status = domain.get("status", "unknown") if domain else "failed"
+                results[pair] = {"project": pair[0], "domain": pair[1], "status": status,
+                                 "result": domain, "checks": 0, "elapsed": 0.0}
+        
+        pending = [pair for pair, info in results.items()
+                   if info["status"] != "failed" and info["status"] not in self.PAGES_DOMAIN_FINAL_STATUSES]
+        if not wait or not pending:
+            return results
+        
+        poller = AdaptivePoller(initial_interval=initial_interval, max_interval=max_interval,
+                                timeout=timeout, max_workers=max_workers)
+        for pair in pending:
+            def check(pair=pair):
+                domain = call(self.get_pages_domain, *pair) or results[pair]["result"]
+                status = domain.get("status", "unknown")
+                # "pending" means validation is under way and usually resolves soon
+                return status in self.PAGES_DOMAIN_FINAL_STATUSES, domain, status == "pending"
+            poller.add(pair, check)
+        
+        print(f"⏳ Waiting for {len(pending)} domain(s) to validate...")
+        for pair, outcome in poller.run().items():
+            domain = outcome["result"] or results[pair]["result"]
+            status = domain.get("status", "unknown") if outcome["done"] else "timeout"
+            results[pair].update(status=status, result=domain,
+                                 checks=outcome["checks"], elapsed=outcome["elapsed"])
+        
+        active = sum(1 for info in results.values() if info["status"] == "active")
+        print(f"✓ {active}/{len(results)} domain(s) active")
+        return results
     
     # ==================== Zone Operations ====================
     
@@ -224,7 +931,7 @@ class CloudflareManager:
             "type": zone_type
         }
         
-        response = self.session.post(url, json=payload)
+        response = self._request("POST", url, json=payload)
         data = self._handle_response(response)
         
         if data and data.get("result"):
@@ -236,22 +943,43 @@ class CloudflareManager:
     
     def list_zones(self) -> List[Dict]:
         """List all zones"""
-        url = f"{self.BASE_URL}/zones"
-        response = self.session.get(url)
-        data = self._handle_response(response)
-        return data.get("result", [])
+        return list(self.iter_zones())
+    
+    def iter_zones(self, params: Optional[Dict] = None, strict: bool = False,
+                   stream: bool = False) -> Iterator[Dict]:
+        """Iterate over every zone across all result pages
+        
+        Args:
+            params: Extra list filters, e.g. {"account.id": ..., "status": "active"}
+            strict: Raise CloudflareAPIError on API errors
+            stream: Decode each page incrementally instead of loading it whole
+        """
+        return self._paginate(f"{self.BASE_URL}/zones", params=params, strict=strict, stream=stream)
+    
+    def iter_zones_page(self, page: int = 1, per_page: int = 50, params: Optional[Dict] = None,
+                        envelope: Optional[Dict] = None) -> Iterator[Dict]:
+        """Stream the zones of a single result page as they are decoded
+        
+        Args:
+            page: 1-based page number
+            per_page: Page size (the API allows up to 50)
+            params: Extra list filters, e.g. {"name": "contains:shop", "status": "active"}
+            envelope: Optional dict that receives result_info (total_count,
+                total_pages) once the page has been consumed; left empty on error
+        """
+        query = dict(params or {}, page=page, per_page=per_page)
+        return self._stream_result(f"{self.BASE_URL}/zones", query, envelope if envelope is not None else {})
     
     def get_zone(self, zone_id: str) -> Optional[Dict]:
         """Get zone details"""
         url = f"{self.BASE_URL}/zones/{zone_id}"
-        response = self.session.get(url)
+        response = self._request("GET", url)
         data = self._handle_response(response)
         return data.get("result")
     
     def get_zone_by_name(self, domain_name: str) -> Optional[Dict]:
         """Get zone by domain name"""
-        zones = self.list_zones()
-        for zone in zones:
+        for zone in self.iter_zones(params={"name": domain_name}):
             if zone.get("name") == domain_name:
                 return zone
         return None
@@ -270,17 +998,275 @@ class CloudflareManager:
             print(f"✗ Zone not found for domain: {domain_name}")
             return None
     
+    # ==================== DNS Operations ====================
+    
+    def iter_dns_records(self, zone_id: str, params: Optional[Dict] = None, strict: bool = False,
+                         stream: bool = False) -> Iterator[Dict]:
+        """Iterate over a zone's DNS records, DNS_PAGE_SIZE per request
+        
+        Args:
+            params: Extra list filters, e.g. {"type": "A", "name": "www.example.com"}
+        """
+        return self._paginate(f"{self.BASE_URL}/zones/{zone_id}/dns_records", params=params,
+                              per_page=self.DNS_PAGE_SIZE, strict=strict, stream=stream)
+    
+    def list_dns_records(self, zone_id: str, record_type: Optional[str] = None, name: Optional[str] = None,
+                         strict: bool = False) -> List[Dict]:
+        """List a zone's DNS records, optionally filtered by type and name"""
+        params = {key: value for key, value in (("type", record_type), ("name", name)) if value}
+        return list(self.iter_dns_records(zone_id, params=params, strict=strict))
+    
+    def create_dns_record(self, zone_id: str, record: Dict) -> Optional[Dict]:
+        """Create a DNS record from {"type", "name", "content", "ttl", "proxied", ...}"""
+        url = f"{self.BASE_URL}/zones/{zone_id}/dns_records"
+        response = self._request("POST", url, json=record)
+        data = self._handle_response(response)
+        
+        if data and data.get("result"):
+            print(f"✓ DNS record created: {record.get('type')} {record.get('name')}")
+            return data["result"]
+        return None
+    
+    def update_dns_record(self, zone_id: str, record_id: str, record: Dict) -> Optional[Dict]:
+        """Replace a DNS record (fields left out are reset to their defaults)"""
+        url = f"{self.BASE_URL}/zones/{zone_id}/dns_records/{record_id}"
+        response = self._request("PUT", url, json=record)
+        data = self._handle_response(response)
+        
+        if data and data.get("result"):
+            print(f"✓ DNS record updated: {record.get('type')} {record.get('name')}")
+            return data["result"]
+        return None
+    
+    def delete_dns_record(self, zone_id: str, record_id: str) -> bool:
+        """Delete a DNS record"""
+        url = f"{self.BASE_URL}/zones/{zone_id}/dns_records/{record_id}"
+        response = self._request("DELETE", url)
+        data = self._handle_response(response)
+        
+        if data:
+            print(f"✓ DNS record deleted: {record_id}")
+            return True
+        return False
+    
+    def batch_dns_records(self, zone_id: str, posts: Iterable[Dict] = (), patches: Iterable[Dict] = (),
+                          puts: Iterable[Dict] = (), deletes: Iterable[Dict] = ()) -> Optional[Dict]:
+        """Apply many DNS changes in one atomic request
+        
+        The API runs deletes, then patches, puts and posts; if any change
+        fails, none are applied. patches/puts/deletes carry the record "id".
+        
+        Returns:
+            {"deletes": [...], "patches": [...], "puts": [...], "posts": [...]} or None on failure
+        """
+        payload = {key: list(value) for key, value in
+                   (("deletes", deletes), ("patches", patches), ("puts", puts), ("posts", posts)) if value}
+        url = f"{self.BASE_URL}/zones/{zone_id}/dns_records/batch"
+        response = self._request("POST", url, json=payload)
+        data = self._handle_response(response)
+        return data.get("result") if data else None
+    
+    def dns_batch_size(self, zone_id: str) -> int:
+        """Largest batch the zone's plan accepts"""
+        zone = self.get_zone(zone_id) or {}
+        plan = (zone.get("plan") or {}).get("legacy_id")
+        return self.DNS_BATCH_SIZE.get(plan, self.DNS_BATCH_SIZE_DEFAULT)
+    
+    @staticmethod
+    def _dns_key(record: Dict) -> Tuple:
+        """Identity of a record for import matching: type, name and value"""
+        content = record.get("content") or ""
+        if record.get("type") in ("TXT", "SPF") and len(content) > 1 and content[0] == content[-1] == '"':
+            content = content[1:-1].replace('" "', "")
+        data = record.get("data")
+        value = tuple(sorted(data.items())) if data and record.get("type") in ("SRV", "CAA") else content.lower()
+        return record.get("type"), (record.get("name") or "").lower().rstrip("."), value
+    
+    @staticmethod
+    def plan_dns_import(records: Iterable[Dict], existing: Iterable[Dict], prune: bool = False) -> Dict[str, List[Dict]]:
+        """Diff wanted records against a zone's current ones
+        
+        Records matching an existing type/name/value are patched when their
+        ttl, proxied, priority or comment differ and left alone otherwise.
+        
+        Returns:
+            {"posts", "patches", "deletes", "unchanged"} lists of records
+        """
+        current: Dict[Tuple, List[Dict]] = {}
+        for record in existing:
+            current.setdefault(CloudflareManager._dns_key(record), []).append(record)
+        plan: Dict[str, List[Dict]] = {"posts": [], "patches": [], "deletes": [], "unchanged": []}
+        for record in records:
+            matches = current.get(CloudflareManager._dns_key(record))
+            if not matches:
+                plan["posts"].append(record)
+                continue
+            match = matches.pop(0)
+            changes = {field: record[field] for field in ("ttl", "proxied", "priority", "comment")
+                       if field in record and record[field] != match.get(field)}
+            if changes:
+                plan["patches"].append(dict(changes, id=match["id"]))
+            else:
+                plan["unchanged"].append(match)
+        if prune:
+            plan["deletes"] = [{"id": record["id"]} for matches in current.values() for record in matches]
+        return plan
+    
+    def import_dns_records(self, zone_id: str, records: Iterable[Dict], prune: bool = False,
+                           batch_size: Optional[int] = None, max_workers: int = 4,
+                           dry_run: bool = False) -> Dict:
+        """Bring a zone's DNS records in line with `records` using the batch endpoint
+        
+        Only missing records are created and changed ones patched, so a
+        re-run after a partial failure picks up where it stopped. Changes
+        are sent in chunks of `batch_size` (by default the plan's limit),
+        `max_workers` chunks at a time; all deletes finish before patches,
+        and patches before creates, so a record can be replaced by one
+        that conflicts with it (e.g. A by CNAME).
+        
+        Args:
+            records: Record dicts, e.g. from zonefile.parse_zone_file()
+            prune: Delete existing records that are not in `records`
+            dry_run: Only compute the counts
+        
+        Returns:
+            {"created", "updated", "deleted", "unchanged", "failed", "batches", "errors"}
+        """
+        plan = self.plan_dns_import(records, self.iter_dns_records(zone_id, strict=True, stream=True), prune)
+        summary = {"created": len(plan["posts"]), "updated": len(plan["patches"]),
+                   "deleted": len(plan["deletes"]), "unchanged": len(plan["unchanged"]),
+                   "failed": 0, "batches": 0, "errors": []}
+        if dry_run or not (plan["posts"] or plan["patches"] or plan["deletes"]):
+            return summary
+        
+        size = batch_size or self.dns_batch_size(zone_id)
+        counted = {"deletes": "deleted", "patches": "updated", "posts": "created"}
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            for kind in ("deletes", "patches", "posts"):
+                chunks = [plan[kind][i:i + size] for i in range(0, len(plan[kind]), size)]
+                results = pool.map(lambda chunk: self.batch_dns_records(zone_id, **{kind: chunk}), chunks)
+                for chunk, result in zip(chunks, results):
+                    summary["batches"] += 1
+                    if result is None:
+                        summary[counted[kind]] -= len(chunk)
+                        summary["failed"] += len(chunk)
+                        summary["errors"].append({"kind": kind, "records": len(chunk),
+                                                  "first": chunk[0].get("name") or chunk[0].get("id")})
+        
+        print(f"✓ DNS import: {summary['created']} created, {summary['updated']} updated, "
+              f"{summary['deleted']} deleted, {summary['unchanged']} unchanged in {summary['batches']} batch(es)")
+        if summary["failed"]:
+            print(f"✗ {summary['failed']} record change(s) failed")
+        return summary
+    
+    def import_zone_file(self, zone_id: str, text: str, origin: Optional[str] = None, **options) -> Dict:
+        """Parse a BIND zone file and import its records (see import_dns_records)
+        
+        The zone's name is used as the origin unless the file sets $ORIGIN.
+        Raises zonefile.ZoneFileError on unparsable input before any change is made.
+        """
+        if origin is None:
+            origin = (self.get_zone(zone_id) or {}).get("name")
+        return self.import_dns_records(zone_id, parse_zone_file(text, origin=origin), **options)
+    
+    def export_zone_file(self, zone_id: str) -> Optional[str]:
+        """Render all of a zone's DNS records as a BIND zone file"""
+        zone = self.get_zone(zone_id)
+        if not zone:
+            return None
+        return render_zone_file(self.iter_dns_records(zone_id, strict=True, stream=True), zone["name"])
+    
+    # ==================== Cache Purge ====================
+    
+    def purge_cache(self, zone_id: str, files: Iterable = (), prefixes: Iterable[str] = (),
+                    hosts: Iterable[str] = (), tags: Iterable[str] = (), everything: bool = False,
+                    max_workers: int = 4) -> Dict:
+        """Purge cached content for any number of URLs, prefixes, hosts or tags
+        
+        Duplicates and targets covered by another one (a URL under a purged
+        prefix or host) are dropped, the rest is split into requests of at
+        most PURGE_LIMITS[kind] targets, and up to `max_workers` requests run
+        at once through the rate limiter.
+        
+        Args:
+            files: Full URLs, or {"url": ..., "headers": {...}} for header-varied cache keys
+            prefixes: host/path prefixes without scheme, e.g. "www.example.com/assets"
+            hosts: Hostnames
+            tags: Cache-Tag values
+            everything: Purge the whole zone (other targets are ignored)
+        
+        Returns:
+            {"requests", "purged", "failed", "errors"}; purged/failed count targets
+        """
+        url = f"{self.BASE_URL}/zones/{zone_id}/purge_cache"
+        if everything:
+            bodies = [{"purge_everything": True}]
+        else:
+            bodies = chunk_purges(coalesce(files, prefixes, hosts, tags), self.PURGE_LIMITS)
+        summary = {"requests": len(bodies), "purged": 0, "failed": 0, "errors": []}
+        if not bodies:
+            return summary
+        
+        def send(body: Dict) -> Dict:
+            return self._handle_response(self._request("POST", url, json=body))
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(bodies)))) as pool:
+            for body, data in zip(bodies, pool.map(send, bodies)):
+                kind, targets = next(iter(body.items()))
+                count = len(targets) if isinstance(targets, list) else 1
+                if data:
+                    summary["purged"] += count
+                else:
+                    summary["failed"] += count
+                    summary["errors"].append({"kind": kind, "targets": count})
+        
+        if summary["purged"] and everything:
+            print(f"✓ Purged everything in zone {zone_id}")
+        elif summary["purged"]:
+            print(f"✓ Purged {summary['purged']} target(s) in {summary['requests']} request(s)")
+        if summary["failed"]:
+            print(f"✗ {summary['failed']} purge target(s) failed")
+        return summary
+    
+    def queue_purge(self, zone_id: str, **targets) -> Future:
+        """Like purge_cache(), but merged with other purges for the zone within PURGE_WINDOW seconds
+        
+        Returns a Future resolving to the shared purge_cache() summary;
+        self.purges.flush() sends pending purges immediately.
+        """
+        return self.purges.submit(zone_id, **targets)
+    
     # ==================== Worker Routes Operations ====================
     
-    def create_worker_route(self, zone_id: str, pattern: str, script_name: str) -> Optional[Dict]:
-        """Create a worker route"""
+    def create_worker_route(self, zone_id: str, pattern: str, script_name: str,
+                            check: bool = False) -> Optional[Dict]:
+        """Create a worker route
+        
+        With check=True the zone's routes are listed first and overlaps with
+        other scripts are reported; a duplicate pattern is not sent.
+        """
         url = f"{self.BASE_URL}/zones/{zone_id}/workers/routes"
+        if check:
+            try:
+                issues = RouteIndex(self.list_worker_routes(zone_id)).check(pattern, script_name)
+            except RoutePatternError as e:
+                print(f"✗ {e}")
+                return None
+            for issue in issues:
+                route = issue["route"]
+                if issue["kind"] == "duplicate":
+                    print(f"✗ Route {pattern} already exists -> {route.get('script')}")
+                    return None
+                loser = pattern if issue["winner"] == "existing" else route["pattern"]
+                print(f"⚠️  {pattern} overlaps {route['pattern']} -> {route.get('script')}: "
+                      f"{loser} is shadowed for {issue['url']}")
         payload = {
             "pattern": pattern,
             "script": script_name
         }
         
-        response = self.session.post(url, json=payload)
+        response = self._request("POST", url, json=payload)
         data = self._handle_response(response)
         
         if data and data.get("result"):
@@ -288,17 +1274,36 @@ class CloudflareManager:
             return data["result"]
         return None
     
-    def list_worker_routes(self, zone_id: str) -> List[Dict]:
+    def update_worker_route(self, zone_id: str, route_id: str, pattern: str, script_name: str) -> Optional[Dict]:
+        """Point an existing worker route at a pattern and script"""
+        url = f"{self.BASE_URL}/zones/{zone_id}/workers/routes/{route_id}"
+        payload = {
+            "pattern": pattern,
+            "script": script_name
+        }
+
+        response = self._request("PUT", url, json=payload)
+        data = self._handle_response(response)
+
+        if data and data.get("result"):
+            print(f"✓ Worker route updated: {pattern} -> {script_name}")
+            return data["result"]
+        return None
+
+    def list_worker_routes(self, zone_id: str, strict: bool = False) -> List[Dict]:
         """List all worker routes for a zone"""
         url = f"{self.BASE_URL}/zones/{zone_id}/workers/routes"
-        response = self.session.get(url)
-        data = self._handle_response(response)
-        return data.get("result", [])
+        return self._list(url, strict=strict)
+    
+    def worker_route_index(self, zone_ids: Iterable[str], strict: bool = False) -> RouteIndex:
+        """Index the routes of several zones; each route gets a zone_id field"""
+        return RouteIndex(dict(route, zone_id=zone_id) for zone_id in zone_ids
+                          for route in self.list_worker_routes(zone_id, strict=strict))
     
     def delete_worker_route(self, zone_id: str, route_id: str) -> bool:
         """Delete a worker route"""
         url = f"{self.BASE_URL}/zones/{zone_id}/workers/routes/{route_id}"
-        response = self.session.delete(url)
+        response = self._request("DELETE", url)
         data = self._handle_response(response)
         
         if data:
@@ -319,7 +1324,7 @@ class CloudflareManager:
             "environment": environment
         }
         
-        response = self.session.put(url, json=payload)
+        response = self._request("PUT", url, json=payload)
         data = self._handle_response(response)
         
         if data and data.get("result"):
@@ -327,88 +1332,612 @@ class CloudflareManager:
             return data["result"]
         return None
     
-    def list_worker_domains(self) -> List[Dict]:
+    def list_worker_domains(self, strict: bool = False) -> List[Dict]:
         """List all worker domains"""
         url = f"{self.BASE_URL}/accounts/{self.account.account_id}/workers/domains"
-        response = self.session.get(url)
+        return self._list(url, strict=strict)
+    
+    # ==================== Workers KV Operations ====================
+    
+    def _kv_url(self, namespace_id: Optional[str] = None) -> str:
+        url = f"{self.BASE_URL}/accounts/{self.account.account_id}/storage/kv/namespaces"
+        return f"{url}/{namespace_id}" if namespace_id else url
+    
+    def list_kv_namespaces(self, strict: bool = False) -> List[Dict]:
+        """List all KV namespaces"""
+        return list(self._paginate(self._kv_url(), per_page=100, strict=strict))
+    
+    def create_kv_namespace(self, title: str) -> Optional[Dict]:
+        """Create a KV namespace; the result's "id" is what KV bindings reference"""
+        response = self._request("POST", self._kv_url(), json={"title": title})
         data = self._handle_response(response)
-        return data.get("result", [])
+        
+        if data and data.get("result"):
+            print(f"✓ KV namespace created: {title} ({data['result'].get('id')})")
+            return data["result"]
+        return None
+    
+    def delete_kv_namespace(self, namespace_id: str) -> bool:
+        """Delete a KV namespace and every key in it"""
+        response = self._request("DELETE", self._kv_url(namespace_id))
+        data = self._handle_response(response)
+        
+        if data:
+            print(f"✓ KV namespace deleted: {namespace_id}")
+            return True
+        return False
+    
+    def iter_kv_keys(self, namespace_id: str, prefix: Optional[str] = None, strict: bool = False) -> Iterator[Dict]:
+        """Iterate over a namespace's keys ({"name", "expiration", "metadata"}), 1000 per request"""
+        url = f"{self._kv_url(namespace_id)}/keys"
+        params: Dict[str, Any] = {"limit": 1000}
+        if prefix:
+            params["prefix"] = prefix
+        while True:
+            data = self._handle_response(self._request("GET", url, params=params))
+            if not data:
+                if strict:
+                    raise CloudflareAPIError(f"Failed to list keys of {namespace_id}")
+                return
+            yield from data.get("result") or []
+            cursor = (data.get("result_info") or {}).get("cursor")
+            if not cursor:
+                return
+            params["cursor"] = cursor
+    
+    def read_kv_value(self, namespace_id: str, key: str) -> Optional[bytes]:
+        """Read one value as bytes; None if the key does not exist"""
+        url = f"{self._kv_url(namespace_id)}/values/{quote(key, safe='')}"
+        response = self._request("GET", url)
+        if response.status_code == 200:
+            return response.content
+        if response.status_code != 404:
+            self._handle_response(response)
+        return None
+    
+    def write_kv_value(self, namespace_id: str, key: str, value: Union[str, bytes],
+                       expiration_ttl: Optional[int] = None) -> bool:
+        """Write one value (use bulk_write_kv for metadata or many keys)"""
+        url = f"{self._kv_url(namespace_id)}/values/{quote(key, safe='')}"
+        params = {"expiration_ttl": expiration_ttl} if expiration_ttl else None
+        body = value.encode("utf-8") if isinstance(value, str) else value
+        response = self._request("PUT", url, params=params, data=body,
+                                 headers={"Content-Type": "application/octet-stream"})
+        return bool(self._handle_response(response))
+    
+    def delete_kv_value(self, namespace_id: str, key: str) -> bool:
+        """Delete one key"""
+        url = f"{self._kv_url(namespace_id)}/values/{quote(key, safe='')}"
+        return bool(self._handle_response(self._request("DELETE", url)))
+    
+    def _run_chunks(self, chunks: Iterable[List], send: Callable[[List], Optional[Dict]], max_workers: int,
+                    checkpoint: Optional[BulkCheckpoint] = None) -> Dict:
+        """Send chunks with at most `max_workers` in flight, stopping at the first failure
+        
+        Chunks are pulled from the iterator only when a slot frees up, so
+        at most max_workers chunks are held in memory.
+        """
+        summary = {"items": 0, "chunks": 0, "skipped_chunks": 0, "unsuccessful_keys": [],
+                   "failed_chunk": None, "complete": False}
+        in_flight: Dict[Future, Tuple[int, int]] = {}
+        
+        def collect(block: bool):
+            done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED) if block else (
+                [future for future in in_flight if future.done()], None)
+            for future in done:
+                index, size = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except requests.RequestException as e:
+                    print(f"✗ Chunk {index} failed: {e}")
+                    result = None
+                if result is None:
+                    if summary["failed_chunk"] is None or index < summary["failed_chunk"]:
+                        summary["failed_chunk"] = index
+                    continue
+                summary["items"] += size
+                summary["chunks"] += 1
+                summary["unsuccessful_keys"].extend((result or {}).get("unsuccessful_keys") or [])
+                if checkpoint:
+                    checkpoint.ack(index, size)
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            for index, chunk in enumerate(chunks):
+                if checkpoint and checkpoint.skip(index):
+                    summary["skipped_chunks"] += 1
+                    continue
+                while len(in_flight) >= max(1, max_workers) and summary["failed_chunk"] is None:
+                    collect(block=True)
+                if summary["failed_chunk"] is not None:
+                    break
+                in_flight[pool.submit(send, chunk)] = (index, len(chunk))
+                collect(block=False)
+            while in_flight:
+                collect(block=True)
+        summary["complete"] = summary["failed_chunk"] is None
+        return summary
+    
+    def _kv_checkpoint(self, namespace_id: str, operation: str, resume_key: Optional[str],
+                       limits: Tuple[int, int]) -> Optional[BulkCheckpoint]:
+        if not resume_key:
+            return None
+        return BulkCheckpoint(self.state, f"kv:{self.account.account_id}/{namespace_id}/{operation}:{resume_key}",
+                              limits)
+    
+    def bulk_write_kv(self, namespace_id: str, source: Union[Iterable, str, Path], max_workers: int = 4,
+                      resume_key: Optional[str] = None, max_items: int = BULK_WRITE_MAX_ITEMS,
+                      max_bytes: int = BULK_WRITE_MAX_BYTES) -> Dict:
+        """Write any number of keys through the bulk endpoint
+        
+        Args:
+            source: An iterable of (key, value) tuples or {"key", "value",
+                "expiration", "expiration_ttl", "metadata", "base64"} dicts
+                (bytes values are base64-encoded), or the path of an NDJSON
+                file of such dicts, or of a directory (one key per file)
+            max_workers: Bulk requests in flight
+            resume_key: Name of this job for resuming; defaults to the path
+                when `source` is one. Acknowledged chunks are checkpointed in
+                the state store and skipped when the same job runs again
+            max_items / max_bytes: Chunk limits (the API maximum by default)
+        
+        Returns:
+            {"items", "chunks", "skipped_chunks", "unsuccessful_keys",
+             "failed_chunk", "complete"}; re-run with the same resume_key
+            after a failure to continue from the last acknowledged chunk
+        """
+        if isinstance(source, (str, Path)):
+            path = str(source)
+            resume_key = resume_key or os.path.abspath(path)
+            items = iter_directory(path) if os.path.isdir(path) else iter_ndjson(path)
+        else:
+            items = (bulk_item(pair) for pair in source)
+        checkpoint = self._kv_checkpoint(namespace_id, "write", resume_key, (max_items, max_bytes))
+        if checkpoint and checkpoint.done:
+            print(f"↻ Resuming KV write after chunk {checkpoint.done - 1} ({checkpoint.items} keys written)")
+        url = f"{self._kv_url(namespace_id)}/bulk"
+        
+        def send(chunk: List[Dict]) -> Optional[Dict]:
+            data = self._handle_response(self._request("PUT", url, json=chunk))
+            return (data.get("result") or {}) if data else None
+        
+        summary = self._run_chunks(pack_bulk(items, max_items, max_bytes), send, max_workers, checkpoint)
+        return self._finish_bulk("written", summary, checkpoint)
+    
+    def bulk_delete_kv(self, namespace_id: str, keys: Iterable[str], max_workers: int = 4,
+                       resume_key: Optional[str] = None) -> Dict:
+        """Delete any number of keys, BULK_DELETE_MAX_KEYS per request (same result as bulk_write_kv)"""
+        checkpoint = self._kv_checkpoint(namespace_id, "delete", resume_key, (BULK_DELETE_MAX_KEYS, 0))
+        url = f"{self._kv_url(namespace_id)}/bulk/delete"
+        
+        def send(chunk: List[str]) -> Optional[Dict]:
+            data = self._handle_response(self._request("POST", url, json=chunk))
+            return (data.get("result") or {}) if data else None
+        
+        chunks = pack_bulk(keys, BULK_DELETE_MAX_KEYS, max_bytes=None)
+        return self._finish_bulk("deleted", self._run_chunks(chunks, send, max_workers, checkpoint), checkpoint)
+    
+    @staticmethod
+    def _finish_bulk(verb: str, summary: Dict, checkpoint: Optional[BulkCheckpoint]) -> Dict:
+        if summary["complete"]:
+            if checkpoint:
+                checkpoint.clear()
+            print(f"✓ KV: {summary['items']} key(s) {verb} in {summary['chunks']} request(s)"
+                  + (f", {summary['skipped_chunks']} chunk(s) already done" if summary["skipped_chunks"] else ""))
+        else:
+            print(f"✗ KV bulk request failed at chunk {summary['failed_chunk']} after {summary['items']} key(s)"
+                  + ("; run again with the same resume_key to continue" if checkpoint else ""))
+        if summary["unsuccessful_keys"]:
+            print(f"⚠️  {len(summary['unsuccessful_keys'])} key(s) were rejected")
+        return summary
+    
+    def bulk_read_kv(self, namespace_id: str, keys: Iterable[str], value_type: str = "text",
+                     with_metadata: bool = False, max_workers: int = 4) -> Dict[str, Any]:
+        """Read many keys, BULK_GET_MAX_KEYS per request
+        
+        Args:
+            value_type: "text" or "json" (values are parsed)
+            with_metadata: Return {"value", "metadata"} per key instead of the value
+        
+        Returns:
+            key -> value (None for missing keys); reading stops at the first failed request
+        """
+        url = f"{self._kv_url(namespace_id)}/bulk/get"
+        values: Dict[str, Any] = {}
+        
+        def send(chunk: List[str]) -> Optional[Dict]:
+            payload = {"keys": chunk, "type": value_type, "withMetadata": with_metadata}
+            data = self._handle_response(self._request("POST", url, json=payload))
+            if not data:
+                return None
+            values.update((data.get("result") or {}).get("values") or {})
+            return {}
+        
+        summary = self._run_chunks(pack_bulk(keys, BULK_GET_MAX_KEYS, max_bytes=None), send, max_workers)
+        if not summary["complete"]:
+            print(f"✗ KV bulk read failed at chunk {summary['failed_chunk']}")
+        return values
+    
+    # ==================== R2 Operations ====================
+    
+    def _r2_buckets_url(self, bucket: Optional[str] = None) -> str:
+        url = f"{self.BASE_URL}/accounts/{self.account.account_id}/r2/buckets"
+        return f"{url}/{bucket}" if bucket else url
+    
+    def list_r2_buckets(self, strict: bool = False) -> List[Dict]:
+        """List all R2 buckets ({"name", "creation_date", "location"})"""
+        params: Dict[str, Any] = {"per_page": 1000}
+        buckets: List[Dict] = []
+        while True:
+            data = self._handle_response(self._request("GET", self._r2_buckets_url(), params=params))
+            if not data:
+                if strict:
+                    raise CloudflareAPIError("Failed to list R2 buckets")
+                return buckets
+            buckets.extend((data.get("result") or {}).get("buckets") or [])
+            cursor = (data.get("result_info") or {}).get("cursor")
+            if not cursor:
+                return buckets
+            params["cursor"] = cursor
+    
+    def create_r2_bucket(self, name: str, location_hint: Optional[str] = None) -> Optional[Dict]:
+        """Create an R2 bucket; bind it to a worker with {"type": "r2_bucket", "name": ..., "bucket_name": name}"""
+        payload = {"name": name}
+        if location_hint:
+            payload["locationHint"] = location_hint
+        data = self._handle_response(self._request("POST", self._r2_buckets_url(), json=payload))
+        
+        if data and data.get("result"):
+            print(f"✓ R2 bucket created: {name}")
+            return data["result"]
+        return None
+    
+    def delete_r2_bucket(self, name: str) -> bool:
+        """Delete an R2 bucket; it must be empty"""
+        data = self._handle_response(self._request("DELETE", self._r2_buckets_url(name)))
+        
+        if data:
+            print(f"✓ R2 bucket deleted: {name}")
+            return True
+        return False
+    
+    def _r2_request(self, method: str, bucket: str, key: str = "", **kwargs) -> Optional[requests.Response]:
+        """Signed request to R2's S3 endpoint, retried with backoff on 429 and 5xx
+        
+        None when the account has no R2 access keys.
+        """
+        if not (self.account.r2_access_key_id and self.account.r2_secret_access_key):
+            print("✗ R2 object operations need the account's r2_access_key_id and r2_secret_access_key")
+            return None
+        auth = R2Auth(self.account.r2_access_key_id, self.account.r2_secret_access_key)
+        url = self.R2_ENDPOINT.format(account_id=self.account.account_id) + f"/{bucket}"
+        if key:
+            url += "/" + quote(key, safe="/")
+        # Keys stay out of the metrics labels
+        label = f"/r2/buckets/{bucket}/objects" + ("/key" if key else "")
+        attempt = 0
+        while True:
+            with self.tracer.span("r2.request", {"http.method": method, "r2.bucket": bucket}, kind="client") as span:
+                started = time.perf_counter()
+                try:
+                    response = self.r2_session.request(method, url, auth=auth, **kwargs)
+                except requests.RequestException:
+                    self.metrics.observe(method, label, "error", time.perf_counter() - started)
+                    raise
+                sent, received = self._observe(method, label, response, time.perf_counter() - started,
+                                               kwargs.get("stream", False))
+                span.set_attributes({"http.status_code": response.status_code, "http.request_bytes": sent,
+                                     "http.response_bytes": received})
+            if response.status_code not in (429, 500, 502, 503, 504) or attempt >= self.max_retries:
+                return response
+            try:
+                delay = float(response.headers.get("Retry-After", ""))
+            except ValueError:
+                delay = 2.0 ** attempt
+            response.close()
+            body = kwargs.get("data")
+            if hasattr(body, "seek"):
+                body.seek(0)
+            attempt += 1
+            self.metrics.retry(label, str(response.status_code))
+            print(f"⏳ R2 returned {response.status_code}, retrying in {delay:.1f}s ({attempt}/{self.max_retries})")
+            self._sleep(delay)
+    
+    @staticmethod
+    def _r2_failed(response: Optional[requests.Response], action: str, ok: Tuple[int, ...] = (200,)) -> bool:
+        """Print the S3 error of a failed response; True when it failed"""
+        if response is None:
+            return True
+        if response.status_code in ok and b"<Error>" not in response.content[:256]:
+            return False
+        code = message = None
+        if response.content:
+            try:
+                code, message = xml_find(response.content, "Code"), xml_find(response.content, "Message")
+            except ET.ParseError:
+                message = response.text[:200]
+        print(f"✗ R2 {action} failed: HTTP {response.status_code} {code or ''} {message or ''}".rstrip())
+        return True
+    
+    def head_r2_object(self, bucket: str, key: str) -> Optional[Dict]:
+        """An object's {"key", "size", "etag", "content_type", "last_modified"}; None if it does not exist"""
+        response = self._r2_request("HEAD", bucket, key)
+        if response is None or response.status_code == 404:
+            return None
+        if self._r2_failed(response, f"HEAD {key}"):
+            return None
+        return {"key": key, "size": int(response.headers.get("Content-Length") or 0),
+                "etag": normalize_etag(response.headers.get("ETag")),
+                "content_type": response.headers.get("Content-Type"),
+                "last_modified": response.headers.get("Last-Modified")}
+    
+    def get_r2_object(self, bucket: str, key: str) -> Optional[bytes]:
+        """An object's contents; None if it does not exist"""
+        response = self._r2_request("GET", bucket, key)
+        if response is None or response.status_code == 404 or self._r2_failed(response, f"GET {key}"):
+            return None
+        return response.content
+    
+    def delete_r2_object(self, bucket: str, key: str) -> bool:
+        """Delete an object (succeeds when it does not exist)"""
+        return not self._r2_failed(self._r2_request("DELETE", bucket, key), f"DELETE {key}", ok=(200, 204))
+    
+    def iter_r2_objects(self, bucket: str, prefix: Optional[str] = None,
+                        strict: bool = False) -> Iterator[Dict]:
+        """Iterate over a bucket's objects ({"key", "size", "etag", "last_modified"}), 1000 per request"""
+        params: Dict[str, Any] = {"list-type": 2, "max-keys": 1000}
+        if prefix:
+            params["prefix"] = prefix
+        while True:
+            response = self._r2_request("GET", bucket, params=params)
+            if self._r2_failed(response, f"list {bucket}"):
+                if strict:
+                    raise CloudflareAPIError(f"Failed to list R2 bucket {bucket}")
+                return
+            objects, token = parse_list_objects(response.content)
+            yield from objects
+            if not token:
+                return
+            params["continuation-token"] = token
+    
+    def upload_r2_object(self, bucket: str, key: str, path: Union[str, Path], part_size: Optional[int] = None,
+                         max_workers: int = 4, content_type: Optional[str] = None, force: bool = False,
+                         remote: Optional[Dict] = None) -> Optional[Dict]:
+        """Upload a file to R2, in parallel parts when it is larger than one part
+        
+        Parts are served from a memory map of the file (r2.PartReader), so
+        their data is sent without being read into or copied between Python
+        buffers. Unless `force` is set, the upload is skipped when the bucket
+        already holds an object of the same size whose ETag matches the
+        file's, computed the way R2 does for the same part layout.
+        
+        Args:
+            part_size: Bytes per part (default R2_PART_SIZE, at least 5 MiB);
+                raised for files that would need more than 10,000 parts
+            max_workers: Parts uploaded at once
+            remote: The existing object's {"size", "etag"} if already known
+                ({} for none), saving the HEAD request
+        
+        Returns:
+            {"key", "size", "etag", "parts", "skipped"}, or None on failure
+        """
+        path = Path(path)
+        size = path.stat().st_size
+        parts = plan_parts(size, part_size or self.R2_PART_SIZE)
+        content_type = content_type or mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if remote is None and not force:
+            remote = self.head_r2_object(bucket, key)
+        
+        with open(path, "rb") as f, (mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size
+                                     else contextlib.nullcontext(b"")) as buffer:
+            if not force and remote and remote.get("size") == size:
+                etag = object_etag(buffer, parts)
+                if normalize_etag(remote.get("etag")) == etag:
+                    print(f"✓ R2 object unchanged, skipped upload: {key}")
+                    return {"key": key, "size": size, "etag": etag, "parts": 0, "skipped": True}
+            with self.tracer.span("r2.upload", {"r2.bucket": bucket, "bytes": size, "parts": len(parts)}):
+                if len(parts) == 1:
+                    etag = self._r2_put(bucket, key, buffer, content_type)
+                else:
+                    etag = self._r2_multipart(bucket, key, buffer, parts, content_type, max_workers)
+        
+        if etag is None:
+            return None
+        print(f"✓ R2 object uploaded: {key} ({size} bytes" + (f", {len(parts)} parts)" if len(parts) > 1 else ")"))
+        return {"key": key, "size": size, "etag": etag, "parts": len(parts), "skipped": False}
+    
+    def _r2_put(self, bucket: str, key: str, buffer, content_type: str) -> Optional[str]:
+        reader = PartReader(buffer)
+        try:
+            response = self._r2_request("PUT", bucket, key, data=reader, headers={"Content-Type": content_type})
+        finally:
+            reader.release()
+        if self._r2_failed(response, f"PUT {key}"):
+            return None
+        return normalize_etag(response.headers.get("ETag"))
+    
+    def _r2_multipart(self, bucket: str, key: str, buffer, parts: List[Tuple[int, int]], content_type: str,
+                      max_workers: int) -> Optional[str]:
+        """Multipart upload with up to max_workers parts in flight; aborted if any part fails"""
+        response = self._r2_request("POST", bucket, key, params={"uploads": ""},
+                                    headers={"Content-Type": content_type})
+        if self._r2_failed(response, f"multipart upload of {key}"):
+            return None
+        upload_id = xml_find(response.content, "UploadId")
+        
+        def send(number: int, offset: int, length: int) -> Optional[str]:
+            reader = PartReader(buffer, offset, length)
+            try:
+                response = self._r2_request("PUT", bucket, key, data=reader,
+                                            params={"partNumber": number, "uploadId": upload_id})
+            finally:
+                reader.release()
+            if self._r2_failed(response, f"part {number} of {key}"):
+                return None
+            return response.headers.get("ETag")
+        
+        etags: Dict[int, str] = {}
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            futures = {pool.submit(send, number, offset, length): number
+                       for number, (offset, length) in enumerate(parts, 1)}
+            for future in as_completed(futures):
+                try:
+                    etag = future.result()
+                except requests.RequestException as e:
+                    print(f"✗ R2 part {futures[future]} of {key} failed: {e}")
+                    etag = None
+                if etag is None:
+                    for pending in futures:
+                        pending.cancel()
+                    break
+                etags[futures[future]] = etag
+        
+        if len(etags) < len(parts):
+            self._r2_request("DELETE", bucket, key, params={"uploadId": upload_id})
+            return None
+        response = self._r2_request("POST", bucket, key, params={"uploadId": upload_id},
+                                    data=complete_multipart_body(etags.items()),
+                                    headers={"Content-Type": "application/xml"})
+        if self._r2_failed(response, f"completing {key}"):
+            self._r2_request("DELETE", bucket, key, params={"uploadId": upload_id})
+            return None
+        return normalize_etag(xml_find(response.content, "ETag"))
+    
+    def upload_r2_directory(self, bucket: str, directory: Union[str, Path], prefix: str = "",
+                            part_size: Optional[int] = None, max_workers: int = 4,
+                            force: bool = False) -> Dict:
+        """Upload every file under a directory as prefix + relative path, skipping unchanged objects
+        
+        One listing of the bucket replaces a HEAD request per file. Files go
+        one at a time, each with up to `max_workers` parts in flight.
+        
+        Returns:
+            {"uploaded", "skipped", "failed", "bytes"}; bytes counts uploaded data
+        """
+        directory = Path(directory)
+        remote = {} if force else {obj["key"]: obj for obj in self.iter_r2_objects(bucket, prefix=prefix or None)}
+        summary = {"uploaded": 0, "skipped": 0, "failed": 0, "bytes": 0}
+        for file_path in sorted(path for path in directory.rglob("*") if path.is_file()):
+            key = prefix + file_path.relative_to(directory).as_posix()
+            result = self.upload_r2_object(bucket, key, file_path, part_size, max_workers, force=force,
+                                           remote=remote.get(key, {}))
+            if result is None:
+                summary["failed"] += 1
+            elif result["skipped"]:
+                summary["skipped"] += 1
+            else:
+                summary["uploaded"] += 1
+                summary["bytes"] += result["size"]
+        print(f"✓ R2: {summary['uploaded']} uploaded, {summary['skipped']} unchanged, {summary['failed']} failed")
+        return summary
     
     # ==================== Worker Script Operations ====================
     
-    def upload_worker(self, script_name: str, worker_file: str, 
-                     bindings: Optional[List[Dict]] = None) -> Optional[Dict]:
+    def _remote_script(self, script_name: str) -> Optional[Dict]:
+        """Look up a script in a briefly cached listing of the account's workers"""
+        fetched_at, scripts = self._scripts_cache
+        if time.monotonic() - fetched_at > self.SCRIPTS_CACHE_TTL:
+            scripts = {script["id"]: script for script in self.list_workers()}
+            self._scripts_cache = (time.monotonic(), scripts)
+        return scripts.get(script_name)
+    
+    @traced("workers.upload")
+    def upload_worker(self, script_name: str, worker_file: Union[str, Path, WorkerBundle, List[WorkerModule]],
+                     bindings: Optional[List[Dict]] = None, force: bool = False,
+                     verify_remote: bool = False, main_module: Optional[str] = None,
+                     compatibility_date: str = "2023-01-01",
+                     compatibility_flags: Optional[List[str]] = None) -> Optional[Dict]:
         """Upload a Worker script to Cloudflare
         
+        The script, metadata and bindings are hashed; when the digest matches
+        the last successful upload recorded in `self.state`, the upload is
+        skipped and the recorded details are returned with "skipped": True.
+        
         Args:
             script_name: Name of the worker script
-            worker_file: Path to the worker .js file
+            worker_file: Path to the worker .js file or a bundle directory, a list
+                of WorkerModule parts, or a prepared WorkerBundle. Module types
+                (ESM, CommonJS, WASM, text, data) follow the file extension.
             bindings: Optional list of bindings (KV, R2, etc.)
+            force: Upload even if nothing changed
+            verify_remote: Only skip if the deployed script's etag still matches
+                the one recorded at upload time
+            main_module: Entry module name (guessed for directories)
+            compatibility_date: Workers runtime compatibility date
+            compatibility_flags: Optional runtime compatibility flags
         
         Returns:
             Worker script details if successful
         """
         url = f"{self.BASE_URL}/accounts/{self.account.account_id}/workers/scripts/{script_name}"
+        root = current_span()
+        root.set_attributes({"cloudflare.account_id": self.account.account_id, "workers.script": script_name})
         
-        # Read worker file
-        worker_path = Path(worker_file)
-        if not worker_path.exists():
-            print(f"✗ Worker file not found: {worker_file}")
-            return None
-        
-        with open(worker_path, 'r', encoding='utf-8') as f:
-            worker_content = f.read()
-        
-        # Prepare metadata
-        metadata = {
-            "main_module": "_worker.js",
-            "compatibility_date": "2023-01-01"
-        }
-        
-        if bindings:
-            metadata["bindings"] = bindings
+        # Collect the bundle; module bodies stay on disk until they are sent
+        with self.tracer.span("workers.upload.bundle") as span:
+            try:
+                if isinstance(worker_file, WorkerBundle):
+                    bundle = worker_file
+                elif isinstance(worker_file, list):
+                    bundle = WorkerBundle(worker_file, main_module)
+                else:
+                    bundle = WorkerBundle.from_path(worker_file, main_module)
+            except (OSError, ValueError) as e:
+                print(f"✗ {e}")
+                span.record_exception(e)
+                return None
+            if span.enabled:
+                span.set_attributes({"files": len(bundle.modules),
+                                     "bytes": sum(module.size for module in bundle.modules)})
         
-        # Prepare multipart form data
-        files = {
-            'metadata': (None, json.dumps(metadata), 'application/json'),
-            '_worker.js': ('_worker.js', worker_content, 'text/javascript'),
-        }
+        metadata = bundle.metadata(bindings, compatibility_date, compatibility_flags)
         
-        # Remove Content-Type header for multipart request
-        headers = {}
-        if self.account.use_api_key:
-            headers["X-Auth-Email"] = self.account.email
-            headers["X-Auth-Key"] = self.account.token
-        else:
-            headers["Authorization"] = f"Bearer {self.account.token}"
+        # Skip the upload when the exact same script and metadata were uploaded last time
+        with self.tracer.span("workers.upload.digest"):
+            digest = bundle.digest(metadata)
+        state_key = f"worker:{self.account.account_id}/{script_name}"
+        previous = self.state.get(state_key)
+        if previous and previous.get("digest") == digest and not force:
+            remote = self._remote_script(script_name) if verify_remote else None
+            if not verify_remote or (remote and remote.get("etag") == previous.get("etag")):
+                print(f"✓ Worker unchanged, skipped upload: {script_name}")
+                root.set_attribute("workers.skipped", True)
+                return dict(previous, id=script_name, skipped=True)
+            print(f"⚠️  Deployed worker differs from last upload, re-uploading: {script_name}")
         
-        response = requests.put(url, headers=headers, files=files)
-        data = self._handle_response(response)
+        # Stream the multipart body part by part instead of building it in memory
+        body = bundle.multipart(metadata)
+        with self.tracer.span("workers.upload.send", {"files": len(bundle.modules), "bytes": len(body)}):
+            response = self._request("PUT", url, headers={"Content-Type": body.content_type}, data=body)
+            data = self._handle_response(response)
         
         if data and data.get("result"):
+            result = data["result"]
+            self.state.set(state_key, {"digest": digest, "etag": result.get("etag"),
+                                       "modified_on": result.get("modified_on"),
+                                       "uploaded_at": time.time()})
+            if script_name in self._scripts_cache[1]:
+                self._scripts_cache[1][script_name] = result
             print(f"✓ Worker uploaded: {script_name}")
             print(f"  URL: https://{script_name}.{self.account.name}.workers.dev")
-            return data["result"]
+            return result
         return None
     
-    def list_workers(self) -> List[Dict]:
+    def list_workers(self, strict: bool = False) -> List[Dict]:
         """List all Worker scripts"""
         url = f"{self.BASE_URL}/accounts/{self.account.account_id}/workers/scripts"
-        response = self.session.get(url)
-        data = self._handle_response(response)
-        return data.get("result", [])
+        return self._list(url, strict=strict)
     
     def get_worker(self, script_name: str) -> Optional[Dict]:
         """Get a specific Worker script details"""
         url = f"{self.BASE_URL}/accounts/{self.account.account_id}/workers/scripts/{script_name}"
-        response = self.session.get(url)
+        response = self._request("GET", url)
         data = self._handle_response(response)
         return data.get("result")
     
     def delete_worker(self, script_name: str) -> bool:
         """Delete a Worker script"""
         url = f"{self.BASE_URL}/accounts/{self.account.account_id}/workers/scripts/{script_name}"
-        response = self.session.delete(url)
+        response = self._request("DELETE", url)
         data = self._handle_response(response)
         
         if data:
@@ -417,20 +1946,158 @@ class CloudflareManager:
         return False
 
 
+class ManagerPool:
+    """Process-wide cache of CloudflareManagers keyed by a hash of the credentials
+    
+    Reusing a manager keeps its HTTP session (connections, TLS) and the
+    auto-detected account metadata warm. Entries are evicted least recently
+    used beyond `max_size` and after `idle_ttl` seconds without use; managers
+    whose account lookup failed are never cached.
+    """
+    
+    def __init__(self, max_size: int = 64, idle_ttl: float = 1800.0,
+                 factory: Optional[Callable[[CloudflareAccount], "CloudflareManager"]] = None):
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self._factory = factory or (lambda account: CloudflareManager(account))
+        self._entries: "OrderedDict[str, Tuple[CloudflareManager, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(email: str, token: str, use_api_key: bool = True) -> str:
+        return hashlib.sha256(f"{email}\0{token}\0{int(use_api_key)}".encode("utf-8")).hexdigest()
+    
+    def _evict(self, now: float) -> List["CloudflareManager"]:
+        """Drop idle and overflow entries; caller holds the lock"""
+        evicted = []
+        for key, (manager, last_used) in list(self._entries.items()):
+            if now - last_used > self.idle_ttl:
+                evicted.append(self._entries.pop(key)[0])
+        while len(self._entries) > self.max_size:
+            evicted.append(self._entries.popitem(last=False)[1][0])
+        return evicted
+    
+    def get(self, email: str, token: str, use_api_key: bool = True) -> "CloudflareManager":
+        """Return a warm manager for these credentials, creating one if needed"""
+        key = self.key(email, token, use_api_key)
+        now = time.monotonic()
+        with self._lock:
+            evicted = self._evict(now)
+            entry = self._entries.get(key)
+            if entry:
+                self._entries[key] = (entry[0], now)
+                self._entries.move_to_end(key)
+        for manager in evicted:
+            manager.session.close()
+        if entry:
+            return entry[0]
+        
+        manager = self._factory(CloudflareAccount(email=email, token=token, use_api_key=use_api_key))
+        if not manager.account.account_id:
+            return manager
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing:
+                # Another thread created one first; keep that one warm
+                manager.session.close()
+                manager = existing[0]
+            self._entries[key] = (manager, time.monotonic())
+            self._entries.move_to_end(key)
+            evicted = self._evict(time.monotonic())
+        for stale in evicted:
+            stale.session.close()
+        return manager
+    
+    def discard(self, email: str, token: str, use_api_key: bool = True):
+        """Forget the manager for these credentials (e.g. after a token change)"""
+        with self._lock:
+            entry = self._entries.pop(self.key(email, token, use_api_key), None)
+        if entry:
+            entry[0].session.close()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 class MultiAccountManager:
     """Manager for multiple Cloudflare accounts"""
     
-    def __init__(self):
+    # Cloudflare allows 1,200 requests per 5 minutes per user
+    CREDENTIAL_RATE = 4.0
+    
+    def __init__(self, base_url: Optional[str] = None,
+                 transport: Optional[requests.adapters.BaseAdapter] = None):
         self.accounts: Dict[str, CloudflareManager] = {}
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._credentials: Dict[str, CloudflareManager] = {}
+        self.base_url = base_url
+        self.transport = transport
     
-    def add_account(self, name: str, email: str, token: str, account_id: Optional[str] = None):
+    @staticmethod
+    def _credential_key(email: str, token: str) -> str:
+        return hashlib.sha256(f"{email}\0{token}".encode("utf-8")).hexdigest()
+    
+    def _limiter_for(self, email: str, token: str) -> RateLimiter:
+        """One rate limiter per credential, shared by every account using it"""
+        key = self._credential_key(email, token)
+        if key not in self._limiters:
+            self._limiters[key] = RateLimiter(self.CREDENTIAL_RATE)
+        return self._limiters[key]
+    
+    def _manager_for(self, email: str, token: str, account_id: Optional[str] = None,
+                     name: Optional[str] = None, use_api_key: bool = True) -> CloudflareManager:
+        """A manager on the credential's shared session, rate limiter and account listing"""
+        key = self._credential_key(email, token)
+        base = self._credentials.get(key)
+        if base is None:
+            account = CloudflareAccount(email=email, token=token, account_id=account_id, name=name,
+                                        use_api_key=use_api_key)
+            base = CloudflareManager(account, rate_limiter=self._limiter_for(email, token),
+                                     base_url=self.base_url, transport=self.transport)
+            if base.account.account_id:
+                self._credentials[key] = base
+            return base
+        if account_id is None:
+            accounts = base.accessible_accounts()
+            account_id = accounts[0]["id"] if accounts else base.account.account_id
+        return base.for_account(account_id, name)
+    
+    def add_account(self, name: str, email: str, token: str, account_id: Optional[str] = None,
+                    use_api_key: bool = True):
         """Add a Cloudflare account"""
-        account = CloudflareAccount(email=email, token=token, account_id=account_id, name=name)
-        manager = CloudflareManager(account)
+        manager = self._manager_for(email, token, account_id, name, use_api_key)
         self.accounts[name] = manager
         print(f"✓ Added account: {name}")
         return manager
     
+    def add_credential(self, email: str, token: str, use_api_key: bool = True,
+                       refresh: bool = False) -> List[str]:
+        """Add every account a credential can access
+        
+        Accounts are added under their account name (followed by the start
+        of the ID when the name is taken) and all share one HTTP session and
+        rate limiter.
+        
+        Returns:
+            The names the accounts were added under
+        """
+        base = self._manager_for(email, token, use_api_key=use_api_key)
+        accounts = base.accessible_accounts(refresh) if base.account.account_id else []
+        if not accounts:
+            print("✗ No accounts found for this credential")
+            return []
+        names = []
+        for info in accounts:
+            name = info.get("name") or info["id"]
+            existing = self.accounts.get(name)
+            if existing and existing.account.account_id != info["id"]:
+                name = f"{name} ({info['id'][:8]})"
+            manager = base if info["id"] == base.account.account_id else base.for_account(info["id"], name)
+            self.accounts[name] = manager
+            names.append(name)
+        print(f"✓ Added {len(names)} account(s) for {email or 'API token'}")
+        return names
+    
     def get_account(self, name: str) -> Optional[CloudflareManager]:
         """Get a specific account manager"""
         return self.accounts.get(name)
@@ -438,6 +2105,110 @@ class MultiAccountManager:
     def list_accounts(self) -> List[str]:
         """List all configured accounts"""
         return list(self.accounts.keys())
+    
+    def map_accounts(self, operation: Callable[[CloudflareManager], Any], accounts: Optional[List[str]] = None,
+                     max_workers: int = 8) -> Dict[str, Dict]:
+        """Run operation(manager) for many accounts concurrently
+        
+        Returns:
+            Dict of account name -> {"result", "error", "seconds"}
+        """
+        names = accounts or self.list_accounts()
+        
+        def run(name: str) -> Dict:
+            started = time.monotonic()
+            entry = {"result": None, "error": None}
+            try:
+                entry["result"] = operation(self.accounts[name])
+            except Exception as e:
+                entry["error"] = f"{type(e).__name__}: {e}"
+            entry["seconds"] = time.monotonic() - started
+            return entry
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            return dict(zip(names, pool.map(run, names)))
+    
+    def broadcast_worker(self, script_name: str, worker_file: Union[str, Path, WorkerBundle],
+                         accounts: Optional[List[str]] = None,
+                         bindings: Optional[Union[List[Dict], Dict[str, List[Dict]]]] = None,
+                         routes: Optional[Dict[str, List[Tuple[str, str]]]] = None,
+                         domains: Optional[Dict[str, List[Tuple[str, str]]]] = None,
+                         max_workers: int = 8, **upload_options) -> Dict[str, Dict]:
+        """Upload the same worker to many accounts concurrently
+        
+        The bundle is read from disk once and shared by every upload; each
+        account's requests still go through its credential's rate limiter.
+        
+        Args:
+            script_name: Worker script name in every account
+            worker_file: Script file, bundle directory or WorkerBundle
+            accounts: Account names to deploy to (default: all)
+            bindings: Bindings for every account, or a dict of account name -> bindings
+            routes: Account name -> [(zone_id, pattern), ...] routes to create
+            domains: Account name -> [(hostname, zone_id), ...] custom domains to attach
+            max_workers: Accounts processed at the same time
+            **upload_options: Passed to upload_worker (force, main_module, ...)
+        
+        Returns:
+            Dict of account name -> {"upload": uploaded|skipped|failed, "result",
+            "routes", "domains", "timings", "error"}
+        """
+        names = accounts or self.list_accounts()
+        missing = [name for name in names if name not in self.accounts]
+        if missing:
+            print(f"✗ Unknown account(s): {', '.join(missing)}")
+            return {}
+        
+        try:
+            bundle = worker_file if isinstance(worker_file, WorkerBundle) \
+                else WorkerBundle.from_path(worker_file, upload_options.pop("main_module", None))
+            bundle = bundle.preload()
+        except (OSError, ValueError) as e:
+            print(f"✗ {e}")
+            return {}
+        
+        def deploy(name: str) -> Dict:
+            manager = self.accounts[name]
+            entry = {"upload": "failed", "result": None, "routes": [], "domains": [],
+                     "timings": {}, "error": None}
+            started = time.monotonic()
+            try:
+                account_bindings = bindings.get(name) if isinstance(bindings, dict) else bindings
+                result = manager.upload_worker(script_name, bundle, bindings=account_bindings, **upload_options)
+                entry["timings"]["upload"] = time.monotonic() - started
+                entry["result"] = result
+                if not result:
+                    return entry
+                entry["upload"] = "skipped" if result.get("skipped") else "uploaded"
+                
+                step = time.monotonic()
+                for zone_id, pattern in (routes or {}).get(name, []):
+                    route = manager.create_worker_route(zone_id, pattern, script_name)
+                    entry["routes"].append({"zone_id": zone_id, "pattern": pattern, "ok": bool(route)})
+                entry["timings"]["routes"] = time.monotonic() - step
+                
+                step = time.monotonic()
+                for hostname, zone_id in (domains or {}).get(name, []):
+                    domain = manager.add_worker_domain(hostname, script_name, zone_id)
+                    entry["domains"].append({"hostname": hostname, "ok": bool(domain)})
+                entry["timings"]["domains"] = time.monotonic() - step
+            except Exception as e:
+                entry["error"] = str(e)
+            finally:
+                entry["timings"]["total"] = time.monotonic() - started
+            return entry
+        
+        print(f"📡 Broadcasting worker {script_name} to {len(names)} account(s)...")
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            results = dict(zip(names, pool.map(deploy, names)))
+        
+        for name, entry in results.items():
+            failed = entry["error"] or entry["upload"] == "failed" \
+                or not all(item["ok"] for item in entry["routes"] + entry["domains"])
+            icon = "✗" if failed else "✓"
+            print(f"  {icon} {name}: {entry['upload']} in {entry['timings']['total']:.2f}s"
+                  + (f" ({entry['error']})" if entry["error"] else ""))
+        return results
 
 
 def print_banner():
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Local SQLite inventory mirror for Cloudflare resources
+Mirrors accounts, zones, Pages projects and deployments, worker scripts,
+routes and worker domains so reports and lookups run as local queries.
+
+Usage:
+    python inventory.py sync [--db inventory.db] [--full]
+    python inventory.py query "SELECT name, status FROM zones"
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any, Iterable
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    type TEXT,
+    created_on TEXT,
+    data TEXT NOT NULL,
+    synced_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS zones (
+    id TEXT PRIMARY KEY,
+    account_id TEXT,
+    name TEXT NOT NULL,
+    status TEXT,
+    type TEXT,
+    name_servers TEXT,
+    created_on TEXT,
+    modified_on TEXT,
+    data TEXT NOT NULL,
+    synced_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_zones_name ON zones(name);
+CREATE INDEX IF NOT EXISTS idx_zones_account ON zones(account_id, status);
+
+CREATE TABLE IF NOT EXISTS pages_projects (
+    account_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    id TEXT,
+    subdomain TEXT,
+    production_branch TEXT,
+    latest_deployment_id TEXT,
+    created_on TEXT,
+    data TEXT NOT NULL,
+    synced_at TEXT NOT NULL,
+    PRIMARY KEY (account_id, name)
+);
+CREATE INDEX IF NOT EXISTS idx_pages_projects_subdomain ON pages_projects(subdomain);
+
+CREATE TABLE IF NOT EXISTS pages_deployments (
+    id TEXT PRIMARY KEY,
+    account_id TEXT NOT NULL,
+    project_name TEXT NOT NULL,
+    environment TEXT,
+    url TEXT,
+    branch TEXT,
+    stage TEXT,
+    stage_status TEXT,
+    created_on TEXT,
+    modified_on TEXT,
+    data TEXT NOT NULL,
+    synced_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pages_deployments_project
+    ON pages_deployments(account_id, project_name, created_on);
+
+CREATE TABLE IF NOT EXISTS worker_scripts (
+    account_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    etag TEXT,
+    created_on TEXT,
+    modified_on TEXT,
+    data TEXT NOT NULL,
+    synced_at TEXT NOT NULL,
+    PRIMARY KEY (account_id, id)
+);
+
+CREATE TABLE IF NOT EXISTS worker_routes (
+    id TEXT PRIMARY KEY,
+    zone_id TEXT NOT NULL,
+    pattern TEXT NOT NULL,
+    script TEXT,
+    data TEXT NOT NULL,
+    synced_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_worker_routes_zone ON worker_routes(zone_id);
+CREATE INDEX IF NOT EXISTS idx_worker_routes_script ON worker_routes(script);
+CREATE INDEX IF NOT EXISTS idx_worker_routes_pattern ON worker_routes(pattern);
+
+CREATE TABLE IF NOT EXISTS worker_domains (
+    id TEXT PRIMARY KEY,
+    account_id TEXT NOT NULL,
+    hostname TEXT NOT NULL,
+    service TEXT,
+    environment TEXT,
+    zone_id TEXT,
+    zone_name TEXT,
+    data TEXT NOT NULL,
+    synced_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_worker_domains_hostname ON worker_domains(hostname);
+CREATE INDEX IF NOT EXISTS idx_worker_domains_service ON worker_domains(account_id, service);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    resource TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (resource, scope)
+);
+"""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+# A deployment is final once it failed, was canceled or its deploy stage succeeded
+_FINAL_SQL = ("(COALESCE(stage_status, '') IN ('failure', 'canceled') "
+              "OR (COALESCE(stage, '') = 'deploy' AND COALESCE(stage_status, '') = 'success'))")
+
+
+def deployment_final(stage: Optional[str], status: Optional[str]) -> bool:
+    """Whether a deployment's latest stage and status can no longer change"""
+    return status in ("failure", "canceled") or (stage == "deploy" and status == "success")
+
+
+class InventoryStore:
+    """SQLite mirror of the resources reachable through a CloudflareManager"""
+
+    def __init__(self, path: str = "inventory.db"):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # ==================== Queries ====================
+
+    def query(self, sql: str, params: Iterable = ()) -> List[Dict]:
+        """Run a read query and return rows as dicts"""
+        return [dict(row) for row in self.conn.execute(sql, tuple(params))]
+
+    def find_zone(self, name: str) -> Optional[Dict]:
+        """Look up a zone by domain name"""
+        rows = self.query("SELECT * FROM zones WHERE name = ?", (name,))
+        return rows[0] if rows else None
+
+    def routes_for_script(self, script_name: str) -> List[Dict]:
+        """List every route (with its zone name) that points at a worker script"""
+        return self.query(
+            "SELECT r.id, r.pattern, r.script, r.zone_id, z.name AS zone_name "
+            "FROM worker_routes r LEFT JOIN zones z ON z.id = r.zone_id "
+            "WHERE r.script = ? ORDER BY r.pattern", (script_name,))
+
+    def counts(self) -> Dict[str, int]:
+        """Row count per mirrored table"""
+        tables = ["accounts", "zones", "pages_projects", "pages_deployments",
+                  "worker_scripts", "worker_routes", "worker_domains"]
+        return {table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in tables}
+
+    # ==================== Sync helpers ====================
+
+    def _synced_at(self, resource: str, scope: str) -> Optional[float]:
+        row = self.conn.execute("SELECT synced_at FROM sync_state WHERE resource = ? AND scope = ?",
+                                (resource, scope)).fetchone()
+        return row[0] if row else None
+
+    def _mark_synced(self, resource: str, scope: str):
+        self.conn.execute("INSERT OR REPLACE INTO sync_state (resource, scope, synced_at) VALUES (?, ?, ?)",
+                          (resource, scope, time.time()))
+
+    def _stamps(self, sql: str, params: Iterable = ()) -> Dict[str, Any]:
+        """Map primary key -> change marker for the rows already mirrored"""
+        return {row[0]: row[1] for row in self.conn.execute(sql, tuple(params))}
+
+    def _upsert(self, table: str, row: Dict[str, Any]):
+        columns = ", ".join(row)
+        placeholders = ", ".join("?" for _ in row)
+        self.conn.execute(f"INSERT OR REPLACE INTO {table} ({columns}) VALUES ({placeholders})",
+                          tuple(row.values()))
+
+    # ==================== Sync ====================
+
+    def sync(self, manager, full: bool = False, routes_max_age: float = 3600.0,
+             deployments: bool = True) -> Dict[str, int]:
+        """Bring the mirror up to date for the manager's account
+
+        Only rows whose modified_on (or etag / latest deployment) changed are
+        rewritten. Worker routes are refetched for new or modified zones and
+        otherwise only once `routes_max_age` seconds have passed; deployments are
+        paged newest-first and paging stops at the first unchanged deployment.
+
+        Args:
+            manager: CloudflareManager to read from
+            full: Refetch routes and all deployment pages regardless of state
+            routes_max_age: Seconds before an unchanged zone's routes are refetched
+            deployments: Also mirror Pages deployments
+
+        Returns:
+            Number of inserted/updated/deleted rows per resource
+        """
+        account_id = manager.account.account_id
+        changes = {"accounts": 0, "zones": 0, "worker_routes": 0, "pages_projects": 0,
+                   "pages_deployments": 0, "worker_scripts": 0, "worker_domains": 0}
+        synced_at = _now()
+
+        print(f"🔄 Syncing inventory for account {account_id} into {self.path}")
+
+        with self.conn:
+            for account in manager.iter_accounts(strict=True):
+                self._upsert("accounts", {
+                    "id": account["id"], "name": account.get("name"), "type": account.get("type"),
+                    "created_on": account.get("created_on"), "data": json.dumps(account),
+                    "synced_at": synced_at,
+                })
+                changes["accounts"] += 1
+
+        changed_zones = self._sync_zones(manager, account_id, synced_at, changes)
+        self._sync_routes(manager, account_id, changed_zones, full, routes_max_age, synced_at, changes)
+        changed_projects = self._sync_pages_projects(manager, account_id, synced_at, changes)
+        if deployments:
+            self._sync_deployments(manager, account_id, changed_projects, full, synced_at, changes)
+        self._sync_worker_scripts(manager, account_id, synced_at, changes)
+        self._sync_worker_domains(manager, account_id, synced_at, changes)
+
+        summary = ", ".join(f"{k}={v}" for k, v in changes.items() if v) or "no changes"
+        print(f"✓ Inventory synced: {summary}")
+        return changes
+
+    def _sync_zones(self, manager, account_id: str, synced_at: str, changes: Dict[str, int]) -> List[str]:
+        known = self._stamps("SELECT id, modified_on FROM zones WHERE account_id = ?", (account_id,))
+        changed, seen = [], set()
+        with self.conn:
+            for zone in manager.iter_zones(params={"account.id": account_id}, strict=True, stream=True):
+                seen.add(zone["id"])
+                if zone["id"] in known and known[zone["id"]] == zone.get("modified_on"):
+                    continue
+                self._upsert("zones", {
+                    "id": zone["id"], "account_id": account_id, "name": zone["name"],
+                    "status": zone.get("status"), "type": zone.get("type"),
+                    "name_servers": json.dumps(zone.get("name_servers", [])),
+                    "created_on": zone.get("created_on"), "modified_on": zone.get("modified_on"),
+                    "data": json.dumps(zone), "synced_at": synced_at,
+                })
+                changed.append(zone["id"])
+            removed = [zone_id for zone_id in known if zone_id not in seen]
+            for zone_id in removed:
+                self.conn.execute("DELETE FROM zones WHERE id = ?", (zone_id,))
+                self.conn.execute("DELETE FROM worker_routes WHERE zone_id = ?", (zone_id,))
+                self.conn.execute("DELETE FROM sync_state WHERE resource = 'worker_routes' AND scope = ?",
+                                  (zone_id,))
+        changes["zones"] += len(changed) + len(removed)
+        return changed
+
+    def _sync_routes(self, manager, account_id: str, changed_zones: List[str], full: bool,
+                     max_age: float, synced_at: str, changes: Dict[str, int]):
+        changed = set(changed_zones)
+        now = time.time()
+        for (zone_id,) in self.conn.execute("SELECT id FROM zones WHERE account_id = ?", (account_id,)).fetchall():
+            last = self._synced_at("worker_routes", zone_id)
+            if not full and zone_id not in changed and last is not None and now - last < max_age:
+                continue
+            routes = manager.list_worker_routes(zone_id, strict=True)
+            with self.conn:
+                self.conn.execute("DELETE FROM worker_routes WHERE zone_id = ?", (zone_id,))
+                for route in routes:
+                    self._upsert("worker_routes", {
+                        "id": route["id"], "zone_id": zone_id, "pattern": route["pattern"],
+                        "script": route.get("script"), "data": json.dumps(route), "synced_at": synced_at,
+                    })
+                self._mark_synced("worker_routes", zone_id)
+            changes["worker_routes"] += len(routes)
+
+    def _sync_pages_projects(self, manager, account_id: str, synced_at: str,
+                             changes: Dict[str, int]) -> List[str]:
+        known = self._stamps("SELECT name, latest_deployment_id FROM pages_projects WHERE account_id = ?",
+                             (account_id,))
+        changed, seen = [], set()
+        with self.conn:
+            for project in manager.iter_pages_projects(strict=True):
+                name = project["name"]
+                latest_id = (project.get("latest_deployment") or {}).get("id")
+                seen.add(name)
+                if name in known and known[name] == latest_id:
+                    continue
+                self._upsert("pages_projects", {
+                    "account_id": account_id, "name": name, "id": project.get("id"),
+                    "subdomain": project.get("subdomain"),
+                    "production_branch": project.get("production_branch"),
+                    "latest_deployment_id": latest_id, "created_on": project.get("created_on"),
+                    "data": json.dumps(project), "synced_at": synced_at,
+                })
+                changed.append(name)
+            removed = [name for name in known if name not in seen]
+            for name in removed:
+                self.conn.execute("DELETE FROM pages_projects WHERE account_id = ? AND name = ?",
+                                  (account_id, name))
+                self.conn.execute("DELETE FROM pages_deployments WHERE account_id = ? AND project_name = ?",
+                                  (account_id, name))
+        changes["pages_projects"] += len(changed) + len(removed)
+        return changed
+
+    def _sync_deployments(self, manager, account_id: str, changed_projects: List[str], full: bool,
+                          synced_at: str, changes: Dict[str, int]):
+        if full:
+            changed_projects = [row["name"] for row in self.query(
+                "SELECT name FROM pages_projects WHERE account_id = ?", (account_id,))]
+        else:
+            # A deployment keeps its ID while it moves on to success or failure, so
+            # projects with unfinished deployments are revisited until they settle
+            unfinished = [row["project_name"] for row in self.query(
+                f"SELECT DISTINCT project_name FROM pages_deployments WHERE account_id = ? AND NOT {_FINAL_SQL}",
+                (account_id,))]
+            changed_projects = list(dict.fromkeys(list(changed_projects) + unfinished))
+        for project_name in changed_projects:
+            known = {row["id"]: (row["modified_on"], row["stage"], row["stage_status"]) for row in self.query(
+                "SELECT id, modified_on, stage, stage_status FROM pages_deployments "
+                "WHERE account_id = ? AND project_name = ?", (account_id, project_name))}
+            pending = {deployment_id for deployment_id, (_, stage, status) in known.items()
+                       if not deployment_final(stage, status)}
+            with self.conn:
+                for deployment in manager.iter_pages_deployments(project_name, strict=True, stream=True):
+                    stage = deployment.get("latest_stage") or {}
+                    pending.discard(deployment["id"])
+                    if not full and known.get(deployment["id"]) == (deployment.get("modified_on"),
+                                                                    stage.get("name"), stage.get("status")):
+                        if pending:
+                            continue
+                        # Newest-first listing: everything older is already mirrored
+                        break
+                    trigger = (deployment.get("deployment_trigger") or {}).get("metadata") or {}
+                    self._upsert("pages_deployments", {
+                        "id": deployment["id"], "account_id": account_id, "project_name": project_name,
+                        "environment": deployment.get("environment"), "url": deployment.get("url"),
+                        "branch": trigger.get("branch"), "stage": stage.get("name"),
+                        "stage_status": stage.get("status"), "created_on": deployment.get("created_on"),
+                        "modified_on": deployment.get("modified_on"), "data": json.dumps(deployment),
+                        "synced_at": synced_at,
+                    })
+                    changes["pages_deployments"] += 1
+                else:
+                    # The whole listing was walked: unfinished deployments it no longer
+                    # holds were deleted, and would otherwise be revisited forever
+                    for deployment_id in pending:
+                        self.conn.execute("DELETE FROM pages_deployments WHERE id = ?", (deployment_id,))
+                    changes["pages_deployments"] += len(pending)
+
+    def _sync_worker_scripts(self, manager, account_id: str, synced_at: str, changes: Dict[str, int]):
+        known = self._stamps("SELECT id, etag FROM worker_scripts WHERE account_id = ?", (account_id,))
+        scripts = manager.list_workers(strict=True)
+        seen = set()
+        with self.conn:
+            for script in scripts:
+                seen.add(script["id"])
+                if script["id"] in known and known[script["id"]] == script.get("etag"):
+                    continue
+                self._upsert("worker_scripts", {
+                    "account_id": account_id, "id": script["id"], "etag": script.get("etag"),
+                    "created_on": script.get("created_on"), "modified_on": script.get("modified_on"),
+                    "data": json.dumps(script), "synced_at": synced_at,
+                })
+                changes["worker_scripts"] += 1
+            for script_id in known:
+                if script_id not in seen:
+                    self.conn.execute("DELETE FROM worker_scripts WHERE account_id = ? AND id = ?",
+                                      (account_id, script_id))
+                    changes["worker_scripts"] += 1
+
+    def _sync_worker_domains(self, manager, account_id: str, synced_at: str, changes: Dict[str, int]):
+        domains = manager.list_worker_domains(strict=True)
+        with self.conn:
+            self.conn.execute("DELETE FROM worker_domains WHERE account_id = ?", (account_id,))
+            for domain in domains:
+                self._upsert("worker_domains", {
+                    "id": domain["id"], "account_id": account_id, "hostname": domain["hostname"],
+                    "service": domain.get("service"), "environment": domain.get("environment"),
+                    "zone_id": domain.get("zone_id"), "zone_name": domain.get("zone_name"),
+                    "data": json.dumps(domain), "synced_at": synced_at,
+                })
+        changes["worker_domains"] += len(domains)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Local Cloudflare inventory mirror")
+    parser.add_argument("--db", default=os.getenv("CLOUDFLARE_INVENTORY_DB", "inventory.db"),
+                        help="SQLite database path")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sync_parser = sub.add_parser("sync", help="Fetch changes from Cloudflare")
+    sync_parser.add_argument("--full", action="store_true", help="Refetch routes and all deployments")
+    sync_parser.add_argument("--routes-max-age", type=float, default=3600.0,
+                             help="Seconds before an unchanged zone's routes are refetched")
+    sync_parser.add_argument("--no-deployments", action="store_true", help="Skip Pages deployments")
+    query_parser = sub.add_parser("query", help="Run a SQL query against the mirror")
+    query_parser.add_argument("sql")
+    args = parser.parse_args(argv)
+
+    store = InventoryStore(args.db)
+    try:
+        if args.command == "query":
+            for row in store.query(args.sql):
+                print(json.dumps(row))
+            return 0
+
+        from cloudflare_manager import CloudflareManager, CloudflareAccount
+
+        email = os.getenv("CLOUDFLARE_EMAIL", "")
+        token = os.getenv("CLOUDFLARE_TOKEN", "")
+        if not token:
+            print("✗ Set CLOUDFLARE_EMAIL and CLOUDFLARE_TOKEN")
+            return 1
+        account = CloudflareAccount(email=email, token=token, account_id=os.getenv("CLOUDFLARE_ACCOUNT_ID"),
+                                    use_api_key=bool(email))
+        manager = CloudflareManager(account)
+        store.sync(manager, full=args.full, routes_max_age=args.routes_max_age,
+                   deployments=not args.no_deployments)
+        return 0
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,723 @@
+#!/usr/bin/env python3
+"""
+Local job daemon: one queue and one rate limiter per Cloudflare account
+
+CI jobs and people submit deploys, uploads and bulk operations to a single
+long-running daemon instead of each calling the API on their own. Jobs are
+kept in SQLite, so they survive a restart (jobs that were running are
+queued again), and run on a worker pool where every account has a cap on
+concurrent jobs. Accounts take turns: the next job comes from the eligible
+account with the fewest running jobs, then the one served least recently,
+so one account's long backlog cannot starve the others. All jobs of an
+account share one CloudflareManager, and all accounts of one credential
+share one RateLimiter, which shapes the API traffic of all clients together.
+
+A job names a CloudflareManager method (see JOB_KINDS) and its keyword
+arguments; paths in them are read by the daemon, so it runs on the same
+machine as its clients. Accounts are the profiles of the CLI config file
+(see cli.py); credentials stay in the daemon and are never sent with jobs.
+
+HTTP API (JSON). The daemon listens on a Unix socket only its user can open
+(~/.cloudflare_manager/jobd.sock); a TCP listener on --port requires a
+token, sent as "Authorization: Bearer <token>", since any local user could
+otherwise run jobs with the daemon's credentials and paths:
+    POST /jobs                 {"kind", "account", "params"} -> job
+    GET  /jobs?status=&account=
+    GET  /jobs/<id>
+    GET  /jobs/<id>/logs?after=<seq>
+    POST /jobs/<id>/cancel     only while queued
+    GET  /status
+
+Usage:
+    python jobd.py serve --per-account 2
+    python jobd.py submit deploy --account prod \\
+        --params '{"project_name": "site", "directory": "./dist", "wait": true}' --wait
+    CLOUDFLARE_JOBD_TOKEN=... python jobd.py serve --port 8765
+"""
+
+import io
+import os
+import sys
+import hmac
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import argparse
+import threading
+import http.client
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+
+# Job kind -> CloudflareManager method called with the job's params
+JOB_KINDS = {
+    "deploy": "deploy_pages_project",
+    "worker_upload": "upload_worker",
+    "dns_import": "import_dns_records",
+    "zone_file_import": "import_zone_file",
+    "purge": "purge_cache",
+    "kv_bulk_write": "bulk_write_kv",
+    "kv_bulk_delete": "bulk_delete_kv",
+    "r2_upload": "upload_r2_object",
+    "r2_upload_directory": "upload_r2_directory",
+}
+
+FINAL_STATUSES = ("succeeded", "failed", "cancelled")
+
+DEFAULT_SOCKET = os.path.join(os.path.expanduser("~"), ".cloudflare_manager", "jobd.sock")
+DEFAULT_ADDRESS = f"unix://{DEFAULT_SOCKET}"
+
+# Cloudflare allows 1200 requests per 5 minutes per user, so the limit is per credential
+DEFAULT_RATE = 4.0
+DEFAULT_BURST = 20.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    account TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT
+);
+
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, account, seq);
+
+CREATE TABLE IF NOT EXISTS job_logs (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    at REAL NOT NULL,
+    line TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+
+class JobStore:
+    """SQLite job queue and log store; one connection shared by all threads under a lock"""
+
+    def __init__(self, path: str = "jobs.db"):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def _job(row: Optional[sqlite3.Row]) -> Optional[Dict]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def submit(self, account: str, kind: str, params: Dict) -> Dict:
+        job_id = uuid.uuid4().hex
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO jobs (id, account, kind, params, status, submitted_at) VALUES (?, ?, ?, ?, 'queued', ?)",
+                (job_id, account, kind, json.dumps(params), time.time()))
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            return self._job(self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def list(self, status: Optional[str] = None, account: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """Most recent jobs first"""
+        clauses, params = [], []
+        for column, value in (("status", status), ("account", account)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self.conn.execute(f"SELECT * FROM jobs {where} ORDER BY seq DESC LIMIT ?",
+                                     (*params, limit)).fetchall()
+        return [self._job(row) for row in rows]
+
+    def queued(self) -> Dict[str, int]:
+        """Account -> submission seq of its oldest queued job"""
+        with self._lock:
+            rows = self.conn.execute("SELECT account, MIN(seq) FROM jobs WHERE status = 'queued' "
+                                     "GROUP BY account").fetchall()
+        return {account: seq for account, seq in rows}
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Status -> account -> number of jobs, for queued and running jobs"""
+        with self._lock:
+            rows = self.conn.execute("SELECT status, account, COUNT(*) FROM jobs "
+                                     "WHERE status IN ('queued', 'running') GROUP BY status, account").fetchall()
+        counts: Dict[str, Dict[str, int]] = {"queued": {}, "running": {}}
+        for status, account, count in rows:
+            counts[status][account] = count
+        return counts
+
+    def claim(self, account: str) -> Optional[Dict]:
+        """Mark the account's oldest queued job running and return it"""
+        with self._lock, self.conn:
+            row = self.conn.execute("SELECT id FROM jobs WHERE status = 'queued' AND account = ? "
+                                    "ORDER BY seq LIMIT 1", (account,)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?",
+                              (time.time(), row["id"]))
+        return self.get(row["id"])
+
+    def finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None):
+        with self._lock, self.conn:
+            self.conn.execute("UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ? WHERE id = ?",
+                              (status, time.time(), json.dumps(result, default=str), error, job_id))
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job that has not started yet"""
+        with self._lock, self.conn:
+            cursor = self.conn.execute("UPDATE jobs SET status = 'cancelled', finished_at = ? "
+                                       "WHERE id = ? AND status = 'queued'", (time.time(), job_id))
+        return cursor.rowcount == 1
+
+    def recover(self) -> int:
+        """Queue again the jobs a previous daemon left running; returns how many"""
+        with self._lock, self.conn:
+            cursor = self.conn.execute("UPDATE jobs SET status = 'queued', started_at = NULL "
+                                       "WHERE status = 'running'")
+        return cursor.rowcount
+
+    def append_log(self, job_id: str, line: str):
+        with self._lock, self.conn:
+            self.conn.execute("INSERT INTO job_logs (job_id, seq, at, line) VALUES "
+                              "(?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM job_logs WHERE job_id = ?), ?, ?)",
+                              (job_id, job_id, time.time(), line))
+
+    def logs(self, job_id: str, after: int = 0, limit: int = 1000) -> List[Dict]:
+        with self._lock:
+            rows = self.conn.execute("SELECT seq, at, line FROM job_logs WHERE job_id = ? AND seq > ? "
+                                     "ORDER BY seq LIMIT ?", (job_id, after, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+
+class _LogRouter(io.TextIOBase):
+    """sys.stdout stand-in that sends a job thread's prints to that job's log
+
+    Other threads (including pools a manager method starts itself) still
+    write to the original stream.
+    """
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+        self._local = threading.local()
+
+    def route(self, sink: Optional[Callable[[str], None]]):
+        pending = getattr(self._local, "pending", "")
+        if pending and getattr(self._local, "sink", None):
+            self._local.sink(pending)
+        self._local.sink, self._local.pending = sink, ""
+
+    def write(self, text: str) -> int:
+        sink = getattr(self._local, "sink", None)
+        if sink is None:
+            return self.fallback.write(text)
+        *lines, self._local.pending = (self._local.pending + text).split("\n")
+        for line in lines:
+            sink(line)
+        return len(text)
+
+    def flush(self):
+        self.fallback.flush()
+
+
+def job_error(result: Any) -> Optional[str]:
+    """Why a manager method's return value means the job failed, or None"""
+    if result is None or result is False:
+        return "operation failed (see the job log)"
+    if isinstance(result, dict):
+        if result.get("complete") is False:
+            return f"stopped at chunk {result.get('failed_chunk')}; submit it again to resume"
+        if result.get("failed"):
+            return f"{result['failed']} item(s) failed"
+        if "wait" in result and (result["wait"] or {}).get("status") != "success":
+            return f"deployment ended as {(result['wait'] or {}).get('status', 'unknown')}"
+    return None
+
+
+class JobRunner:
+    """Runs queued jobs on `workers` threads, at most `per_account` at once per account
+
+    Args:
+        store: The job queue
+        manager_for: Account name -> manager; called from worker threads
+        kinds: Job kind -> manager method name (default JOB_KINDS)
+    """
+
+    def __init__(self, store: JobStore, manager_for: Callable[[str], Any], workers: int = 4,
+                 per_account: int = 2, kinds: Optional[Dict[str, str]] = None):
+        self.store = store
+        self.manager_for = manager_for
+        self.workers = workers
+        self.per_account = per_account
+        self.kinds = kinds or JOB_KINDS
+        self.running: Dict[str, int] = {}
+        self._served: Dict[str, int] = {}
+        self._turn = 0
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._threads: List[threading.Thread] = []
+        self._router: Optional[_LogRouter] = None
+
+    def start(self):
+        recovered = self.store.recover()
+        if recovered:
+            print(f"↻ Requeued {recovered} job(s) interrupted by the last shutdown")
+        if not isinstance(sys.stdout, _LogRouter):
+            sys.stdout = _LogRouter(sys.stdout)
+        self._router = sys.stdout
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"jobd-worker-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 10.0):
+        """Stop taking jobs and wait for running ones to finish"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        if sys.stdout is self._router:
+            sys.stdout = self._router.fallback
+
+    def submit(self, account: str, kind: str, params: Optional[Dict] = None) -> Dict:
+        if kind not in self.kinds:
+            raise ValueError(f"Unknown job kind {kind!r}; expected one of {', '.join(sorted(self.kinds))}")
+        job = self.store.submit(account, kind, params or {})
+        self.wake()
+        return job
+
+    def wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def _next_job(self) -> Optional[Dict]:
+        """Claim the next job fairly; caller holds the condition"""
+        eligible = [(self.running.get(account, 0), self._served.get(account, 0), seq, account)
+                    for account, seq in self.store.queued().items()
+                    if self.running.get(account, 0) < self.per_account]
+        for _, _, _, account in sorted(eligible):
+            job = self.store.claim(account)
+            if job:
+                self.running[account] = self.running.get(account, 0) + 1
+                self._turn += 1
+                self._served[account] = self._turn
+                return job
+        return None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                job = None
+                while not self._stopping:
+                    job = self._next_job()
+                    if job:
+                        break
+                    self._cond.wait(1.0)
+                if job is None:
+                    return
+            try:
+                self._run(job)
+            finally:
+                with self._cond:
+                    self.running[job["account"]] -= 1
+                    self._cond.notify_all()
+
+    def _run(self, job: Dict):
+        log = lambda line: self.store.append_log(job["id"], line)
+        if self._router:
+            self._router.route(log)
+        status, result, error = "failed", None, None
+        try:
+            manager = self.manager_for(job["account"])
+            result = getattr(manager, self.kinds[job["kind"]])(**job["params"])
+            error = job_error(result)
+            status = "succeeded" if error is None else "failed"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            log(f"✗ {error}")
+        finally:
+            if self._router:
+                self._router.route(None)
+        self.store.finish(job["id"], status, result, error)
+
+
+class AccountManagers:
+    """One CloudflareManager per configured account; profiles with the same credential share a rate limiter
+
+    Args:
+        profiles: Account name -> {"email", "token", "account_id",
+            "use_api_key", "r2_access_key_id", "r2_secret_access_key"} as in
+            the CLI config file
+        rate / burst: Requests per second allowed per credential
+    """
+
+    def __init__(self, profiles: Dict[str, Dict], rate: float = DEFAULT_RATE, burst: float = DEFAULT_BURST,
+                 factory: Optional[Callable[..., Any]] = None):
+        self.profiles = profiles
+        self.rate = rate
+        self.burst = burst
+        self._factory = factory
+        self._managers: Dict[str, Any] = {}
+        self._limiters: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, account: str) -> bool:
+        return account in self.profiles
+
+    def __call__(self, account: str):
+        with self._lock:
+            manager = self._managers.get(account)
+            if manager is None:
+                manager = self._managers[account] = self._create(account)
+            return manager
+
+    def _create(self, account: str):
+        from cloudflare_manager import CloudflareManager, CloudflareAccount, MultiAccountManager, RateLimiter
+
+        if account not in self.profiles:
+            raise KeyError(f"Unknown account {account!r}")
+        profile = self.profiles[account]
+        credentials = CloudflareAccount(
+            email=profile.get("email", ""), token=profile["token"], account_id=profile.get("account_id"),
+            name=account, use_api_key=profile.get("use_api_key", bool(profile.get("email"))),
+            r2_access_key_id=profile.get("r2_access_key_id"),
+            r2_secret_access_key=profile.get("r2_secret_access_key"))
+        key = MultiAccountManager._credential_key(credentials.email, credentials.token)
+        if key not in self._limiters:
+            self._limiters[key] = RateLimiter(self.rate, self.burst)
+        factory = self._factory or CloudflareManager
+        return factory(credentials, rate_limiter=self._limiters[key])
+
+
+# ==================== HTTP API ====================
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    runner: JobRunner = None  # set per server subclass
+    accounts: Optional[Callable[[str], bool]] = None
+    token: Optional[str] = None
+
+    def _reply(self, status: int, data: Any):
+        payload = json.dumps(data, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _authorized(self) -> bool:
+        if self.token is None:
+            return True
+        if hmac.compare_digest(self.headers.get("Authorization", ""), f"Bearer {self.token}"):
+            return True
+        self._reply(401, {"error": "Missing or wrong token"})
+        return False
+
+    def _body(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = url.path.strip("/").split("/")
+        store = self.runner.store
+        if parts == ["status"]:
+            counts = store.counts()
+            return self._reply(200, {"queued": counts["queued"], "running": counts["running"],
+                                     "workers": self.runner.workers, "per_account": self.runner.per_account})
+        if parts == ["jobs"]:
+            return self._reply(200, {"jobs": store.list(query.get("status"), query.get("account"),
+                                                        int(query.get("limit", 100)))})
+        if len(parts) >= 2 and parts[0] == "jobs":
+            job = store.get(parts[1])
+            if job is None:
+                return self._reply(404, {"error": f"No job {parts[1]}"})
+            if len(parts) == 2:
+                return self._reply(200, job)
+            if parts[2:] == ["logs"]:
+                after = int(query.get("after", 0))
+                lines = store.logs(job["id"], after)
+                return self._reply(200, {"lines": lines, "next": lines[-1]["seq"] if lines else after,
+                                         "status": job["status"]})
+        self._reply(404, {"error": f"No route for {url.path}"})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        parts = urlsplit(self.path).path.strip("/").split("/")
+        try:
+            body = self._body()
+        except ValueError:
+            return self._reply(400, {"error": "Request body is not JSON"})
+        if parts == ["jobs"]:
+            account, kind = body.get("account"), body.get("kind")
+            if self.accounts is not None and not self.accounts(account):
+                return self._reply(400, {"error": f"Unknown account {account!r}"})
+            try:
+                return self._reply(201, self.runner.submit(account, kind, body.get("params") or {}))
+            except ValueError as e:
+                return self._reply(400, {"error": str(e)})
+        if len(parts) == 3 and parts[0] == "jobs" and parts[2] == "cancel":
+            return self._reply(200, {"cancelled": self.runner.store.cancel(parts[1])})
+        self._reply(404, {"error": f"No route for {self.path}"})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class JobServer:
+    """Serves a JobRunner's HTTP API on a Unix socket path or a TCP address in a background thread
+
+    The socket is created 0600. Every local user can reach a TCP port, so
+    TCP requires a token; it is optional on a socket.
+    """
+
+    def __init__(self, runner: JobRunner, host: str = "127.0.0.1", port: int = 8765,
+                 socket_path: Optional[str] = None, accounts: Optional[Callable[[str], bool]] = None,
+                 token: Optional[str] = None):
+        if not socket_path and not token:
+            raise ValueError("A TCP listener needs a token; use a Unix socket or pass one")
+        handler = type("JobHandler", (_Handler,), {"runner": runner, "accounts": staticmethod(accounts)
+                                                   if accounts else None, "token": token})
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            # Never let the socket exist with looser permissions, even briefly
+            umask = os.umask(0o177)
+            try:
+                self.httpd = _UnixHTTPServer(socket_path, handler)
+            finally:
+                os.umask(umask)
+            self.address = f"unix://{socket_path}"
+        else:
+            self.httpd = ThreadingHTTPServer((host, port), handler)
+            self.httpd.daemon_threads = True
+            self.address = f"http://{host}:{self.httpd.server_address[1]}"
+        self.socket_path = socket_path
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="jobd-http", daemon=True)
+
+    def start(self) -> "JobServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.socket_path and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def __enter__(self) -> "JobServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# ==================== Client ====================
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float = 30.0):
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+
+class JobClient:
+    """Talks to a job daemon at unix:///path/to/socket or http://host:port"""
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, timeout: float = 30.0, token: Optional[str] = None):
+        self.address = address
+        self.timeout = timeout
+        self.token = token
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self.address.startswith("unix://"):
+            return _UnixHTTPConnection(self.address[len("unix://"):], self.timeout)
+        url = urlsplit(self.address)
+        return http.client.HTTPConnection(url.hostname, url.port or 80, timeout=self.timeout)
+
+    def _call(self, method: str, path: str, body: Optional[Dict] = None) -> Tuple[int, Dict]:
+        connection = self._connection()
+        try:
+            payload = json.dumps(body).encode("utf-8") if body is not None else None
+            headers = {"Content-Type": "application/json"}
+            if self.token:
+                headers["Authorization"] = f"Bearer {self.token}"
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            return response.status, json.loads(response.read() or b"{}")
+        finally:
+            connection.close()
+
+    def submit(self, kind: str, account: str, params: Optional[Dict] = None) -> Dict:
+        status, data = self._call("POST", "/jobs", {"kind": kind, "account": account, "params": params or {}})
+        if status != 201:
+            raise ValueError(data.get("error", f"HTTP {status}"))
+        return data
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        status, data = self._call("GET", f"/jobs/{job_id}")
+        return data if status == 200 else None
+
+    def list(self, **filters) -> List[Dict]:
+        query = urlencode({key: value for key, value in filters.items() if value})
+        return self._call("GET", "/jobs" + (f"?{query}" if query else ""))[1].get("jobs", [])
+
+    def logs(self, job_id: str, after: int = 0) -> Dict:
+        return self._call("GET", f"/jobs/{job_id}/logs?after={after}")[1]
+
+    def cancel(self, job_id: str) -> bool:
+        return bool(self._call("POST", f"/jobs/{job_id}/cancel", {})[1].get("cancelled"))
+
+    def status(self) -> Dict:
+        return self._call("GET", "/status")[1]
+
+    def wait(self, job_id: str, timeout: Optional[float] = None, interval: float = 1.0,
+             on_log: Optional[Callable[[str], None]] = None) -> Optional[Dict]:
+        """Poll until the job finishes; None on timeout. on_log receives new log lines"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        after = 0
+        while True:
+            logs = self.logs(job_id, after)
+            for entry in logs.get("lines", []):
+                if on_log:
+                    on_log(entry["line"])
+            after = logs.get("next", after)
+            if logs.get("status") in FINAL_STATUSES:
+                return self.get(job_id)
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(interval)
+
+
+# ==================== Command line ====================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Cloudflare job daemon")
+    parser.add_argument("--address", default=os.getenv("CLOUDFLARE_JOBD", DEFAULT_ADDRESS),
+                        help="Daemon address for client commands (unix:///path or http://host:port)")
+    parser.add_argument("--token", default=os.getenv("CLOUDFLARE_JOBD_TOKEN"),
+                        help="Shared token; required to serve on TCP, sent by client commands")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("serve", help="Run the daemon")
+    p.add_argument("--db", default=os.getenv("CLOUDFLARE_JOBD_DB", "jobs.db"), help="SQLite queue path")
+    p.add_argument("--config", default=os.getenv("CLOUDFLARE_CONFIG", os.path.join(
+        os.path.expanduser("~"), ".cloudflare_manager", "config.json")), help="Accounts (CLI config file)")
+    p.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket to listen on (created 0600)")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, help="Listen on TCP instead of the socket (requires --token)")
+    p.add_argument("--workers", type=int, default=8, help="Jobs running at once in total")
+    p.add_argument("--per-account", type=int, default=2, help="Jobs running at once per account")
+    p.add_argument("--rate", type=float, default=DEFAULT_RATE, help="API requests per second per credential")
+    p = sub.add_parser("submit", help="Queue a job")
+    p.add_argument("kind", choices=sorted(JOB_KINDS))
+    p.add_argument("--account", required=True, help="Account (config profile) name")
+    p.add_argument("--params", default="{}", help="JSON keyword arguments for the operation")
+    p.add_argument("--wait", action="store_true", help="Follow the log and exit non-zero if the job fails")
+    p = sub.add_parser("status", help="Show a job, or the daemon's queues")
+    p.add_argument("job_id", nargs="?")
+    p = sub.add_parser("logs", help="Print a job's log")
+    p.add_argument("job_id")
+    p.add_argument("--follow", action="store_true", help="Keep printing until the job finishes")
+    p = sub.add_parser("cancel", help="Cancel a queued job")
+    p.add_argument("job_id")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        if args.port is not None and not args.token:
+            print("✗ Serving on TCP needs --token (or CLOUDFLARE_JOBD_TOKEN); any local user can reach the port")
+            return 1
+        try:
+            with open(args.config, "r", encoding="utf-8") as f:
+                profiles = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"✗ Cannot read accounts from {args.config}: {e}")
+            return 1
+        managers = AccountManagers(profiles, rate=args.rate)
+        store = JobStore(args.db)
+        runner = JobRunner(store, managers, workers=args.workers, per_account=args.per_account)
+        runner.start()
+        socket_path = None if args.port is not None else args.socket
+        if socket_path:
+            os.makedirs(os.path.dirname(socket_path) or ".", mode=0o700, exist_ok=True)
+        server = JobServer(runner, args.host, args.port or 0, socket_path, accounts=managers.__contains__,
+                           token=args.token).start()
+        print(f"✓ Job daemon listening on {server.address} ({len(profiles)} account(s))")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            print("\nStopping; running jobs finish first")
+        finally:
+            server.stop()
+            runner.stop()
+            store.close()
+        return 0
+
+    client = JobClient(args.address, token=args.token)
+    try:
+        if args.command == "submit":
+            job = client.submit(args.kind, args.account, json.loads(args.params))
+            if not args.wait:
+                print(json.dumps(job))
+                return 0
+            job = client.wait(job["id"], on_log=lambda line: print(line, file=sys.stderr))
+            print(json.dumps(job))
+            return 0 if job["status"] == "succeeded" else 1
+        if args.command == "status":
+            print(json.dumps(client.get(args.job_id) if args.job_id else client.status()))
+            return 0
+        if args.command == "logs":
+            if args.follow:
+                job = client.wait(args.job_id, on_log=print)
+                return 0 if job and job["status"] == "succeeded" else 1
+            for entry in client.logs(args.job_id).get("lines", []):
+                print(entry["line"])
+            return 0
+        if args.command == "cancel":
+            cancelled = client.cancel(args.job_id)
+            print("✓ Cancelled" if cancelled else "✗ Job is not queued")
+            return 0 if cancelled else 1
+    except (OSError, ValueError) as e:
+        print(f"✗ {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Write-ahead journal for bulk API mutations, so a run that dies can be resumed
+
+A run is a list of steps ({"action": "create_zone", "domain": "..."}, see
+MUTATIONS). The journal is a JSON lines file: the first record holds the
+whole plan, then every step gets an "intent" record, flushed to disk before
+its request is sent, and a "done" or "failed" record after the answer.
+
+Resuming reads the journal instead of the API:
+    done        skipped; the recorded result is reused
+    failed      the API rejected it. It is checked like a step in doubt (the
+                request may have been applied before an error came back),
+                then sent again
+    in doubt    intent without an outcome: the process died mid-request.
+                One targeted read (the zone by name, the zone's routes, ...)
+                shows whether it happened before anything is sent again.
+                The read is strict: only "not found" counts as not applied.
+    not started sent
+
+Usage:
+    from journal import Journal, run_journal
+    journal = Journal("zones.journal").begin("apply", [{"action": "create_zone", "domain": "a.com"}])
+    run_journal(cf, journal)
+    run_journal(cf, Journal("zones.journal"))   # after a crash
+"""
+
+import os
+import json
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set
+
+
+JOURNAL_VERSION = 1
+
+# Result fields kept in the journal; the full objects stay with the API
+RESULT_FIELDS = ("id", "name", "pattern", "script", "status")
+
+
+class Mutation(NamedTuple):
+    """How to perform a step, and how to tell afterwards whether it took effect"""
+    args: tuple
+    run: Callable[[Any, Dict], Any]
+    find: Callable[[Any, Dict], Any]
+
+
+def _route(cf, step: Dict, **match) -> Optional[Dict]:
+    for route in cf.list_worker_routes(step["zone_id"], strict=True):
+        if all(route.get(field) == value for field, value in match.items()):
+            return route
+    return None
+
+
+def _zone(cf, step: Dict) -> Optional[Dict]:
+    return next((zone for zone in cf.iter_zones(params={"name": step["domain"]}, strict=True)
+                 if zone.get("name") == step["domain"]), None)
+
+
+MUTATIONS: Dict[str, Mutation] = {
+    "create_zone": Mutation(
+        ("domain",),
+        lambda cf, s: cf.create_zone(s["domain"], s.get("type", "full")),
+        _zone),
+    "create_pages_project": Mutation(
+        ("project",),
+        lambda cf, s: cf.create_pages_project(s["project"], s.get("branch", "main")),
+        lambda cf, s: cf.get_pages_project(s["project"], strict=True)),
+    "add_pages_domain": Mutation(
+        ("project", "domain"),
+        lambda cf, s: cf.add_pages_domain(s["project"], s["domain"]),
+        lambda cf, s: cf.get_pages_domain(s["project"], s["domain"], strict=True)),
+    "create_worker_route": Mutation(
+        ("zone_id", "pattern", "script"),
+        lambda cf, s: cf.create_worker_route(s["zone_id"], s["pattern"], s["script"]),
+        lambda cf, s: _route(cf, s, pattern=s["pattern"], script=s["script"])),
+    "update_worker_route": Mutation(
+        ("zone_id", "id", "pattern", "script"),
+        lambda cf, s: cf.update_worker_route(s["zone_id"], s["id"], s["pattern"], s["script"]),
+        lambda cf, s: _route(cf, s, id=s["id"], pattern=s["pattern"], script=s["script"])),
+    "delete_worker_route": Mutation(
+        ("zone_id", "id"),
+        lambda cf, s: cf.delete_worker_route(s["zone_id"], s["id"]),
+        lambda cf, s: _route(cf, s, id=s["id"]) is None),
+}
+
+
+def check_steps(steps: List[Dict]) -> List[Dict]:
+    """Validate a plan; raises ValueError naming the first bad step"""
+    for number, step in enumerate(steps):
+        mutation = MUTATIONS.get(step.get("action"))
+        if mutation is None:
+            raise ValueError(f"Step {number}: unknown action {step.get('action')!r}; "
+                             f"expected one of {', '.join(sorted(MUTATIONS))}")
+        missing = [name for name in mutation.args if not step.get(name)]
+        if missing:
+            raise ValueError(f"Step {number} ({step['action']}): missing {', '.join(missing)}")
+    return steps
+
+
+def _summary(result: Any) -> Any:
+    if isinstance(result, dict):
+        return {field: result[field] for field in RESULT_FIELDS if field in result}
+    return result
+
+
+class Journal:
+    """Append-only record of one run's plan and each step's progress
+
+    Opening an existing file replays it. A torn last line, left by a crash
+    in the middle of a write, is ignored.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.operation: Optional[str] = None
+        self.steps: List[Dict] = []
+        self.states: Dict[int, str] = {}
+        self.intents: Set[int] = set()
+        self.results: Dict[int, Any] = {}
+        self.errors: Dict[int, str] = {}
+        self.finished = False
+        if os.path.exists(path):
+            self._replay()
+
+    def _replay(self):
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            if not data.endswith(b"\n"):
+                # Drop a record cut short by a crash so the next one starts on its own line
+                data = data[:data.rfind(b"\n") + 1]
+                f.truncate(len(data))
+        for number, line in enumerate(data.decode("utf-8").splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                raise ValueError(f"{self.path}:{number}: corrupt journal record")
+            self._apply(record)
+
+    def _apply(self, record: Dict):
+        op = record["op"]
+        if op == "begin":
+            if record.get("version") != JOURNAL_VERSION:
+                raise ValueError(f"{self.path}: unsupported journal version {record.get('version')}")
+            self.operation, self.steps = record["operation"], record["steps"]
+        elif op in ("intent", "done", "failed"):
+            step = record["step"]
+            self.states[step] = op
+            if op == "intent":
+                self.intents.add(step)
+            if op == "done":
+                self.results[step] = record.get("result")
+            elif op == "failed":
+                self.errors[step] = record.get("error")
+        elif op == "end":
+            self.finished = True
+
+    def _write(self, record: Dict):
+        record["at"] = time.time()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._apply(record)
+
+    @property
+    def started(self) -> bool:
+        return self.operation is not None
+
+    def begin(self, operation: str, steps: List[Dict]) -> "Journal":
+        """Record the plan; a journal already holding the same plan is kept as it is"""
+        check_steps(steps)
+        if self.started:
+            if self.steps != steps:
+                raise ValueError(f"{self.path} belongs to a different plan; resume it or remove it")
+            return self
+        self._write({"op": "begin", "version": JOURNAL_VERSION, "operation": operation, "steps": steps})
+        return self
+
+    def intent(self, step: int):
+        self._write({"op": "intent", "step": step})
+
+    def done(self, step: int, result: Any = None):
+        self._write({"op": "done", "step": step, "result": _summary(result)})
+
+    def failed(self, step: int, error: str):
+        self._write({"op": "failed", "step": step, "error": error})
+
+    def finish(self):
+        self._write({"op": "end"})
+
+    def state(self, step: int) -> str:
+        """pending, in_doubt, done or failed"""
+        return {"intent": "in_doubt"}.get(self.states.get(step), self.states.get(step, "pending"))
+
+    def counts(self) -> Dict[str, int]:
+        counts = {"pending": 0, "in_doubt": 0, "done": 0, "failed": 0}
+        for step in range(len(self.steps)):
+            counts[self.state(step)] += 1
+        return counts
+
+
+def run_journal(cf, journal: Journal, on_step: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """Carry out (or resume) the journal's plan, one step at a time
+
+    Exceptions from the manager (connection errors, failed reads while
+    checking an in-doubt step) stop the run with the journal intact, so it
+    can be resumed again.
+
+    Args:
+        on_step: Called with {"step", "action", "state", "result", "error", **step args}
+            for every step, including skipped ones
+
+    Returns:
+        {"total", "done", "skipped", "recovered", "failed"}
+    """
+    if not journal.started:
+        raise ValueError(f"{journal.path} has no plan")
+    counts = journal.counts()
+    if counts["done"] or counts["in_doubt"] or counts["failed"]:
+        print(f"↻ Resuming {journal.operation}: {counts['done']} done, {counts['in_doubt']} in doubt, "
+              f"{counts['failed']} failed, {counts['pending']} not started")
+    summary = {"total": len(journal.steps), "done": 0, "skipped": 0, "recovered": 0, "failed": 0}
+
+    for number, step in enumerate(journal.steps):
+        mutation = MUTATIONS[step["action"]]
+        state = journal.state(number)
+        if state == "done":
+            summary["skipped"] += 1
+        else:
+            if state == "in_doubt" or (state == "failed" and number in journal.intents):
+                found = mutation.find(cf, step)
+                if found:
+                    print(f"✓ Step {number} ({step['action']}) had already been applied")
+                    journal.done(number, found)
+                    summary["recovered"] += 1
+            if journal.state(number) != "done":
+                journal.intent(number)
+                result = mutation.run(cf, step)
+                if result:
+                    journal.done(number, result)
+                    summary["done"] += 1
+                else:
+                    journal.failed(number, "rejected by the API (see the messages above)")
+                    summary["failed"] += 1
+        if on_step:
+            on_step(dict(step, step=number, state=journal.state(number), result=journal.results.get(number),
+                         error=journal.errors.get(number) if journal.state(number) == "failed" else None))
+
+    if not summary["failed"]:
+        if not journal.finished:
+            journal.finish()
+        print(f"✓ {journal.operation}: all {summary['total']} step(s) applied")
+    else:
+        print(f"⚠️  {journal.operation}: {summary['failed']} step(s) failed; resume {journal.path} to retry them")
+    return summary
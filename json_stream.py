@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Incremental decoding of Cloudflare API list responses
+Yields the items of the top-level "result" array as they are parsed, so a
+large page never has to be held in memory as one decoded document.
+"""
+
+import re
+import json
+import codecs
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+
+_WHITESPACE = " \t\n\r"
+_COMPACT_AFTER = 1 << 16
+# Characters a number can continue with ("1." or "2e" is cut mid-number)
+_NUMBER_TAIL = re.compile(r"[-+.eE0-9]*")
+
+
+class _ChunkReader:
+    """Text buffer over a byte-chunk iterator that decodes one JSON value at a time"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Append the next chunk to the buffer; False once the input is exhausted"""
+        if self.eof:
+            return False
+        if self.pos > _COMPACT_AFTER:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        for chunk in self._chunks:
+            if chunk:
+                self.buf += self._text.decode(chunk)
+                return True
+        self.buf += self._text.decode(b"", final=True)
+        self.eof = True
+        return False
+
+    def peek(self) -> Optional[str]:
+        """Skip whitespace and return the next character (None at end of input)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return None
+
+    def take(self, expected: str) -> str:
+        """Consume one structural character that must be one of `expected`"""
+        char = self.peek()
+        if char is None or char not in expected:
+            raise json.JSONDecodeError(f"Expected one of {expected!r}", self.buf, self.pos)
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value, reading more input as needed"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A number followed only by number characters up to the buffer edge may
+            # continue in the next chunk
+            if (isinstance(value, (int, float)) and _NUMBER_TAIL.match(self.buf, end).end() == len(self.buf)
+                    and self.fill()):
+                continue
+            self.pos = end
+            return value
+
+
+def iter_result_items(chunks: Iterable[bytes], envelope: Optional[Dict] = None) -> Iterator[Any]:
+    """Yield each element of the top-level "result" array of an API response
+
+    Args:
+        chunks: Raw response body chunks, e.g. response.iter_content(65536)
+        envelope: Optional dict that receives every other top-level field
+            (success, errors, messages, result_info). Fields that follow
+            "result" in the body are only present once iteration finishes.
+            A non-array "result" is stored here instead of being yielded.
+    """
+    if envelope is None:
+        envelope = {}
+    reader = _ChunkReader(chunks)
+
+    reader.take("{")
+    if reader.peek() == "}":
+        reader.pos += 1
+        return
+    while True:
+        key = reader.value()
+        reader.take(":")
+        if key == "result" and reader.peek() == "[":
+            reader.pos += 1
+            if reader.peek() == "]":
+                reader.pos += 1
+            else:
+                while True:
+                    yield reader.value()
+                    if reader.take(",]") == "]":
+                        break
+        else:
+            envelope[key] = reader.value()
+        if reader.take(",}") == "}":
+            return
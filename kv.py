@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Workers KV bulk helpers: streamed key/value sources, request packing and resume
+
+Bulk writes take up to 10,000 pairs and 100 MB per request. pack_bulk()
+fills each request as far as both limits allow while pulling pairs lazily
+from any iterator, so millions of keys never sit in memory at once.
+Sources:
+    iter_ndjson(path)       {"key", "value", ...} per line ("-" reads stdin)
+    iter_directory(path)    one key per file, named by its relative path
+
+BulkCheckpoint remembers which chunks the API acknowledged; packing is
+deterministic for the same input and limits, so a re-run skips those
+chunks and resumes after the last acknowledged one.
+"""
+
+import os
+import sys
+import json
+import base64
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+
+# Limits of the bulk endpoints
+BULK_WRITE_MAX_ITEMS = 10000
+BULK_WRITE_MAX_BYTES = 100 * 1000 * 1000
+BULK_DELETE_MAX_KEYS = 10000
+BULK_GET_MAX_KEYS = 100
+
+# Largest key, in bytes
+MAX_KEY_BYTES = 512
+
+# Fields of a bulk write item besides key and value
+ITEM_FIELDS = ("expiration", "expiration_ttl", "metadata")
+
+Pair = Union[Dict, Tuple[str, Union[str, bytes]]]
+
+
+def bulk_item(pair: Pair) -> Dict:
+    """Normalize a (key, value) tuple or dict into a bulk write item
+
+    bytes values, or str values with base64=True, are sent base64-encoded.
+    """
+    if isinstance(pair, dict):
+        item = {"key": pair["key"], "value": pair["value"]}
+        item.update({field: pair[field] for field in ITEM_FIELDS if pair.get(field) is not None})
+        if pair.get("base64"):
+            item["base64"] = True
+    else:
+        key, value = pair
+        item = {"key": key, "value": value}
+    if isinstance(item["value"], (bytes, bytearray)):
+        item["value"] = base64.b64encode(item["value"]).decode("ascii")
+        item["base64"] = True
+    elif not isinstance(item["value"], str):
+        item["value"] = json.dumps(item["value"])
+    if len(item["key"].encode("utf-8")) > MAX_KEY_BYTES:
+        raise ValueError(f"KV key longer than {MAX_KEY_BYTES} bytes: {item['key'][:40]}...")
+    return item
+
+
+def pack_bulk(items: Iterable, max_items: int = BULK_WRITE_MAX_ITEMS,
+              max_bytes: Optional[int] = BULK_WRITE_MAX_BYTES) -> Iterator[List]:
+    """Group items into lists that serialize to at most max_bytes of JSON and max_items entries"""
+    chunk: List = []
+    size = 2  # the enclosing []
+    for item in items:
+        # requests serializes with json.dumps defaults: ", " between items
+        item_size = len(json.dumps(item).encode("utf-8")) + 2 if max_bytes else 0
+        if max_bytes and item_size + 2 > max_bytes:
+            raise ValueError(f"KV item too large for one request: {str(item.get('key'))[:40]}")
+        if chunk and (len(chunk) >= max_items or (max_bytes and size + item_size > max_bytes)):
+            yield chunk
+            chunk, size = [], 2
+        chunk.append(item)
+        size += item_size
+    if chunk:
+        yield chunk
+
+
+def iter_ndjson(path: str) -> Iterator[Dict]:
+    """Bulk items from an NDJSON file, one {"key", "value", ...} object per line"""
+    stream = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                yield bulk_item(json.loads(line))
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{path}:{number}: {e}")
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def iter_directory(path: str, prefix: str = "") -> Iterator[Dict]:
+    """Bulk items from a directory tree: key = prefix + relative path, value = file contents
+
+    Text files are sent as-is, anything that is not valid UTF-8 as base64.
+    """
+    root = Path(path)
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            file_path = Path(directory, filename)
+            data = file_path.read_bytes()
+            key = prefix + file_path.relative_to(root).as_posix()
+            try:
+                yield bulk_item((key, data.decode("utf-8")))
+            except UnicodeDecodeError:
+                yield bulk_item((key, data))
+
+
+class BulkCheckpoint:
+    """Acknowledged chunk numbers of one bulk job, persisted in a StateStore
+
+    `done` is the watermark: every chunk below it was acknowledged. Chunks
+    that finished out of order above it are kept in `acked`. The checkpoint
+    is only valid for the same chunking limits; other limits start over.
+    """
+
+    def __init__(self, state, key: str, limits: Tuple[int, int]):
+        self.state = state
+        self.key = key
+        self.limits = list(limits)
+        saved = state.get(key) or {}
+        if saved.get("limits") == self.limits:
+            self.done, self.acked, self.items = saved["done"], set(saved.get("acked", ())), saved.get("items", 0)
+        else:
+            self.done, self.acked, self.items = 0, set(), 0
+
+    def skip(self, index: int) -> bool:
+        return index < self.done or index in self.acked
+
+    def ack(self, index: int, items: int):
+        self.acked.add(index)
+        self.items += items
+        while self.done in self.acked:
+            self.acked.discard(self.done)
+            self.done += 1
+        self.save()
+
+    def save(self):
+        self.state.set(self.key, {"limits": self.limits, "done": self.done, "acked": sorted(self.acked),
+                                  "items": self.items})
+
+    def clear(self):
+        self.state.set(self.key, {})
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+In-process metrics for Cloudflare API calls, exportable as Prometheus text
+
+CloudflareManager records every request into API_METRICS: counts by
+endpoint and status, latency histograms, API error codes, retries and bytes
+sent/received. Endpoints are normalized (IDs and names replaced by
+placeholders) so label cardinality stays bounded.
+
+Usage:
+    from metrics import REGISTRY
+    print(REGISTRY.render())
+"""
+
+import re
+import bisect
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+
+# Latency buckets in seconds, tuned for API calls that range from fast reads to large uploads
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Path segments followed by a resource ID or name in Cloudflare API URLs
+COLLECTIONS = frozenset({
+    "accounts", "zones", "projects", "deployments", "domains", "scripts", "routes",
+    "namespaces", "values", "buckets", "objects", "dns_records", "memberships", "users",
+})
+
+_API_PREFIX = re.compile(r"^/client/v4")
+
+
+@lru_cache(maxsize=4096)
+def endpoint_label(url: str) -> str:
+    """Reduce a request URL to a low-cardinality endpoint template
+
+    https://api.cloudflare.com/client/v4/zones/abc/workers/routes/def
+    becomes /zones/:id/workers/routes/:id
+    """
+    path = _API_PREFIX.sub("", urlsplit(url).path)
+    segments = path.strip("/").split("/")
+    normalized = []
+    previous = None
+    for segment in segments:
+        normalized.append(":id" if previous in COLLECTIONS else segment)
+        previous = segment if previous not in COLLECTIONS else None
+    return "/" + "/".join(normalized)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """Base class: a named family of labelled series guarded by the registry lock"""
+
+    TYPE = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], lock: threading.Lock):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = lock
+        self._series: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+
+
+class Counter(Metric):
+    """Monotonically increasing value per label set"""
+
+    TYPE = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._series.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(self._series.items())]
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+
+    TYPE = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = float(value)
+
+
+class Histogram(Metric):
+    """Bucketed distribution with sum and count per label set"""
+
+    TYPE = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], lock: threading.Lock,
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames, lock)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket (non-cumulative) counts, then sum and count
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series[-1] if series else 0
+
+    def totals(self) -> Tuple[int, float]:
+        """(count, sum) over every label set"""
+        with self._lock:
+            return (sum(series[-1] for series in self._series.values()),
+                    sum(series[-2] for series in self._series.values()))
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, hits in zip(self.buckets + (float("inf"),), series):
+                cumulative += hits
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metric families and renders them in the Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Metric] = {}
+
+    def _register(self, cls, name: str, documentation: str, labelnames: Iterable[str], **kwargs) -> Metric:
+        existing = self._metrics.get(name)
+        if existing is not None:
+            if type(existing) is not cls:
+                raise ValueError(f"Metric {name} already registered as {existing.TYPE}")
+            return existing
+        metric = self._metrics[name] = cls(name, documentation, tuple(labelnames), self._lock, **kwargs)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """Prometheus text exposition (version 0.0.4) of every metric"""
+        lines = []
+        with self._lock:
+            for metric in self._metrics.values():
+                lines.extend(metric.header())
+                lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+class ApiMetrics:
+    """The metric families CloudflareManager records into"""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.requests = registry.counter(
+            "cloudflare_api_requests_total", "Cloudflare API requests by endpoint and HTTP status",
+            ("method", "endpoint", "status"))
+        self.latency = registry.histogram(
+            "cloudflare_api_request_duration_seconds", "Cloudflare API request latency",
+            ("method", "endpoint"))
+        self.api_errors = registry.counter(
+            "cloudflare_api_errors_total", "Error codes returned in Cloudflare API responses",
+            ("endpoint", "code"))
+        self.retries = registry.counter(
+            "cloudflare_api_retries_total", "Requests retried, by reason", ("endpoint", "reason"))
+        self.bytes_sent = registry.counter(
+            "cloudflare_api_request_bytes_total", "Request body bytes sent", ("endpoint",))
+        self.bytes_received = registry.counter(
+            "cloudflare_api_response_bytes_total", "Response body bytes received", ("endpoint",))
+        self.rate_limit_wait = registry.counter(
+            "cloudflare_api_rate_limit_wait_seconds_total", "Time spent waiting on the client-side rate limiter")
+
+    def observe(self, method: str, url: str, status: str, seconds: float, sent: int = 0,
+                received: int = 0):
+        endpoint = endpoint_label(url)
+        self.requests.inc(method=method, endpoint=endpoint, status=status)
+        self.latency.observe(seconds, method=method, endpoint=endpoint)
+        if sent:
+            self.bytes_sent.inc(sent, endpoint=endpoint)
+        if received:
+            self.bytes_received.inc(received, endpoint=endpoint)
+
+    def retry(self, url: str, reason: str):
+        self.retries.inc(endpoint=endpoint_label(url), reason=reason)
+
+    def errors(self, url: Optional[str], errors: Iterable[Dict]):
+        endpoint = endpoint_label(url) if url else "unknown"
+        for error in errors or [{}]:
+            code = error.get("code", "unknown") if isinstance(error, dict) else "unknown"
+            self.api_errors.inc(endpoint=endpoint, code=code)
+
+
+REGISTRY = MetricsRegistry()
+API_METRICS = ApiMetrics(REGISTRY)
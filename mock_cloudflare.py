@@ -0,0 +1,1065 @@
+#!/usr/bin/env python3
+"""
+Local mock of the Cloudflare v4 API endpoints used by CloudflareManager
+
+Covers accounts, zones, DNS records (including batches), cache purge,
+Workers KV, R2 buckets, Pages projects/deployments/domains and worker
+scripts/routes/domains with Cloudflare-style envelopes, pagination and
+result_info. Requests signed with AWS SigV4 are answered as R2's
+S3-compatible endpoint (objects and multipart uploads; see
+add_r2_credentials). Pages deployments and custom domains move through their
+stages over successive GETs so polling code can be exercised.
+
+Usage:
+    from mock_cloudflare import MockCloudflareServer
+    with MockCloudflareServer() as server:
+        server.api.add_zones(1000)
+        cf = CloudflareManager(account, base_url=server.url)
+"""
+
+import re
+import json
+import base64
+import time
+import uuid
+import hashlib
+import threading
+import xml.etree.ElementTree as ET
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs, unquote, urlencode
+
+
+API_PREFIX = "/client/v4"
+
+# Largest page each list endpoint returns, as on the real API
+MAX_PER_PAGE = {"zones": 50, "projects": 10, "deployments": 25, "dns_records": 5000}
+
+# Targets per cache purge request, by kind
+PURGE_LIMIT = 30
+
+KV_NAMESPACES = r"/accounts/(?P<account_id>[^/]+)/storage/kv/namespaces"
+
+# Workers KV bulk limits
+KV_BULK_MAX_ITEMS = 10000
+KV_BULK_MAX_BYTES = 100 * 1000 * 1000
+KV_BULK_GET_MAX_KEYS = 100
+
+# S3 multipart limits of the R2 endpoint
+R2_MIN_PART_SIZE = 5 * 1024 * 1024
+R2_MAX_PARTS = 10000
+
+# Changes per DNS batch request on Free plan zones (the mock's zones are all Free)
+DNS_BATCH_LIMIT = 200
+DEFAULT_MAX_PER_PAGE = 100
+
+DEPLOY_STAGES = ("queued", "initialize", "clone_repo", "build", "deploy")
+
+READ_CHUNK = 1 << 16
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000000Z", time.gmtime())
+
+
+def _new_id() -> str:
+    return uuid.uuid4().hex
+
+
+class RawResponse:
+    """A non-JSON answer (R2's S3 endpoint) with its own headers"""
+
+    def __init__(self, body: bytes, headers: Optional[Dict[str, str]] = None):
+        self.body = body
+        self.headers = headers or {}
+
+
+def response_body(data: Any) -> Tuple[Dict[str, str], bytes]:
+    """(headers, body) for a dispatch result: raw bytes as-is, anything else as JSON"""
+    if isinstance(data, RawResponse):
+        return dict(data.headers), data.body
+    if isinstance(data, bytes):
+        return {"Content-Type": "application/octet-stream"}, data
+    return {"Content-Type": "application/json"}, json.dumps(data).encode("utf-8")
+
+
+def _escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _xml(root: str, content: str) -> RawResponse:
+    return RawResponse(f'<?xml version="1.0" encoding="UTF-8"?><{root} '
+                       f'xmlns="http://s3.amazonaws.com/doc/2006-03-01/">{content}</{root}>'.encode("utf-8"),
+                       {"Content-Type": "application/xml"})
+
+
+def _s3_error(code: str, message: str) -> RawResponse:
+    return RawResponse(f'<?xml version="1.0" encoding="UTF-8"?><Error><Code>{code}</Code>'
+                       f'<Message>{_escape(message)}</Message></Error>'.encode("utf-8"),
+                       {"Content-Type": "application/xml"})
+
+
+class MockError(Exception):
+    """An API error answered with Cloudflare's error envelope"""
+
+    def __init__(self, status: int, code: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+class _DnsZone:
+    """A zone's DNS records with a by-name index for conflict checks"""
+
+    def __init__(self):
+        self.records: Dict[str, Dict] = {}
+        self.names: Dict[str, List[str]] = {}
+
+    def copy(self) -> "_DnsZone":
+        zone = _DnsZone()
+        zone.records = dict(self.records)
+        zone.names = {name: list(ids) for name, ids in self.names.items()}
+        return zone
+
+    def remove(self, record: Dict):
+        del self.records[record["id"]]
+        self.names[record["name"]].remove(record["id"])
+
+    def put(self, record: Dict):
+        """Store a new or changed record, enforcing Cloudflare's uniqueness rules"""
+        for other_id in self.names.get(record["name"], ()):
+            other = self.records[other_id]
+            if other_id == record["id"]:
+                continue
+            if (other["type"], other["content"]) == (record["type"], record["content"]):
+                raise MockError(400, 81058, "An identical record already exists.")
+            if "CNAME" in (other["type"], record["type"]):
+                raise MockError(400, 81053, "An A, AAAA, or CNAME record with that host already exists.")
+        previous = self.records.get(record["id"])
+        if previous is not None:
+            self.remove(previous)
+        self.records[record["id"]] = record
+        self.names.setdefault(record["name"], []).append(record["id"])
+
+
+class MockCloudflare:
+    """In-memory API state and request handlers, independent of the HTTP server
+
+    Args:
+        deploy_polls: GETs of a deployment before it reports success
+        domain_polls: GETs of a Pages domain before it becomes active
+    """
+
+    def __init__(self, deploy_polls: int = 2, domain_polls: int = 2):
+        self.deploy_polls = deploy_polls
+        self.domain_polls = domain_polls
+        self.lock = threading.Lock()
+        self.accounts: Dict[str, Dict] = {}
+        self.memberships: Dict[str, List[Dict]] = {}
+        self.zones: Dict[str, Dict] = {}
+        self.projects: Dict[Tuple[str, str], Dict] = {}
+        self.deployments: Dict[Tuple[str, str], List[Dict]] = {}
+        self.pages_domains: Dict[Tuple[str, str], Dict[str, Dict]] = {}
+        self.scripts: Dict[str, Dict[str, Dict]] = {}
+        self.routes: Dict[str, Dict[str, Dict]] = {}
+        self.worker_domains: Dict[str, Dict[str, Dict]] = {}
+        self.dns_records: Dict[str, _DnsZone] = {}
+        self.purges: List[Tuple[str, Dict]] = []
+        self.kv_namespaces: Dict[str, Dict[str, Dict]] = {}
+        self.kv: Dict[str, Dict[str, Dict]] = {}
+        self.r2_credentials: Dict[str, Tuple[str, str]] = {}
+        self.r2_buckets: Dict[Tuple[str, str], Dict] = {}
+        self.r2_objects: Dict[Tuple[str, str], Dict[str, Dict]] = {}
+        self.r2_uploads: Dict[str, Dict] = {}
+        self.r2_parts_received = 0
+        self.polls: Dict[str, int] = {}
+        self._zone_views: Dict[str, Tuple[int, List[Dict]]] = {}
+        self.request_count = 0
+        self.bytes_received = 0
+        self._routes = [
+            ("GET", r"/accounts", self.list_accounts),
+            ("GET", r"/zones", self.list_zones),
+            ("POST", r"/zones", self.create_zone),
+            ("GET", r"/zones/(?P<zone_id>[^/]+)", self.get_zone),
+            ("GET", r"/zones/(?P<zone_id>[^/]+)/workers/routes", self.list_routes),
+            ("POST", r"/zones/(?P<zone_id>[^/]+)/workers/routes", self.create_route),
+            ("PUT", r"/zones/(?P<zone_id>[^/]+)/workers/routes/(?P<route_id>[^/]+)", self.update_route),
+            ("POST", r"/zones/(?P<zone_id>[^/]+)/purge_cache", self.purge_cache),
+            ("GET", r"/zones/(?P<zone_id>[^/]+)/dns_records", self.list_dns_records),
+            ("POST", r"/zones/(?P<zone_id>[^/]+)/dns_records", self.create_dns_record),
+            ("POST", r"/zones/(?P<zone_id>[^/]+)/dns_records/batch", self.batch_dns_records),
+            ("PUT", r"/zones/(?P<zone_id>[^/]+)/dns_records/(?P<record_id>[^/]+)", self.put_dns_record),
+            ("PATCH", r"/zones/(?P<zone_id>[^/]+)/dns_records/(?P<record_id>[^/]+)", self.patch_dns_record),
+            ("DELETE", r"/zones/(?P<zone_id>[^/]+)/dns_records/(?P<record_id>[^/]+)", self.delete_dns_record),
+            ("DELETE", r"/zones/(?P<zone_id>[^/]+)/workers/routes/(?P<route_id>[^/]+)", self.delete_route),
+            ("GET", r"/accounts/(?P<account_id>[^/]+)/pages/projects", self.list_projects),
+            ("POST", r"/accounts/(?P<account_id>[^/]+)/pages/projects", self.create_project),
+            ("GET", r"/accounts/(?P<account_id>[^/]+)/pages/projects/(?P<project>[^/]+)", self.get_project),
+            ("GET", r"/accounts/(?P<account_id>[^/]+)/pages/projects/(?P<project>[^/]+)/deployments",
+             self.list_deployments),
+            ("POST", r"/accounts/(?P<account_id>[^/]+)/pages/projects/(?P<project>[^/]+)/deployments",
+             self.create_deployment),
+            ("GET", r"/accounts/(?P<account_id>[^/]+)/pages/projects/(?P<project>[^/]+)/deployments/"
+                    r"(?P<deployment_id>[^/]+)", self.get_deployment),
+            ("GET", r"/accounts/(?P<account_id>[^/]+)/pages/projects/(?P<project>[^/]+)/domains",
+             self.list_pages_domains),
+            ("POST", r"/accounts/(?P<account_id>[^/]+)/pages/projects/(?P<project>[^/]+)/domains",
+             self.add_pages_domain),
+            ("GET", r"/accounts/(?P<account_id>[^/]+)/pages/projects/(?P<project>[^/]+)/domains/(?P<domain>[^/]+)",
+             self.get_pages_domain),
+            ("GET", KV_NAMESPACES, self.list_kv_namespaces),
+            ("POST", KV_NAMESPACES, self.create_kv_namespace),
+            ("DELETE", KV_NAMESPACES + r"/(?P<namespace_id>[^/]+)", self.delete_kv_namespace),
+            ("GET", KV_NAMESPACES + r"/(?P<namespace_id>[^/]+)/keys", self.list_kv_keys),
+            ("PUT", KV_NAMESPACES + r"/(?P<namespace_id>[^/]+)/bulk", self.kv_bulk_write),
+            ("POST", KV_NAMESPACES + r"/(?P<namespace_id>[^/]+)/bulk/delete", self.kv_bulk_delete),
+            ("POST", KV_NAMESPACES + r"/(?P<namespace_id>[^/]+)/bulk/get", self.kv_bulk_get),
+            ("GET", KV_NAMESPACES + r"/(?P<namespace_id>[^/]+)/values/(?P<key>.+)", self.get_kv_value),
+            ("PUT", KV_NAMESPACES + r"/(?P<namespace_id>[^/]+)/values/(?P<key>.+)", self.put_kv_value),
+            ("DELETE", KV_NAMESPACES + r"/(?P<namespace_id>[^/]+)/values/(?P<key>.+)", self.delete_kv_value),
+            ("GET", r"/accounts/(?P<account_id>[^/]+)/r2/buckets", self.list_r2_buckets),
+            ("POST", r"/accounts/(?P<account_id>[^/]+)/r2/buckets", self.create_r2_bucket),
+            ("DELETE", r"/accounts/(?P<account_id>[^/]+)/r2/buckets/(?P<bucket>[^/]+)", self.delete_r2_bucket),
+            ("GET", r"/accounts/(?P<account_id>[^/]+)/workers/scripts", self.list_scripts),
+            ("GET", r"/accounts/(?P<account_id>[^/]+)/workers/scripts/(?P<script>[^/]+)", self.get_script),
+            ("PUT", r"/accounts/(?P<account_id>[^/]+)/workers/scripts/(?P<script>[^/]+)", self.upload_script),
+            ("DELETE", r"/accounts/(?P<account_id>[^/]+)/workers/scripts/(?P<script>[^/]+)", self.delete_script),
+            ("GET", r"/accounts/(?P<account_id>[^/]+)/workers/domains", self.list_worker_domains),
+            ("PUT", r"/accounts/(?P<account_id>[^/]+)/workers/domains", self.put_worker_domain),
+        ]
+        self._compiled = [(method, re.compile(f"^{pattern}$"), handler) for method, pattern, handler in self._routes]
+
+    # ==================== Seeding ====================
+
+    def account_for(self, token: str) -> Dict:
+        """The account owned by a credential, created on first use"""
+        with self.lock:
+            if token not in self.accounts:
+                account_id = hashlib.sha256(token.encode("utf-8")).hexdigest()[:32]
+                self.accounts[token] = {"id": account_id, "name": f"Account {account_id[:6]}",
+                                        "type": "standard", "created_on": _now()}
+            return self.accounts[token]
+
+    def add_member_accounts(self, token: str, count: int, prefix: str = "Member") -> List[Dict]:
+        """Give a credential access to `count` more accounts besides its own"""
+        owner = self.account_for(token)
+        with self.lock:
+            members = self.memberships.setdefault(owner["id"], [])
+            added = []
+            for _ in range(count):
+                account_id = hashlib.sha256(f"{owner['id']}/{len(members)}".encode("utf-8")).hexdigest()[:32]
+                added.append({"id": account_id, "name": f"{prefix} {len(members) + 1}", "type": "standard",
+                              "created_on": _now()})
+                members.append(added[-1])
+            return added
+
+    def add_zones(self, count: int, account_id: str = "", prefix: str = "zone",
+                  statuses: Tuple[str, ...] = ("active", "active", "active", "pending")) -> List[str]:
+        """Create `count` zones named <prefix><n>.example.com and return their IDs"""
+        ids = []
+        with self.lock:
+            start = len(self.zones)
+            for n in range(start, start + count):
+                zone = self._zone(f"{prefix}{n}.example.com", account_id, statuses[n % len(statuses)])
+                self.zones[zone["id"]] = zone
+                ids.append(zone["id"])
+        return ids
+
+    def _zone(self, name: str, account_id: str, status: str, zone_type: str = "full") -> Dict:
+        zone_id = _new_id()
+        created = _now()
+        return {
+            "id": zone_id, "name": name, "status": status, "paused": False, "type": zone_type,
+            "development_mode": 0,
+            "name_servers": [f"{ns}.ns.cloudflare.com" for ns in ("ada", "bob")],
+            "original_name_servers": [f"ns{n}.registrar.example" for n in (1, 2)],
+            "original_registrar": None, "original_dnshost": None,
+            "created_on": created, "modified_on": created, "activated_on": created if status == "active" else None,
+            "meta": {"step": 2, "custom_certificate_quota": 0, "page_rule_quota": 3, "phishing_detected": False},
+            "owner": {"id": None, "type": "user", "email": None},
+            "account": {"id": account_id, "name": f"Account {account_id[:6]}"},
+            "permissions": ["#zone:read", "#zone:edit", "#worker:read", "#worker:edit"],
+            "plan": {"id": "0feeeeeeeeeeeeeeeeeeeeeeeeeeeeee", "name": "Free Website", "price": 0,
+                     "currency": "USD", "frequency": "", "is_subscribed": False, "can_subscribe": False,
+                     "legacy_id": "free", "legacy_discount": False, "externally_managed": False},
+        }
+
+    # ==================== Helpers ====================
+
+    @staticmethod
+    def page(items: List[Any], query: Dict[str, str], kind: str = "") -> Tuple[List[Any], Dict]:
+        """Slice one page out of `items` and build its result_info"""
+        max_per_page = MAX_PER_PAGE.get(kind, DEFAULT_MAX_PER_PAGE)
+        try:
+            page = max(1, int(query.get("page", 1)))
+            per_page = max(1, min(max_per_page, int(query.get("per_page", 20))))
+        except ValueError:
+            raise MockError(400, 1001, "Invalid pagination parameters")
+        start = (page - 1) * per_page
+        chunk = items[start:start + per_page]
+        total_pages = (len(items) + per_page - 1) // per_page
+        return chunk, {"page": page, "per_page": per_page, "count": len(chunk),
+                       "total_count": len(items), "total_pages": total_pages}
+
+    def _check_account(self, account: Dict, account_id: str):
+        members = self.memberships.get(account["id"], ())
+        if account["id"] != account_id and all(member["id"] != account_id for member in members):
+            raise MockError(403, 9109, "Unauthorized to access requested resource")
+
+    def _project(self, account_id: str, name: str) -> Dict:
+        project = self.projects.get((account_id, name))
+        if project is None:
+            raise MockError(404, 8000007, f"Project not found. The specified project name does not match "
+                                          f"any of your existing projects: {name}")
+        return project
+
+    def _zone_by_id(self, zone_id: str) -> Dict:
+        zone = self.zones.get(zone_id)
+        if zone is None:
+            raise MockError(404, 1001, "Invalid zone identifier")
+        return zone
+
+    # ==================== Dispatch ====================
+
+    def dispatch(self, method: str, path: str, query: Dict[str, str], headers: Dict[str, str],
+                 body: bytes) -> Tuple[int, Any]:
+        """Answer one request; returns (HTTP status, JSON envelope or raw body)"""
+        with self.lock:
+            self.request_count += 1
+            self.bytes_received += len(body)
+        if headers.get("authorization", "").startswith("AWS4-HMAC-SHA256"):
+            return self.dispatch_s3(method, path, query, headers, body)
+        if not path.startswith(API_PREFIX):
+            return 404, self.envelope(errors=[{"code": 7000, "message": "No route for that URI"}])
+        path = path[len(API_PREFIX):].rstrip("/") or "/"
+        token = headers.get("x-auth-key") or headers.get("authorization", "").replace("Bearer ", "", 1)
+        if not token:
+            return 400, self.envelope(errors=[{"code": 9106, "message": "Missing X-Auth-Key or Authorization"}])
+        account = self.account_for(token)
+
+        allowed = False
+        for route_method, pattern, handler in self._compiled:
+            match = pattern.match(path)
+            if not match:
+                continue
+            allowed = True
+            if route_method != method:
+                continue
+            params = {key: unquote(value) for key, value in match.groupdict().items()}
+            try:
+                if "account_id" in params:
+                    self._check_account(account, params["account_id"])
+                result = handler(account=account, query=query, headers=headers, body=body, **params)
+            except MockError as e:
+                return e.status, self.envelope(errors=[{"code": e.code, "message": str(e)}])
+            if isinstance(result, (bytes, RawResponse)):
+                return 200, result
+            if isinstance(result, tuple):
+                return 200, self.envelope(*result)
+            return 200, self.envelope(result)
+        if allowed:
+            return 405, self.envelope(errors=[{"code": 10405, "message": "Method not allowed"}])
+        return 404, self.envelope(errors=[{"code": 7003, "message": "Could not route to " + path}])
+
+    @staticmethod
+    def envelope(result: Any = None, result_info: Optional[Dict] = None,
+                 errors: Optional[List[Dict]] = None) -> Dict:
+        data = {"success": not errors, "errors": errors or [], "messages": [], "result": result}
+        if result_info is not None:
+            data["result_info"] = result_info
+        return data
+
+    @staticmethod
+    def _json(body: bytes) -> Dict:
+        try:
+            return json.loads(body or b"{}")
+        except ValueError:
+            raise MockError(400, 6007, "Malformed JSON in request body")
+
+    # ==================== Accounts and zones ====================
+
+    def list_accounts(self, account, query, **_):
+        return self.page([account] + self.memberships.get(account["id"], []), query)
+
+    def _visible_zones(self, account_id: str) -> List[Dict]:
+        """Zones an account can see, cached until the zone set changes"""
+        with self.lock:
+            version, zones = self._zone_views.get(account_id, (None, None))
+            if version != len(self.zones):
+                zones = [zone for zone in self.zones.values() if zone["account"]["id"] in ("", account_id)]
+                self._zone_views[account_id] = (len(self.zones), zones)
+            return zones
+
+    def list_zones(self, account, query, **_):
+        zones = self._visible_zones(account["id"])
+        name = query.get("name")
+        if name:
+            if name.startswith("contains:"):
+                zones = [zone for zone in zones if name[9:] in zone["name"]]
+            else:
+                zones = [zone for zone in zones if zone["name"] == name]
+        if query.get("status"):
+            zones = [zone for zone in zones if zone["status"] == query["status"]]
+        return self.page(zones, query, "zones")
+
+    def create_zone(self, account, body, **_):
+        payload = self._json(body)
+        name = payload.get("name")
+        if not name or "." not in name:
+            raise MockError(400, 1099, "Invalid zone name")
+        with self.lock:
+            if any(zone["name"] == name for zone in self.zones.values()):
+                raise MockError(400, 1061, f"{name} already exists")
+            zone = self._zone(name, (payload.get("account") or {}).get("id") or account["id"], "pending",
+                              payload.get("type", "full"))
+            self.zones[zone["id"]] = zone
+        return zone
+
+    def get_zone(self, zone_id, **_):
+        return self._zone_by_id(zone_id)
+
+    # ==================== Worker routes ====================
+
+    def list_routes(self, zone_id, **_):
+        self._zone_by_id(zone_id)
+        with self.lock:
+            return list(self.routes.get(zone_id, {}).values())
+
+    def create_route(self, zone_id, body, **_):
+        self._zone_by_id(zone_id)
+        payload = self._json(body)
+        with self.lock:
+            routes = self.routes.setdefault(zone_id, {})
+            if any(route["pattern"] == payload.get("pattern") for route in routes.values()):
+                raise MockError(409, 10020, "A route with the same pattern already exists")
+            route = {"id": _new_id(), "pattern": payload.get("pattern"), "script": payload.get("script")}
+            routes[route["id"]] = route
+        return route
+
+    def update_route(self, zone_id, route_id, body, **_):
+        payload = self._json(body)
+        with self.lock:
+            route = self.routes.get(zone_id, {}).get(route_id)
+            if route is None:
+                raise MockError(404, 10019, "Route not found")
+            route.update(pattern=payload.get("pattern", route["pattern"]),
+                         script=payload.get("script", route["script"]))
+            return dict(route)
+
+    def delete_route(self, zone_id, route_id, **_):
+        with self.lock:
+            if self.routes.get(zone_id, {}).pop(route_id, None) is None:
+                raise MockError(404, 10019, "Route not found")
+        return {"id": route_id}
+
+    # ==================== Cache purge ====================
+
+    def purge_cache(self, zone_id, body, **_):
+        self._zone_by_id(zone_id)
+        payload = self._json(body)
+        kinds = [kind for kind in ("files", "prefixes", "hosts", "tags", "purge_everything") if kind in payload]
+        if len(kinds) != 1:
+            raise MockError(400, 1015, "Purge requests take exactly one of files, prefixes, hosts, tags "
+                                       "or purge_everything")
+        if kinds[0] != "purge_everything" and not 0 < len(payload[kinds[0]]) <= PURGE_LIMIT:
+            raise MockError(400, 1015, f"Purge requests take between 1 and {PURGE_LIMIT} {kinds[0]}")
+        with self.lock:
+            self.purges.append((zone_id, payload))
+        return {"id": zone_id}
+
+    # ==================== DNS records ====================
+
+    @staticmethod
+    def _dns_record(zone: Dict, payload: Dict, existing: Optional[Dict] = None) -> Dict:
+        """Validate a record payload and build the stored record"""
+        record = dict(existing or {})
+        record.update({key: value for key, value in payload.items() if key != "id"})
+        rtype, name = record.get("type"), (record.get("name") or "").rstrip(".").lower()
+        if not rtype or not name:
+            raise MockError(400, 9000, "DNS record type and name are required")
+        if name == "@":
+            name = zone["name"]
+        elif name != zone["name"] and not name.endswith("." + zone["name"]):
+            name = f"{name}.{zone['name']}"
+        data = record.get("data")
+        if rtype == "SRV" and data:
+            record["priority"] = data["priority"]
+            record["content"] = f"{data['weight']} {data['port']} {data['target']}"
+        elif rtype == "CAA" and data:
+            record["content"] = f'{data["flags"]} {data["tag"]} "{data["value"]}"'
+        if not record.get("content"):
+            raise MockError(400, 9005, "Content for the DNS record is required")
+        now = _now()
+        record.update(name=name, zone_id=zone["id"], zone_name=zone["name"], ttl=record.get("ttl") or 1,
+                      proxied=bool(record.get("proxied", False)), proxiable=rtype in ("A", "AAAA", "CNAME"),
+                      modified_on=now)
+        record.setdefault("id", _new_id())
+        record.setdefault("created_on", now)
+        record.setdefault("comment", None)
+        record.setdefault("tags", [])
+        return record
+
+    def list_dns_records(self, zone_id, query, **_):
+        self._zone_by_id(zone_id)
+        with self.lock:
+            records = list(self.dns_records.get(zone_id, _DnsZone()).records.values())
+        for key in ("type", "name", "content"):
+            if query.get(key):
+                records = [record for record in records if record[key] == query[key]]
+        return self.page(records, query, "dns_records")
+
+    def _apply_dns(self, zone: Dict, records: "_DnsZone", kind: str, payload: Dict) -> Dict:
+        """One change applied to `records` in place"""
+        if kind == "posts":
+            record = self._dns_record(zone, payload)
+        else:
+            current = records.records.get(payload.get("id"))
+            if current is None:
+                raise MockError(404, 81044, "Record does not exist.")
+            if kind == "deletes":
+                records.remove(current)
+                return {"id": current["id"]}
+            base = current if kind == "patches" else {"id": current["id"], "created_on": current["created_on"]}
+            record = self._dns_record(zone, payload, base)
+        records.put(record)
+        return record
+
+    def _dns_change(self, zone_id: str, kind: str, payload: Dict) -> Dict:
+        zone = self._zone_by_id(zone_id)
+        with self.lock:
+            return dict(self._apply_dns(zone, self.dns_records.setdefault(zone_id, _DnsZone()), kind, payload))
+
+    def create_dns_record(self, zone_id, body, **_):
+        return self._dns_change(zone_id, "posts", self._json(body))
+
+    def put_dns_record(self, zone_id, record_id, body, **_):
+        return self._dns_change(zone_id, "puts", dict(self._json(body), id=record_id))
+
+    def patch_dns_record(self, zone_id, record_id, body, **_):
+        return self._dns_change(zone_id, "patches", dict(self._json(body), id=record_id))
+
+    def delete_dns_record(self, zone_id, record_id, **_):
+        return self._dns_change(zone_id, "deletes", {"id": record_id})
+
+    def batch_dns_records(self, zone_id, body, **_):
+        """Deletes, patches, puts, then posts; all or nothing"""
+        zone = self._zone_by_id(zone_id)
+        payload = self._json(body)
+        kinds = ("deletes", "patches", "puts", "posts")
+        if sum(len(payload.get(kind) or []) for kind in kinds) > DNS_BATCH_LIMIT:
+            raise MockError(400, 1004, f"A batch may contain at most {DNS_BATCH_LIMIT} changes")
+        with self.lock:
+            records = self.dns_records.get(zone_id, _DnsZone()).copy()
+            result = {kind: [dict(self._apply_dns(zone, records, kind, change))
+                             for change in payload.get(kind) or []] for kind in kinds}
+            self.dns_records[zone_id] = records
+        return result
+
+    # ==================== Pages ====================
+
+    def list_projects(self, account_id, query, **_):
+        with self.lock:
+            projects = [project for (owner, _), project in self.projects.items() if owner == account_id]
+        return self.page(projects, query, "projects")
+
+    def create_project(self, account_id, body, **_):
+        payload = self._json(body)
+        name = payload.get("name", "")
+        if not re.match(r"^[a-z0-9][a-z0-9-]{0,57}$", name):
+            raise MockError(400, 8000011, "Invalid project name")
+        with self.lock:
+            if (account_id, name) in self.projects:
+                raise MockError(409, 8000002, "A project with this name already exists")
+            project = {
+                "id": _new_id(), "name": name, "subdomain": f"{name}.pages.dev", "domains": [f"{name}.pages.dev"],
+                "production_branch": payload.get("production_branch", "main"), "created_on": _now(),
+                "source": None, "build_config": {"build_command": "", "destination_dir": ""},
+                "deployment_configs": {"preview": {}, "production": {}}, "latest_deployment": None,
+                "canonical_deployment": None,
+            }
+            self.projects[(account_id, name)] = project
+        return project
+
+    def get_project(self, account_id, project, **_):
+        return self._project(account_id, project)
+
+    def list_deployments(self, account_id, project, query, **_):
+        self._project(account_id, project)
+        with self.lock:
+            deployments = [self._deployment_view(d) for d in self.deployments.get((account_id, project), [])]
+        return self.page(deployments, query, "deployments")
+
+    def create_deployment(self, account_id, project, body, headers, **_):
+        record = self._project(account_id, project)
+        if "multipart/form-data" not in headers.get("content-type", ""):
+            raise MockError(400, 8000096, "Expected a multipart/form-data body")
+        branch = re.search(rb'name="branch"\r\n(?:[^\r\n]+\r\n)*\r\n([^\r\n]*)\r\n', body)
+        message = re.search(rb'name="commit_message"\r\n(?:[^\r\n]+\r\n)*\r\n([^\r\n]*)\r\n', body)
+        created = _now()
+        deployment = {
+            "id": _new_id(), "short_id": "", "project_id": record["id"], "project_name": project,
+            "environment": "production", "created_on": created, "modified_on": created,
+            "deployment_trigger": {"type": "ad_hoc", "metadata": {
+                "branch": branch.group(1).decode("utf-8") if branch else record["production_branch"],
+                "commit_hash": "", "commit_message": message.group(1).decode("utf-8") if message else ""}},
+            "files": body.count(b'; filename="'), "bytes": len(body),
+            "aliases": None, "is_skipped": False,
+        }
+        deployment["short_id"] = deployment["id"][:8]
+        deployment["url"] = f"https://{deployment['short_id']}.{project}.pages.dev"
+        with self.lock:
+            self.deployments.setdefault((account_id, project), []).insert(0, deployment)
+            self.polls[deployment["id"]] = 0
+            record["latest_deployment"] = {"id": deployment["id"]}
+            return self._deployment_view(deployment)
+
+    def _deployment_view(self, deployment: Dict) -> Dict:
+        """The deployment with stages advanced by how often it has been polled"""
+        done = min(len(DEPLOY_STAGES), 1 + self.polls.get(deployment["id"], 0) * len(DEPLOY_STAGES)
+                   // max(1, self.deploy_polls))
+        stages = []
+        for index, name in enumerate(DEPLOY_STAGES):
+            if index < done:
+                status = "success"
+            elif index == done:
+                status = "active"
+            else:
+                status = "idle"
+            stages.append({"name": name, "status": status,
+                           "started_on": deployment["created_on"] if index <= done else None,
+                           "ended_on": deployment["created_on"] if index < done else None})
+        latest = [stage for stage in stages if stage["status"] != "idle"][-1]
+        return dict(deployment, stages=stages, latest_stage=latest)
+
+    def get_deployment(self, account_id, project, deployment_id, **_):
+        with self.lock:
+            for deployment in self.deployments.get((account_id, project), []):
+                if deployment["id"] == deployment_id:
+                    self.polls[deployment_id] += 1
+                    return self._deployment_view(deployment)
+        raise MockError(404, 8000009, "Deployment not found")
+
+    def list_pages_domains(self, account_id, project, **_):
+        self._project(account_id, project)
+        with self.lock:
+            return list(self.pages_domains.get((account_id, project), {}).values())
+
+    def add_pages_domain(self, account_id, project, body, **_):
+        self._project(account_id, project)
+        name = self._json(body).get("name", "")
+        with self.lock:
+            domains = self.pages_domains.setdefault((account_id, project), {})
+            if name in domains:
+                raise MockError(409, 8000018, "You have already added this custom domain")
+            domain = {"id": _new_id(), "name": name, "status": "initializing", "created_on": _now(),
+                      "validation_data": {"method": "http", "status": "initializing"},
+                      "verification_data": {"status": "pending"}}
+            domains[name] = domain
+            self.polls[domain["id"]] = 0
+            return dict(domain)
+
+    def get_pages_domain(self, account_id, project, domain, **_):
+        with self.lock:
+            record = self.pages_domains.get((account_id, project), {}).get(domain)
+            if record is None:
+                raise MockError(404, 8000015, "Domain not found")
+            self.polls[record["id"]] += 1
+            if self.polls[record["id"]] >= self.domain_polls:
+                record.update(status="active", validation_data={"method": "http", "status": "active"})
+            else:
+                record["status"] = "pending"
+            return dict(record)
+
+    # ==================== Workers KV ====================
+
+    def _kv_namespace(self, account_id: str, namespace_id: str) -> Dict[str, Dict]:
+        if namespace_id not in self.kv_namespaces.get(account_id, {}):
+            raise MockError(404, 10013, "namespace not found")
+        return self.kv[namespace_id]
+
+    def list_kv_namespaces(self, account_id, query, **_):
+        with self.lock:
+            namespaces = list(self.kv_namespaces.get(account_id, {}).values())
+        return self.page(namespaces, query)
+
+    def create_kv_namespace(self, account_id, body, **_):
+        title = self._json(body).get("title")
+        if not title:
+            raise MockError(400, 10019, "namespace title is required")
+        with self.lock:
+            namespaces = self.kv_namespaces.setdefault(account_id, {})
+            if any(namespace["title"] == title for namespace in namespaces.values()):
+                raise MockError(400, 10014, "a namespace with this account ID and title already exists")
+            namespace = {"id": _new_id(), "title": title, "supports_url_encoding": True}
+            namespaces[namespace["id"]] = namespace
+            self.kv[namespace["id"]] = {}
+        return namespace
+
+    def delete_kv_namespace(self, account_id, namespace_id, **_):
+        with self.lock:
+            self._kv_namespace(account_id, namespace_id)
+            del self.kv_namespaces[account_id][namespace_id]
+            del self.kv[namespace_id]
+        return None
+
+    def list_kv_keys(self, account_id, namespace_id, query, **_):
+        """Cursor-paginated like the real API; the cursor is an offset here"""
+        prefix, cursor = query.get("prefix", ""), query.get("cursor", "")
+        limit = max(10, min(1000, int(query.get("limit", 1000))))
+        start = int(cursor) if cursor else 0
+        with self.lock:
+            store = self._kv_namespace(account_id, namespace_id)
+            names = sorted(name for name in store if name.startswith(prefix))
+            keys = [{"name": name, **{field: store[name][field] for field in ("expiration", "metadata")
+                                      if store[name].get(field) is not None}}
+                    for name in names[start:start + limit]]
+        next_cursor = str(start + limit) if start + limit < len(names) else ""
+        return keys, {"count": len(keys), "cursor": next_cursor}
+
+    def kv_bulk_write(self, account_id, namespace_id, body, **_):
+        if len(body) > KV_BULK_MAX_BYTES:
+            raise MockError(413, 10046, "request body too large")
+        items = self._json(body)
+        if not isinstance(items, list) or len(items) > KV_BULK_MAX_ITEMS:
+            raise MockError(400, 10026, f"bulk writes take a list of at most {KV_BULK_MAX_ITEMS} items")
+        with self.lock:
+            store = self._kv_namespace(account_id, namespace_id)
+            for item in items:
+                value = item.get("value", "")
+                data = base64.b64decode(value) if item.get("base64") else value.encode("utf-8")
+                store[item["key"]] = {"value": data, "metadata": item.get("metadata"),
+                                      "expiration": item.get("expiration")}
+        return {"successful_key_count": len(items), "unsuccessful_keys": []}
+
+    def kv_bulk_delete(self, account_id, namespace_id, body, **_):
+        keys = self._json(body)
+        if not isinstance(keys, list) or len(keys) > KV_BULK_MAX_ITEMS:
+            raise MockError(400, 10026, f"bulk deletes take a list of at most {KV_BULK_MAX_ITEMS} keys")
+        with self.lock:
+            store = self._kv_namespace(account_id, namespace_id)
+            for key in keys:
+                store.pop(key, None)
+        return {"successful_key_count": len(keys), "unsuccessful_keys": []}
+
+    def kv_bulk_get(self, account_id, namespace_id, body, **_):
+        payload = self._json(body)
+        keys = payload.get("keys") or []
+        if len(keys) > KV_BULK_GET_MAX_KEYS:
+            raise MockError(400, 10026, f"bulk reads take at most {KV_BULK_GET_MAX_KEYS} keys")
+        with self.lock:
+            store = self._kv_namespace(account_id, namespace_id)
+            entries = {key: store.get(key) for key in keys}
+        values = {}
+        for key, entry in entries.items():
+            value = None
+            if entry is not None:
+                value = entry["value"].decode("utf-8")
+                if payload.get("type") == "json":
+                    value = json.loads(value)
+            if payload.get("withMetadata"):
+                value = {"value": value, "metadata": entry["metadata"] if entry else None}
+            values[key] = value
+        return {"values": values}
+
+    def get_kv_value(self, account_id, namespace_id, key, **_):
+        with self.lock:
+            entry = self._kv_namespace(account_id, namespace_id).get(key)
+        if entry is None:
+            raise MockError(404, 10009, "get: 'key not found'")
+        return entry["value"]
+
+    def put_kv_value(self, account_id, namespace_id, key, body, **_):
+        with self.lock:
+            self._kv_namespace(account_id, namespace_id)[key] = {"value": body, "metadata": None,
+                                                                 "expiration": None}
+        return None
+
+    def delete_kv_value(self, account_id, namespace_id, key, **_):
+        with self.lock:
+            self._kv_namespace(account_id, namespace_id).pop(key, None)
+        return None
+
+    # ==================== R2 ====================
+
+    def add_r2_credentials(self, account_id: str) -> Tuple[str, str]:
+        """Issue an R2 access key pair for the S3 endpoint; returns (access_key_id, secret_access_key)"""
+        access_key_id, secret = uuid.uuid4().hex, hashlib.sha256(uuid.uuid4().bytes).hexdigest()
+        with self.lock:
+            self.r2_credentials[access_key_id] = (secret, account_id)
+        return access_key_id, secret
+
+    def list_r2_buckets(self, account_id, query, **_):
+        with self.lock:
+            buckets = [dict(bucket) for (owner, _), bucket in sorted(self.r2_buckets.items()) if owner == account_id]
+        per_page = max(1, min(1000, int(query.get("per_page", 20))))
+        start = int(query.get("cursor") or 0)
+        cursor = str(start + per_page) if start + per_page < len(buckets) else ""
+        return {"buckets": buckets[start:start + per_page]}, {"cursor": cursor, "per_page": per_page}
+
+    def create_r2_bucket(self, account_id, body, **_):
+        name = self._json(body).get("name") or ""
+        if not re.match(r"^[a-z0-9][a-z0-9-]{1,61}[a-z0-9]$", name):
+            raise MockError(400, 10005, "The specified bucket name is not valid.")
+        with self.lock:
+            if (account_id, name) in self.r2_buckets:
+                raise MockError(409, 10004, "The bucket you tried to create already exists, and you own it.")
+            bucket = {"name": name, "creation_date": _now(), "location": "WNAM"}
+            self.r2_buckets[(account_id, name)] = bucket
+            self.r2_objects[(account_id, name)] = {}
+        return bucket
+
+    def delete_r2_bucket(self, account_id, bucket, **_):
+        with self.lock:
+            if (account_id, bucket) not in self.r2_buckets:
+                raise MockError(404, 10006, "The specified bucket does not exist.")
+            if self.r2_objects[(account_id, bucket)]:
+                raise MockError(409, 10008, "The bucket you tried to delete is not empty.")
+            del self.r2_buckets[(account_id, bucket)]
+            del self.r2_objects[(account_id, bucket)]
+        return None
+
+    def dispatch_s3(self, method: str, path: str, query: Dict[str, str], headers: Dict[str, str],
+                    body: bytes) -> Tuple[int, RawResponse]:
+        """Answer one request to R2's S3-compatible endpoint (path-style, SigV4-signed)"""
+        from r2 import sign_v4
+
+        authorization = headers.get("authorization", "")
+        match = re.search(r"Credential=([^/]+)/", authorization)
+        credentials = self.r2_credentials.get(match.group(1)) if match else None
+        url = f"https://{headers.get('host', '')}{path}" + (f"?{urlencode(query)}" if query else "")
+        if credentials is None or sign_v4(method, url, {name: value for name, value in headers.items()
+                                                        if name.startswith("x-amz-")},
+                                          match.group(1), credentials[0],
+                                          headers.get("x-amz-date", "")) != authorization:
+            return 403, _s3_error("SignatureDoesNotMatch", "The request signature we calculated does not match")
+        bucket, _, key = path.lstrip("/").partition("/")
+        key = unquote(key)
+        with self.lock:
+            objects = self.r2_objects.get((credentials[1], bucket))
+            if objects is None:
+                return 404, _s3_error("NoSuchBucket", "The specified bucket does not exist.")
+            if not key:
+                if method == "GET" and query.get("list-type") == "2":
+                    return 200, self._s3_list(bucket, objects, query)
+                return 405, _s3_error("MethodNotAllowed", "The specified method is not allowed")
+            if "uploads" in query and method == "POST":
+                upload_id = _new_id()
+                self.r2_uploads[upload_id] = {"bucket": (credentials[1], bucket), "key": key, "parts": {},
+                                              "content_type": headers.get("content-type")}
+                return 200, _xml("InitiateMultipartUploadResult",
+                                 f"<Bucket>{bucket}</Bucket><Key>{_escape(key)}</Key><UploadId>{upload_id}</UploadId>")
+            if "uploadId" in query:
+                return self._s3_multipart(method, (credentials[1], bucket), key, query, body)
+            entry = objects.get(key)
+            if method == "PUT":
+                entry = {"body": body, "etag": hashlib.md5(body).hexdigest(), "last_modified": _now(),
+                         "content_type": headers.get("content-type") or "application/octet-stream"}
+                objects[key] = entry
+                return 200, RawResponse(b"", {"ETag": f'"{entry["etag"]}"'})
+            if method == "DELETE":
+                objects.pop(key, None)
+                return 204, RawResponse(b"")
+        if entry is None:
+            return 404, _s3_error("NoSuchKey", "The specified key does not exist.")
+        object_headers = {"ETag": f'"{entry["etag"]}"', "Last-Modified": entry["last_modified"],
+                          "Content-Type": entry["content_type"], "Content-Length": str(len(entry["body"]))}
+        if method == "HEAD":
+            return 200, RawResponse(b"", object_headers)
+        if method == "GET":
+            return 200, RawResponse(entry["body"], object_headers)
+        return 405, _s3_error("MethodNotAllowed", "The specified method is not allowed")
+
+    def _s3_list(self, bucket: str, objects: Dict[str, Dict], query: Dict[str, str]) -> RawResponse:
+        prefix = query.get("prefix", "")
+        max_keys = max(1, min(1000, int(query.get("max-keys", 1000))))
+        start = int(query.get("continuation-token") or 0)
+        keys = sorted(key for key in objects if key.startswith(prefix))
+        page = keys[start:start + max_keys]
+        truncated = start + max_keys < len(keys)
+        contents = "".join(f"<Contents><Key>{_escape(key)}</Key><LastModified>{objects[key]['last_modified']}"
+                           f"</LastModified><ETag>&quot;{objects[key]['etag']}&quot;</ETag>"
+                           f"<Size>{len(objects[key]['body'])}</Size></Contents>" for key in page)
+        token = f"<NextContinuationToken>{start + max_keys}</NextContinuationToken>" if truncated else ""
+        return _xml("ListBucketResult", f"<Name>{bucket}</Name><Prefix>{_escape(prefix)}</Prefix>"
+                                        f"<KeyCount>{len(page)}</KeyCount><MaxKeys>{max_keys}</MaxKeys>"
+                                        f"<IsTruncated>{str(truncated).lower()}</IsTruncated>{token}{contents}")
+
+    def _s3_multipart(self, method: str, bucket: Tuple[str, str], key: str, query: Dict[str, str],
+                      body: bytes) -> Tuple[int, RawResponse]:
+        """UploadPart, CompleteMultipartUpload and AbortMultipartUpload; called with the lock held"""
+        upload = self.r2_uploads.get(query["uploadId"])
+        if upload is None or (upload["bucket"], upload["key"]) != (bucket, key):
+            return 404, _s3_error("NoSuchUpload", "The specified multipart upload does not exist.")
+        if method == "PUT":
+            number = int(query.get("partNumber", 0))
+            if not 1 <= number <= R2_MAX_PARTS:
+                return 400, _s3_error("InvalidArgument", "Part number must be between 1 and 10000")
+            etag = hashlib.md5(body).hexdigest()
+            upload["parts"][number] = (etag, body)
+            self.r2_parts_received += 1
+            return 200, RawResponse(b"", {"ETag": f'"{etag}"'})
+        if method == "DELETE":
+            del self.r2_uploads[query["uploadId"]]
+            return 204, RawResponse(b"")
+        if method != "POST":
+            return 405, _s3_error("MethodNotAllowed", "The specified method is not allowed")
+        listed = [(int(part.findtext("{*}PartNumber")), (part.findtext("{*}ETag") or "").strip('"'))
+                  for part in ET.fromstring(body).findall("{*}Part")]
+        if not listed or [number for number, _ in listed] != sorted({number for number, _ in listed}):
+            return 400, _s3_error("InvalidPartOrder", "The list of parts was not in ascending order.")
+        parts = []
+        for number, etag in listed:
+            stored = upload["parts"].get(number)
+            if stored is None or stored[0] != etag:
+                return 400, _s3_error("InvalidPart", "One or more of the specified parts could not be found.")
+            parts.append(stored[1])
+        sizes = [len(part) for part in parts]
+        if any(size < R2_MIN_PART_SIZE for size in sizes[:-1]) or len(set(sizes[:-1])) > 1 \
+                or (len(sizes) > 1 and sizes[-1] > sizes[0]):
+            return 400, _s3_error("EntityTooSmall", "All non-trailing parts must have the same length "
+                                                    "of at least 5 MiB.")
+        digests = b"".join(hashlib.md5(part).digest() for part in parts)
+        etag = f"{hashlib.md5(digests).hexdigest()}-{len(parts)}"
+        self.r2_objects[bucket][key] = {"body": b"".join(parts), "etag": etag, "last_modified": _now(),
+                                        "content_type": upload["content_type"] or "application/octet-stream"}
+        del self.r2_uploads[query["uploadId"]]
+        return 200, _xml("CompleteMultipartUploadResult",
+                         f"<Bucket>{bucket[1]}</Bucket><Key>{_escape(key)}</Key><ETag>&quot;{etag}&quot;</ETag>")
+
+    # ==================== Worker scripts and domains ====================
+
+    def list_scripts(self, account_id, **_):
+        with self.lock:
+            return list(self.scripts.get(account_id, {}).values())
+
+    def get_script(self, account_id, script, **_):
+        with self.lock:
+            record = self.scripts.get(account_id, {}).get(script)
+        if record is None:
+            raise MockError(404, 10007, "This Worker does not exist on your account")
+        return record
+
+    def upload_script(self, account_id, script, body, headers, **_):
+        if "multipart/form-data" not in headers.get("content-type", ""):
+            raise MockError(400, 10021, "Expected a multipart/form-data body")
+        metadata = re.search(rb'name="metadata"[^\r\n]*\r\n(?:[^\r\n]+\r\n)*\r\n([^\r\n]*)\r\n', body)
+        try:
+            metadata = json.loads(metadata.group(1)) if metadata else {}
+        except ValueError:
+            raise MockError(400, 10021, "Invalid metadata part")
+        now = _now()
+        with self.lock:
+            scripts = self.scripts.setdefault(account_id, {})
+            created = scripts.get(script, {}).get("created_on", now)
+            record = {"id": script, "etag": hashlib.sha256(body).hexdigest(), "created_on": created,
+                      "modified_on": now, "usage_model": "standard", "handlers": ["fetch"],
+                      "compatibility_date": metadata.get("compatibility_date"),
+                      "compatibility_flags": metadata.get("compatibility_flags", [])}
+            scripts[script] = record
+            return dict(record)
+
+    def delete_script(self, account_id, script, **_):
+        with self.lock:
+            if self.scripts.get(account_id, {}).pop(script, None) is None:
+                raise MockError(404, 10007, "This Worker does not exist on your account")
+        return {"id": script}
+
+    def list_worker_domains(self, account_id, **_):
+        with self.lock:
+            return list(self.worker_domains.get(account_id, {}).values())
+
+    def put_worker_domain(self, account_id, body, **_):
+        payload = self._json(body)
+        zone = self._zone_by_id(payload.get("zone_id", ""))
+        with self.lock:
+            domains = self.worker_domains.setdefault(account_id, {})
+            existing = next((d for d in domains.values() if d["hostname"] == payload.get("hostname")), None)
+            domain = existing or {"id": _new_id()}
+            domain.update(hostname=payload.get("hostname"), service=payload.get("service"),
+                          environment=payload.get("environment", "production"),
+                          zone_id=zone["id"], zone_name=zone["name"])
+            domains[domain["id"]] = domain
+            return dict(domain)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """HTTP/1.1 keep-alive front end that forwards every request to MockCloudflare"""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, delayed ACKs stall keep-alive clients
+    disable_nagle_algorithm = True
+    api: MockCloudflare = None  # set per server subclass
+
+    def _handle(self):
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query, keep_blank_values=True).items()}
+        headers = {key.lower(): value for key, value in self.headers.items()}
+        length = int(headers.get("content-length") or 0)
+        chunks = []
+        while length > 0:
+            chunk = self.rfile.read(min(READ_CHUNK, length))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            length -= len(chunk)
+        status, data = self.api.dispatch(self.command, url.path, query, headers, b"".join(chunks))
+        response_headers, payload = response_body(data)
+        response_headers.setdefault("Content-Length", str(len(payload)))
+        self.send_response(status)
+        for name, value in response_headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_PATCH = do_HEAD = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockCloudflareServer:
+    """Runs a MockCloudflare on a local port in a background thread
+
+    `url` is the base URL to pass as CloudflareManager(base_url=...).
+    """
+
+    def __init__(self, api: Optional[MockCloudflare] = None, host: str = "127.0.0.1", port: int = 0):
+        self.api = api or MockCloudflare()
+        handler = type("Handler", (_Handler,), {"api": self.api})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://{host}:{self.httpd.server_address[1]}{API_PREFIX}"
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "MockCloudflareServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-cloudflare", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "MockCloudflareServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve a mock Cloudflare API")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--zones", type=int, default=0, help="Zones to seed")
+    args = parser.parse_args()
+    server = MockCloudflareServer(port=args.port)
+    server.api.add_zones(args.zones)
+    print(f"🧪 Mock Cloudflare API on {server.url}")
+    server.start()
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+CloudflareManager factory for offline tests
+
+Builds a manager whose state file lives in a caller-owned directory and whose
+requests go to an in-process MockCloudflare (or any other transport).
+
+Usage:
+    from mock_manager import make_manager
+    with tempfile.TemporaryDirectory() as tmp:
+        cf = make_manager(MockCloudflare(), tmp, token="dns-token")
+"""
+
+import os
+from typing import Optional
+
+from requests.adapters import BaseAdapter
+
+from cloudflare_manager import CloudflareManager, CloudflareAccount, StateStore
+from mock_cloudflare import MockCloudflare
+from sim_transport import MockTransport
+
+
+def make_manager(api: Optional[MockCloudflare], tmp: str, transport: Optional[BaseAdapter] = None,
+                 token: str = "test-token", **kwargs) -> CloudflareManager:
+    """Create a manager for `api`, keeping its state in `tmp`
+
+    Args:
+        api: Mock API to serve requests in process; None to use `transport`
+            or a real base_url instead
+        tmp: Directory for state.json, removed by the caller
+        transport: Adapter to mount instead of MockTransport(api)
+        token: API token; the mock gives each token its own account
+        **kwargs: Passed on to CloudflareManager (base_url, sleep...)
+    """
+    if transport is None and api is not None:
+        transport = MockTransport(api)
+    account = CloudflareAccount(email="test@example.com", token=token)
+    return CloudflareManager(account, state=StateStore(os.path.join(tmp, "state.json")), transport=transport,
+                             **kwargs)
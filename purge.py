@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Cache purge planning: de-duplication, coalescing and request chunking
+
+The purge endpoint takes one kind of target per request (files, prefixes,
+hosts or tags) and a limited number of them. coalesce() drops targets that
+another target already covers (a file under a purged prefix or host, a
+prefix under a shorter prefix), chunk_purges() splits the rest into
+request bodies, and PurgeCoalescer merges purges submitted for the same
+zone within a short window into one CloudflareManager.purge_cache() call.
+
+pages_purge_urls() maps the paths that changed between two Pages deploy
+manifests to the URLs Pages serves them under.
+"""
+
+import json
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+
+# Targets per purge request on non-Enterprise plans (Enterprise allows 500 files, 100 of the others)
+PURGE_LIMITS = {"files": 30, "prefixes": 30, "hosts": 30, "tags": 30}
+
+PURGE_KINDS = ("files", "prefixes", "hosts", "tags")
+
+# A file is a URL, or {"url": ..., "headers": {...}} for cache keys that vary on headers
+PurgeFile = Union[str, Dict]
+
+
+def _unique(values: Iterable) -> List:
+    """Drop repeats, keeping first-seen order; dicts compare by content"""
+    seen = {}
+    for value in values:
+        key = json.dumps(value, sort_keys=True) if isinstance(value, dict) else value
+        seen.setdefault(key, value)
+    return list(seen.values())
+
+
+def _file_target(file: PurgeFile) -> Tuple[str, str]:
+    """(host, host + path) of a file URL, lowercased host, without scheme or query"""
+    parts = urlsplit(file["url"] if isinstance(file, dict) else file)
+    host = (parts.hostname or "").lower()
+    return host, host + (parts.path or "/")
+
+
+def _covered(target: str, prefixes: set) -> bool:
+    """Whether host+path sits at or below one of `prefixes` (compared by path segment)"""
+    segments = target.rstrip("/").split("/")
+    return any("/".join(segments[:n]) in prefixes for n in range(1, len(segments) + 1))
+
+
+def coalesce(files: Iterable[PurgeFile] = (), prefixes: Iterable[str] = (), hosts: Iterable[str] = (),
+             tags: Iterable[str] = ()) -> Dict[str, List]:
+    """Remove duplicate targets and targets another one already purges"""
+    hosts = _unique(host.lower() for host in hosts)
+    host_set = set(hosts)
+    kept_prefixes: List[str] = []
+    prefix_set: set = set()
+    # Shortest first, so a prefix below an already kept one is dropped
+    for prefix in sorted(_unique(prefixes), key=lambda p: p.rstrip("/").count("/")):
+        normalized = prefix.split("://", 1)[-1].rstrip("/")
+        host = normalized.split("/", 1)[0].lower()
+        normalized = host + normalized[len(host):]
+        if host in host_set or _covered(normalized, prefix_set):
+            continue
+        prefix_set.add(normalized)
+        kept_prefixes.append(prefix)
+    kept_files = []
+    for file in _unique(files):
+        host, target = _file_target(file)
+        if host in host_set or _covered(target, prefix_set):
+            continue
+        kept_files.append(file)
+    return {"files": kept_files, "prefixes": kept_prefixes, "hosts": hosts, "tags": _unique(tags)}
+
+
+def chunk_purges(targets: Dict[str, List], limits: Optional[Dict[str, int]] = None) -> List[Dict]:
+    """Request bodies for purge_cache: one kind per body, at most limits[kind] targets each"""
+    limits = limits or PURGE_LIMITS
+    bodies = []
+    for kind in PURGE_KINDS:
+        values = targets.get(kind) or []
+        size = limits[kind]
+        bodies.extend({kind: values[i:i + size]} for i in range(0, len(values), size))
+    return bodies
+
+
+def changed_paths(previous: Dict[str, str], current: Dict[str, str]) -> List[str]:
+    """Paths added, modified or removed between two {path: hash} manifests"""
+    changed = [path for path, digest in current.items() if previous.get(path) != digest]
+    return changed + [path for path in previous if path not in current]
+
+
+def pages_purge_urls(paths: Iterable[str], hosts: Iterable[str]) -> List[str]:
+    """URLs Pages serves each path under on each host
+
+    Besides /path itself, index.html is also served as its directory
+    (docs/index.html -> /docs/) and page.html as /page.
+    """
+    routes = []
+    for path in paths:
+        path = path.lstrip("/")
+        routes.append("/" + path)
+        if path == "index.html" or path.endswith("/index.html"):
+            routes.append("/" + path[:-len("index.html")])
+        elif path.endswith(".html"):
+            routes.append("/" + path[:-len(".html")])
+    return [f"https://{host}{route}" for host in hosts for route in routes]
+
+
+class PurgeCoalescer:
+    """Merges purges for the same zone submitted within `window` seconds
+
+    The first submit for a zone starts a timer; everything submitted before
+    it fires is coalesced and sent as one purge(zone_id, ...) call, whose
+    summary resolves every submitter's future. A purge_everything request
+    replaces whatever else is pending for the zone.
+    """
+
+    def __init__(self, purge: Callable[..., Dict], window: float = 1.0,
+                 timer: Callable[[float, Callable], threading.Timer] = threading.Timer):
+        self._purge = purge
+        self.window = window
+        self._timer = timer
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Dict] = {}
+
+    def submit(self, zone_id: str, files: Iterable[PurgeFile] = (), prefixes: Iterable[str] = (),
+               hosts: Iterable[str] = (), tags: Iterable[str] = (), everything: bool = False) -> Future:
+        future: Future = Future()
+        with self._lock:
+            pending = self._pending.get(zone_id)
+            if pending is None:
+                pending = self._pending[zone_id] = {"everything": False, "futures": [],
+                                                    **{kind: [] for kind in PURGE_KINDS}}
+                timer = self._timer(self.window, lambda: self.flush(zone_id))
+                timer.daemon = False
+                pending["timer"] = timer
+                timer.start()
+            pending["everything"] = pending["everything"] or everything
+            for kind, values in zip(PURGE_KINDS, (files, prefixes, hosts, tags)):
+                pending[kind].extend(values)
+            pending["futures"].append(future)
+        return future
+
+    def flush(self, zone_id: Optional[str] = None):
+        """Send what is pending now (for one zone, or all) instead of waiting for the timer"""
+        with self._lock:
+            zones = [zone_id] if zone_id is not None else list(self._pending)
+            batches = [(zone, self._pending.pop(zone)) for zone in zones if zone in self._pending]
+        for zone, pending in batches:
+            pending["timer"].cancel()
+            try:
+                if pending["everything"]:
+                    summary = self._purge(zone, everything=True)
+                else:
+                    summary = self._purge(zone, **{kind: pending[kind] for kind in PURGE_KINDS})
+            except Exception as e:
+                for future in pending["futures"]:
+                    future.set_exception(e)
+                continue
+            for future in pending["futures"]:
+                future.set_result(summary)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Compact typed records for Cloudflare API resources
+Each record keeps only the fields the tools use, in __slots__, instead of
+the full per-key dict returned by the API. Fields are copied out when the
+record is built so the raw payload can be dropped (unless keep_raw=True);
+only timestamps are parsed lazily, on created_at / modified_at.
+
+Usage:
+    from records import Zone, iter_records
+    zones = list(iter_records(Zone, cf.iter_zones(stream=True)))
+"""
+
+import re
+import sys
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Type, TypeVar
+
+
+R = TypeVar("R", bound="Record")
+
+_MISSING = object()
+
+
+def _dig(data: Dict, path: Tuple[str, ...]) -> Any:
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key, _MISSING)
+        if data is _MISSING:
+            return None
+    return data
+
+
+def _compact(value: Any, intern: bool) -> Any:
+    if isinstance(value, list):
+        return tuple(_compact(item, intern) for item in value)
+    if intern and isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+_FRACTION = re.compile(r"\.(\d+)")
+
+
+def parse_time(value: Optional[str]) -> Optional[datetime]:
+    """Parse an API timestamp such as 2024-01-02T03:04:05.123456Z"""
+    if not value:
+        return None
+    # Before 3.11 fromisoformat only takes 3 or 6 fraction digits; the API sends 1 to 9
+    text = _FRACTION.sub(lambda m: "." + m.group(1)[:6].ljust(6, "0"), value.replace("Z", "+00:00"), count=1)
+    return datetime.fromisoformat(text)
+
+
+class Record:
+    """Base class for slot-based API records
+
+    Subclasses list their attributes in __slots__; PATHS maps an attribute to a
+    nested key path when it differs from the attribute name, and INTERNED names
+    low-cardinality string fields (status, type...) that share one copy.
+    """
+
+    __slots__ = ("raw",)
+    PATHS: Dict[str, Tuple[str, ...]] = {}
+    INTERNED: Tuple[str, ...] = ()
+
+    @classmethod
+    def fields(cls) -> Tuple[str, ...]:
+        """Names of the kept attributes, in declaration order"""
+        names = cls.__dict__.get("_fields")
+        if names is None:
+            names = tuple(name for klass in reversed(cls.__mro__)
+                          for name in klass.__dict__.get("__slots__", ()) if name != "raw")
+            cls._fields = names
+        return names
+
+    @classmethod
+    def from_api(cls: Type[R], data: Dict, keep_raw: bool = False, **extra) -> R:
+        """Build a record from an API payload
+
+        Args:
+            data: Raw API dict
+            keep_raw: Keep a reference to `data` on record.raw
+            **extra: Values for fields the payload does not carry (e.g. zone_id)
+        """
+        record = cls.__new__(cls)
+        for name in cls.fields():
+            if name in extra:
+                value = extra[name]
+            else:
+                value = _dig(data, cls.PATHS.get(name, (name,)))
+            setattr(record, name, _compact(value, name in cls.INTERNED))
+        record.raw = data if keep_raw else None
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the kept fields as a plain dict"""
+        return {name: getattr(self, name) for name in self.fields()}
+
+    @property
+    def created_at(self) -> Optional[datetime]:
+        return parse_time(getattr(self, "created_on", None))
+
+    @property
+    def modified_at(self) -> Optional[datetime]:
+        return parse_time(getattr(self, "modified_on", None))
+
+    def __eq__(self, other):
+        return type(other) is type(self) and self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        # Defining __eq__ alone would make records unhashable; lists are stored as tuples
+        return hash((type(self),) + tuple(getattr(self, name) for name in self.fields()))
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.fields()[:3])
+        return f"{type(self).__name__}({values})"
+
+
+class Zone(Record):
+    __slots__ = ("id", "name", "status", "type", "account_id", "name_servers", "paused",
+                 "created_on", "modified_on")
+    PATHS = {"account_id": ("account", "id")}
+    INTERNED = ("status", "type", "account_id", "name_servers")
+
+
+class PagesProject(Record):
+    __slots__ = ("id", "name", "subdomain", "production_branch", "domains",
+                 "latest_deployment_id", "created_on")
+    PATHS = {"latest_deployment_id": ("latest_deployment", "id")}
+    INTERNED = ("production_branch",)
+
+
+class Deployment(Record):
+    __slots__ = ("id", "project_name", "environment", "url", "branch", "stage", "stage_status",
+                 "created_on", "modified_on")
+    PATHS = {
+        "branch": ("deployment_trigger", "metadata", "branch"),
+        "stage": ("latest_stage", "name"),
+        "stage_status": ("latest_stage", "status"),
+    }
+    INTERNED = ("project_name", "environment", "branch", "stage", "stage_status")
+
+
+class WorkerScript(Record):
+    __slots__ = ("id", "etag", "compatibility_date", "usage_model", "created_on", "modified_on")
+    INTERNED = ("compatibility_date", "usage_model")
+
+
+class WorkerRoute(Record):
+    __slots__ = ("id", "pattern", "script", "zone_id")
+    INTERNED = ("script", "zone_id")
+
+
+class WorkerDomain(Record):
+    __slots__ = ("id", "hostname", "service", "environment", "zone_id", "zone_name")
+    INTERNED = ("service", "environment", "zone_id", "zone_name")
+
+
+def iter_records(cls: Type[R], items: Iterable[Dict], keep_raw: bool = False, **extra) -> Iterator[R]:
+    """Convert API dicts to records one at a time as they are produced
+
+    Combined with the manager's iter_*(stream=True) methods, no page of raw
+    dicts is ever held in memory.
+    """
+    for item in items:
+        yield cls.from_api(item, keep_raw=keep_raw, **extra)
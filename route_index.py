@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Worker route index: which route handles a URL, and which routes overlap
+
+Route patterns are [scheme://]host[/path] with Cloudflare's wildcards:
+    shop.example.com/api/*    the host exactly, any path starting with /api/
+    *.example.com/*           any subdomain of example.com (not example.com)
+    *example.com/*            example.com and any subdomain
+    example.com/login         exactly that path; no path means "/"
+The scheme is ignored, and so are the port and query string of a URL.
+
+Hosts are kept in a trie of reversed labels (com -> example -> shop), so a
+lookup walks the URL's labels once, then tries at most a handful of path
+tables, each with one dict lookup per distinct prefix length. When several
+routes match, the most specific host wins (an exact host, then the longest
+wildcard domain), then the most specific path (an exact path, then the
+longest prefix). *.d and *d match the same subdomains, so between them the
+path decides, and *.d wins only a tie.
+
+conflicts() and check() report duplicate patterns and routes whose URLs
+overlap while pointing at different scripts; the loser of each overlap is
+shadowed for the example URL given.
+
+Usage:
+    from route_index import RouteIndex
+    index = RouteIndex(cf.list_worker_routes(zone_id))
+    index.match("https://shop.example.com/api/v2/x")   # route dict or None
+"""
+
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+# Host forms of a pattern
+HOST_EXACT = "exact"            # shop.example.com
+HOST_SUBDOMAINS = "subdomains"  # *.example.com
+HOST_ANY = "any"                # *example.com
+
+
+class RoutePatternError(ValueError):
+    """A route pattern Cloudflare would not accept"""
+
+
+class RoutePattern(NamedTuple):
+    host: str
+    host_kind: str
+    path: str
+    prefix: bool
+
+    @property
+    def labels(self) -> List[str]:
+        return self.host.split(".")[::-1]
+
+    @property
+    def rank(self) -> Tuple:
+        """Sort key: higher is more specific"""
+        return (self.host_kind == HOST_EXACT, self.host.count(".") + 1, not self.prefix, len(self.path),
+                self.host_kind == HOST_SUBDOMAINS)
+
+    def __str__(self) -> str:
+        host = {HOST_EXACT: "", HOST_SUBDOMAINS: "*.", HOST_ANY: "*"}[self.host_kind] + self.host
+        return f"{host}{self.path}{'*' if self.prefix else ''}"
+
+
+def parse_pattern(pattern: str) -> RoutePattern:
+    """Split a route pattern into host, host wildcard form, path and path wildcard"""
+    text = pattern.strip()
+    for scheme in ("https://", "http://"):
+        if text.lower().startswith(scheme):
+            text = text[len(scheme):]
+    host, slash, path = text.partition("/")
+    host, path = host.lower().rstrip("."), slash + path or "/"
+    if host.startswith("*."):
+        host, kind = host[2:], HOST_SUBDOMAINS
+    elif host.startswith("*"):
+        host, kind = host[1:], HOST_ANY
+    else:
+        kind = HOST_EXACT
+    prefix = path.endswith("*")
+    if prefix:
+        path = path[:-1]
+    if not host or "*" in host or "*" in path or ":" in host or "" in host.split("."):
+        raise RoutePatternError(f"Invalid route pattern {pattern!r}: wildcards are only allowed at the start "
+                                f"of the host and the end of the path")
+    if "?" in path or "#" in path:
+        raise RoutePatternError(f"Invalid route pattern {pattern!r}: query strings are not matched")
+    return RoutePattern(host, kind, path, prefix)
+
+
+def _split_url(url: str) -> Tuple[str, str]:
+    parts = urlsplit(url if "//" in url else "//" + url)
+    return (parts.hostname or "").rstrip("."), parts.path or "/"
+
+
+def _host_overlap(a: RoutePattern, b: RoutePattern) -> Optional[str]:
+    """A host both patterns match, or None"""
+    if a.host.count(".") < b.host.count("."):
+        a, b = b, a
+    if not (a.host == b.host or a.host.endswith("." + b.host)):
+        return None
+    if a.host != b.host:
+        # b's domain is a parent of a's: only b's wildcards reach down to a
+        if b.host_kind == HOST_EXACT:
+            return None
+        return ("x." if a.host_kind == HOST_SUBDOMAINS else "") + a.host
+    kinds = {a.host_kind, b.host_kind}
+    if kinds == {HOST_EXACT, HOST_SUBDOMAINS}:
+        return None
+    return ("x." if HOST_SUBDOMAINS in kinds else "") + a.host
+
+
+def _path_overlap(a: RoutePattern, b: RoutePattern) -> Optional[str]:
+    """A path both patterns match, or None"""
+    if not a.prefix and not b.prefix:
+        return a.path if a.path == b.path else None
+    if a.prefix and b.prefix:
+        longer, shorter = (a, b) if len(a.path) >= len(b.path) else (b, a)
+        return longer.path if longer.path.startswith(shorter.path) else None
+    exact, prefix = (b, a) if a.prefix else (a, b)
+    return exact.path if exact.path.startswith(prefix.path) else None
+
+
+def overlap_url(a: RoutePattern, b: RoutePattern) -> Optional[str]:
+    """An example URL both patterns match, or None when they never match the same URL"""
+    host = _host_overlap(a, b)
+    path = _path_overlap(a, b) if host else None
+    return f"https://{host}{path}" if path is not None else None
+
+
+class _Paths:
+    """Routes of one host form at one trie node, by path"""
+
+    __slots__ = ("exact", "prefixes", "lengths")
+
+    def __init__(self):
+        self.exact: Dict[str, Dict] = {}
+        self.prefixes: Dict[str, Dict] = {}
+        self.lengths: List[int] = []
+
+    def add(self, pattern: RoutePattern, route: Dict):
+        table = self.prefixes if pattern.prefix else self.exact
+        table.setdefault(pattern.path, route)
+        if pattern.prefix and len(pattern.path) not in self.lengths:
+            self.lengths = sorted(self.lengths + [len(pattern.path)], reverse=True)
+
+    def match(self, path: str) -> Optional[Tuple[Tuple[bool, int], Dict]]:
+        """The best route for a path and its path rank, or None"""
+        route = self.exact.get(path)
+        if route is not None:
+            return (True, len(path)), route
+        for length in self.lengths:
+            if length <= len(path):
+                route = self.prefixes.get(path[:length])
+                if route is not None:
+                    return (False, length), route
+        return None
+
+
+class _Node:
+    __slots__ = ("children", "paths", "entries")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.paths: Dict[str, _Paths] = {}
+        self.entries: List[int] = []
+
+
+class RouteIndex:
+    """Compiled set of worker routes ({"pattern", "script", ...} as the API lists them)
+
+    Routes are kept as given, so zone_id or id fields added by the caller come
+    back from match(). The first of two routes with the same pattern is the
+    one matched; conflicts() reports the second.
+    """
+
+    def __init__(self, routes: Iterable[Dict] = ()):
+        self._root = _Node()
+        self._entries: List[Tuple[RoutePattern, Dict]] = []
+        for route in routes:
+            self.add(route)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _node(self, pattern: RoutePattern, create: bool = False) -> Tuple[Optional[_Node], List[_Node]]:
+        """The pattern's trie node and its strict ancestors (deepest last)"""
+        node, ancestors = self._root, []
+        for label in pattern.labels:
+            ancestors.append(node)
+            child = node.children.get(label)
+            if child is None:
+                if not create:
+                    return None, ancestors[1:]
+                child = node.children[label] = _Node()
+            node = child
+        return node, ancestors[1:]
+
+    def add(self, route: Dict) -> RoutePattern:
+        """Index a route; raises RoutePatternError for an invalid pattern"""
+        pattern = parse_pattern(route["pattern"])
+        node, _ = self._node(pattern, create=True)
+        node.paths.setdefault(pattern.host_kind, _Paths()).add(pattern, route)
+        node.entries.append(len(self._entries))
+        self._entries.append((pattern, route))
+        return pattern
+
+    def match(self, url: str) -> Optional[Dict]:
+        """The route that handles a URL, or None"""
+        host, path = _split_url(url)
+        node, chain = self._root, []
+        for label in reversed(host.split(".")):
+            node = node.children.get(label)
+            if node is None:
+                break
+            chain.append(node)
+        if node is not None and chain:
+            # The URL's host itself: exact routes first, then *host (which includes the apex)
+            for kind in (HOST_EXACT, HOST_ANY):
+                paths = node.paths.get(kind)
+                found = paths.match(path) if paths else None
+                if found is not None:
+                    return found[1]
+            chain.pop()
+        for ancestor in reversed(chain):
+            # *.d and *d cover the same subdomains: the better path wins, *.d on a tie
+            best = None
+            for kind in (HOST_SUBDOMAINS, HOST_ANY):
+                paths = ancestor.paths.get(kind)
+                found = paths.match(path) if paths else None
+                if found is not None and (best is None or found[0] > best[0]):
+                    best = found
+            if best is not None:
+                return best[1]
+        return None
+
+    def _candidates(self, pattern: RoutePattern, descendants: bool) -> Iterator[int]:
+        """Indexes of routes whose hosts may overlap the pattern's"""
+        node, ancestors = self._node(pattern)
+        for ancestor in ancestors:
+            yield from ancestor.entries
+        if node is None:
+            return
+        yield from node.entries
+        if descendants and pattern.host_kind != HOST_EXACT:
+            stack = list(node.children.values())
+            while stack:
+                child = stack.pop()
+                yield from child.entries
+                stack.extend(child.children.values())
+
+    def _issue(self, pattern: RoutePattern, script: Optional[str], index: int) -> Optional[Dict]:
+        other, route = self._entries[index]
+        if other == pattern:
+            return {"kind": "duplicate", "route": route, "url": overlap_url(pattern, other)}
+        if route.get("script") == script:
+            return None
+        url = overlap_url(pattern, other)
+        if url is None:
+            return None
+        return {"kind": "overlap", "route": route, "url": url,
+                "winner": "new" if pattern.rank > other.rank else "existing"}
+
+    def check(self, pattern: str, script: Optional[str] = None) -> List[Dict]:
+        """Problems adding a route would cause
+
+        Returns:
+            [{"kind": "duplicate" | "overlap", "route": existing route, "url": example URL,
+              "winner": "new" | "existing" (overlaps only)}]
+        """
+        parsed = parse_pattern(pattern)
+        issues = []
+        for index in dict.fromkeys(self._candidates(parsed, descendants=True)):
+            issue = self._issue(parsed, script, index)
+            if issue:
+                issues.append(issue)
+        return issues
+
+    def conflicts(self) -> List[Dict]:
+        """Duplicate patterns and overlapping routes with different scripts
+
+        Returns:
+            [{"kind": "duplicate" | "overlap", "winner": route, "shadowed": route, "url": example URL}]
+        """
+        found = []
+        for index, (pattern, route) in enumerate(self._entries):
+            node, ancestors = self._node(pattern)
+            pairs = [other for ancestor in ancestors for other in ancestor.entries]
+            pairs += [other for other in node.entries if other > index]
+            for other in pairs:
+                issue = self._issue(pattern, route.get("script"), other)
+                if issue is None:
+                    continue
+                later = other > index
+                if issue["kind"] == "duplicate":
+                    winner, shadowed = (route, issue["route"]) if later else (issue["route"], route)
+                elif issue["winner"] == "new":
+                    winner, shadowed = route, issue["route"]
+                else:
+                    winner, shadowed = issue["route"], route
+                found.append({"kind": issue["kind"], "winner": winner, "shadowed": shadowed, "url": issue["url"]})
+        return found
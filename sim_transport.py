@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Simulated transport for CloudflareManager: latency, rate limits and faults
+
+SimulatedTransport is a requests transport adapter that sits in front of a
+real adapter (or an in-process MockCloudflare) and injects:
+    - latency drawn from a distribution (fixed, uniform, lognormal, empirical)
+    - upload/download bandwidth caps
+    - 429s with Retry-After, from a server-side token bucket or at random
+    - bursts of 5xx responses
+    - connection resets
+    - slow bodies (delays between response chunks)
+
+RecordingTransport writes real request/response sequences to a JSON lines
+file and ReplayTransport serves them back offline. Every random draw comes
+from one seeded generator and time can be virtual (SimClock), so the same
+seed gives the same fault sequence and the same simulated timings.
+
+Usage:
+    from sim_transport import SimulatedTransport, SimProfile, MockTransport, lognormal
+    profile = SimProfile(latency=lognormal(0.08, 0.6), error_rate=0.01, seed=7)
+    cf = CloudflareManager(account, transport=SimulatedTransport(profile, MockTransport()))
+"""
+
+import io
+import json
+import math
+import time
+import base64
+import random
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit, parse_qsl
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import super_len
+
+from mock_cloudflare import MockCloudflare, response_body
+
+# A latency distribution draws seconds from the transport's seeded generator
+Distribution = Callable[[random.Random], float]
+
+# Size of the chunks a throttled or slow body is delivered in
+BODY_CHUNK = 16 * 1024
+
+REASONS = {200: "OK", 429: "Too Many Requests", 500: "Internal Server Error", 502: "Bad Gateway",
+           503: "Service Unavailable", 504: "Gateway Timeout"}
+
+
+def fixed(seconds: float) -> Distribution:
+    return lambda rng: seconds
+
+
+def uniform(low: float, high: float) -> Distribution:
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal(median: float, sigma: float) -> Distribution:
+    """Long-tailed latency: half the draws fall below `median`, sigma widens the tail"""
+    mu = math.log(median)
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+def empirical(samples: Sequence[float]) -> Distribution:
+    """Draw from observed latencies, e.g. a recording's `elapsed` values"""
+    samples = list(samples)
+    return lambda rng: rng.choice(samples)
+
+
+class SimClock:
+    """Virtual time: sleep() advances the clock instantly
+
+    Pass `clock.sleep`/`clock.time` to SimulatedTransport, RateLimiter and
+    CloudflareManager to run long experiments in milliseconds.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self._now = start
+        self._lock = threading.Lock()
+
+    def time(self) -> float:
+        with self._lock:
+            return self._now
+
+    def sleep(self, seconds: float):
+        with self._lock:
+            self._now += max(0.0, seconds)
+
+
+@dataclass
+class SimProfile:
+    """What the simulated network and API do; rates are per-request probabilities"""
+    latency: Distribution = fixed(0.0)
+    upload_bps: Optional[float] = None
+    download_bps: Optional[float] = None
+    # Server-side token bucket (requests per second, burst); excess requests get 429
+    rate_limit: Optional[Tuple[float, float]] = None
+    throttle_rate: float = 0.0
+    retry_after: float = 1.0
+    error_rate: float = 0.0
+    error_burst: int = 1
+    error_statuses: Tuple[int, ...] = (500, 502, 503)
+    reset_rate: float = 0.0
+    slow_body_rate: float = 0.0
+    slow_body_delay: float = 0.5
+    seed: int = 0
+
+
+def build_response(request: requests.PreparedRequest, status: int, body: bytes,
+                   headers: Optional[Dict[str, str]] = None, adapter: Optional[BaseAdapter] = None
+                   ) -> requests.Response:
+    """A complete requests.Response without a network connection"""
+    response = requests.Response()
+    response.status_code = status
+    response.reason = REASONS.get(status, "")
+    response.headers = CaseInsensitiveDict(headers or {})
+    response.headers.setdefault("Content-Type", "application/json")
+    response.headers.setdefault("Content-Length", str(len(body)))
+    response.raw = io.BytesIO(body)
+    response.encoding = "utf-8"
+    response.url = request.url
+    response.request = request
+    response.connection = adapter
+    return response
+
+
+def error_body(code: int, message: str) -> bytes:
+    return json.dumps({"success": False, "errors": [{"code": code, "message": message}],
+                       "messages": [], "result": None}).encode("utf-8")
+
+
+def read_body(request: requests.PreparedRequest) -> bytes:
+    """The request body as bytes, draining streamed bodies (the caller rewinds on retry)"""
+    body = request.body
+    if body is None:
+        return b""
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    if isinstance(body, (bytes, bytearray)):
+        return bytes(body)
+    chunks = []
+    while True:
+        chunk = body.read(BODY_CHUNK)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+class _ThrottledBody:
+    """Response raw stream delivered in chunks with a delay before each"""
+
+    def __init__(self, raw, delay: Callable[[int], float], sleep: Callable[[float], None]):
+        self._raw = raw
+        self._delay = delay
+        self._sleep = sleep
+
+    def read(self, amt: Optional[int] = None, **kwargs) -> bytes:
+        data = self._raw.read(amt) if amt is not None else self._raw.read()
+        if data:
+            self._sleep(self._delay(len(data)))
+        return data
+
+    def stream(self, amt: int = BODY_CHUNK, decode_content: bool = True):
+        # requests prefers raw.stream(); read() above honors decode_content on urllib3 responses
+        while True:
+            data = self.read(amt or BODY_CHUNK)
+            if not data:
+                return
+            yield data
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+class MockTransport(BaseAdapter):
+    """Answers requests in-process from a MockCloudflare, without sockets"""
+
+    def __init__(self, api: Optional[MockCloudflare] = None):
+        super().__init__()
+        self.api = api or MockCloudflare()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        url = urlsplit(request.url)
+        headers = {key.lower(): value for key, value in request.headers.items()}
+        headers.setdefault("host", url.netloc)
+        query = dict(parse_qsl(url.query, keep_blank_values=True))
+        status, data = self.api.dispatch(request.method, url.path, query, headers, read_body(request))
+        response_headers, body = response_body(data)
+        return build_response(request, status, body, response_headers, adapter=self)
+
+    def close(self):
+        pass
+
+
+class SimulatedTransport(BaseAdapter):
+    """Injects the faults and delays of a SimProfile in front of another adapter
+
+    Decisions are drawn under a lock in request order, so a single-threaded
+    run with a fixed seed is fully reproducible. `stats` counts what was
+    injected and `latencies` holds each request's simulated seconds.
+    """
+
+    def __init__(self, profile: Optional[SimProfile] = None, inner: Optional[BaseAdapter] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        super().__init__()
+        self.profile = profile or SimProfile()
+        self.inner = inner or HTTPAdapter()
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = random.Random(self.profile.seed)
+        self._lock = threading.Lock()
+        self._burst_left = 0
+        self._burst_status = 0
+        if self.profile.rate_limit:
+            self._tokens = float(self.profile.rate_limit[1])
+            self._updated = clock()
+        self.stats = {"requests": 0, "throttled": 0, "errors": 0, "resets": 0, "slow_bodies": 0}
+        self.latencies: List[float] = []
+
+    def _take_token(self) -> Optional[float]:
+        """Spend one server-side token; returns the Retry-After when none is left"""
+        rate, burst = self.profile.rate_limit
+        now = self._clock()
+        self._tokens = min(float(burst), self._tokens + (now - self._updated) * rate)
+        self._updated = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return None
+        return max(1.0, math.ceil((1.0 - self._tokens) / rate))
+
+    def _decide(self) -> Dict:
+        """Draw every random outcome for one request, in a fixed order"""
+        profile = self.profile
+        with self._lock:
+            self.stats["requests"] += 1
+            rng = self._rng
+            decision = {"latency": max(0.0, profile.latency(rng)), "reset": rng.random() < profile.reset_rate,
+                        "slow": rng.random() < profile.slow_body_rate, "status": None, "retry_after": None}
+            if self._burst_left:
+                self._burst_left -= 1
+                decision["status"] = self._burst_status
+            elif rng.random() < profile.error_rate:
+                self._burst_status = rng.choice(profile.error_statuses)
+                self._burst_left = max(0, profile.error_burst - 1)
+                decision["status"] = self._burst_status
+            retry_after = self._take_token() if profile.rate_limit else None
+            if retry_after is None and rng.random() < profile.throttle_rate:
+                retry_after = profile.retry_after
+            if retry_after is not None and decision["status"] is None:
+                decision["status"], decision["retry_after"] = 429, retry_after
+            for outcome, key in (("reset", "resets"), ("slow", "slow_bodies")):
+                if decision[outcome]:
+                    self.stats[key] += 1
+            if decision["status"] == 429:
+                self.stats["throttled"] += 1
+            elif decision["status"]:
+                self.stats["errors"] += 1
+            return decision
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        decision = self._decide()
+        started = self._clock()
+        self._sleep(decision["latency"])
+        if self.profile.upload_bps:
+            self._sleep((super_len(request.body) if request.body is not None else 0) / self.profile.upload_bps)
+        if decision["reset"]:
+            self._record(started)
+            raise requests.exceptions.ConnectionError(
+                ConnectionResetError(104, "Connection reset by peer (simulated)"), request=request)
+
+        if decision["status"] == 429:
+            response = build_response(request, 429, error_body(971, "Please wait and consider throttling your request speed"),
+                                      {"Retry-After": str(int(decision["retry_after"]))}, self)
+        elif decision["status"]:
+            response = build_response(request, decision["status"], error_body(10000, "Internal server error (simulated)"),
+                                      adapter=self)
+        else:
+            response = self.inner.send(request, stream=stream, timeout=timeout, verify=verify, cert=cert,
+                                       proxies=proxies)
+        self._throttle_body(response, decision["slow"])
+        self._record(started)
+        return response
+
+    def _throttle_body(self, response: requests.Response, slow: bool):
+        download_bps, slow_delay = self.profile.download_bps, self.profile.slow_body_delay if slow else 0.0
+        if not download_bps and not slow_delay:
+            return
+
+        def delay(size: int) -> float:
+            return slow_delay + (size / download_bps if download_bps else 0.0)
+
+        response.raw = _ThrottledBody(response.raw, delay, self._sleep)
+
+    def _record(self, started: float):
+        with self._lock:
+            self.latencies.append(self._clock() - started)
+
+    def percentile(self, q: float) -> float:
+        """Simulated request latency at quantile q (0.99 = p99); bodies read later are not included"""
+        with self._lock:
+            ordered = sorted(self.latencies)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def close(self):
+        self.inner.close()
+
+
+def _encode(body: bytes) -> Dict:
+    try:
+        return {"body": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_b64": base64.b64encode(body).decode("ascii")}
+
+
+def _request_key(method: str, url: str) -> str:
+    parts = urlsplit(url)
+    return f"{method} {parts.path}" + (f"?{parts.query}" if parts.query else "")
+
+
+class RecordingTransport(BaseAdapter):
+    """Passes requests to `inner` and appends each exchange to a JSON lines file
+
+    Only method, path, status, response headers/body and elapsed time are
+    stored; request headers (and with them credentials) are never written.
+    """
+
+    # Response headers worth keeping for replay
+    KEEP_HEADERS = ("content-type", "retry-after", "etag", "cf-ray")
+
+    def __init__(self, path: str, inner: Optional[BaseAdapter] = None):
+        super().__init__()
+        self.path = path
+        self.inner = inner or HTTPAdapter()
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        started = time.perf_counter()
+        response = self.inner.send(request, stream=False, timeout=timeout, verify=verify, cert=cert,
+                                   proxies=proxies)
+        entry = {"key": _request_key(request.method, request.url), "status": response.status_code,
+                 "headers": {key: value for key, value in response.headers.items()
+                             if key.lower() in self.KEEP_HEADERS},
+                 "elapsed": round(time.perf_counter() - started, 6)}
+        entry.update(_encode(response.content))
+        with self._lock:
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+        return response
+
+    def close(self):
+        self.inner.close()
+        with self._lock:
+            self._file.close()
+
+
+class ReplayTransport(BaseAdapter):
+    """Serves a recording back: each method+path+query gets its responses in recorded order
+
+    Once a request's responses are used up the last one repeats (polling
+    loops keep seeing the final state); with strict=True an unrecorded or
+    exhausted request raises ConnectionError instead.
+    """
+
+    def __init__(self, path: str, strict: bool = False):
+        super().__init__()
+        self.strict = strict
+        self._lock = threading.Lock()
+        self._queues: Dict[str, List[Dict]] = {}
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._queues.setdefault(entry["key"], []).append(entry)
+        self._positions = {key: 0 for key in self._queues}
+
+    def elapsed(self) -> List[float]:
+        """Recorded latencies, e.g. for empirical()"""
+        return [entry["elapsed"] for entry in sum(self._queues.values(), [])]
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        key = _request_key(request.method, request.url)
+        with self._lock:
+            queue = self._queues.get(key)
+            position = self._positions.get(key, 0)
+            if not queue or (self.strict and position >= len(queue)):
+                raise requests.exceptions.ConnectionError(f"No recorded response for {key}", request=request)
+            entry = queue[min(position, len(queue) - 1)]
+            self._positions[key] = position + 1
+        if "body_b64" in entry:
+            body = base64.b64decode(entry["body_b64"])
+        else:
+            body = entry["body"].encode("utf-8")
+        return build_response(request, entry["status"], body, entry["headers"], self)
+
+    def close(self):
+        pass
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for credentials with access to several accounts
+Runs entirely offline against an in-process MockCloudflare
+"""
+
+import os
+import sys
+import tempfile
+from cloudflare_manager import CloudflareManager, CloudflareAccount, MultiAccountManager, StateStore
+from mock_cloudflare import MockCloudflare
+from sim_transport import MockTransport
+
+
+def test_accessible_accounts():
+    """Test the paginated, cached account listing and for_account()"""
+    print("Testing accessible accounts...")
+    api = MockCloudflare()
+    members = api.add_member_accounts("multi-token", 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        account = CloudflareAccount(email="ops@example.com", token="multi-token", r2_access_key_id="key",
+                                    r2_secret_access_key="secret")
+        cf = CloudflareManager(account, state=StateStore(os.path.join(tmp, "state.json")),
+                               transport=MockTransport(api))
+        # 61 accounts at 50 per page: two requests, made while detecting the account ID
+        assert api.request_count == 2
+        accounts = cf.accessible_accounts()
+        assert len(accounts) == 61 and accounts[0]["id"] == cf.account.account_id and api.request_count == 2
+
+        other = cf.for_account(members[41]["id"])
+        assert other.account.name == "Member 42" and other.account.r2_access_key_id is None
+        assert other.session is cf.session and other.rate_limiter is cf.rate_limiter
+        assert other.purges is not cf.purges and cf.account.account_id != other.account.account_id
+        assert other.accessible_accounts() == accounts and api.request_count == 2
+
+        assert other.create_kv_namespace("OTHER") and not cf.list_kv_namespaces()
+        assert [ns["title"] for ns in other.list_kv_namespaces()] == ["OTHER"]
+        assert cf.for_account("f" * 32).list_kv_namespaces() == []
+
+        before = api.request_count
+        assert len(cf.accessible_accounts(refresh=True)) == 61 and api.request_count - before == 2
+    print("✓ 61 accounts are listed once and reached through one session")
+
+
+def test_multi_account_fan_out():
+    """Test adding every account of a credential and fanning out over them"""
+    print("\nTesting multi-account fan-out...")
+    api = MockCloudflare()
+    api.add_member_accounts("team-token", 3, prefix="Customer")
+    api.add_member_accounts("other-token", 1, prefix="Customer")
+    multi = MultiAccountManager(transport=MockTransport(api))
+
+    names = multi.add_credential("ops@example.com", "team-token")
+    assert len(names) == 4 and names[1:] == ["Customer 1", "Customer 2", "Customer 3"]
+    before = api.request_count
+    added = multi.add_credential("ops@example.com", "other-token")
+    assert added[1].startswith("Customer 1 (") and api.request_count - before == 1
+
+    team = [multi.accounts[name] for name in names]
+    assert all(manager.session is team[0].session for manager in team)
+    assert all(manager.rate_limiter is team[0].rate_limiter for manager in team)
+    assert multi.accounts[added[0]].session is not team[0].session
+
+    before = api.request_count
+    results = multi.map_accounts(lambda cf: cf.create_kv_namespace(f"NS {cf.account.name}")["id"])
+    assert len(results) == 6 and all(entry["error"] is None and entry["result"] for entry in results.values())
+    assert api.request_count - before == 6
+    assert len({ns_id for ns_id in (entry["result"] for entry in results.values())}) == 6
+    failed = multi.map_accounts(lambda cf: cf.no_such_method(), accounts=["Customer 2", "missing"])
+    assert failed["Customer 2"]["error"].startswith("AttributeError") and failed["missing"]["error"]
+
+    # add_account reuses the credential's session too
+    manager = multi.add_account("pinned", "ops@example.com", "team-token", account_id=team[2].account.account_id)
+    assert manager.session is team[0].session and manager.account.name == "pinned"
+    print("✓ Every account of a credential shares one session and rate limiter")
+
+
+if __name__ == "__main__":
+    test_accessible_accounts()
+    test_multi_account_fan_out()
+    print("\n✅ All tests passed!")
+    sys.exit(0)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test script for the non-interactive CLI
+Runs entirely offline with a fake manager
+"""
+
+import io
+import os
+import sys
+import json
+import tempfile
+import subprocess
+import contextlib
+import cli
+
+
+class FakeManager:
+    """Records route changes and serves canned listings"""
+
+    def __init__(self):
+        self.calls = []
+        self.routes = {"z" * 32: [{"id": "r1", "pattern": "a.example.com/*", "script": "old"},
+                                  {"id": "r2", "pattern": "b.example.com/*", "script": "api"},
+                                  {"id": "r3", "pattern": "stale.example.com/*", "script": "api"}]}
+
+    def iter_zones(self, params=None, strict=False, stream=False):
+        print("listing zones")
+        zones = [{"id": "z" * 32, "name": "example.com", "status": "active", "name_servers": ["a.ns", "b.ns"]},
+                 {"id": "y" * 32, "name": "other.com", "status": "pending", "name_servers": []}]
+        return iter([zone for zone in zones if not params or params.get("name") in (None, zone["name"])])
+
+    def list_worker_routes(self, zone_id, strict=False):
+        return self.routes.get(zone_id, [])
+
+    def create_worker_route(self, zone_id, pattern, script_name):
+        self.calls.append(("create", pattern, script_name))
+        return {"id": "new"}
+
+    def update_worker_route(self, zone_id, route_id, pattern, script_name):
+        self.calls.append(("update", route_id, script_name))
+        return {"id": route_id}
+
+    def delete_worker_route(self, zone_id, route_id):
+        self.calls.append(("delete", route_id))
+        return True
+
+
+def run(argv, manager):
+    """Run the CLI against a fake manager and return (exit code, stdout, stderr)"""
+    stdout, stderr = io.StringIO(), io.StringIO()
+    original = cli.get_manager
+    cli.get_manager = lambda args: manager
+    try:
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            code = cli.main(argv)
+    finally:
+        cli.get_manager = original
+    return code, stdout.getvalue(), stderr.getvalue()
+
+
+def test_lazy_imports():
+    """Test that --help never loads requests or the manager"""
+    print("Testing lazy imports...")
+    script = ("import sys, cli\n"
+              "try:\n    cli.main(['--help'])\nexcept SystemExit:\n    pass\n"
+              "print('LOADED' if {'requests', 'cloudflare_manager'} & set(sys.modules) else 'LAZY')")
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert result.stdout.strip().endswith("LAZY"), result.stdout
+    print("✓ --help starts without heavy imports")
+
+
+def test_output_formats():
+    """Test JSON/NDJSON output, field selection and stdout/stderr separation"""
+    print("\nTesting output formats...")
+    code, out, err = run(["--format", "ndjson", "--fields", "name,status", "zones", "list"], FakeManager())
+    assert code == 0
+    assert [json.loads(line) for line in out.splitlines()] == [
+        {"name": "example.com", "status": "active"}, {"name": "other.com", "status": "pending"}]
+    assert "listing zones" in err and "listing zones" not in out
+
+    code, out, _ = run(["ns", "example.com"], FakeManager())
+    assert code == 0 and json.loads(out)["name_servers"] == ["a.ns", "b.ns"]
+
+    code, out, err = run(["ns", "missing.com"], FakeManager())
+    assert code == 1 and not out and "Zone not found" in err
+    print("✓ Results on stdout, messages on stderr, failures exit 1")
+
+
+def test_routes_apply():
+    """Test that route files are planned and applied idempotently"""
+    print("\nTesting routes apply...")
+    routes = [{"zone": "example.com", "pattern": "a.example.com/*", "script": "new"},
+              {"zone": "example.com", "pattern": "b.example.com/*", "script": "api"},
+              {"zone_id": "z" * 32, "pattern": "c.example.com/*", "script": "api"}]
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(routes, f)
+    try:
+        manager = FakeManager()
+        code, out, _ = run(["routes", "apply", f.name, "--dry-run", "--prune"], manager)
+        actions = [json.loads(line)["action"] for line in out.splitlines()]
+        assert code == 0 and actions == ["update", "unchanged", "create", "delete"]
+        assert manager.calls == []
+
+        code, _, _ = run(["routes", "apply", f.name], manager)
+        assert code == 0
+        assert manager.calls == [("update", "r1", "new"), ("create", "c.example.com/*", "api")]
+    finally:
+        os.unlink(f.name)
+    print("✓ Only changed routes are written")
+
+
+def test_credentials():
+    """Test flag > environment > config file precedence"""
+    print("\nTesting credential resolution...")
+    with tempfile.TemporaryDirectory() as tmp:
+        config = os.path.join(tmp, "config.json")
+        with open(config, "w", encoding="utf-8") as f:
+            json.dump({"ci": {"email": "ci@example.com", "token": "cfg", "account_id": "acc",
+                              "r2_access_key_id": "r2key"}}, f)
+        saved = {name: os.environ.pop(name, None) for name in
+                 ("CLOUDFLARE_EMAIL", "CLOUDFLARE_TOKEN", "CLOUDFLARE_API_TOKEN", "CLOUDFLARE_ACCOUNT_ID",
+                  "R2_ACCESS_KEY_ID", "R2_SECRET_ACCESS_KEY")}
+        try:
+            parser = cli.build_parser()
+            args = parser.parse_args(["--config", config, "--profile", "ci", "workers", "list"])
+            assert cli.resolve_credentials(args) == {"email": "ci@example.com", "token": "cfg",
+                                                     "account_id": "acc", "use_api_key": True,
+                                                     "r2_access_key_id": "r2key", "r2_secret_access_key": None}
+            os.environ["CLOUDFLARE_API_TOKEN"] = "bearer"
+            os.environ["CLOUDFLARE_EMAIL"] = ""
+            args = parser.parse_args(["--config", config, "--profile", "ci", "workers", "list"])
+            creds = cli.resolve_credentials(args)
+            assert creds["token"] == "bearer" and not creds["use_api_key"]
+            args = parser.parse_args(["--config", config, "--profile", "ci", "--token", "flag", "workers", "list"])
+            assert cli.resolve_credentials(args)["token"] == "flag"
+        finally:
+            for name, value in saved.items():
+                os.environ.pop(name, None)
+                if value is not None:
+                    os.environ[name] = value
+    print("✓ Credentials resolved from flags, environment and config")
+
+
+if __name__ == "__main__":
+    test_lazy_imports()
+    test_output_formats()
+    test_routes_apply()
+    test_credentials()
+    print("\n✅ All tests passed!")
+    sys.exit(0)
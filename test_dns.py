@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Test script for DNS records, batch imports and BIND zone files
+Runs entirely offline against an in-process MockCloudflare
+"""
+
+import os
+import sys
+import tempfile
+import cli
+from mock_cloudflare import MockCloudflare
+from mock_manager import make_manager
+from zonefile import ZoneFileError, parse_zone_file, render_zone_file
+
+
+ZONE_FILE = """$ORIGIN example.com.
+$TTL 1h
+@   IN SOA ns1.example.com. admin.example.com. (
+        2024010101 ; serial
+        7200 3600 1209600 300 )
+@       IN NS ns1.example.com.
+@       300 IN A 192.0.2.1 ; cf_tags=cf-proxied:true
+        IN AAAA 2001:db8::1
+www     IN CNAME @
+mail    IN MX 10 mx1
+@       IN TXT "v=spf1 include:_spf.example.net ~all"
+split   TXT "a\\"b" "cd"
+_sip._tcp IN SRV 10 5 5060 sip.example.com.
+@ IN CAA 0 issue "letsencrypt.org"
+"""
+
+
+def test_zone_file_parsing():
+    """Test directives, relative names, multi-line records and round-tripping"""
+    print("Testing zone file parsing...")
+    records = parse_zone_file(ZONE_FILE)
+    assert [r["type"] for r in records] == ["A", "AAAA", "CNAME", "MX", "TXT", "TXT", "SRV", "CAA"]
+    apex, aaaa, www, mx = records[:4]
+    assert apex == {"type": "A", "name": "example.com", "ttl": 300, "content": "192.0.2.1", "proxied": True}
+    assert aaaa["name"] == "example.com" and aaaa["ttl"] == 3600
+    assert www["content"] == "example.com" and mx["content"] == "mx1.example.com" and mx["priority"] == 10
+    assert records[5]["content"] == 'a"bcd'
+    assert records[6]["data"] == {"priority": 10, "weight": 5, "port": 5060, "target": "sip.example.com"}
+
+    rendered = render_zone_file(records, "example.com")
+    key = lambda r: (r["name"], r["type"], r["content"])
+    assert sorted(parse_zone_file(rendered), key=key) == sorted(records, key=key)
+    assert '"' + "x" * 255 + '" "xx"' in render_zone_file([{"type": "TXT", "name": "t.example.com",
+                                                             "content": "x" * 257}], "example.com")
+    for bad in ("www IN MX mx1", "$INCLUDE other.zone", "@ IN A (192.0.2.1", "  IN A 192.0.2.1"):
+        try:
+            parse_zone_file(bad, origin="example.com")
+            assert False, f"should not parse: {bad}"
+        except ZoneFileError as e:
+            assert e.line == 1
+    print("✓ Zone files parse and render back to the same records")
+
+
+def test_record_crud():
+    """Test single-record create, update, list and delete"""
+    print("\nTesting DNS record CRUD...")
+    with tempfile.TemporaryDirectory() as tmp:
+        api = MockCloudflare()
+        cf = make_manager(api, tmp)
+        zone_id = api.add_zones(1)[0]
+        name = api.zones[zone_id]["name"]
+
+        record = cf.create_dns_record(zone_id, {"type": "A", "name": "www", "content": "192.0.2.1", "ttl": 300})
+        assert record["name"] == f"www.{name}"
+        assert cf.create_dns_record(zone_id, {"type": "CNAME", "name": "www", "content": name}) is None
+        updated = cf.update_dns_record(zone_id, record["id"], {"type": "A", "name": "www", "content": "192.0.2.2"})
+        assert updated["content"] == "192.0.2.2" and updated["ttl"] == 1
+        assert [r["id"] for r in cf.list_dns_records(zone_id, record_type="A")] == [record["id"]]
+        assert cf.list_dns_records(zone_id, record_type="MX") == []
+        assert cf.delete_dns_record(zone_id, record["id"])
+        assert cf.list_dns_records(zone_id) == []
+    print("✓ Records are created, replaced, filtered and deleted")
+
+
+def test_bulk_import():
+    """Test a large import in concurrent batches, idempotent re-runs and pruning"""
+    print("\nTesting bulk import...")
+    with tempfile.TemporaryDirectory() as tmp:
+        api = MockCloudflare()
+        cf = make_manager(api, tmp)
+        zone_id = api.add_zones(1, prefix="big")[0]
+        name = api.zones[zone_id]["name"]
+        lines = [f"$ORIGIN {name}."] + [f"host{n} 300 IN A 10.{n // 65536}.{n // 256 % 256}.{n % 256}"
+                                          for n in range(1000)]
+
+        before = api.request_count
+        summary = cf.import_zone_file(zone_id, "\n".join(lines))
+        assert summary["created"] == 1000 and summary["failed"] == 0
+        assert summary["batches"] == 5  # Free plan zones take 200 changes per batch
+        assert api.request_count - before == 1 + 1 + 1 + 5  # zone, listing, plan lookup, batches
+        assert len(cf.list_dns_records(zone_id)) == 1000
+
+        lines[1] = lines[1].replace(" 300 ", " 600 ")
+        again = cf.import_zone_file(zone_id, "\n".join(lines[:501]), prune=True, dry_run=True)
+        assert (again["created"], again["updated"], again["deleted"], again["unchanged"]) == (0, 1, 500, 499)
+        again = cf.import_zone_file(zone_id, "\n".join(lines[:501]), prune=True, max_workers=2)
+        assert again["failed"] == 0 and len(cf.list_dns_records(zone_id)) == 500
+        assert cf.list_dns_records(zone_id, name=f"host0.{name}")[0]["ttl"] == 600
+
+        # A batch is atomic: one conflicting record fails its whole chunk and nothing else
+        conflict = [{"type": "CNAME", "name": f"host1.{name}", "content": name}]
+        extra = [{"type": "A", "name": f"new{n}.{name}", "content": "10.9.9.9"} for n in range(3)]
+        result = cf.import_dns_records(zone_id, extra + conflict, batch_size=2)
+        assert result["created"] == 2 and result["failed"] == 2 and len(result["errors"]) == 1
+    print("✓ 1,000 records import in 5 batch calls and re-runs only send the difference")
+
+
+def test_export():
+    """Test exporting a zone to BIND format"""
+    print("\nTesting export...")
+    with tempfile.TemporaryDirectory() as tmp:
+        api = MockCloudflare()
+        cf = make_manager(api, tmp)
+        zone_id = api.add_zones(1)[0]
+        name = api.zones[zone_id]["name"]
+        cf.import_zone_file(zone_id, ZONE_FILE.replace("example.com", name))
+        text = cf.export_zone_file(zone_id)
+        assert text.startswith(f"$ORIGIN {name}.\n")
+        assert f"{name}.\t300\tIN\tA\t192.0.2.1 ; cf_tags=cf-proxied:true" in text
+        summary = cf.import_zone_file(zone_id, text, dry_run=True)
+        assert summary["unchanged"] == 8 and summary["created"] == summary["updated"] == 0
+    print("✓ Exported zone files re-import without changes")
+
+
+def test_cli():
+    """Test dns import/export through the CLI"""
+    print("\nTesting dns commands...")
+    with tempfile.TemporaryDirectory() as tmp:
+        api = MockCloudflare()
+        cf = make_manager(api, tmp)
+        zone_id = api.add_zones(1)[0]
+        original = cli.get_manager
+        cli.get_manager = lambda args: cf
+        try:
+            source, exported = os.path.join(tmp, "in.zone"), os.path.join(tmp, "out.zone")
+            with open(source, "w", encoding="utf-8") as f:
+                f.write(ZONE_FILE.replace("example.com", "zone0.example.com"))
+            assert cli.main(["dns", "import", "zone0.example.com", source, "--dry-run"]) == 0
+            assert cf.list_dns_records(zone_id) == []
+            assert cli.main(["dns", "import", "zone0.example.com", source]) == 0
+            assert cli.main(["dns", "export", "zone0.example.com", "--output", exported]) == 0
+            with open(exported, "r", encoding="utf-8") as f:
+                assert len(f.read().splitlines()) == 9
+            with open(source, "a", encoding="utf-8") as f:
+                f.write("broken IN MX\n")
+            assert cli.main(["dns", "import", "zone0.example.com", source]) == 1
+        finally:
+            cli.get_manager = original
+    print("✓ Zone files import and export from the command line")
+
+
+if __name__ == "__main__":
+    test_zone_file_parsing()
+    test_record_crud()
+    test_bulk_import()
+    test_export()
+    test_cli()
+    print("\n✅ All tests passed!")
+    sys.exit(0)
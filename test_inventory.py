@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test script for the local SQLite inventory mirror
+Uses an in-memory stand-in for CloudflareManager
+"""
+
+import sys
+from inventory import InventoryStore
+
+
+class FakeManager:
+    """Minimal CloudflareManager stand-in that counts list calls"""
+
+    def __init__(self):
+        self.account = type("Account", (), {"account_id": "acc1"})()
+        self.calls = {"routes": 0, "deployments": 0}
+        self.zones = [
+            {"id": "z1", "name": "example.com", "status": "active", "modified_on": "2024-01-01T00:00:00Z",
+             "name_servers": ["ns1.cloudflare.com"]},
+            {"id": "z2", "name": "example.org", "status": "pending", "modified_on": "2024-01-01T00:00:00Z"},
+        ]
+        self.deployments = [
+            {"id": "d2", "modified_on": "2", "latest_stage": {"name": "deploy", "status": "success"}},
+            {"id": "d1", "modified_on": "1", "latest_stage": {"name": "deploy", "status": "success"}},
+        ]
+
+    def iter_accounts(self, strict=False):
+        return iter([{"id": "acc1", "name": "Primary"}])
+
+    def iter_zones(self, params=None, strict=False, stream=False):
+        return iter(self.zones)
+
+    def list_worker_routes(self, zone_id, strict=False):
+        self.calls["routes"] += 1
+        if zone_id == "z1":
+            return [{"id": "r1", "pattern": "example.com/api/*", "script": "api"}]
+        return []
+
+    def iter_pages_projects(self, strict=False):
+        return iter([{"name": "site", "subdomain": "site.pages.dev",
+                      "latest_deployment": {"id": self.deployments[0]["id"]}}])
+
+    def iter_pages_deployments(self, project_name, strict=False, stream=False):
+        for deployment in self.deployments:
+            self.calls["deployments"] += 1
+            yield deployment
+
+    def list_workers(self, strict=False):
+        return [{"id": "api", "etag": "e1"}]
+
+    def list_worker_domains(self, strict=False):
+        return [{"id": "wd1", "hostname": "api.example.com", "service": "api"}]
+
+
+def test_initial_sync():
+    """Test that a first sync mirrors every resource"""
+    print("Testing initial inventory sync...")
+    store = InventoryStore(":memory:")
+    cf = FakeManager()
+
+    store.sync(cf)
+    counts = store.counts()
+
+    assert counts["zones"] == 2
+    assert counts["worker_routes"] == 1
+    assert counts["pages_deployments"] == 2
+    assert store.find_zone("example.com")["status"] == "active"
+    assert store.routes_for_script("api")[0]["zone_name"] == "example.com"
+    print("✓ Initial sync mirrors zones, routes, projects, deployments and workers")
+
+
+def test_incremental_sync():
+    """Test that unchanged resources are not refetched"""
+    print("\nTesting incremental inventory sync...")
+    store = InventoryStore(":memory:")
+    cf = FakeManager()
+    store.sync(cf)
+    cf.calls = {"routes": 0, "deployments": 0}
+
+    changes = store.sync(cf)
+    assert cf.calls == {"routes": 0, "deployments": 0}
+    assert changes["zones"] == 0
+
+    # A new deployment and a modified zone trigger targeted refetches only
+    cf.deployments.insert(0, {"id": "d3", "modified_on": "3", "latest_stage": {"name": "queued"}})
+    cf.zones[1] = dict(cf.zones[1], status="active", modified_on="2024-02-01T00:00:00Z")
+    cf.zones.pop(0)
+    changes = store.sync(cf)
+
+    assert cf.calls == {"routes": 1, "deployments": 2}
+    assert changes["zones"] == 2
+    assert store.find_zone("example.com") is None
+    assert store.counts()["worker_routes"] == 0
+    assert store.counts()["pages_deployments"] == 3
+    print("✓ Incremental sync only refetches what changed")
+
+
+def test_deployment_status_change():
+    """Test that an unfinished deployment is revisited until its status settles"""
+    print("\nTesting deployment status changes...")
+    store = InventoryStore(":memory:")
+    cf = FakeManager()
+    cf.deployments.insert(0, {"id": "d3", "modified_on": "3", "latest_stage": {"name": "build", "status": "active"}})
+    store.sync(cf)
+    assert store.query("SELECT stage_status FROM pages_deployments WHERE id = 'd3'")[0]["stage_status"] == "active"
+
+    # Same ID and project stamp, new status
+    cf.deployments[0] = dict(cf.deployments[0], latest_stage={"name": "deploy", "status": "success"})
+    cf.calls = {"routes": 0, "deployments": 0}
+    changes = store.sync(cf)
+    row = store.query("SELECT stage, stage_status FROM pages_deployments WHERE id = 'd3'")[0]
+    assert (row["stage"], row["stage_status"]) == ("deploy", "success") and changes["pages_deployments"] == 1
+    assert cf.calls["deployments"] == 2
+
+    cf.calls = {"routes": 0, "deployments": 0}
+    store.sync(cf)
+    assert cf.calls["deployments"] == 0
+
+    # An unfinished deployment that disappears from the listing is dropped once
+    cf.deployments.insert(0, {"id": "d4", "modified_on": "4", "latest_stage": {"name": "build", "status": "active"}})
+    store.sync(cf)
+    cf.deployments.pop(0)
+    cf.calls = {"routes": 0, "deployments": 0}
+    store.sync(cf)
+    assert cf.calls["deployments"] == 3
+    assert not store.query("SELECT id FROM pages_deployments WHERE id = 'd4'")
+    cf.calls = {"routes": 0, "deployments": 0}
+    store.sync(cf)
+    assert cf.calls["deployments"] == 0
+    print("✓ Unfinished deployments are refreshed until they succeed or fail")
+
+
+if __name__ == "__main__":
+    test_initial_sync()
+    test_incremental_sync()
+    test_deployment_status_change()
+    print("\n✅ All tests passed!")
+    sys.exit(0)
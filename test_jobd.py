@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Test script for the local job daemon: persistence, per-account caps, fairness and the HTTP API
+Runs entirely offline against an in-process MockCloudflare
+"""
+
+import os
+import sys
+import stat
+import time
+import socket
+import tempfile
+import threading
+import jobd
+from cloudflare_manager import CloudflareManager, StateStore
+from mock_cloudflare import MockCloudflare
+from sim_transport import MockTransport
+from jobd import AccountManagers, JobClient, JobRunner, JobServer, JobStore, job_error
+
+
+class FakeManager:
+    """Records the order jobs start in; hold() blocks until released"""
+
+    def __init__(self, account, journal, release):
+        self.account = account
+        self.journal = journal
+        self.release = release
+
+    def hold(self, name):
+        self.journal.append((self.account, name))
+        print(f"✓ started {name}")
+        self.release.wait(10)
+        return {"name": name}
+
+    def fail(self):
+        print("✗ nothing to do")
+        return None
+
+    def crash(self):
+        raise RuntimeError("boom")
+
+
+KINDS = {"hold": "hold", "fail": "fail", "crash": "crash"}
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_store():
+    """Test queue order, claiming, cancelling, logs and recovery after a restart"""
+    print("Testing job store...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "jobs.db")
+        store = JobStore(path)
+        first = store.submit("a", "deploy", {"project_name": "site"})
+        second = store.submit("a", "purge", {})
+        other = store.submit("b", "purge", {})
+        assert first["status"] == "queued" and first["params"] == {"project_name": "site"}
+        assert store.queued() == {"a": first["seq"], "b": other["seq"]}
+
+        assert store.claim("a")["id"] == first["id"]
+        assert store.cancel(second["id"]) and not store.cancel(first["id"])
+        assert store.claim("a") is None
+        store.append_log(first["id"], "one")
+        store.append_log(first["id"], "two")
+        assert [entry["line"] for entry in store.logs(first["id"], after=1)] == ["two"]
+        assert store.counts() == {"queued": {"b": 1}, "running": {"a": 1}}
+        store.close()
+
+        # A restart queues the interrupted job again; finished ones stay finished
+        store = JobStore(path)
+        assert store.recover() == 1
+        assert store.get(first["id"])["status"] == "queued" and store.get(second["id"])["status"] == "cancelled"
+        store.finish(first["id"], "succeeded", {"id": "dep"})
+        assert store.get(first["id"])["result"] == {"id": "dep"}
+        assert [job["id"] for job in store.list(account="a")] == [second["id"], first["id"]]
+        store.close()
+    print("✓ Jobs survive a restart and interrupted jobs are queued again")
+
+
+def test_job_errors():
+    """Test how manager results map to job failures"""
+    print("\nTesting job results...")
+    assert job_error({"id": "x"}) is None and job_error([]) is None
+    assert job_error(None) and job_error(False)
+    assert "chunk 2" in job_error({"complete": False, "failed_chunk": 2})
+    assert job_error({"uploaded": 3, "failed": 1}) == "1 item(s) failed"
+    assert job_error({"id": "d", "wait": {"status": "failure"}}) == "deployment ended as failure"
+    assert job_error({"id": "d", "wait": {"status": "success"}}) is None
+    print("✓ Failed, partial and unfinished results fail the job")
+
+
+def test_caps_and_fairness():
+    """Test per-account caps and that accounts take turns"""
+    print("\nTesting per-account caps and fairness...")
+    with tempfile.TemporaryDirectory() as tmp:
+        journal, release = [], threading.Event()
+        managers = {name: FakeManager(name, journal, release) for name in ("a", "b")}
+        store = JobStore(os.path.join(tmp, "jobs.db"))
+        runner = JobRunner(store, managers.__getitem__, workers=3, per_account=2, kinds=KINDS)
+        for n in range(5):
+            runner.submit("a", "hold", {"name": f"a{n}"})
+        runner.submit("b", "hold", {"name": "b0"})
+        runner.start()
+        try:
+            wait_until(lambda: len(journal) == 3)
+            time.sleep(0.1)
+            # 3 workers but account a may only use 2 of them
+            assert store.counts()["running"] == {"a": 2, "b": 1} and len(journal) == 3
+            release.set()
+            wait_until(lambda: not store.counts()["queued"] and not store.counts()["running"])
+        finally:
+            runner.stop()
+        assert all(job["status"] == "succeeded" for job in store.list())
+        store.close()
+
+        # One worker: the single b job goes second, not after all of a's backlog
+        journal, release = [], threading.Event()
+        release.set()
+        managers = {name: FakeManager(name, journal, release) for name in ("a", "b")}
+        store = JobStore(os.path.join(tmp, "order.db"))
+        runner = JobRunner(store, managers.__getitem__, workers=1, per_account=1, kinds=KINDS)
+        for n in range(3):
+            runner.submit("a", "hold", {"name": f"a{n}"})
+        runner.submit("b", "hold", {"name": "b0"})
+        runner.start()
+        try:
+            wait_until(lambda: len(journal) == 4)
+        finally:
+            runner.stop()
+        assert [name for _, name in journal] == ["a0", "b0", "a1", "a2"]
+        store.close()
+    print("✓ No account runs more than its cap and a backlog does not starve others")
+
+
+def test_failures_and_logs():
+    """Test failed jobs, exceptions and per-job logs"""
+    print("\nTesting failures and logs...")
+    with tempfile.TemporaryDirectory() as tmp:
+        journal, release = [], threading.Event()
+        release.set()
+        store = JobStore(os.path.join(tmp, "jobs.db"))
+        runner = JobRunner(store, lambda account: FakeManager(account, journal, release), workers=2,
+                           kinds=KINDS)
+        try:
+            runner.submit("a", "unknown")
+            assert False, "unknown kinds should be rejected"
+        except ValueError:
+            pass
+        held, failed, crashed = (runner.submit("a", kind, params) for kind, params in (
+            ("hold", {"name": "x"}), ("fail", {}), ("crash", {})))
+        runner.start()
+        try:
+            wait_until(lambda: all(store.get(job["id"])["status"] in jobd.FINAL_STATUSES
+                                   for job in (held, failed, crashed)))
+        finally:
+            runner.stop()
+        assert store.get(held["id"])["status"] == "succeeded"
+        assert [entry["line"] for entry in store.logs(held["id"])] == ["✓ started x"]
+        assert store.get(failed["id"])["status"] == "failed"
+        assert [entry["line"] for entry in store.logs(failed["id"])] == ["✗ nothing to do"]
+        crash = store.get(crashed["id"])
+        assert crash["status"] == "failed" and crash["error"] == "RuntimeError: boom"
+        assert not isinstance(sys.stdout, jobd._LogRouter)
+        store.close()
+    print("✓ Job output lands in the job's own log and failures are recorded")
+
+
+def test_shared_rate_limits():
+    """Test that profiles with the same credential share one rate limiter"""
+    print("\nTesting rate limiters per credential...")
+    managers = AccountManagers({"prod": {"email": "ops@example.com", "token": "team"},
+                                "staging": {"email": "ops@example.com", "token": "team"},
+                                "other": {"email": "ops@example.com", "token": "solo"}},
+                               factory=lambda account, rate_limiter: rate_limiter)
+    assert managers("prod") is managers("staging") and managers("prod") is not managers("other")
+    print("✓ One credential's accounts draw from one request budget")
+
+
+def test_http_api():
+    """Test submitting and following a real purge job over TCP and a Unix socket"""
+    print("\nTesting HTTP API...")
+    api = MockCloudflare()
+    zone_id = api.add_zones(1)[0]
+    with tempfile.TemporaryDirectory() as tmp:
+        state = StateStore(os.path.join(tmp, "state.json"))
+        managers = AccountManagers({"prod": {"email": "ops@example.com", "token": "jobd-token"}}, rate=100,
+                                   factory=lambda account, rate_limiter: CloudflareManager(
+                                       account, rate_limiter=rate_limiter, state=state,
+                                       transport=MockTransport(api)))
+        store = JobStore(os.path.join(tmp, "jobs.db"))
+        runner = JobRunner(store, managers, workers=2)
+        runner.start()
+        addresses = [dict(port=0, token="secret")]
+        if hasattr(socket, "AF_UNIX"):
+            addresses.append(dict(socket_path=os.path.join(tmp, "jobd.sock")))
+        try:
+            try:
+                JobServer(runner, port=0)
+                assert False, "TCP without a token should be refused"
+            except ValueError:
+                pass
+            for address in addresses:
+                with JobServer(runner, accounts=managers.__contains__, **address) as server:
+                    if "token" in address:
+                        try:
+                            JobClient(server.address, timeout=5, token="wrong").submit("purge", "prod")
+                            assert False, "a wrong token should be rejected"
+                        except ValueError as e:
+                            assert "token" in str(e)
+                    else:
+                        assert stat.S_IMODE(os.stat(address["socket_path"]).st_mode) == 0o600
+                    client = JobClient(server.address, timeout=5, token=address.get("token"))
+                    job = client.submit("purge", "prod", {"zone_id": zone_id, "files": ["https://example.com/"]})
+                    lines = []
+                    done = client.wait(job["id"], timeout=10, interval=0.05, on_log=lines.append)
+                    assert done["status"] == "succeeded" and done["result"]["purged"] == 1
+                    assert lines and lines == [entry["line"] for entry in client.logs(job["id"])["lines"]]
+                    assert client.get("missing") is None and client.list(status="succeeded")
+                    try:
+                        client.submit("purge", "staging")
+                        assert False, "unknown accounts should be rejected"
+                    except ValueError as e:
+                        assert "staging" in str(e)
+                    assert client.status()["per_account"] == 2
+            assert managers("prod") is managers("prod")
+        finally:
+            runner.stop()
+            store.close()
+    print(f"✓ Jobs are submitted and followed over {len(addresses)} transport(s)")
+
+
+if __name__ == "__main__":
+    test_store()
+    test_job_errors()
+    test_caps_and_fairness()
+    test_failures_and_logs()
+    test_shared_rate_limits()
+    test_http_api()
+    print("\n✅ All tests passed!")
+    sys.exit(0)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Test script for the write-ahead journal and resuming interrupted bulk runs
+Runs entirely offline against an in-process MockCloudflare
+"""
+
+import os
+import sys
+import json
+import tempfile
+import requests
+import cli
+from cloudflare_manager import CloudflareAPIError
+from mock_cloudflare import MockCloudflare
+from mock_manager import make_manager
+from sim_transport import MockTransport, build_response, error_body
+from journal import Journal, run_journal
+
+
+class CrashingTransport(MockTransport):
+    """Raises a connection error on the Nth POST, after (applied=True) or before the API sees it"""
+
+    def __init__(self, api, crash_at, applied=True):
+        super().__init__(api)
+        self.crash_at = crash_at
+        self.applied = applied
+        self.posts = 0
+
+    def send(self, request, **kwargs):
+        if request.method == "POST":
+            self.posts += 1
+            if self.posts == self.crash_at:
+                if self.applied:
+                    super().send(request, **kwargs)
+                raise requests.ConnectionError("connection reset")
+        return super().send(request, **kwargs)
+
+
+class ErrorTransport(MockTransport):
+    """Answers matching requests with an API error, after passing them on when applied=True"""
+
+    def __init__(self, api, method, path, applied=False):
+        super().__init__(api)
+        self.method, self.path, self.applied = method, path, applied
+
+    def send(self, request, **kwargs):
+        if request.method == self.method and self.path in request.url:
+            if self.applied:
+                super().send(request, **kwargs)
+            return build_response(request, 403, error_body(10000, "Authentication error"), {}, adapter=self)
+        return super().send(request, **kwargs)
+
+
+def test_journal_file():
+    """Test replay, torn records and plan checks"""
+    print("Testing journal file...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "run.journal")
+        steps = [{"action": "create_zone", "domain": "a.com"}, {"action": "create_zone", "domain": "b.com"}]
+        journal = Journal(path).begin("apply", steps)
+        journal.intent(0)
+        journal.done(0, {"id": "z1", "name": "a.com", "name_servers": ["ns"]})
+        journal.intent(1)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"op": "done", "st')
+
+        replayed = Journal(path)
+        assert replayed.steps == steps and replayed.results[0] == {"id": "z1", "name": "a.com"}
+        assert replayed.counts() == {"pending": 0, "in_doubt": 1, "done": 1, "failed": 0}
+        replayed.failed(1, "rejected")
+        assert Journal(path).state(1) == "failed"
+        with open(path, "r", encoding="utf-8") as f:
+            assert all(json.loads(line) for line in f)
+
+        assert Journal(path).begin("apply", steps).steps == steps
+        for bad, message in (([{"action": "create_zone", "domain": "c.com"}], "different plan"),
+                             ([{"action": "drop_zone"}], "unknown action"),
+                             ([{"action": "add_pages_domain", "project": "p"}], "missing domain")):
+            try:
+                Journal(path if message == "different plan" else os.path.join(tmp, "new")).begin("apply", bad)
+                assert False, f"expected {message}"
+            except ValueError as e:
+                assert message in str(e)
+    print("✓ Journals replay, drop torn records and reject other plans")
+
+
+def test_crash_and_resume():
+    """Test resuming after the process dies mid-request"""
+    print("\nTesting crash and resume...")
+    api = MockCloudflare()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "run.journal")
+        steps = ([{"action": "create_zone", "domain": f"site{n}.com"} for n in range(3)]
+                 + [{"action": "create_pages_project", "project": "site"},
+                    {"action": "add_pages_domain", "project": "site", "domain": "www.site0.com"}])
+
+        # The second zone is created but the response never arrives
+        cf = make_manager(api, tmp, CrashingTransport(api, crash_at=2))
+        try:
+            run_journal(cf, Journal(path).begin("apply", steps))
+            assert False, "the connection error should stop the run"
+        except requests.ConnectionError:
+            pass
+        assert Journal(path).counts() == {"pending": 3, "in_doubt": 1, "done": 1, "failed": 0}
+
+        cf = make_manager(api, tmp)
+        before = api.request_count
+        summary = run_journal(cf, Journal(path))
+        assert summary == {"total": 5, "done": 3, "skipped": 1, "recovered": 1, "failed": 0}
+        # One read for the step in doubt, one request per remaining step, nothing for the finished one
+        assert api.request_count - before == 4
+        assert sorted(zone["name"] for zone in cf.iter_zones()) == ["site0.com", "site1.com", "site2.com"]
+        journal = Journal(path)
+        assert journal.finished and journal.results[1]["name"] == "site1.com"
+
+        before = api.request_count
+        assert run_journal(cf, journal)["skipped"] == 5 and api.request_count == before
+
+        # A request that never reached the API is simply sent again
+        zone_id = cf.get_zone_by_name("site0.com")["id"]
+        path = os.path.join(tmp, "routes.journal")
+        steps = [{"action": "create_worker_route", "zone_id": zone_id, "pattern": f"site0.com/{n}/*",
+                  "script": "api"} for n in range(2)]
+        try:
+            run_journal(make_manager(api, tmp, CrashingTransport(api, crash_at=1, applied=False)),
+                        Journal(path).begin("routes", steps))
+        except requests.ConnectionError:
+            pass
+        summary = run_journal(cf, Journal(path))
+        assert summary["done"] == 2 and summary["recovered"] == 0
+        assert len(cf.list_worker_routes(zone_id)) == 2
+    print("✓ Finished steps are skipped and the step in doubt is checked once, not redone")
+
+
+def test_failed_steps():
+    """Test that steps the API rejects are retried on resume"""
+    print("\nTesting failed steps...")
+    api = MockCloudflare()
+    with tempfile.TemporaryDirectory() as tmp:
+        cf = make_manager(api, tmp)
+        path = os.path.join(tmp, "run.journal")
+        steps = [{"action": "add_pages_domain", "project": "later", "domain": "www.example.com"},
+                 {"action": "create_zone", "domain": "example.com"}]
+        summary = run_journal(cf, Journal(path).begin("apply", steps))
+        assert summary["failed"] == 1 and summary["done"] == 1 and not Journal(path).finished
+        cf.create_pages_project("later")
+        summary = run_journal(cf, Journal(path))
+        assert summary == {"total": 2, "done": 1, "skipped": 1, "recovered": 0, "failed": 0}
+    print("✓ Rejected steps are sent again on resume")
+
+
+def test_strict_checks():
+    """Test that a failed check read stops the run instead of sending the step again"""
+    print("\nTesting strict in-doubt checks...")
+    api = MockCloudflare()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "run.journal")
+        steps = [{"action": "create_pages_project", "project": "site"},
+                 {"action": "add_pages_domain", "project": "site", "domain": "www.example.com"}]
+        try:
+            run_journal(make_manager(api, tmp, CrashingTransport(api, crash_at=1)), Journal(path).begin("apply", steps))
+        except requests.ConnectionError:
+            pass
+
+        # The check read is refused: the run stops with the step still in doubt
+        cf = make_manager(api, tmp, ErrorTransport(api, "GET", "/pages/projects/site"))
+        try:
+            run_journal(cf, Journal(path))
+            assert False, "a failed check read should stop the run"
+        except CloudflareAPIError:
+            pass
+        assert Journal(path).counts() == {"pending": 1, "in_doubt": 1, "done": 0, "failed": 0}
+
+        # The domain is added but the answer is an error: the step fails, and resume finds it
+        cf = make_manager(api, tmp, ErrorTransport(api, "POST", "/domains", applied=True))
+        summary = run_journal(cf, Journal(path))
+        assert summary["recovered"] == 1 and summary["failed"] == 1
+        summary = run_journal(make_manager(api, tmp), Journal(path))
+        assert summary == {"total": 2, "done": 0, "skipped": 1, "recovered": 1, "failed": 0}
+        assert len(api.projects) == 1
+    print("✓ Only a 'not found' read lets a step be sent again")
+
+
+def test_cli():
+    """Test apply, resume and routes apply --journal"""
+    print("\nTesting apply and resume commands...")
+    api = MockCloudflare()
+    with tempfile.TemporaryDirectory() as tmp:
+        cf = make_manager(api, tmp)
+        zone_id = cf.create_zone("example.com")["id"]
+        plan = os.path.join(tmp, "plan.json")
+        with open(plan, "w", encoding="utf-8") as f:
+            json.dump([{"action": "create_worker_route", "zone": "example.com", "pattern": "example.com/api/*",
+                        "script": "api"},
+                       {"action": "create_zone", "domain": "example.org"}], f)
+        original = cli.get_manager
+        cli.get_manager = lambda args: cf
+        try:
+            assert cli.main(["apply", plan]) == 0
+            assert Journal(plan + ".journal").steps[0]["zone_id"] == zone_id
+            assert cli.main(["apply", plan]) == 1
+            assert cli.main(["resume", plan + ".journal"]) == 0
+            assert cli.main(["resume", os.path.join(tmp, "missing")]) == 1
+
+            routes = os.path.join(tmp, "routes.json")
+            with open(routes, "w", encoding="utf-8") as f:
+                json.dump([{"zone": "example.com", "pattern": "example.com/api/*", "script": "api-v2"},
+                           {"zone": "example.com", "pattern": "example.com/img/*", "script": "img"}], f)
+            journal = os.path.join(tmp, "routes.journal")
+            assert cli.main(["routes", "apply", routes, "--journal", journal]) == 0
+            assert [step["action"] for step in Journal(journal).steps] == [
+                "update_worker_route", "create_worker_route"]
+            assert sorted(route["script"] for route in cf.list_worker_routes(zone_id)) == ["api-v2", "img"]
+        finally:
+            cli.get_manager = original
+    print("✓ Plans run with a journal and resume from the command line")
+
+
+if __name__ == "__main__":
+    test_journal_file()
+    test_crash_and_resume()
+    test_failed_steps()
+    test_strict_checks()
+    test_cli()
+    print("\n✅ All tests passed!")
+    sys.exit(0)
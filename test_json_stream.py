@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for incremental decoding of API list responses
+"""
+
+import sys
+import json
+from json_stream import iter_result_items
+from cloudflare_manager import CloudflareManager, CloudflareAccount
+
+
+def chunked(data: bytes, size: int):
+    """Split a body into fixed-size chunks"""
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_iter_result_items():
+    """Test that items decode identically regardless of chunk boundaries"""
+    print("Testing incremental result decoding...")
+    body = {
+        "success": True,
+        "errors": [],
+        "result": [{"id": str(i), "name": f"zone-{i}.example.com", "ttl": 3600 + i,
+                    "comment": "naïve ✓ \"quoted\""} for i in range(50)],
+        "result_info": {"page": 1, "per_page": 50, "total_pages": 3, "count": 50},
+    }
+    raw = json.dumps(body, ensure_ascii=False, indent=1).encode("utf-8")
+
+    for size in (1, 7, 4096):
+        envelope = {}
+        items = list(iter_result_items(chunked(raw, size), envelope))
+        assert items == body["result"]
+        assert envelope["success"] is True
+        assert envelope["result_info"]["total_pages"] == 3
+
+    envelope = {}
+    assert list(iter_result_items([b'{"success": false, "errors": [{"code": 9}], "result": null}'], envelope)) == []
+    assert envelope["errors"] == [{"code": 9}]
+    print("✓ Result items decode incrementally across any chunk size")
+
+
+def test_split_numbers():
+    """Test numbers cut at every offset, including just after a dot or exponent"""
+    print("\nTesting numbers split across chunks...")
+    raw = b'{"success":true,"result":[1.5,2e3,-4,0.25E-2,10],"x":1}'
+    for cut in range(1, len(raw)):
+        envelope = {}
+        items = list(iter_result_items([raw[:cut], raw[cut:]], envelope))
+        assert items == [1.5, 2e3, -4, 0.25e-2, 10] and envelope["x"] == 1, cut
+    print("✓ Numbers decode wherever the body is split")
+
+
+def test_streamed_pagination():
+    """Test that streamed pages follow result_info like buffered ones"""
+    print("\nTesting streamed pagination...")
+    account = CloudflareAccount(email="test@example.com", token="test-token", account_id="test-account")
+    cf = CloudflareManager(account)
+
+    class FakeResponse:
+        def __init__(self, page):
+            self.body = json.dumps({"success": True, "result": [{"id": f"{page}-{i}"} for i in range(2)],
+                                    "result_info": {"page": page, "total_pages": 2}}).encode()
+
+        def iter_content(self, chunk_size=1):
+            return chunked(self.body, 5)
+
+        def close(self):
+            pass
+
+    cf._request = lambda method, url, **kwargs: FakeResponse(kwargs["params"]["page"])
+    ids = [zone["id"] for zone in cf.iter_zones(stream=True)]
+
+    assert ids == ["1-0", "1-1", "2-0", "2-1"]
+    print("✓ Streamed pagination yields every page")
+
+
+if __name__ == "__main__":
+    test_iter_result_items()
+    test_split_numbers()
+    test_streamed_pagination()
+    print("\n✅ All tests passed!")
+    sys.exit(0)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Test script for Workers KV namespaces and streamed, resumable bulk operations
+Runs entirely offline against an in-process MockCloudflare
+"""
+
+import os
+import sys
+import json
+import tempfile
+import cli
+from mock_cloudflare import MockCloudflare
+from mock_manager import make_manager
+from sim_transport import MockTransport, build_response, error_body
+from kv import BulkCheckpoint, bulk_item, iter_directory, iter_ndjson, pack_bulk
+
+
+class FailingTransport(MockTransport):
+    """Fails the Nth bulk write request (1-based) with a 500"""
+
+    def __init__(self, api, fail_at):
+        super().__init__(api)
+        self.fail_at = fail_at
+        self.bulk_requests = 0
+
+    def send(self, request, **kwargs):
+        if request.method == "PUT" and request.url.endswith("/bulk"):
+            self.bulk_requests += 1
+            if self.bulk_requests == self.fail_at:
+                return build_response(request, 500, error_body(10001, "Internal error"), adapter=self)
+        return super().send(request, **kwargs)
+
+
+def test_packing():
+    """Test item normalization and the per-request item and byte limits"""
+    print("Testing bulk packing...")
+    assert bulk_item(("a", b"\x00\xff")) == {"key": "a", "value": "AP8=", "base64": True}
+    assert bulk_item({"key": "b", "value": {"x": 1}, "expiration_ttl": 60, "unknown": 1}) == {
+        "key": "b", "value": '{"x": 1}', "expiration_ttl": 60}
+    try:
+        bulk_item(("k" * 513, "v"))
+        assert False, "oversized key should be rejected"
+    except ValueError:
+        pass
+
+    items = [bulk_item((f"key{n:03d}", "v" * 50)) for n in range(25)]
+    assert [len(chunk) for chunk in pack_bulk(items, max_items=10)] == [10, 10, 5]
+    size = len(json.dumps(items[0])) + 2
+    chunks = list(pack_bulk(iter(items), max_items=100, max_bytes=2 + 4 * size))
+    assert [len(chunk) for chunk in chunks] == [4] * 6 + [1]
+    assert all(len(json.dumps(chunk)) <= 2 + 4 * size for chunk in chunks)
+    print("✓ Chunks are filled up to both limits")
+
+
+def test_sources():
+    """Test the NDJSON and directory readers"""
+    print("\nTesting streamed sources...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "pairs.ndjson")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('{"key": "a", "value": "1", "metadata": {"m": 1}}\n\n{"key": "b", "value": "2"}\n')
+        assert list(iter_ndjson(path)) == [{"key": "a", "value": "1", "metadata": {"m": 1}},
+                                           {"key": "b", "value": "2"}]
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"value": "no key"}\n')
+        try:
+            list(iter_ndjson(path))
+            assert False, "line without a key should fail"
+        except ValueError as e:
+            assert ":4:" in str(e)
+
+        site = os.path.join(tmp, "site")
+        os.makedirs(os.path.join(site, "img"))
+        with open(os.path.join(site, "index.html"), "w", encoding="utf-8") as f:
+            f.write("<h1>hi</h1>")
+        with open(os.path.join(site, "img", "dot.bin"), "wb") as f:
+            f.write(b"\xff\x00")
+        assert list(iter_directory(site, prefix="site/")) == [
+            {"key": "site/index.html", "value": "<h1>hi</h1>"},
+            {"key": "site/img/dot.bin", "value": "/wA=", "base64": True}]
+    print("✓ NDJSON lines and directory files become bulk items")
+
+
+def test_namespaces_and_values():
+    """Test namespace management, single values and key listing"""
+    print("\nTesting namespaces and values...")
+    api = MockCloudflare()
+    with tempfile.TemporaryDirectory() as tmp:
+        cf = make_manager(api, tmp)
+        namespace = cf.create_kv_namespace("CACHE")
+        assert cf.create_kv_namespace("CACHE") is None
+        assert [ns["title"] for ns in cf.list_kv_namespaces()] == ["CACHE"]
+
+        assert cf.write_kv_value(namespace["id"], "a/b c", b"\x00raw")
+        assert cf.read_kv_value(namespace["id"], "a/b c") == b"\x00raw"
+        assert cf.read_kv_value(namespace["id"], "missing") is None
+        assert cf.delete_kv_value(namespace["id"], "a/b c")
+        assert cf.read_kv_value(namespace["id"], "a/b c") is None
+
+        cf.bulk_write_kv(namespace["id"], ((f"user:{n:04d}", str(n)) for n in range(2500)))
+        before = api.request_count
+        keys = [key["name"] for key in cf.iter_kv_keys(namespace["id"], prefix="user:")]
+        assert keys == [f"user:{n:04d}" for n in range(2500)]
+        assert api.request_count - before == 3
+        assert cf.delete_kv_namespace(namespace["id"])
+        assert cf.list_kv_namespaces() == []
+    print("✓ Namespaces, values and cursor-paginated keys work")
+
+
+def test_bulk_write_and_resume():
+    """Test concurrent chunked writes and resuming after a failed chunk"""
+    print("\nTesting bulk write and resume...")
+    api = MockCloudflare()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "pairs.ndjson")
+        with open(path, "w", encoding="utf-8") as f:
+            for n in range(10):
+                f.write(json.dumps({"key": f"k{n}", "value": f"v{n}"}) + "\n")
+
+        transport = FailingTransport(api, fail_at=3)
+        cf = make_manager(api, tmp, transport)
+        namespace_id = cf.create_kv_namespace("DATA")["id"]
+        summary = cf.bulk_write_kv(namespace_id, path, max_workers=1, max_items=2)
+        assert not summary["complete"] and summary["failed_chunk"] == 2
+        assert summary["items"] == 4 and sorted(api.kv[namespace_id]) == ["k0", "k1", "k2", "k3"]
+
+        # Re-running the same file skips the acknowledged chunks
+        summary = cf.bulk_write_kv(namespace_id, path, max_workers=3, max_items=2)
+        assert summary["complete"] and summary["skipped_chunks"] == 2 and summary["chunks"] == 3
+        assert len(api.kv[namespace_id]) == 10 and transport.bulk_requests == 2 + 1 + 3
+        assert cf.state.get(f"kv:{cf.account.account_id}/{namespace_id}/write:{os.path.abspath(path)}") == {}
+
+        # Different chunk limits invalidate a checkpoint
+        checkpoint = BulkCheckpoint(cf.state, "kv:test", (2, 0))
+        checkpoint.ack(1, 2)
+        checkpoint.ack(0, 2)
+        assert checkpoint.done == 2 and not checkpoint.acked
+        assert BulkCheckpoint(cf.state, "kv:test", (2, 0)).done == 2
+        assert BulkCheckpoint(cf.state, "kv:test", (3, 0)).done == 0
+
+        with open(os.path.join(tmp, "big.ndjson"), "w", encoding="utf-8") as f:
+            for n in range(25000):
+                f.write(json.dumps({"key": f"big{n}", "value": "x"}) + "\n")
+        before = api.request_count
+        summary = cf.bulk_write_kv(namespace_id, os.path.join(tmp, "big.ndjson"))
+        assert summary["complete"] and summary["chunks"] == 3 and api.request_count - before == 3
+    print("✓ 25,000 keys go out in 3 requests and failed jobs resume")
+
+
+def test_bulk_delete_and_read():
+    """Test bulk delete and bulk read"""
+    print("\nTesting bulk delete and read...")
+    api = MockCloudflare()
+    with tempfile.TemporaryDirectory() as tmp:
+        cf = make_manager(api, tmp)
+        namespace_id = cf.create_kv_namespace("DATA")["id"]
+        cf.bulk_write_kv(namespace_id, [{"key": f"k{n}", "value": json.dumps({"n": n}), "metadata": {"n": n}}
+                                        for n in range(250)])
+
+        values = cf.bulk_read_kv(namespace_id, [f"k{n}" for n in range(250)] + ["missing"], value_type="json")
+        assert len(values) == 251 and values["k7"] == {"n": 7} and values["missing"] is None
+        values = cf.bulk_read_kv(namespace_id, ["k1"], with_metadata=True)
+        assert values == {"k1": {"value": '{"n": 1}', "metadata": {"n": 1}}}
+
+        summary = cf.bulk_delete_kv(namespace_id, (f"k{n}" for n in range(200)))
+        assert summary["complete"] and summary["items"] == 200
+        assert sorted(api.kv[namespace_id]) == sorted(f"k{n}" for n in range(200, 250))
+    print("✓ Keys are read 100 per request and deleted in bulk")
+
+
+def test_cli():
+    """Test kv write/delete through the CLI"""
+    print("\nTesting kv commands...")
+    api = MockCloudflare()
+    with tempfile.TemporaryDirectory() as tmp:
+        cf = make_manager(api, tmp)
+        original = cli.get_manager
+        cli.get_manager = lambda args: cf
+        try:
+            assert cli.main(["kv", "create", "SITE"]) == 0
+            namespace_id = cf.list_kv_namespaces()[0]["id"]
+            site = os.path.join(tmp, "site")
+            os.makedirs(site)
+            for name in ("a.txt", "b.txt"):
+                with open(os.path.join(site, name), "w", encoding="utf-8") as f:
+                    f.write(name)
+            assert cli.main(["kv", "write", namespace_id, "--dir", site]) == 0
+            assert sorted(api.kv[namespace_id]) == ["a.txt", "b.txt"]
+            assert cli.main(["kv", "write", namespace_id]) == 1
+            keys = os.path.join(tmp, "keys.txt")
+            with open(keys, "w", encoding="utf-8") as f:
+                f.write("a.txt\n")
+            assert cli.main(["kv", "delete", namespace_id, keys]) == 0
+            assert sorted(api.kv[namespace_id]) == ["b.txt"]
+        finally:
+            cli.get_manager = original
+    print("✓ Directories are written and keys deleted from the command line")
+
+
+if __name__ == "__main__":
+    test_packing()
+    test_sources()
+    test_namespaces_and_values()
+    test_bulk_write_and_resume()
+    test_bulk_delete_and_read()
+    test_cli()
+    print("\n✅ All tests passed!")
+    sys.exit(0)
@@ -134,10 +134,14 @@ def test_api_methods():
             "get_pages_project",
             "deploy_pages_project",
             "list_pages_deployments",
+            "get_pages_deployment",
+            "wait_for_deployment",
+            "wait_for_deployments",
             # Domain methods
             "add_pages_domain",
             "list_pages_domains",
             "get_pages_domain",
+            "attach_pages_domains",
             # Zone methods
             "create_zone",
             "list_zones",
@@ -166,6 +170,41 @@ def test_api_methods():
         return False
 
 
+def test_manager_pool():
+    """Test that the manager pool reuses, evicts and skips failed logins"""
+    print("\nTesting manager pool...")
+    from cloudflare_manager import ManagerPool
+
+    class StubSession:
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    class StubManager:
+        def __init__(self, account):
+            self.account = account
+            self.session = StubSession()
+            if account.token != "bad-token":
+                account.account_id = f"id-{account.email}"
+
+    pool = ManagerPool(max_size=2, idle_ttl=3600, factory=StubManager)
+
+    first = pool.get("a@example.com", "token")
+    assert pool.get("a@example.com", "token") is first
+    assert pool.get("a@example.com", "other-token") is not first
+
+    failed = pool.get("c@example.com", "bad-token")
+    assert failed.account.account_id is None
+    assert pool.get("c@example.com", "bad-token") is not failed
+
+    pool.get("b@example.com", "token")
+    assert len(pool) == 2
+    assert first.session.closed
+
+    print("✓ Manager pool reuses warm managers with LRU eviction")
+
+
 def run_all_tests():
     """Run all tests"""
     print("""
@@ -180,6 +219,7 @@ def run_all_tests():
         ("Account Creation", test_account_creation),
         ("Multi-Account Manager", test_multi_account_manager),
         ("API Methods", test_api_methods),
+        ("Manager Pool", test_manager_pool),
         ("index.html", test_index_html),
     ]
     
@@ -189,7 +229,12 @@ def run_all_tests():
         print(f"\n{'='*60}")
         print(f"Test: {test_name}")
         print(f"{'='*60}")
-        result = test_func()
+        try:
+            # Older tests return a bool; newer ones assert and return None
+            result = test_func() is not False
+        except AssertionError as e:
+            print(f"✗ {test_name} failed: {e}")
+            result = False
         results.append((test_name, result))
     
     # Summary
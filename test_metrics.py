@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test script for API metrics and the Prometheus exporter
+Runs entirely offline with a stubbed HTTP session
+"""
+
+import sys
+import json
+import requests
+from cloudflare_manager import CloudflareManager, CloudflareAccount
+from metrics import MetricsRegistry, ApiMetrics, endpoint_label
+
+
+def make_response(method, url, status, payload, headers=None, body=None):
+    """Build a real requests.Response without the network"""
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(payload).encode("utf-8")
+    response.headers.update(headers or {})
+    response.request = requests.Request(method, url, data=body).prepare()
+    response.url = url
+    return response
+
+
+def test_endpoint_label():
+    """Test that IDs and names are folded into placeholders"""
+    print("Testing endpoint normalization...")
+    base = CloudflareManager.BASE_URL
+    assert endpoint_label(f"{base}/zones/abc123/workers/routes/def456") == "/zones/:id/workers/routes/:id"
+    assert endpoint_label(f"{base}/accounts/acc/pages/projects/site/deployments") == \
+        "/accounts/:id/pages/projects/:id/deployments"
+    assert endpoint_label(f"{base}/zones?page=2") == "/zones"
+    print("✓ Endpoint labels have bounded cardinality")
+
+
+def test_request_metrics():
+    """Test counters, latency, retries, API errors and bytes"""
+    print("\nTesting request metrics...")
+    registry = MetricsRegistry()
+    api = ApiMetrics(registry)
+    account = CloudflareAccount(email="test@example.com", token="dummy-token", account_id="acc1")
+    cf = CloudflareManager(account, metrics=api)
+    url = f"{cf.BASE_URL}/zones/z1/workers/routes"
+    replies = [
+        make_response("POST", url, 429, {"success": False}, {"Retry-After": "0"}, body=b"x" * 10),
+        make_response("POST", url, 400, {"success": False, "errors": [{"code": 10020, "message": "bad"}]},
+                      body=b"x" * 10),
+    ]
+    cf.session.request = lambda method, url, **kwargs: replies.pop(0)
+
+    assert cf.create_worker_route("z1", "example.com/*", "api") is None
+
+    endpoint = "/zones/:id/workers/routes"
+    assert api.requests.value(method="POST", endpoint=endpoint, status="429") == 1
+    assert api.requests.value(method="POST", endpoint=endpoint, status="400") == 1
+    assert api.retries.value(endpoint=endpoint, reason="429") == 1
+    assert api.api_errors.value(endpoint=endpoint, code="10020") == 1
+    assert api.bytes_sent.value(endpoint=endpoint) == 20
+    assert api.latency.count(method="POST", endpoint=endpoint) == 2
+    print("✓ Requests, retries, errors and bytes recorded per endpoint")
+
+    text = registry.render()
+    assert "# TYPE cloudflare_api_request_duration_seconds histogram" in text
+    assert ('cloudflare_api_requests_total{method="POST",endpoint="/zones/:id/workers/routes",status="429"} 1'
+            in text)
+    assert ('cloudflare_api_request_duration_seconds_bucket{method="POST",'
+            'endpoint="/zones/:id/workers/routes",le="+Inf"} 2') in text
+    print("✓ Prometheus text rendered")
+
+
+if __name__ == "__main__":
+    test_endpoint_label()
+    test_request_metrics()
+    print("\n✅ All tests passed!")
+    sys.exit(0)
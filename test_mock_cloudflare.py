@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script running CloudflareManager end to end against the local mock API
+"""
+
+import os
+import sys
+import json
+import tempfile
+from mock_cloudflare import MockCloudflare, MockCloudflareServer
+from mock_manager import make_manager
+import benchmark
+
+
+def test_manager_against_mock():
+    """Test listing, Pages, worker and route operations over real HTTP"""
+    print("Testing manager against the mock API...")
+    with tempfile.TemporaryDirectory() as tmp, MockCloudflareServer(MockCloudflare(deploy_polls=2)) as server:
+        server.api.add_zones(120)
+        cf = make_manager(None, tmp, base_url=server.url)
+        assert cf.account.account_id == server.api.account_for("test-token")["id"]
+
+        assert len(list(cf.iter_zones(strict=True, stream=True))) == 120
+        assert len(cf.list_zones()) == 120
+        assert [z["name"] for z in cf.iter_zones(params={"name": "zone7.example.com"})] == ["zone7.example.com"]
+        zone = cf.create_zone("new-site.com")
+        assert cf.get_nameservers("new-site.com") == zone["name_servers"]
+        print("✓ Zones paginate, filter and create")
+
+        assert cf.create_pages_project("site")
+        for n in range(24):
+            cf.create_pages_project(f"extra{n}")
+        envelope = {}
+        assert len(list(cf.iter_pages_projects_page(3, envelope))) == 5
+        assert envelope["result_info"]["total_pages"] == 3 and envelope["result_info"]["total_count"] == 25
+        site = os.path.join(tmp, "site")
+        os.makedirs(site)
+        for name in ("index.html", "about.html"):
+            with open(os.path.join(site, name), "w", encoding="utf-8") as f:
+                f.write(name)
+        deployment = cf.deploy_pages_project("site", site, branch="preview")
+        assert deployment["files"] == 2 and deployment["deployment_trigger"]["metadata"]["branch"] == "preview"
+        waited = cf.wait_for_deployment("site", deployment["id"], timeout=10, initial_interval=0.01, max_interval=0.02)
+        assert waited["status"] == "success"
+        domains = cf.attach_pages_domains([("site", "www.example.com")], initial_interval=0.01,
+                                          max_interval=0.02, timeout=10)
+        assert domains[("site", "www.example.com")]["status"] == "active"
+        print("✓ Pages deploy and custom domain reach their final states")
+
+        worker = os.path.join(tmp, "worker.js")
+        with open(worker, "w", encoding="utf-8") as f:
+            f.write("export default { fetch() { return new Response('ok') } }")
+        uploaded = cf.upload_worker("api", worker, compatibility_flags=["nodejs_compat"])
+        assert uploaded["compatibility_flags"] == ["nodejs_compat"]
+        assert cf.upload_worker("api", worker, compatibility_flags=["nodejs_compat"], verify_remote=True)["skipped"]
+
+        route = cf.create_worker_route(zone["id"], "new-site.com/*", "api")
+        assert cf.create_worker_route(zone["id"], "new-site.com/*", "api") is None
+        assert cf.update_worker_route(zone["id"], route["id"], "new-site.com/api/*", "api")
+        assert [r["pattern"] for r in cf.list_worker_routes(zone["id"])] == ["new-site.com/api/*"]
+        assert cf.delete_worker_route(zone["id"], route["id"])
+        assert cf.add_worker_domain("api.new-site.com", "api", zone["id"])["zone_name"] == "new-site.com"
+        print("✓ Worker uploads, routes and domains round-trip")
+
+
+def test_benchmark_suite():
+    """Test a scaled-down benchmark run and regression detection"""
+    print("\nTesting benchmark suite...")
+    results = benchmark.run_benchmarks(list(benchmark.SCENARIOS), scale=0.01, concurrency=4)
+    assert set(results["scenarios"]) == set(benchmark.SCENARIOS)
+    assert results["scenarios"]["deploy"]["files"] == 100
+    assert results["scenarios"]["zones"]["zones"] >= 500
+    assert all(entry["requests"] > 0 for entry in results["scenarios"].values())
+    json.dumps(results)
+
+    slower = json.loads(json.dumps(results))
+    slower["scenarios"]["zones"]["seconds"] = results["scenarios"]["zones"]["seconds"] / 10
+    assert benchmark.compare(results, slower, threshold=0.2)[0].startswith("zones:")
+    assert benchmark.compare(results, results, threshold=0.2) == []
+    print("✓ Benchmarks run and regressions are flagged")
+
+
+if __name__ == "__main__":
+    test_manager_against_mock()
+    test_benchmark_suite()
+    print("\n✅ All tests passed!")
+    sys.exit(0)
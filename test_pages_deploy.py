@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for streamed Pages deploys with progress reporting
+Runs entirely offline with a stubbed request method
+"""
+
+import os
+import sys
+import json
+import hashlib
+import tempfile
+from email.parser import BytesParser
+from cloudflare_manager import CloudflareManager, CloudflareAccount
+
+
+class FakeResponse:
+    """Stand-in for a successful deployment response"""
+
+    def json(self):
+        return {"success": True, "result": {"id": "dep1", "url": "https://dep1.site.pages.dev",
+                                            "stages": [{"name": "queued"}]}}
+
+
+def test_deploy_progress():
+    """Test that files are streamed from disk and every phase is reported"""
+    print("Testing Pages deploy progress...")
+    account = CloudflareAccount(email="test@example.com", token="dummy-token", account_id="acc1")
+    cf = CloudflareManager(account)
+    sent = {}
+
+    def fake_request(method, url, **kwargs):
+        body = kwargs["data"]
+        chunks = []
+        while True:
+            chunk = body.read(4096)
+            if not chunk:
+                break
+            chunks.append(bytes(chunk))
+        sent["content_type"] = kwargs["headers"]["Content-Type"]
+        sent["raw"] = b"".join(chunks)
+        return FakeResponse()
+
+    cf._request = fake_request
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "assets"))
+        files = {"index.html": b"<h1>hi</h1>", "assets/app.bin": os.urandom(300_000)}
+        for name, content in files.items():
+            with open(os.path.join(tmp, name), "wb") as f:
+                f.write(content)
+
+        events = []
+        deployment = cf.deploy_pages_project("site", tmp, progress=lambda phase, info: events.append((phase, info)))
+
+    assert deployment["id"] == "dep1"
+    phases = [phase for phase, _ in events]
+    assert phases[0] == "scan" and phases[-1] == "processing"
+    assert {"hash", "upload"} <= set(phases)
+    hashed = [info for phase, info in events if phase == "hash"][-1]
+    assert hashed["files"] == hashed["total_files"] == 2
+    uploaded = [info for phase, info in events if phase == "upload"][-1]
+    assert uploaded["bytes"] == uploaded["total_bytes"] == len(sent["raw"])
+    assert uploaded["eta"] == 0 and uploaded["rate"] > 0
+    print("✓ Scan, hash, upload and processing phases reported")
+
+    message = BytesParser().parsebytes(f"Content-Type: {sent['content_type']}\r\n\r\n".encode() + sent["raw"])
+    parts = {part.get_param("name", header="content-disposition"): part for part in message.get_payload()}
+    manifest = json.loads(parts["manifest"].get_payload())
+    assert manifest == {name: hashlib.sha256(content).hexdigest() for name, content in files.items()}
+    assert parts["assets/app.bin"].get_payload(decode=True) == files["assets/app.bin"]
+    assert parts["index.html"].get_content_type() == "text/html"
+    assert parts["branch"].get_payload() == "main"
+    print("✓ Files streamed with a matching manifest")
+
+
+if __name__ == "__main__":
+    test_deploy_progress()
+    print("\n✅ All tests passed!")
+    sys.exit(0)
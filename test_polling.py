@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test script for rate limiting, adaptive polling and bulk domain attachment
+Runs entirely offline with stubbed API methods
+"""
+
+import sys
+from cloudflare_manager import CloudflareManager, CloudflareAccount, RateLimiter, AdaptivePoller
+
+
+class FakeClock:
+    """Deterministic clock whose sleep() just advances time"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def make_manager():
+    """Build a manager without touching the network"""
+    account = CloudflareAccount(email="test@example.com", token="test-token", account_id="test-account")
+    return CloudflareManager(account)
+
+
+def test_rate_limiter():
+    """Test that the token bucket spaces out requests beyond the burst"""
+    print("Testing rate limiter...")
+    clock = FakeClock()
+    limiter = RateLimiter(rate=2.0, burst=2, clock=clock, sleep=clock.sleep)
+
+    waits = [limiter.acquire() for _ in range(4)]
+
+    assert waits[:2] == [0.0, 0.0]
+    assert abs(clock.now - 1.0) < 1e-9
+    print("✓ Rate limiter enforces the configured rate")
+
+
+def test_adaptive_poller():
+    """Test backoff growth, urgent ordering and timeouts"""
+    print("\nTesting adaptive poller...")
+    clock = FakeClock()
+    poller = AdaptivePoller(initial_interval=1.0, max_interval=4.0, backoff=2.0, timeout=30.0,
+                            max_workers=1, clock=clock, sleep=clock.sleep)
+    seen = {"slow": [], "never": []}
+
+    def slow():
+        seen["slow"].append(clock.now)
+        return len(seen["slow"]) == 4, "ready", False
+
+    def never():
+        seen["never"].append(clock.now)
+        return False, None, True
+
+    poller.add("slow", slow)
+    poller.add("never", never)
+    outcomes = poller.run()
+
+    assert outcomes["slow"]["done"] and outcomes["slow"]["result"] == "ready"
+    assert seen["slow"] == [1.0, 3.0, 7.0, 11.0]
+    assert not outcomes["never"]["done"]
+    assert outcomes["never"]["elapsed"] >= 30.0
+    # Urgent items back off half as fast: intervals 1, 2, 2, 4, 4...
+    assert seen["never"][:4] == [1.0, 2.0, 4.0, 6.0]
+    print("✓ Poller backs off, prioritizes urgent items and times out")
+
+
+def test_attach_pages_domains():
+    """Test bulk attach with validation tracking"""
+    print("\nTesting bulk Pages domain attachment...")
+    cf = make_manager()
+    polls = {}
+
+    def add_pages_domain(project_name, domain_name):
+        if domain_name == "broken.example.com":
+            return None
+        return {"name": domain_name, "status": "initializing"}
+
+    def get_pages_domain(project_name, domain_name):
+        if domain_name == "broken.example.com":
+            return None
+        polls[domain_name] = polls.get(domain_name, 0) + 1
+        status = "active" if polls[domain_name] >= 2 else "pending"
+        if domain_name == "bad.example.com":
+            status = "blocked"
+        return {"name": domain_name, "status": status}
+
+    cf.add_pages_domain = add_pages_domain
+    cf.get_pages_domain = get_pages_domain
+
+    results = cf.attach_pages_domains(
+        [("site", "a.example.com"), ("site", "bad.example.com"), ("site", "broken.example.com")],
+        requests_per_second=1000, initial_interval=0.01, max_interval=0.02, timeout=5.0
+    )
+
+    assert results[("site", "a.example.com")]["status"] == "active"
+    assert results[("site", "bad.example.com")]["status"] == "blocked"
+    assert results[("site", "broken.example.com")]["status"] == "failed"
+    print("✓ Bulk attach tracks every domain to a final status")
+
+
+def test_wait_for_deployments():
+    """Test shared polling of several deployments with stage timings"""
+    print("\nTesting deployment waiting...")
+    cf = make_manager()
+    polls = {}
+
+    def stage(name, status, start=None, end=None):
+        return {"name": name, "status": status, "started_on": start, "ended_on": end}
+
+    def get_pages_deployment(project_name, deployment_id):
+        polls[deployment_id] = polls.get(deployment_id, 0) + 1
+        queued = stage("queued", "success", "2024-01-01T00:00:00Z", "2024-01-01T00:00:03Z")
+        init = stage("initialize", "success", "2024-01-01T00:00:03Z", "2024-01-01T00:00:04.5Z")
+        if deployment_id == "broken":
+            stages = [queued, stage("initialize", "failure", "2024-01-01T00:00:03Z", "2024-01-01T00:00:05Z")]
+        elif polls[deployment_id] < 3:
+            stages = [queued, init, stage("deploy", "active", "2024-01-01T00:00:04.5Z")]
+        else:
+            stages = [queued, init, stage("deploy", "success", "2024-01-01T00:00:04.5Z", "2024-01-01T00:00:10Z")]
+        latest = [s for s in stages if s["status"] != "idle"][-1]
+        return {"id": deployment_id, "url": f"https://{deployment_id}.site.pages.dev",
+                "stages": stages, "latest_stage": latest}
+
+    cf.get_pages_deployment = get_pages_deployment
+    results = cf.wait_for_deployments([("site", "good"), ("site", "broken")],
+                                      initial_interval=0.01, max_interval=0.02, timeout=5.0)
+
+    good = results[("site", "good")]
+    assert good["status"] == "success" and polls["good"] == 3
+    assert good["stages"] == {"queued": 3.0, "initialize": 1.5, "deploy": 5.5}
+    assert good["total"] == 10.0
+    assert results[("site", "broken")]["status"] == "failure"
+    print("✓ Deployments are tracked to completion with per-stage durations")
+
+
+if __name__ == "__main__":
+    test_rate_limiter()
+    test_adaptive_poller()
+    test_attach_pages_domains()
+    test_wait_for_deployments()
+    print("\n✅ All tests passed!")
+    sys.exit(0)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Test script for cache purge chunking, coalescing and purge-after-deploy
+Runs entirely offline against an in-process MockCloudflare
+"""
+
+import os
+import sys
+import tempfile
+import cli
+from functools import partial
+from mock_cloudflare import MockCloudflare
+from mock_manager import make_manager
+from purge import PurgeCoalescer, coalesce, changed_paths, pages_purge_urls
+
+
+class ManualTimer:
+    """Timer stand-in that only fires when the test flushes"""
+
+    def __init__(self, interval, function):
+        self.daemon = True
+        self.cancelled = False
+
+    def start(self):
+        pass
+
+    def cancel(self):
+        self.cancelled = True
+
+
+def purge_manager(api, tmp):
+    """Manager whose deployment waits poll quickly"""
+    cf = make_manager(api, tmp)
+    # Deploys with purge_zone wait for the deployment
+    cf.wait_for_deployment = partial(cf.wait_for_deployment, initial_interval=0.01, max_interval=0.02)
+    return cf
+
+
+def test_coalesce():
+    """Test de-duplication and targets covered by hosts or prefixes"""
+    print("Testing purge coalescing...")
+    targets = coalesce(
+        files=["https://a.example.com/x", "https://a.example.com/x", "https://b.example.com/assets/app.js",
+               "https://b.example.com/assetsx/app.js", {"url": "https://c.example.com/", "headers": {"Origin": "o"}},
+               {"url": "https://c.example.com/", "headers": {"Origin": "o"}}],
+        prefixes=["b.example.com/assets/img", "b.example.com/assets", "A.example.com/y"],
+        hosts=["A.example.com"], tags=["t1", "t1", "t2"])
+    assert targets == {"files": ["https://b.example.com/assetsx/app.js",
+                                 {"url": "https://c.example.com/", "headers": {"Origin": "o"}}],
+                       "prefixes": ["b.example.com/assets"], "hosts": ["a.example.com"], "tags": ["t1", "t2"]}
+
+    assert changed_paths({"a": "1", "b": "2", "gone": "3"}, {"a": "1", "b": "9", "new": "4"}) == ["b", "new", "gone"]
+    assert pages_purge_urls(["index.html", "docs/index.html", "about.html", "app.js"], ["www.example.com"]) == [
+        "https://www.example.com/index.html", "https://www.example.com/",
+        "https://www.example.com/docs/index.html", "https://www.example.com/docs/",
+        "https://www.example.com/about.html", "https://www.example.com/about",
+        "https://www.example.com/app.js"]
+    print("✓ Duplicates and covered targets are dropped")
+
+
+def test_chunked_purge():
+    """Test per-request limits and concurrent chunks"""
+    print("\nTesting chunked purge...")
+    api = MockCloudflare()
+    with tempfile.TemporaryDirectory() as tmp:
+        cf = purge_manager(api, tmp)
+        zone_id = api.add_zones(1)[0]
+        urls = [f"https://www.example.com/page{n}" for n in range(65)]
+        summary = cf.purge_cache(zone_id, files=urls + urls[:10], tags=[f"tag{n}" for n in range(31)])
+        assert summary == {"requests": 5, "purged": 96, "failed": 0, "errors": []}
+        sizes = sorted(len(body.get("files", body.get("tags"))) for _, body in api.purges)
+        assert sizes == [1, 5, 30, 30, 30]
+        assert cf.purge_cache(zone_id) == {"requests": 0, "purged": 0, "failed": 0, "errors": []}
+        assert cf.purge_cache(zone_id, files=urls, everything=True)["requests"] == 1
+        assert api.purges[-1][1] == {"purge_everything": True}
+        assert cf.purge_cache("missing", hosts=["a.example.com"])["failed"] == 1
+    print("✓ 96 targets go out as 5 requests of at most 30")
+
+
+def test_coalescer():
+    """Test that purges submitted within the window become one call"""
+    print("\nTesting purge window...")
+    calls = []
+    coalescer = PurgeCoalescer(lambda zone, **targets: calls.append((zone, targets)) or {"purged": 1},
+                               timer=ManualTimer)
+    first = coalescer.submit("z1", files=["https://a.example.com/1"])
+    second = coalescer.submit("z1", files=["https://a.example.com/1", "https://a.example.com/2"], tags=["t"])
+    other = coalescer.submit("z2", everything=True)
+    coalescer.submit("z2", hosts=["b.example.com"])
+    assert not first.done()
+    coalescer.flush()
+    assert first.result() == second.result() == other.result() == {"purged": 1}
+    assert calls[0] == ("z1", {"files": ["https://a.example.com/1", "https://a.example.com/1",
+                                         "https://a.example.com/2"], "prefixes": [], "hosts": [], "tags": ["t"]})
+    assert calls[1] == ("z2", {"everything": True})
+    coalescer.flush()
+    assert len(calls) == 2
+    print("✓ Pending purges per zone are merged into one call")
+
+
+def test_purge_after_deploy():
+    """Test that only changed files are purged after a Pages deploy"""
+    print("\nTesting purge after deploy...")
+    api = MockCloudflare(deploy_polls=0)
+    with tempfile.TemporaryDirectory() as tmp:
+        cf = purge_manager(api, tmp)
+        zone_id = api.add_zones(1)[0]
+        cf.create_pages_project("site")
+        site = os.path.join(tmp, "site")
+        os.makedirs(os.path.join(site, "docs"))
+        for name in ("index.html", "docs/index.html", "app.js"):
+            with open(os.path.join(site, name), "w", encoding="utf-8") as f:
+                f.write(name)
+
+        deployment = cf.deploy_pages_project("site", site, purge_zone=zone_id, purge_hosts=["www.example.com"])
+        assert deployment["purge"]["purged"] == 1 and api.purges[-1][1] == {"hosts": ["www.example.com"]}
+
+        with open(os.path.join(site, "docs", "index.html"), "w", encoding="utf-8") as f:
+            f.write("changed")
+        os.remove(os.path.join(site, "app.js"))
+        deployment = cf.deploy_pages_project("site", site, purge_zone=zone_id, purge_hosts=["www.example.com"])
+        assert deployment["purge"]["paths"] == 2
+        assert api.purges[-1][1] == {"files": ["https://www.example.com/docs/index.html",
+                                               "https://www.example.com/docs/",
+                                               "https://www.example.com/app.js"]}
+
+        count = len(api.purges)
+        deployment = cf.deploy_pages_project("site", site, purge_zone=zone_id, purge_hosts=["www.example.com"])
+        assert deployment["purge"]["requests"] == 0 and len(api.purges) == count
+    print("✓ Redeploys purge only the URLs of changed files")
+
+
+def test_purge_waits_for_live():
+    """Test that wait=False still purges only after the deployment is live"""
+    print("\nTesting purge timing...")
+    api = MockCloudflare(deploy_polls=0)
+    with tempfile.TemporaryDirectory() as tmp:
+        cf = purge_manager(api, tmp)
+        zone_id = api.add_zones(1)[0]
+        cf.create_pages_project("site")
+        site = os.path.join(tmp, "site")
+        os.makedirs(site)
+        with open(os.path.join(site, "index.html"), "w", encoding="utf-8") as f:
+            f.write("v1")
+        deployment = cf.deploy_pages_project("site", site, wait=False, purge_zone=zone_id,
+                                             purge_hosts=["www.example.com"])
+        assert deployment["wait"]["status"] == "success" and deployment["purge"]["purged"] == 1
+
+        # A deployment that never goes live purges nothing and keeps the stored manifest
+        with open(os.path.join(site, "index.html"), "w", encoding="utf-8") as f:
+            f.write("v2")
+        api.deploy_polls = 1000
+        count = len(api.purges)
+        deployment = cf.deploy_pages_project("site", site, wait=False, timeout=0.5, purge_zone=zone_id,
+                                             purge_hosts=["www.example.com"])
+        assert deployment["wait"]["status"] != "success" and "purge" not in deployment
+        assert len(api.purges) == count
+
+        api.deploy_polls = 0
+        deployment = cf.deploy_pages_project("site", site, purge_zone=zone_id, purge_hosts=["www.example.com"])
+        assert deployment["purge"]["paths"] == 1
+        assert api.purges[-1][1] == {"files": ["https://www.example.com/index.html", "https://www.example.com/"]}
+
+        # Without hosts there is nothing to purge, so the combination is refused
+        before = api.request_count
+        try:
+            cf.deploy_pages_project("site", site, purge_zone=zone_id)
+            assert False, "purge_zone without purge_hosts should be rejected"
+        except ValueError:
+            pass
+        assert api.request_count == before
+        original = cli.get_manager
+        cli.get_manager = lambda args: cf
+        try:
+            assert cli.main(["deploy", "site", site, "--purge-zone", zone_id]) == 1
+        finally:
+            cli.get_manager = original
+    print("✓ The purge follows a live deployment and is retried after a failed one")
+
+
+if __name__ == "__main__":
+    test_coalesce()
+    test_chunked_purge()
+    test_coalescer()
+    test_purge_after_deploy()
+    test_purge_waits_for_live()
+    print("\n✅ All tests passed!")
+    sys.exit(0)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Test script for R2 buckets, SigV4 signing and parallel multipart uploads
+Runs entirely offline against an in-process MockCloudflare
+"""
+
+import os
+import sys
+import tempfile
+import cli
+from mock_cloudflare import MockCloudflare
+from mock_manager import make_manager
+from sim_transport import MockTransport, SimProfile, SimulatedTransport
+from r2 import MIN_PART_SIZE, MAX_PARTS, PartReader, object_etag, plan_parts, sign_v4
+
+MIB = 1024 * 1024
+
+
+def r2_manager(api, tmp):
+    """Manager with R2 credentials that does not sleep between retries"""
+    cf = make_manager(api, tmp, sleep=lambda seconds: None)
+    account = cf.account
+    account.r2_access_key_id, account.r2_secret_access_key = api.add_r2_credentials(account.account_id)
+    return cf
+
+
+def write_file(path, size):
+    with open(path, "wb") as f:
+        f.write(bytes(range(256)) * (size // 256) + b"x" * (size % 256))
+    return path
+
+
+def test_signing():
+    """Test SigV4 against the AWS test suite's get-vanilla case"""
+    print("Testing SigV4 signing...")
+    authorization = sign_v4("GET", "https://example.amazonaws.com/", {"X-Amz-Date": "20150830T123600Z"},
+                            "AKIDEXAMPLE", "wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY", "20150830T123600Z",
+                            region="us-east-1", service="service")
+    assert authorization == ("AWS4-HMAC-SHA256 Credential=AKIDEXAMPLE/20150830/us-east-1/service/aws4_request, "
+                             "SignedHeaders=host;x-amz-date, "
+                             "Signature=5fa00fa31553b73ebf1942676e86291e8372ff2a2260956d9b8aae1d763fbf31")
+    print("✓ Signature matches the reference")
+
+
+def test_part_planning():
+    """Test part layout, the part count limit and zero-copy part readers"""
+    print("\nTesting part planning...")
+    assert plan_parts(12 * MIB, 5 * MIB) == [(0, 5 * MIB), (5 * MIB, 5 * MIB), (10 * MIB, 2 * MIB)]
+    assert plan_parts(0) == [(0, 0)]
+    huge = plan_parts(100 * 1024 * MIB, 5 * MIB)
+    assert len(huge) <= MAX_PARTS and huge[0][1] % MIB == 0
+    try:
+        plan_parts(10 * MIB, MIN_PART_SIZE - 1)
+        assert False, "parts below 5 MiB should be rejected"
+    except ValueError:
+        pass
+
+    data = bytearray(b"0123456789")
+    reader = PartReader(data, 2, 5)
+    assert len(reader) == 5 and bytes(reader.read(3)) == b"234" and bytes(reader.read()) == b"56"
+    assert isinstance(reader.read(1), memoryview)
+    reader.seek(0)
+    assert bytes(reader.read()) == b"23456"
+    reader.release()
+    assert object_etag(b"abc", [(0, 3)]) == "900150983cd24fb0d6963f7d28e17f72"
+    print("✓ Parts are planned within the limits and read without copies")
+
+
+def test_buckets_and_objects():
+    """Test bucket management and single-request objects"""
+    print("\nTesting buckets and objects...")
+    api = MockCloudflare()
+    with tempfile.TemporaryDirectory() as tmp:
+        cf = r2_manager(api, tmp)
+        assert cf.create_r2_bucket("media")
+        assert cf.create_r2_bucket("media") is None
+        assert [bucket["name"] for bucket in cf.list_r2_buckets()] == ["media"]
+
+        small = write_file(os.path.join(tmp, "logo.png"), 1000)
+        result = cf.upload_r2_object("media", "img/logo v2.png", small)
+        assert result["parts"] == 1 and not result["skipped"]
+        head = cf.head_r2_object("media", "img/logo v2.png")
+        assert head["size"] == 1000 and head["etag"] == result["etag"] and head["content_type"] == "image/png"
+        with open(small, "rb") as f:
+            assert cf.get_r2_object("media", "img/logo v2.png") == f.read()
+        assert cf.head_r2_object("media", "missing") is None
+
+        empty = write_file(os.path.join(tmp, "empty.txt"), 0)
+        assert cf.upload_r2_object("media", "empty.txt", empty)["size"] == 0
+        assert [obj["key"] for obj in cf.iter_r2_objects("media")] == ["empty.txt", "img/logo v2.png"]
+
+        assert not cf.delete_r2_bucket("media")
+        assert cf.delete_r2_object("media", "empty.txt") and cf.delete_r2_object("media", "img/logo v2.png")
+        assert cf.delete_r2_bucket("media") and cf.list_r2_buckets() == []
+
+        cf.account.r2_secret_access_key = "wrong"
+        assert cf.head_r2_object("missing", "x") is None and cf.upload_r2_object("media", "x", small) is None
+    print("✓ Buckets and objects are created, read, listed and deleted")
+
+
+def test_multipart_upload():
+    """Test a parallel multipart upload, ETag skipping and retried parts"""
+    print("\nTesting multipart upload...")
+    api = MockCloudflare()
+    with tempfile.TemporaryDirectory() as tmp:
+        cf = r2_manager(api, tmp)
+        cf.create_r2_bucket("media")
+        video = write_file(os.path.join(tmp, "video.mp4"), 12 * MIB + 123)
+
+        result = cf.upload_r2_object("media", "video.mp4", video, part_size=5 * MIB, max_workers=3)
+        assert result["parts"] == 3 and result["etag"].endswith("-3") and api.r2_parts_received == 3
+        with open(video, "rb") as f:
+            assert api.r2_objects[(cf.account.account_id, "media")]["video.mp4"]["body"] == f.read()
+        assert not api.r2_uploads
+
+        # Same content and part layout: skipped by ETag without sending anything
+        before = api.request_count
+        assert cf.upload_r2_object("media", "video.mp4", video, part_size=5 * MIB)["skipped"]
+        assert api.request_count - before == 1
+        # A different part layout has a different ETag, so the object is sent again
+        assert not cf.upload_r2_object("media", "video.mp4", video, part_size=6 * MIB)["skipped"]
+
+        # Parts answered with 503 are retried from the start of their range
+        flaky = SimulatedTransport(SimProfile(error_rate=0.3, error_statuses=(503,), seed=12),
+                                   inner=MockTransport(api), sleep=lambda seconds: None)
+        cf.r2_session.mount("https://", flaky)
+        result = cf.upload_r2_object("media", "again.mp4", video, part_size=5 * MIB, max_workers=1)
+        assert result and flaky.stats["errors"] > 0
+        stored = api.r2_objects[(cf.account.account_id, "media")]["again.mp4"]
+        assert len(stored["body"]) == 12 * MIB + 123 and stored["etag"] == result["etag"]
+    print("✓ 3 parts upload in parallel, unchanged files are skipped and failed parts retried")
+
+
+def test_directory_upload():
+    """Test directory uploads through the CLI"""
+    print("\nTesting directory upload...")
+    api = MockCloudflare()
+    with tempfile.TemporaryDirectory() as tmp:
+        cf = r2_manager(api, tmp)
+        cf.create_r2_bucket("assets")
+        site = os.path.join(tmp, "site")
+        os.makedirs(os.path.join(site, "img"))
+        for name, size in (("index.html", 300), ("img/a.jpg", 5000), ("img/b.jpg", 7000)):
+            write_file(os.path.join(site, name), size)
+        original = cli.get_manager
+        cli.get_manager = lambda args: cf
+        try:
+            assert cli.main(["r2", "upload", "assets", site, "--prefix", "v1/"]) == 0
+            assert sorted(api.r2_objects[(cf.account.account_id, "assets")]) == [
+                "v1/img/a.jpg", "v1/img/b.jpg", "v1/index.html"]
+            write_file(os.path.join(site, "img", "b.jpg"), 7001)
+            summary = cf.upload_r2_directory("assets", site, prefix="v1/")
+            assert summary == {"uploaded": 1, "skipped": 2, "failed": 0, "bytes": 7001}
+            assert cli.main(["r2", "upload", "assets", site, "--part-size", "1"]) == 1
+        finally:
+            cli.get_manager = original
+    print("✓ Only changed files are uploaded again")
+
+
+if __name__ == "__main__":
+    test_signing()
+    test_part_planning()
+    test_buckets_and_objects()
+    test_multipart_upload()
+    test_directory_upload()
+    print("\n✅ All tests passed!")
+    sys.exit(0)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test script for compact typed API records
+"""
+
+import sys
+from records import Zone, Deployment, WorkerRoute, iter_records, parse_time
+
+
+ZONE = {
+    "id": "023e105f4ecef8ad9ca31a8372d0c353",
+    "name": "example.com",
+    "status": "active",
+    "type": "full",
+    "paused": False,
+    "account": {"id": "acc1", "name": "Primary"},
+    "name_servers": ["ada.ns.cloudflare.com", "bob.ns.cloudflare.com"],
+    "created_on": "2024-01-01T05:20:00.12345Z",
+    "modified_on": "2024-01-02T05:20:00Z",
+    "meta": {"step": 2, "custom_certificate_quota": 0},
+    "plan": {"id": "free", "name": "Free Website"},
+}
+
+
+def test_zone_record():
+    """Test field extraction, slots and raw opt-in"""
+    print("Testing zone records...")
+    zone = Zone.from_api(ZONE)
+
+    assert zone.id == ZONE["id"]
+    assert zone.account_id == "acc1"
+    assert zone.name_servers == ("ada.ns.cloudflare.com", "bob.ns.cloudflare.com")
+    assert zone.raw is None
+    assert not hasattr(zone, "__dict__")
+    assert zone.created_at.year == 2024
+    assert zone.to_dict()["status"] == "active"
+
+    assert Zone.from_api(ZONE, keep_raw=True).raw is ZONE
+    print("✓ Zone records keep only the declared fields")
+
+
+def test_nested_and_extra_fields():
+    """Test nested paths and caller-supplied fields"""
+    print("\nTesting nested and extra fields...")
+    deployment = Deployment.from_api({
+        "id": "d1", "project_name": "site", "environment": "production",
+        "deployment_trigger": {"metadata": {"branch": "main"}},
+        "latest_stage": {"name": "deploy", "status": "success"},
+    })
+    assert (deployment.branch, deployment.stage, deployment.stage_status) == ("main", "deploy", "success")
+    assert deployment.modified_on is None
+
+    routes = list(iter_records(WorkerRoute, [{"id": "r1", "pattern": "example.com/*", "script": "api"}],
+                               zone_id="z1"))
+    assert routes[0].zone_id == "z1"
+    assert routes[0] == WorkerRoute.from_api({"id": "r1", "pattern": "example.com/*", "script": "api"},
+                                             zone_id="z1")
+    assert len({routes[0], WorkerRoute.from_api({"id": "r1", "pattern": "example.com/*", "script": "api"},
+                                                zone_id="z1")}) == 1
+    assert {routes[0]: "api"}[routes[0]] == "api"
+    print("✓ Nested paths and extra fields resolve")
+
+
+def test_parse_time():
+    """Test timestamps with any number of fraction digits (Python 3.10 only takes 3 or 6)"""
+    print("\nTesting timestamp parsing...")
+    assert parse_time("2024-01-02T03:04:04.5Z").microsecond == 500000
+    assert parse_time("2024-01-01T05:20:00.12345Z").microsecond == 123450
+    assert parse_time("2024-01-01T05:20:00.123456789Z").microsecond == 123456
+    assert parse_time("2024-01-01T05:20:00+00:00").utcoffset().total_seconds() == 0
+    assert parse_time("2024-01-01T05:20:00.1+02:00").hour == 5 and parse_time(None) is None
+    print("✓ Fractions of 1 to 9 digits parse")
+
+
+if __name__ == "__main__":
+    test_zone_record()
+    test_parse_time()
+    test_nested_and_extra_fields()
+    print("\n✅ All tests passed!")
+    sys.exit(0)
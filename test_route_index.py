@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test script for the worker route index: pattern parsing, URL matching and conflict detection
+Runs entirely offline against an in-process MockCloudflare
+"""
+
+import os
+import sys
+import time
+import tempfile
+import cli
+from cloudflare_manager import CloudflareManager, CloudflareAccount, StateStore
+from mock_cloudflare import MockCloudflare
+from sim_transport import MockTransport
+from route_index import HOST_ANY, HOST_SUBDOMAINS, RouteIndex, RoutePatternError, overlap_url, parse_pattern
+
+
+ROUTES = [
+    {"pattern": "shop.example.com/api/*", "script": "api"},
+    {"pattern": "*.example.com/*", "script": "edge"},
+    {"pattern": "*example.com/static/*", "script": "static"},
+    {"pattern": "example.com/login", "script": "auth"},
+    {"pattern": "https://shop.example.com/api/v2/*", "script": "api-v2"},
+]
+
+
+def test_patterns():
+    """Test parsing and validation of route patterns"""
+    print("Testing route patterns...")
+    pattern = parse_pattern("HTTPS://*.Example.com/api/*")
+    assert (pattern.host, pattern.host_kind, pattern.path, pattern.prefix) == ("example.com", HOST_SUBDOMAINS,
+                                                                              "/api/", True)
+    assert str(pattern) == "*.example.com/api/*"
+    assert parse_pattern("*example.com").host_kind == HOST_ANY and parse_pattern("example.com").path == "/"
+    for bad in ("shop.*.example.com/*", "example.com/a*b", "example.com:8080/*", "*", "example.com/?q=1"):
+        try:
+            parse_pattern(bad)
+            assert False, f"{bad} should be rejected"
+        except RoutePatternError:
+            pass
+    assert overlap_url(parse_pattern("*.example.com/*"), parse_pattern("example.com/*")) is None
+    assert overlap_url(parse_pattern("*example.com/a/*"), parse_pattern("x.example.com/a/b")) == \
+        "https://x.example.com/a/b"
+    print("✓ Host and path wildcards are parsed and misplaced ones rejected")
+
+
+def test_matching():
+    """Test that the most specific route wins"""
+    print("\nTesting URL matching...")
+    index = RouteIndex(ROUTES)
+    cases = {
+        "https://shop.example.com/api/v2/x": "api-v2",
+        "shop.example.com/api/x?debug=1": "api",
+        "http://shop.example.com:8443/": "edge",
+        "https://a.b.example.com/static/x.css": "static",
+        "https://example.com/static/x.css": "static",
+        "https://example.com/login": "auth",
+        "https://example.com/login/": None,
+        "https://example.com/": None,
+        "https://example.org/": None,
+        "https://notexample.com/static/x": None,
+    }
+    for url, script in cases.items():
+        route = index.match(url)
+        assert (route and route["script"]) == script, (url, route)
+
+    # A more specific host beats a longer path on a wildcard host
+    index.add({"pattern": "*.shop.example.com/*", "script": "tenant"})
+    assert index.match("https://a.shop.example.com/static/x")["script"] == "tenant"
+
+    big = RouteIndex({"pattern": f"s{n}.zone{n % 50}.example.com/p{n % 7}/*", "script": f"w{n}"}
+                     for n in range(10000))
+    urls = [f"https://s{n}.zone{n % 50}.example.com/p{n % 7}/deep/path" for n in range(0, 10000, 7)]
+    started = time.perf_counter()
+    for url in urls:
+        assert big.match(url) is not None
+    per_lookup = (time.perf_counter() - started) / len(urls)
+    assert per_lookup < 0.001, per_lookup
+    print(f"✓ The most specific route wins; {per_lookup * 1e6:.1f}µs per lookup over 10,000 routes")
+
+
+def test_conflicts():
+    """Test duplicate and overlap reports"""
+    print("\nTesting conflict detection...")
+    index = RouteIndex(ROUTES + [{"pattern": "*.example.com/*", "script": "other"},
+                                 {"pattern": "shop.example.com/*", "script": "edge"}])
+    found = {(c["kind"], c["winner"]["script"], c["shadowed"]["script"]) for c in index.conflicts()}
+    assert ("duplicate", "edge", "other") in found
+    assert ("overlap", "api-v2", "api") in found and ("overlap", "api", "edge") in found
+    assert ("overlap", "edge", "static") in found
+    # Overlaps between routes of the same script, and routes that never meet, are not reported
+    assert not any("auth" in pair for pair in found)
+    assert ("overlap", "edge", "edge") not in found and ("overlap", "api", "other") in found
+
+    issues = index.check("example.com/*", "site")
+    # On the apex an exact host beats *example.com, whatever the path
+    assert {(issue["route"]["script"], issue["winner"]) for issue in issues} == {("auth", "existing"),
+                                                                                ("static", "new")}
+    assert [issue["kind"] for issue in index.check("https://example.com/login", "auth")] == ["duplicate"]
+    assert index.check("other.org/*", "x") == []
+    print("✓ Duplicates and shadowed routes are reported with an example URL")
+
+
+def test_manager_and_cli():
+    """Test the pre-check in create_worker_route and the routes commands"""
+    print("\nTesting create_worker_route check and CLI...")
+    api = MockCloudflare()
+    with tempfile.TemporaryDirectory() as tmp:
+        account = CloudflareAccount(email="test@example.com", token="routes-token")
+        cf = CloudflareManager(account, state=StateStore(os.path.join(tmp, "state.json")),
+                               transport=MockTransport(api))
+        zone_id = cf.create_zone("example.com")["id"]
+        assert cf.create_worker_route(zone_id, "example.com/*", "site", check=True)
+        assert cf.create_worker_route(zone_id, "example.com/api/*", "api", check=True)
+        before = api.request_count
+        assert cf.create_worker_route(zone_id, "example.com/*", "other", check=True) is None
+        assert api.request_count - before == 1
+        assert cf.create_worker_route(zone_id, "example.com/a*b", "x", check=True) is None
+        assert len(cf.list_worker_routes(zone_id)) == 2
+
+        original = cli.get_manager
+        cli.get_manager = lambda args: cf
+        try:
+            assert cli.main(["routes", "match", "https://example.com/api/x", "https://example.com/",
+                             "--zone", "example.com"]) == 0
+            assert cli.main(["routes", "conflicts", "example.com"]) == 1
+        finally:
+            cli.get_manager = original
+        index = cf.worker_route_index([zone_id])
+        assert index.match("example.com/api/x")["zone_id"] == zone_id
+    print("✓ Duplicates are stopped before they are sent and overlaps reported")
+
+
+if __name__ == "__main__":
+    test_patterns()
+    test_matching()
+    test_conflicts()
+    test_manager_and_cli()
+    print("\n✅ All tests passed!")
+    sys.exit(0)
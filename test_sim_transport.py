@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test script for the simulated transport: injected faults, virtual time and record/replay
+Runs entirely offline against an in-process MockCloudflare
+"""
+
+import os
+import sys
+import tempfile
+import requests
+from mock_cloudflare import MockCloudflare
+from mock_manager import make_manager
+from sim_transport import (SimulatedTransport, SimProfile, SimClock, MockTransport, RecordingTransport,
+                           ReplayTransport, fixed, lognormal)
+
+
+def run_profile(profile, requests_count=200):
+    """Send GETs straight through a transport and return (statuses, transport)"""
+    clock = SimClock()
+    transport = SimulatedTransport(profile, MockTransport(), clock=clock.time, sleep=clock.sleep)
+    session = requests.Session()
+    session.headers["Authorization"] = "Bearer sim-token"
+    session.mount("https://", transport)
+    statuses = []
+    for _ in range(requests_count):
+        try:
+            statuses.append(session.get("https://api.cloudflare.com/client/v4/zones").status_code)
+        except requests.exceptions.ConnectionError:
+            statuses.append("reset")
+    return statuses, transport, clock
+
+
+def test_deterministic_faults():
+    """Test that a seed reproduces the same faults and simulated timings"""
+    print("Testing deterministic fault injection...")
+    profile = SimProfile(latency=lognormal(0.05, 0.8), error_rate=0.05, error_burst=3, reset_rate=0.02,
+                         throttle_rate=0.05, retry_after=2, seed=42)
+    first, transport, clock = run_profile(profile)
+    second, _, clock2 = run_profile(profile)
+    assert first == second and clock.time() == clock2.time()
+    assert {429, "reset", 200} <= set(first) and {500, 502, 503} & set(first)
+    assert transport.stats["requests"] == 200 and transport.stats["resets"] == first.count("reset")
+    assert transport.percentile(0.99) > transport.percentile(0.5) > 0
+    # Every burst of 5xx runs for error_burst requests unless interrupted by a reset
+    errors = [n for n, status in enumerate(first) if status in (500, 502, 503)]
+    assert len(errors) >= 3
+    print(f"✓ Same seed, same outcome ({transport.stats})")
+
+
+def test_rate_limit_and_bandwidth():
+    """Test the server-side token bucket and bandwidth caps in virtual time"""
+    print("\nTesting rate limit and bandwidth caps...")
+    statuses, transport, _ = run_profile(SimProfile(rate_limit=(1.0, 5)), requests_count=10)
+    assert statuses == [200] * 5 + [429] * 5
+
+    clock = SimClock()
+    transport = SimulatedTransport(SimProfile(latency=fixed(0.1), download_bps=1000), MockTransport(),
+                                   clock=clock.time, sleep=clock.sleep)
+    session = requests.Session()
+    session.headers["Authorization"] = "Bearer sim-token"
+    session.mount("https://", transport)
+    response = session.get("https://api.cloudflare.com/client/v4/accounts")
+    assert abs(clock.time() - (0.1 + len(response.content) / 1000)) < 1e-9
+    print("✓ Excess requests are throttled and slow links take proportionally longer")
+
+
+def test_manager_retries_in_virtual_time():
+    """Test the manager's 429 handling against simulated throttling without real sleeps"""
+    print("\nTesting manager retries under throttling...")
+    clock = SimClock()
+    profile = SimProfile(latency=fixed(0.2), rate_limit=(0.5, 2))
+    transport = SimulatedTransport(profile, MockTransport(MockCloudflare()), clock=clock.time, sleep=clock.sleep)
+    with tempfile.TemporaryDirectory() as tmp:
+        cf = make_manager(None, tmp, transport, token="sim-token", sleep=clock.sleep)
+        cf.max_retries = 10
+        transport.inner.api.add_zones(3)
+        for _ in range(4):
+            assert len(cf.list_zones()) == 3
+    assert transport.stats["throttled"] > 0
+    # Past the burst of 2, successful requests are paced at the bucket's 0.5/s
+    served = transport.stats["requests"] - transport.stats["throttled"]
+    assert clock.time() >= (served - 2) / 0.5
+    print(f"✓ {transport.stats['throttled']} throttled request(s) retried in {clock.time():.0f} virtual seconds")
+
+
+def test_record_and_replay():
+    """Test replaying a recorded session offline"""
+    print("\nTesting record and replay...")
+    api = MockCloudflare()
+    api.add_zones(60)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "session.jsonl")
+        recorder = RecordingTransport(path, MockTransport(api))
+        recorded = make_manager(None, tmp, recorder, token="sim-token")
+        zones = [zone["name"] for zone in recorded.list_zones()]
+        recorder.close()
+        with open(path, "r", encoding="utf-8") as f:
+            assert "sim-token" not in f.read()
+
+        replay = ReplayTransport(path, strict=True)
+        replayed = make_manager(None, tmp, replay, token="sim-token")
+        assert replayed.account.account_id == recorded.account.account_id
+        assert [zone["name"] for zone in replayed.list_zones()] == zones
+        assert len(replay.elapsed()) == api.request_count
+        try:
+            replayed.list_zones()
+            assert False, "strict replay should run out of responses"
+        except requests.exceptions.ConnectionError:
+            pass
+    print("✓ Recorded exchanges replay in order without the API")
+
+
+if __name__ == "__main__":
+    test_deterministic_faults()
+    test_rate_limit_and_bandwidth()
+    test_manager_retries_in_virtual_time()
+    test_record_and_replay()
+    print("\n✅ All tests passed!")
+    sys.exit(0)
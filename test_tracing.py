@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for tracing spans and exporters
+Runs entirely offline with a stubbed HTTP session
+"""
+
+import os
+import sys
+import json
+import tempfile
+import requests
+from cloudflare_manager import CloudflareManager, CloudflareAccount
+from tracing import Tracer, JsonFileExporter, OTLPExporter, NOOP_SPAN, otlp_span
+
+
+class ListExporter:
+    """Collects finished spans in memory"""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def shutdown(self):
+        pass
+
+
+def fake_session_request(method, url, **kwargs):
+    """Consume the body like a real upload and answer with a created deployment"""
+    body = kwargs.get("data")
+    response = requests.Response()
+    response.request = requests.Request(method, url, headers=kwargs.get("headers"), data=body).prepare()
+    while body is not None and body.read(65536):
+        pass
+    response.status_code = 200
+    response._content = json.dumps({"success": True, "result": {"id": "dep1", "url": "https://x"}}).encode()
+    return response
+
+
+def test_disabled_tracer():
+    """Test that a tracer without exporters hands out the shared no-op span"""
+    print("Testing disabled tracer...")
+    tracer = Tracer()
+    assert not tracer.enabled
+    with tracer.span("anything") as span:
+        assert span is NOOP_SPAN
+    print("✓ No spans are created while tracing is off")
+
+
+def test_deploy_spans():
+    """Test the phase spans of a Pages deploy and their request children"""
+    print("\nTesting deploy spans...")
+    exporter = ListExporter()
+    account = CloudflareAccount(email="test@example.com", token="dummy-token", account_id="acc1")
+    cf = CloudflareManager(account, tracer=Tracer([exporter]))
+    cf.session.request = fake_session_request
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("index.html", "app.js"):
+            with open(os.path.join(tmp, name), "w", encoding="utf-8") as f:
+                f.write("x" * 100)
+        assert cf.deploy_pages_project("site", tmp)["id"] == "dep1"
+
+    spans = {span.name: span for span in exporter.spans}
+    root = spans["pages.deploy"]
+    assert root.parent_id is None and root.attributes["pages.project"] == "site"
+    assert root.attributes["pages.deployment_id"] == "dep1"
+    for phase in ("scan", "hash", "multipart", "upload"):
+        assert spans[f"pages.deploy.{phase}"].parent_id == root.span_id
+    assert spans["pages.deploy.scan"].attributes == {"files": 2, "bytes": 200}
+    request = spans["cloudflare.request"]
+    assert request.parent_id == spans["pages.deploy.upload"].span_id
+    assert request.attributes["cloudflare.endpoint"] == "/accounts/:id/pages/projects/:id/deployments"
+    assert request.attributes["http.request_bytes"] == spans["pages.deploy.multipart"].attributes["bytes"]
+    assert len({span.trace_id for span in exporter.spans}) == 1
+    print("✓ Deploy phases and the upload request share one trace")
+
+
+def test_exporters():
+    """Test the JSON file and OTLP payload formats"""
+    print("\nTesting exporters...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trace.jsonl")
+        tracer = Tracer([JsonFileExporter(path)])
+        try:
+            with tracer.span("outer", {"files": 3}):
+                with tracer.span("inner"):
+                    raise ValueError("boom")
+        except ValueError:
+            pass
+        with open(path, "r", encoding="utf-8") as f:
+            inner, outer = [json.loads(line) for line in f]
+        assert inner["parent_id"] == outer["span_id"] and inner["error"] == "ValueError: boom"
+        assert outer["attributes"] == {"files": 3} and outer["duration"] >= 0
+    print("✓ JSON trace file written")
+
+    exporter = OTLPExporter("http://127.0.0.1:9/v1/traces", service_name="test", flush_interval=60)
+    tracer = Tracer([ListExporter()])
+    with tracer.span("call", {"bytes": 5, "ok": True}, kind="client") as span:
+        pass
+    payload = exporter.payload([span])
+    data = payload["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert data == otlp_span(span)
+    assert data["kind"] == 3 and data["status"] == {"code": 1}
+    assert {"key": "bytes", "value": {"intValue": "5"}} in data["attributes"]
+    assert len(data["traceId"]) == 32 and len(data["spanId"]) == 16
+    print("✓ OTLP/JSON payload built")
+
+
+if __name__ == "__main__":
+    test_disabled_tracer()
+    test_deploy_spans()
+    test_exporters()
+    print("\n✅ All tests passed!")
+    sys.exit(0)
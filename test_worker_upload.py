@@ -3,8 +3,12 @@
 Test script to verify Worker upload functionality
 """
 
-from cloudflare_manager import CloudflareManager, CloudflareAccount
+from cloudflare_manager import CloudflareManager, CloudflareAccount, StateStore, MultiAccountManager
+from worker_bundle import WorkerBundle, WorkerModule, ESM, COMMONJS, WASM, DATA
+from email.parser import BytesParser
 import os
+import tempfile
+import threading
 
 def test_upload_worker_format():
     """Test that upload_worker method has correct signature"""
@@ -43,5 +47,167 @@ def test_upload_worker_format():
     
     print("\n✅ All tests passed!")
 
+class FakeResponse:
+    """Stand-in for a successful upload response"""
+
+    def __init__(self, etag):
+        self.etag = etag
+
+    def json(self):
+        return {"success": True, "result": {"id": "my-worker", "etag": self.etag}}
+
+
+def test_skip_unchanged_upload():
+    """Test that identical uploads are skipped and changes are uploaded"""
+    print("Testing unchanged upload detection...\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        account = CloudflareAccount(email="test@example.com", token="dummy-token", account_id="acc1")
+        cf = CloudflareManager(account, state=StateStore(os.path.join(tmp, "state.json")))
+        uploads = []
+
+        def fake_request(method, url, **kwargs):
+            uploads.append(kwargs["data"])
+            return FakeResponse(f"etag-{len(uploads)}")
+
+        cf._request = fake_request
+        worker = os.path.join(tmp, "worker.js")
+        with open(worker, "w", encoding="utf-8") as f:
+            f.write("export default { fetch() { return new Response('hi') } }")
+
+        assert not cf.upload_worker("my-worker", worker).get("skipped")
+        assert cf.upload_worker("my-worker", worker)["skipped"]
+        assert len(uploads) == 1
+        print("✓ Identical upload skipped")
+
+        bindings = [{"type": "kv_namespace", "name": "KV", "namespace_id": "ns1"}]
+        assert not cf.upload_worker("my-worker", worker, bindings=bindings).get("skipped")
+        assert cf.upload_worker("my-worker", worker, force=True)["etag"] == "etag-3"
+        assert len(uploads) == 3
+        print("✓ Changed bindings and force trigger uploads")
+
+        # A remote etag that no longer matches the recorded one forces a re-upload
+        cf.list_workers = lambda strict=False: [{"id": "my-worker", "etag": "someone-else"}]
+        assert not cf.upload_worker("my-worker", worker, verify_remote=True).get("skipped")
+        assert len(uploads) == 4
+        print("✓ Remote etag mismatch triggers upload")
+
+
+def test_bundle_multipart():
+    """Test module detection and the streamed multipart body"""
+    print("Testing multi-module worker bundles...\n")
+    wasm = bytes([0x00, 0x61, 0x73, 0x6d, 0x01, 0x00, 0x00, 0x00, 0xff, 0x0d, 0x0a])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "lib"))
+        files = {"index.js": b"import add from './add.wasm'; export default {}",
+                 "lib/util.cjs": b"module.exports = 1", "add.wasm": wasm, ".env": b"SECRET=1"}
+        for name, content in files.items():
+            with open(os.path.join(tmp, name), "wb") as f:
+                f.write(content)
+
+        bundle = WorkerBundle.from_path(tmp)
+        types = {module.name: module.content_type for module in bundle.modules}
+        assert bundle.main_module == "index.js"
+        assert types == {"index.js": ESM, "lib/util.cjs": COMMONJS, "add.wasm": WASM}
+        print("✓ Bundle directory modules detected")
+
+        extra = WorkerModule(name="blob", content=memoryview(b"\x00\x01"), content_type=DATA)
+        bundle = WorkerBundle(bundle.modules + [extra], "index.js")
+        metadata = bundle.metadata(compatibility_date="2024-09-23", compatibility_flags=["nodejs_compat"])
+        body = bundle.multipart(metadata)
+        chunks = []
+        while True:
+            chunk = body.read(7)
+            if not chunk:
+                break
+            chunks.append(bytes(chunk))
+        raw = b"".join(chunks)
+        assert len(raw) == len(body)
+
+        message = BytesParser().parsebytes(f"Content-Type: {body.content_type}\r\n\r\n".encode() + raw)
+        parts = {part.get_param("name", header="content-disposition"): part for part in message.get_payload()}
+        assert parts["add.wasm"].get_payload(decode=True) == wasm
+        assert parts["add.wasm"].get_content_type() == WASM
+        assert parts["blob"].get_payload(decode=True) == b"\x00\x01"
+        assert '"nodejs_compat"' in parts["metadata"].get_payload()
+
+        # Retries rewind the body and send it again
+        body.seek(0)
+        assert body.read() == raw
+        print("✓ Multipart body streams every part byte-for-byte")
+
+
+def test_broadcast_worker():
+    """Test concurrent upload of one bundle to several accounts"""
+    print("Testing worker broadcast...\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        worker = os.path.join(tmp, "worker.js")
+        with open(worker, "w", encoding="utf-8") as f:
+            f.write("export default { fetch() { return new Response('edge') } }")
+
+        multi = MultiAccountManager()
+        bodies = []
+        for name in ("customer-a", "customer-b", "customer-c"):
+            account = CloudflareAccount(email="ops@example.com", token="shared", account_id=f"id-{name}")
+            manager = CloudflareManager(account, state=StateStore(os.path.join(tmp, "state.json")),
+                                        rate_limiter=multi._limiter_for("ops@example.com", "shared"))
+
+            def fake_request(method, url, name=name, **kwargs):
+                if name == "customer-c":
+                    raise ConnectionError("reset by peer")
+                bodies.append(bytes(kwargs["data"].read()))
+                return FakeResponse(f"etag-{name}")
+
+            manager._request = fake_request
+            manager.create_worker_route = lambda zone_id, pattern, script: {"id": "r1"}
+            multi.accounts[name] = manager
+
+        results = multi.broadcast_worker("edge", worker, routes={"customer-a": [("zone-a", "a.example.com/*")]})
+
+        assert results["customer-a"]["upload"] == "uploaded"
+        assert results["customer-a"]["routes"] == [{"zone_id": "zone-a", "pattern": "a.example.com/*", "ok": True}]
+        assert results["customer-b"]["upload"] == "uploaded" and results["customer-b"]["routes"] == []
+        assert results["customer-c"]["error"] == "reset by peer"
+        assert "total" in results["customer-c"]["timings"]
+        assert len(bodies) == 2 and b"Response('edge')" in bodies[0]
+        assert multi.accounts["customer-a"].rate_limiter is multi.accounts["customer-b"].rate_limiter
+        print("✓ Broadcast returns a per-account result matrix")
+
+
+def test_shared_state_file():
+    """Test that separate stores on one state file never lose each other's keys"""
+    print("Testing concurrent state stores...\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "state.json")
+        errors = []
+
+        def write(n):
+            store = StateStore(path)
+            for i in range(200):
+                try:
+                    store.set(f"worker-{n}", {"digest": i})
+                except OSError as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        store = StateStore(path)
+        assert not errors
+        assert [store.get(f"worker-{n}") for n in range(8)] == [{"digest": 199}] * 8
+        assert os.listdir(tmp) == ["state.json"]
+        print("✓ Eight stores on one file keep every key")
+
+
 if __name__ == "__main__":
     test_upload_worker_format()
+    test_skip_unchanged_upload()
+    test_bundle_multipart()
+    test_broadcast_worker()
+    test_shared_state_file()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Optional tracing of Cloudflare API calls and deploy phases
+
+Spans are only created when an exporter is configured; otherwise every
+tracer call returns a shared no-op span. Two exporters are built in:
+
+- JsonFileExporter: one JSON object per finished span, appended to a file
+- OTLPExporter: batches spans to an OpenTelemetry collector over OTLP/HTTP JSON
+
+Configuration from the environment (read by get_tracer() on first use):
+    CLOUDFLARE_TRACE_FILE=trace.jsonl
+    OTEL_EXPORTER_OTLP_ENDPOINT=http://localhost:4318   (or OTEL_EXPORTER_OTLP_TRACES_ENDPOINT)
+    OTEL_EXPORTER_OTLP_HEADERS=api-key=secret
+    OTEL_SERVICE_NAME=cloudflare-manager
+"""
+
+import os
+import json
+import time
+import queue
+import atexit
+import threading
+import functools
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+
+class Span:
+    """A timed operation with attributes, events and an error status"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "kind", "start_ns", "end_ns",
+                 "attributes", "events", "error", "_tracer", "_token")
+
+    enabled = True
+
+    def __init__(self, tracer: "Tracer", name: str, parent: Optional["Span"], kind: str,
+                 attributes: Optional[Dict[str, Any]]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = dict(attributes) if attributes else {}
+        self.events: List[Dict] = []
+        self.error: Optional[str] = None
+        self._tracer = tracer
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]):
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": attributes or {}})
+
+    def record_exception(self, error: BaseException):
+        self.error = f"{type(error).__name__}: {error}"
+        self.add_event("exception", {"exception.type": type(error).__name__, "exception.message": str(error)})
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self._tracer.export(self)
+
+    @property
+    def duration(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name, "trace_id": self.trace_id, "span_id": self.span_id,
+            "parent_id": self.parent_id, "kind": self.kind, "start": self.start_ns / 1e9,
+            "duration": self.duration, "attributes": self.attributes, "events": self.events,
+            "error": self.error,
+        }
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.record_exception(exc)
+        _current_span.reset(self._token)
+        self.end()
+        return False
+
+
+class _NoopSpan:
+    """Stand-in returned while tracing is disabled; every method does nothing"""
+
+    __slots__ = ()
+    enabled = False
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]):
+        pass
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        pass
+
+    def record_exception(self, error: BaseException):
+        pass
+
+    def end(self):
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("cloudflare_current_span", default=None)
+
+
+def current_span():
+    """The innermost active span in this context, or the no-op span"""
+    return _current_span.get() or NOOP_SPAN
+
+
+class Tracer:
+    """Creates spans and hands finished ones to its exporters"""
+
+    def __init__(self, exporters: Optional[List[Any]] = None, service_name: str = "cloudflare-manager"):
+        self.exporters = list(exporters or [])
+        self.service_name = service_name
+        self.enabled = bool(self.exporters)
+
+    def span(self, name: str, attributes: Optional[Dict[str, Any]] = None, kind: str = "internal"):
+        """Start a span as a child of the current one; use it as a context manager"""
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, _current_span.get(), kind, attributes)
+
+    def export(self, span: Span):
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception as e:
+                print(f"✗ Trace export failed: {e}")
+
+    def shutdown(self):
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+
+def traced(name: str) -> Callable:
+    """Wrap a method in a span taken from self.tracer; skipped entirely when disabled"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            if not self.tracer.enabled:
+                return fn(self, *args, **kwargs)
+            with self.tracer.span(name):
+                return fn(self, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class JsonFileExporter:
+    """Appends each finished span to a file as one JSON line"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def shutdown(self):
+        pass
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+# OTLP span kinds and status codes
+_OTLP_KINDS = {"internal": 1, "server": 2, "client": 3}
+_STATUS_OK, _STATUS_ERROR = 1, 2
+
+
+def otlp_span(span: Span) -> Dict[str, Any]:
+    """Convert a span to the OTLP/JSON representation"""
+    data = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": _OTLP_KINDS.get(span.kind, 1),
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": _otlp_attributes(span.attributes),
+        "events": [{"name": event["name"], "timeUnixNano": str(event["time_ns"]),
+                    "attributes": _otlp_attributes(event["attributes"])} for event in span.events],
+        "status": {"code": _STATUS_ERROR, "message": span.error} if span.error else {"code": _STATUS_OK},
+    }
+    if span.parent_id:
+        data["parentSpanId"] = span.parent_id
+    return data
+
+
+class OTLPExporter:
+    """Sends spans to an OpenTelemetry collector (OTLP/HTTP JSON) from a background thread
+
+    Spans are batched up to `batch_size` or for at most `flush_interval`
+    seconds; when the queue is full new spans are dropped rather than
+    slowing down API calls.
+    """
+
+    def __init__(self, endpoint: str, headers: Optional[Dict[str, str]] = None,
+                 service_name: str = "cloudflare-manager", batch_size: int = 256,
+                 flush_interval: float = 5.0, max_queue: int = 10000, timeout: float = 10.0):
+        import requests
+
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.dropped = 0
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json", **(headers or {})})
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(max_queue)
+        self._thread = threading.Thread(target=self._run, name="otlp-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span):
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        batch: List[Span] = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                span = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                span = False
+            if span:
+                batch.append(span)
+            if span is None or len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                if batch:
+                    self._send(batch)
+                    batch = []
+                deadline = time.monotonic() + self.flush_interval
+            if span is None:
+                return
+
+    def payload(self, spans: List[Span]) -> Dict[str, Any]:
+        return {"resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+            "scopeSpans": [{"scope": {"name": "cloudflare_manager"}, "spans": [otlp_span(s) for s in spans]}],
+        }]}
+
+    def _send(self, spans: List[Span]):
+        try:
+            response = self.session.post(self.endpoint, data=json.dumps(self.payload(spans)),
+                                         timeout=self.timeout)
+            if response.status_code >= 400:
+                print(f"✗ OTLP export rejected ({response.status_code}): {response.text[:200]}")
+        except Exception as e:
+            print(f"✗ OTLP export failed: {e}")
+
+    def shutdown(self):
+        """Flush queued spans and stop the background thread"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(self.timeout)
+
+
+def tracer_from_env() -> Tracer:
+    """Build a tracer from CLOUDFLARE_TRACE_FILE / OTEL_* variables; disabled when none are set"""
+    service_name = os.getenv("OTEL_SERVICE_NAME", "cloudflare-manager")
+    exporters = []
+    trace_file = os.getenv("CLOUDFLARE_TRACE_FILE")
+    if trace_file:
+        exporters.append(JsonFileExporter(trace_file))
+    endpoint = os.getenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT")
+    if not endpoint and os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+        endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT").rstrip("/") + "/v1/traces"
+    if endpoint:
+        headers = dict(pair.split("=", 1) for pair in os.getenv("OTEL_EXPORTER_OTLP_HEADERS", "").split(",")
+                       if "=" in pair)
+        exporters.append(OTLPExporter(endpoint, headers, service_name=service_name))
+    return Tracer(exporters, service_name)
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """The process-wide tracer, configured from the environment on first use"""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                set_tracer(tracer_from_env())
+    return _tracer
+
+
+def set_tracer(tracer: Tracer):
+    """Replace the process-wide tracer; it is flushed at interpreter exit"""
+    global _tracer
+    _tracer = tracer
+    if tracer.enabled:
+        atexit.register(tracer.shutdown)
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Worker bundles: multi-module scripts (ESM, CommonJS, WASM, text and data)
+and a streaming multipart body that sends module parts straight from disk.
+"""
+
+import os
+import json
+import uuid
+import hashlib
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Union, Iterable, Callable
+
+
+# Module part content types understood by the Workers script upload API
+ESM = "application/javascript+module"
+COMMONJS = "application/javascript"
+WASM = "application/wasm"
+TEXT = "text/plain"
+DATA = "application/octet-stream"
+
+MODULE_TYPES = {
+    ".js": ESM,
+    ".mjs": ESM,
+    ".cjs": COMMONJS,
+    ".wasm": WASM,
+    ".txt": TEXT,
+    ".html": TEXT,
+    ".json": TEXT,
+    ".bin": DATA,
+}
+
+# Entry points tried, in order, when a directory bundle has no explicit main module
+MAIN_CANDIDATES = ("index.js", "index.mjs", "worker.js", "_worker.js", "src/index.js", "src/index.mjs")
+
+CHUNK_SIZE = 1 << 20
+
+Content = Union[bytes, bytearray, memoryview]
+
+
+def file_chunks(path: Path, chunk_size: int = CHUNK_SIZE) -> Iterable[bytes]:
+    """Yield a file's bytes in chunks"""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+@dataclass
+class WorkerModule:
+    """One part of a worker bundle, backed by a file on disk or in-memory bytes"""
+    name: str
+    path: Optional[Path] = None
+    content: Optional[Content] = None
+    content_type: Optional[str] = None
+
+    def __post_init__(self):
+        if self.path is not None:
+            self.path = Path(self.path)
+        if (self.path is None) == (self.content is None):
+            raise ValueError(f"Module {self.name} needs exactly one of path or content")
+        if self.content_type is None:
+            self.content_type = MODULE_TYPES.get(Path(self.name).suffix.lower(), DATA)
+
+    @property
+    def size(self) -> int:
+        if self.path is not None:
+            return self.path.stat().st_size
+        return memoryview(self.content).nbytes
+
+    def chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterable[Content]:
+        """Yield the module bytes without decoding or joining them"""
+        if self.path is None:
+            view = memoryview(self.content).cast("B")
+            for start in range(0, len(view), chunk_size):
+                yield view[start:start + chunk_size]
+            return
+        yield from file_chunks(self.path, chunk_size)
+
+
+class WorkerBundle:
+    """A set of modules uploaded together as one worker script"""
+
+    def __init__(self, modules: List[WorkerModule], main_module: Optional[str] = None):
+        if not modules:
+            raise ValueError("A worker bundle needs at least one module")
+        names = [module.name for module in modules]
+        if len(set(names)) != len(names):
+            raise ValueError("Duplicate module names in worker bundle")
+        self.modules = modules
+        self._modules_digest: Optional[bytes] = None
+        self.main_module = main_module or self._guess_main()
+        if self.main_module not in names:
+            raise ValueError(f"Main module {self.main_module} is not part of the bundle")
+
+    def _guess_main(self) -> str:
+        names = {module.name for module in self.modules}
+        for candidate in MAIN_CANDIDATES:
+            if candidate in names:
+                return candidate
+        scripts = [module.name for module in self.modules if module.content_type == ESM]
+        if len(scripts) == 1:
+            return scripts[0]
+        raise ValueError("Cannot tell which module is the entry point; pass main_module")
+
+    @classmethod
+    def from_path(cls, path: Union[str, Path], main_module: Optional[str] = None) -> "WorkerBundle":
+        """Build a bundle from a single script file or a bundle directory
+
+        Every file below a directory becomes a module named by its relative
+        path; dotfiles and source maps are skipped.
+        """
+        path = Path(path)
+        if not path.exists():
+            raise FileNotFoundError(f"Worker file not found: {path}")
+        if path.is_file():
+            module = WorkerModule(name=path.name, path=path)
+            if module.content_type not in (ESM, COMMONJS):
+                module.content_type = ESM
+            return cls([module], main_module or path.name)
+
+        modules = []
+        for file_path in sorted(path.rglob("*")):
+            relative = file_path.relative_to(path)
+            if not file_path.is_file() or file_path.suffix == ".map" \
+                    or any(part.startswith(".") for part in relative.parts):
+                continue
+            modules.append(WorkerModule(name=relative.as_posix(), path=file_path))
+        return cls(modules, main_module)
+
+    def preload(self) -> "WorkerBundle":
+        """Return a copy whose modules are read into memory once
+
+        Used when the same bundle is uploaded many times (e.g. to many
+        accounts) so each upload shares the bytes instead of re-reading disk.
+        """
+        modules = [module if module.path is None else
+                   WorkerModule(module.name, content=module.path.read_bytes(), content_type=module.content_type)
+                   for module in self.modules]
+        return WorkerBundle(modules, self.main_module)
+
+    def metadata(self, bindings: Optional[List[Dict]] = None, compatibility_date: str = "2023-01-01",
+                 compatibility_flags: Optional[List[str]] = None) -> Dict:
+        """Build the upload metadata part"""
+        metadata = {"main_module": self.main_module, "compatibility_date": compatibility_date}
+        if compatibility_flags:
+            metadata["compatibility_flags"] = list(compatibility_flags)
+        if bindings:
+            metadata["bindings"] = bindings
+        return metadata
+
+    def digest(self, metadata: Dict) -> str:
+        """SHA-256 over the metadata and every module, streamed from disk"""
+        if self._modules_digest is None:
+            modules = hashlib.sha256()
+            for module in self.modules:
+                modules.update(f"\0{module.name}\0{module.content_type}\0".encode("utf-8"))
+                for chunk in module.chunks():
+                    modules.update(chunk)
+            self._modules_digest = modules.digest()
+        digest = hashlib.sha256(json.dumps(metadata, sort_keys=True).encode("utf-8"))
+        digest.update(self._modules_digest)
+        return digest.hexdigest()
+
+    def multipart(self, metadata: Dict) -> "MultipartStream":
+        """Streaming multipart/form-data body for the script upload endpoint"""
+        parts = [MultipartPart("metadata", json.dumps(metadata).encode("utf-8"), "application/json")]
+        parts.extend(MultipartPart(module.name, module, module.content_type, filename=module.name)
+                     for module in self.modules)
+        return MultipartStream(parts)
+
+
+class MultipartPart:
+    """A form field whose body is bytes, a file Path or a WorkerModule"""
+
+    def __init__(self, name: str, body: Union[Content, Path, WorkerModule], content_type: Optional[str] = None,
+                 filename: Optional[str] = None):
+        self.name = name
+        self.body = body
+        self.content_type = content_type
+        self.filename = filename
+
+    def header(self, boundary: str) -> bytes:
+        disposition = f'form-data; name="{self.name}"'
+        if self.filename is not None:
+            disposition += f'; filename="{self.filename}"'
+        header = f"--{boundary}\r\nContent-Disposition: {disposition}\r\n"
+        if self.content_type:
+            header += f"Content-Type: {self.content_type}\r\n"
+        return (header + "\r\n").encode("utf-8")
+
+    @property
+    def size(self) -> int:
+        if isinstance(self.body, WorkerModule):
+            return self.body.size
+        if isinstance(self.body, Path):
+            return self.body.stat().st_size
+        return memoryview(self.body).nbytes
+
+    def chunks(self) -> Iterable[Content]:
+        if isinstance(self.body, WorkerModule):
+            return self.body.chunks()
+        if isinstance(self.body, Path):
+            return file_chunks(self.body)
+        return [memoryview(self.body)]
+
+
+class MultipartStream:
+    """File-like multipart/form-data body read part by part while it is sent
+
+    Has a known length so requests sends a Content-Length, returns memoryviews
+    or file chunks from read() instead of one joined bytes object, and can be
+    rewound with seek(0) when a request has to be retried.
+    """
+
+    def __init__(self, parts: List[MultipartPart], boundary: Optional[str] = None,
+                 progress: Optional[Callable[[int, int], None]] = None):
+        self.parts = parts
+        self.boundary = boundary or uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self.progress = progress
+        self._length = sum(len(part.header(self.boundary)) + part.size + 2 for part in parts) \
+            + len(self._trailer())
+        self.seek(0)
+
+    def _trailer(self) -> bytes:
+        return f"--{self.boundary}--\r\n".encode("utf-8")
+
+    def _segments(self) -> Iterable[Content]:
+        for part in self.parts:
+            yield part.header(self.boundary)
+            yield from part.chunks()
+            yield b"\r\n"
+        yield self._trailer()
+
+    def __len__(self) -> int:
+        return self._length
+
+    def tell(self) -> int:
+        return self._sent
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if offset != 0 or whence != os.SEEK_SET:
+            raise OSError("MultipartStream can only be rewound to the start")
+        self._iter = iter(self._segments())
+        self._pending = memoryview(b"")
+        self._sent = 0
+        return 0
+
+    def read(self, size: int = -1) -> Content:
+        if size is None or size < 0:
+            return b"".join(bytes(chunk) for chunk in self._read_all())
+        while not self._pending:
+            segment = next(self._iter, None)
+            if segment is None:
+                return b""
+            self._pending = memoryview(segment).cast("B")
+        chunk, self._pending = self._pending[:size], self._pending[size:]
+        self._sent += len(chunk)
+        if self.progress:
+            self.progress(self._sent, self._length)
+        return chunk
+
+    def _read_all(self) -> Iterable[Content]:
+        while True:
+            chunk = self.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
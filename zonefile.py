@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+BIND zone file parsing and rendering for Cloudflare DNS records
+
+parse_zone_file() turns a zone file into record dicts in the shape the DNS
+records API accepts ({"type", "name", "content", "ttl", ...}) and
+render_zone_file() writes records back out. Names are fully qualified
+without the trailing dot, as Cloudflare returns them. Cloudflare's proxy
+flag round-trips through the "cf_tags=cf-proxied:true" comment its own
+exports use.
+
+Usage:
+    from zonefile import parse_zone_file, render_zone_file
+    records = parse_zone_file(open("example.com.zone").read(), origin="example.com")
+"""
+
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# TTL 1 means "automatic" on Cloudflare
+AUTO_TTL = 1
+
+CLASSES = frozenset({"IN", "CH", "HS", "CS"})
+
+# Record types whose rdata is a single domain name
+NAME_TYPES = frozenset({"CNAME", "NS", "PTR", "DNAME"})
+
+# Managed by Cloudflare; skipped by default when parsing
+MANAGED_TYPES = frozenset({"SOA"})
+
+# TXT character-strings are limited to 255 bytes each
+TXT_CHUNK = 255
+
+_TTL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+_TTL_PART = re.compile(r"(\d+)([smhdw]?)", re.IGNORECASE)
+_PROXIED_TAG = re.compile(r"cf_tags=\S*cf-proxied:(true|false)", re.IGNORECASE)
+
+
+class ZoneFileError(ValueError):
+    """A zone file line that cannot be parsed"""
+
+    def __init__(self, line: int, message: str):
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+
+
+def parse_ttl(value: str) -> Optional[int]:
+    """Seconds for "3600" or BIND unit forms like "1h30m"; None if not a TTL"""
+    position, total = 0, 0
+    for match in _TTL_PART.finditer(value):
+        if match.start() != position:
+            return None
+        total += int(match.group(1)) * _TTL_UNITS[(match.group(2) or "s").lower()]
+        position = match.end()
+    return total if position == len(value) and value else None
+
+
+def _tokens(text: str) -> Iterator[Tuple[int, bool, List[Tuple[str, bool]], str]]:
+    """Yield (line number, starts with blank, tokens, comment) per logical record
+
+    Tokens are (text, quoted). Parentheses join physical lines into one
+    logical record; comments are collected so cf_tags survive.
+    """
+    tokens: List[Tuple[str, bool]] = []
+    comments: List[str] = []
+    depth, start_line, blank_owner = 0, 0, False
+    for number, line in enumerate(text.splitlines(), 1):
+        if depth == 0:
+            start_line, blank_owner = number, line[:1] in (" ", "\t")
+        i = 0
+        while i < len(line):
+            char = line[i]
+            if char in " \t\r":
+                i += 1
+            elif char == ";":
+                comments.append(line[i + 1:].strip())
+                break
+            elif char == "(":
+                depth += 1
+                i += 1
+            elif char == ")":
+                if depth == 0:
+                    raise ZoneFileError(number, "unbalanced ')'")
+                depth -= 1
+                i += 1
+            elif char == '"':
+                i += 1
+                value = []
+                while i < len(line) and line[i] != '"':
+                    if line[i] == "\\" and i + 1 < len(line):
+                        i += 1
+                    value.append(line[i])
+                    i += 1
+                if i >= len(line):
+                    raise ZoneFileError(number, "unterminated quoted string")
+                tokens.append(("".join(value), True))
+                i += 1
+            else:
+                end = i
+                while end < len(line) and line[end] not in ' \t\r;()"':
+                    end += 1
+                tokens.append((line[i:end], False))
+                i = end
+        if depth == 0 and tokens:
+            yield start_line, blank_owner, tokens, " ".join(comments)
+            tokens, comments = [], []
+        elif depth == 0:
+            comments = []
+    if depth:
+        raise ZoneFileError(start_line, "unbalanced '('")
+
+
+def _absolute(name: str, origin: str) -> str:
+    """Qualify a zone file name against the origin; result has no trailing dot"""
+    if name == "@":
+        return origin
+    if name.endswith("."):
+        return name[:-1].lower()
+    return f"{name}.{origin}".lower() if origin else name.lower()
+
+
+def _record(rtype: str, owner: str, ttl: int, rdata: List[Tuple[str, bool]], origin: str,
+            line: int) -> Dict:
+    values = [value for value, _ in rdata]
+    record: Dict = {"type": rtype, "name": owner, "ttl": ttl}
+    try:
+        if rtype in ("A", "AAAA"):
+            record["content"] = values[0]
+        elif rtype in NAME_TYPES:
+            record["content"] = _absolute(values[0], origin)
+        elif rtype == "MX":
+            record["priority"] = int(values[0])
+            record["content"] = _absolute(values[1], origin)
+        elif rtype in ("TXT", "SPF"):
+            record["content"] = "".join(values)
+        elif rtype == "SRV":
+            priority, weight, port = int(values[0]), int(values[1]), int(values[2])
+            target = _absolute(values[3], origin)
+            record["data"] = {"priority": priority, "weight": weight, "port": port, "target": target}
+            record["priority"] = priority
+            record["content"] = f"{weight} {port} {target}"
+        elif rtype == "CAA":
+            record["data"] = {"flags": int(values[0]), "tag": values[1], "value": values[2]}
+            record["content"] = f'{values[0]} {values[1]} "{values[2]}"'
+        else:
+            record["content"] = " ".join(f'"{value}"' if quoted else value for value, quoted in rdata)
+    except (IndexError, ValueError):
+        raise ZoneFileError(line, f"malformed {rtype} record data: {' '.join(values)}")
+    if not values:
+        raise ZoneFileError(line, f"{rtype} record has no data")
+    return record
+
+
+def parse_zone_file(text: str, origin: Optional[str] = None, default_ttl: int = AUTO_TTL,
+                    skip_managed: bool = True) -> List[Dict]:
+    """Parse a BIND zone file into Cloudflare DNS record dicts
+
+    Args:
+        text: Zone file contents
+        origin: Zone name, used until a $ORIGIN directive overrides it
+        default_ttl: TTL for records without one when there is no $TTL
+        skip_managed: Drop SOA and apex NS records, which Cloudflare manages
+    Raises:
+        ZoneFileError: With the line number of the first unparsable record
+    """
+    origin = (origin or "").rstrip(".").lower()
+    zone = origin
+    ttl_default = default_ttl
+    records = []
+    owner, last_ttl = None, None
+    for line, blank_owner, tokens, comment in _tokens(text):
+        first = tokens[0][0]
+        if first.upper() == "$ORIGIN":
+            origin = _absolute(tokens[1][0] if len(tokens) > 1 else "", "")
+            zone = zone or origin
+            continue
+        if first.upper() == "$TTL":
+            ttl_default = parse_ttl(tokens[1][0]) if len(tokens) > 1 else None
+            if ttl_default is None:
+                raise ZoneFileError(line, "invalid $TTL")
+            continue
+        if first.startswith("$"):
+            raise ZoneFileError(line, f"unsupported directive {first}")
+
+        if not blank_owner:
+            owner, tokens = _absolute(first, origin), tokens[1:]
+        elif owner is None:
+            raise ZoneFileError(line, "record without an owner name")
+        ttl = None
+        while tokens and not tokens[0][1]:
+            value = tokens[0][0]
+            if value.upper() in CLASSES:
+                tokens = tokens[1:]
+            elif ttl is None and parse_ttl(value) is not None:
+                ttl, tokens = parse_ttl(value), tokens[1:]
+            else:
+                break
+        if not tokens:
+            raise ZoneFileError(line, "missing record type")
+        rtype = tokens[0][0].upper()
+        # A record without a TTL inherits $TTL, or the previous record's TTL in classic BIND files
+        ttl = ttl if ttl is not None else ttl_default if ttl_default is not None else last_ttl
+        last_ttl = ttl
+        if skip_managed and (rtype in MANAGED_TYPES or (rtype == "NS" and owner == zone)):
+            continue
+        record = _record(rtype, owner, ttl if ttl is not None else AUTO_TTL, tokens[1:], origin, line)
+        proxied = _PROXIED_TAG.search(comment)
+        if proxied:
+            record["proxied"] = proxied.group(1).lower() == "true"
+        records.append(record)
+    return records
+
+
+def _quote(text: str) -> str:
+    """TXT content as one or more quoted character-strings of at most 255 bytes"""
+    chunks = [text[i:i + TXT_CHUNK] for i in range(0, len(text), TXT_CHUNK)] or [""]
+    return " ".join('"' + chunk.replace("\\", "\\\\").replace('"', '\\"') + '"' for chunk in chunks)
+
+
+def _rdata(record: Dict) -> str:
+    rtype, content = record["type"], record.get("content", "")
+    data = record.get("data") or {}
+    if rtype in NAME_TYPES:
+        return f"{content}."
+    if rtype == "MX":
+        return f"{record.get('priority', 0)} {content}."
+    if rtype in ("TXT", "SPF"):
+        # The API may return TXT content already quoted
+        if content.startswith('"') and content.endswith('"'):
+            return content
+        return _quote(content)
+    if rtype == "SRV":
+        if data:
+            return f"{data['priority']} {data['weight']} {data['port']} {data['target'].rstrip('.')}."
+        weight, port, target = content.split()
+        return f"{record.get('priority', 0)} {weight} {port} {target.rstrip('.')}."
+    if rtype == "CAA" and data:
+        return f"{data['flags']} {data['tag']} {_quote(str(data['value']))}"
+    return content
+
+
+def render_zone_file(records: Iterable[Dict], origin: str, default_ttl: Optional[int] = None) -> str:
+    """Write records as a BIND zone file with fully qualified names
+
+    Records are sorted by name and type so exports diff cleanly.
+    """
+    origin = origin.rstrip(".")
+    lines = [f"$ORIGIN {origin}."]
+    if default_ttl:
+        lines.append(f"$TTL {default_ttl}")
+    ordered = sorted(records, key=lambda r: (r["name"] != origin, r["name"].split(".")[::-1], r["type"],
+                                             r.get("content", "")))
+    for record in ordered:
+        line = f"{record['name']}.\t{record.get('ttl') or AUTO_TTL}\tIN\t{record['type']}\t{_rdata(record)}"
+        if record.get("proxiable") or "proxied" in record:
+            line += f" ; cf_tags=cf-proxied:{'true' if record.get('proxied') else 'false'}"
+        lines.append(line)
+    return "\n".join(lines) + "\n"